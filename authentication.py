@@ -1,3 +1,9 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import bcrypt
@@ -9,6 +15,101 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from config import settings
 from exceptions import AuthenticationException
+from models.users import Role
+
+# One bit per known role; TokenPayload precomputes its mask for O(1) checks
+ROLE_BITS: dict[str, int] = {role.value: 1 << i for i, role in enumerate(Role)}
+
+
+def role_mask(roles) -> int:
+    """Combine role names into a bitmask (unknown roles are ignored)"""
+    mask = 0
+    for role in roles or ():
+        mask |= ROLE_BITS.get(role.value if isinstance(role, Role) else role, 0)
+    return mask
+
+
+class VerifiedTokenCache:
+    """
+    LRU cache of verified access tokens.
+
+    Keyed by a SHA-256 of signing secret and token (raw tokens are never stored).
+    Entries are dropped once the token's own exp has passed, so a cached token is
+    never accepted longer than jwt.decode would accept it.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, TokenPayload]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(secret: str, token: str) -> str:
+        return hashlib.sha256(f"{secret}\0{token}".encode()).hexdigest()
+
+    def get(self, key: str) -> "TokenPayload | None":
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key: str, expires_at: float, payload: "TokenPayload"):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AuthMetrics:
+    """In-process latency counters for password hashing and logins"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, float]] = {}
+
+    def record(self, operation: str, duration_ms: float, wait_ms: float = 0.0):
+        """Record one operation; wait_ms is time spent queued for a hashing worker"""
+        with self._lock:
+            stats = self._stats.setdefault(
+                operation, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "wait_total_ms": 0.0}
+            )
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            stats["wait_total_ms"] += wait_ms
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Return count, average/max duration and average queue wait per operation"""
+        with self._lock:
+            return {
+                operation: {
+                    "count": stats["count"],
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 2),
+                    "max_ms": round(stats["max_ms"], 2),
+                    "avg_wait_ms": round(stats["wait_total_ms"] / stats["count"], 2),
+                }
+                for operation, stats in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
 
 
 class AuthHandler:
@@ -17,11 +118,72 @@ class AuthHandler:
     argon2_hasher = PasswordHasher()
     secret = settings.SECRET_KEY
     refresh_secret = settings.SECRET_KEY + "_refresh"  # Separate secret for refresh tokens
+    # Shared by all handlers: argon2/bcrypt run here instead of on the event loop
+    _hash_executor: ThreadPoolExecutor | None = None
+    _hash_executor_lock = threading.Lock()
+    metrics = AuthMetrics()
+    token_cache = VerifiedTokenCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+    @classmethod
+    def _get_hash_executor(cls) -> ThreadPoolExecutor:
+        """Lazily create the hashing pool, capped at PASSWORD_HASH_WORKERS threads"""
+        if cls._hash_executor is None:
+            with cls._hash_executor_lock:
+                if cls._hash_executor is None:
+                    cls._hash_executor = ThreadPoolExecutor(
+                        max_workers=max(1, int(settings.PASSWORD_HASH_WORKERS)),
+                        thread_name_prefix="password-hash",
+                    )
+        return cls._hash_executor
+
+    async def _run_off_loop(self, operation: str, func, *args):
+        """Run a CPU-bound hashing call in the hashing pool and record its latency"""
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        started: list[float] = []
+
+        def _timed():
+            started.append(time.perf_counter())
+            return func(*args)
+
+        result = await loop.run_in_executor(self._get_hash_executor(), _timed)
+        finished = time.perf_counter()
+        start = started[0] if started else submitted
+        self.metrics.record(
+            operation, duration_ms=(finished - start) * 1000, wait_ms=(start - submitted) * 1000
+        )
+        return result
 
     def get_password_hash(self, password):
         """Hash password using argon2 (new standard)"""
         return self.argon2_hasher.hash(password)
 
+    async def get_password_hash_async(self, password) -> str:
+        """Hash password without blocking the event loop"""
+        return await self._run_off_loop("hash", self.get_password_hash, password)
+
+    async def verify_password_async(self, plain_password, hashed_password) -> bool:
+        """Verify password without blocking the event loop"""
+        return await self._run_off_loop(
+            "verify", self.verify_password, plain_password, hashed_password
+        )
+
+    async def verify_and_upgrade_password(
+        self, plain_password, hashed_password
+    ) -> tuple[bool, str | None]:
+        """
+        Verify password off-loop and rehash it if the stored hash is outdated.
+
+        Returns:
+            Tuple of (is_valid, new_hash). new_hash is a fresh argon2 hash when the
+            password is valid but stored as legacy bcrypt (or with outdated argon2
+            parameters), otherwise None.
+        """
+        is_valid = await self.verify_password_async(plain_password, hashed_password)
+        if not is_valid or not self.needs_rehash(hashed_password):
+            return is_valid, None
+        return True, await self.get_password_hash_async(plain_password)
+
     def verify_password(self, plain_password, hashed_password):
         """Verify password - supports both argon2 and legacy bcrypt"""
         # Try argon2 first (new format starts with $argon2)
@@ -38,8 +200,13 @@ class AuthHandler:
             return False
 
     def needs_rehash(self, hashed_password):
-        """Check if password needs to be upgraded from bcrypt to argon2"""
-        return not hashed_password.startswith("$argon2")
+        """Check if password needs to be upgraded from bcrypt to argon2 (or to current argon2 parameters)"""
+        if not hashed_password.startswith("$argon2"):
+            return True
+        try:
+            return self.argon2_hasher.check_needs_rehash(hashed_password)
+        except InvalidHash:
+            return False
 
     def encode_token(self, user: dict) -> str:
         """Generate short-lived access token (30 minutes)"""
@@ -72,12 +239,16 @@ class AuthHandler:
         return jwt.encode(payload, self.refresh_secret, algorithm="HS256")
 
     def decode_token(self, token):
-        """Decode and validate access token"""
+        """Decode and validate access token (verified tokens are cached until they expire)"""
+        cache_key = self.token_cache.key(self.secret, token)
+        cached = self.token_cache.get(cache_key)
+        if cached is not None:
+            return cached
         try:
             payload = jwt.decode(token, self.secret, algorithms=["HS256"])
             if payload.get("type") != "access":
                 raise jwt.InvalidTokenError("Not an access token")
-            return TokenPayload(
+            token_payload = TokenPayload(
                 sub=payload["sub"],
                 roles=payload["roles"],
                 firstName=payload.get("firstName"),
@@ -85,6 +256,9 @@ class AuthHandler:
                 clubId=payload.get("clubId"),
                 clubName=payload.get("clubName"),
             )
+            if isinstance(payload.get("exp"), int | float):
+                self.token_cache.put(cache_key, payload["exp"], token_payload)
+            return token_payload
         except jwt.ExpiredSignatureError as e:
             raise AuthenticationException(
                 message="Token has expired", details={"reason": "expired_signature"}
@@ -142,7 +316,8 @@ class AuthHandler:
         """Check if user has any of the required roles"""
         return any(role in user_roles for role in required_roles)
 
-    def auth_wrapper(self, auth: HTTPAuthorizationCredentials = Security(security)):
+    async def auth_wrapper(self, auth: HTTPAuthorizationCredentials = Security(security)):
+        # async so FastAPI does not dispatch every authenticated request to a worker thread
         return self.decode_token(auth.credentials)
 
 
@@ -163,3 +338,20 @@ class TokenPayload:
         self.lastName = lastName
         self.clubId = clubId
         self.clubName = clubName
+        self.role_mask = role_mask(roles)
+
+    def has_role(self, role: str | Role) -> bool:
+        """Check a single role against the precomputed role mask"""
+        bit = ROLE_BITS.get(role.value if isinstance(role, Role) else role)
+        if bit is None:
+            return role in self.roles
+        return bool(self.role_mask & bit)
+
+    def has_any_role(self, *roles: str | Role) -> bool:
+        """Check if the token carries any of the given roles"""
+        if self.role_mask & role_mask(roles):
+            return True
+        # Roles outside the Role enum have no bit; fall back to the raw list
+        return any(
+            role not in ROLE_BITS and role in self.roles for role in roles if isinstance(role, str)
+        )
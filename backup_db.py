@@ -1,69 +1,199 @@
 #!/usr/bin/env python
+"""
+Backup MongoDB collections
+
+Every collection is streamed with a cursor into <collection>.ndjson.gz: one
+MongoDB Extended JSON document per line, gzip-compressed, written in batches,
+so memory use does not grow with the collection. Collections are backed up in
+parallel. _metadata.json records per collection the document count, the
+SHA-256 of the uncompressed lines, and the highest _id and update timestamp.
+
+With --since <backup_dir> the backup is incremental: collections with an update
+timestamp (TIMESTAMP_FIELDS) only get the documents inserted or updated after
+that backup; all others are dumped in full. Deletions are not captured by an
+incremental layer. restore_db.py restores a backup and the chain of backups it
+is based on.
+
+Usage:
+    python backup_db.py [--prod] [--since backups/<dir>] [--jobs 4] [--batch-size 1000]
+"""
+
 import argparse
+import gzip
+import hashlib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from typing import Any
 
-import certifi
-from pymongo import MongoClient
-
-parser = argparse.ArgumentParser(description="Backup MongoDB collections")
-parser.add_argument("--prod", action="store_true", help="Backup production database")
-args = parser.parse_args()
-
-# Database configuration
-if args.prod:
-    DB_URL = os.environ["DB_URL_PROD"]
-    DB_NAME = "bishl"
-    backup_prefix = "prod"
-else:
-    DB_URL = os.environ["DB_URL"]
-    DB_NAME = "bishl_dev"
-    backup_prefix = "dev"
-
-# Connect to MongoDB
-client: MongoClient = MongoClient(DB_URL, tlsCAFile=certifi.where())
-db = client[DB_NAME]
-
-# Create backup directory
-backup_dir = f"backups/{backup_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-os.makedirs(backup_dir, exist_ok=True)
-
-# Collections to backup
-collections = db.list_collection_names()
-
-print(f"Starting backup for {DB_NAME}...")
-for collection_name in collections:
-    print(f"Backing up {collection_name}...")
-    collection = db[collection_name]
-
-    # Export to JSON
-    documents = list(collection.find())
-
-    # Convert ObjectId to string for JSON serialization
-    for doc in documents:
-        if "_id" in doc:
-            doc["_id"] = str(doc["_id"])
-
-    backup_file = f"{backup_dir}/{collection_name}.json"
-    with open(backup_file, "w") as f:
-        json.dump(documents, f, indent=2, default=str)
-
-    print(f"  → Saved {len(documents)} documents to {backup_file}")
-
-print(f"\nBackup completed successfully in {backup_dir}")
-print(f"Total collections backed up: {len(collections)}")
-
-# Create metadata file
-metadata = {
-    "backup_date": datetime.now().isoformat(),
-    "database": DB_NAME,
-    "environment": backup_prefix,
-    "collections": collections,
-    "total_collections": len(collections),
+from bson import json_util
+
+# Canonical Extended JSON keeps types (dates, ObjectIds, int64) exact on restore
+JSON_OPTIONS = json_util.CANONICAL_JSON_OPTIONS
+METADATA_FILE = "_metadata.json"
+FORMAT = "ndjson.gz"
+
+# Collections whose documents carry a timestamp that every update sets.
+# Assignments have no updateDate (status changes only $set status and $push
+# statusHistory), so they are always dumped in full.
+TIMESTAMP_FIELDS = {
+    "documents": "updateDate",
+    "posts": "updateDate",
 }
 
-with open(f"{backup_dir}/_metadata.json", "w") as f:
-    json.dump(metadata, f, indent=2)
 
-print("\nTo restore, use: python restore_db.py --backup <backup_dir>")
+def encode(value: Any) -> Any:
+    """A metadata value as Extended JSON (dates and ObjectIds survive the round trip)"""
+    return json.loads(json_util.dumps(value, json_options=JSON_OPTIONS))
+
+
+def decode(value: Any) -> Any:
+    return json_util.loads(json.dumps(value))
+
+
+def incremental_query(previous: dict[str, Any] | None, timestamp_field: str | None) -> dict:
+    """Documents inserted or updated since the previous backup; {} for a full dump"""
+    if not previous or not timestamp_field:
+        return {}
+    conditions = []
+    if previous.get("max_id") is not None:
+        conditions.append({"_id": {"$gt": decode(previous["max_id"])}})
+    if previous.get("max_updated") is not None:
+        conditions.append({timestamp_field: {"$gt": decode(previous["max_updated"])}})
+    return {"$or": conditions} if conditions else {}
+
+
+def backup_collection(
+    collection, path: Path, previous: dict[str, Any] | None = None, batch_size: int = 1000
+) -> dict[str, Any]:
+    """Stream one collection into a gzip NDJSON file; returns its metadata entry"""
+    timestamp_field = TIMESTAMP_FIELDS.get(collection.name)
+    query = incremental_query(previous, timestamp_field)
+    checksum = hashlib.sha256()
+    count = 0
+    max_id = max_updated = None
+    if query:
+        max_id = decode(previous.get("max_id"))
+        max_updated = decode(previous.get("max_updated"))
+
+    cursor = collection.find(query).sort("_id", 1).batch_size(batch_size)
+    with gzip.open(path, "wb") as f:
+        lines: list[bytes] = []
+        for doc in cursor:
+            line = (json_util.dumps(doc, json_options=JSON_OPTIONS) + "\n").encode("utf-8")
+            checksum.update(line)
+            lines.append(line)
+            count += 1
+            max_id = doc["_id"] if max_id is None or _greater(doc["_id"], max_id) else max_id
+            updated = doc.get(timestamp_field) if timestamp_field else None
+            if isinstance(updated, datetime) and (max_updated is None or updated > max_updated):
+                max_updated = updated
+            if len(lines) >= batch_size:
+                f.write(b"".join(lines))
+                lines = []
+        f.write(b"".join(lines))
+
+    return {
+        "file": path.name,
+        "mode": "incremental" if query else "full",
+        "count": count,
+        "sha256": checksum.hexdigest(),
+        "max_id": encode(max_id),
+        "timestamp_field": timestamp_field,
+        "max_updated": encode(max_updated),
+    }
+
+
+def _greater(a: Any, b: Any) -> bool:
+    """_id order across the string and ObjectId ids found in this database"""
+    try:
+        return a > b
+    except TypeError:
+        return str(a) > str(b)
+
+
+def load_metadata(backup_dir: Path) -> dict[str, Any]:
+    return json.loads((Path(backup_dir) / METADATA_FILE).read_text(encoding="utf-8"))
+
+
+def backup_database(
+    db,
+    backup_dir: Path,
+    since: Path | None = None,
+    jobs: int = 4,
+    batch_size: int = 1000,
+    environment: str | None = None,
+) -> dict[str, Any]:
+    """Back up every collection of db into backup_dir and write _metadata.json"""
+    backup_dir = Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_metadata(since)["collections"] if since else {}
+    names = sorted(name for name in db.list_collection_names() if not name.startswith("system."))
+
+    def run(name: str) -> tuple[str, dict[str, Any]]:
+        entry = backup_collection(
+            db[name], backup_dir / f"{name}.{FORMAT}", previous.get(name), batch_size
+        )
+        print(f"  → {name}: {entry['count']} documents ({entry['mode']})")
+        return name, entry
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        collections = dict(pool.map(run, names))
+
+    metadata = {
+        "backup_date": datetime.now().isoformat(),
+        "database": db.name,
+        "environment": environment,
+        "format": FORMAT,
+        "base": str(since) if since else None,
+        "collections": collections,
+        "total_collections": len(collections),
+    }
+    (backup_dir / METADATA_FILE).write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    return metadata
+
+
+def main() -> None:
+    import certifi
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description="Backup MongoDB collections")
+    parser.add_argument("--prod", action="store_true", help="Backup production database")
+    parser.add_argument(
+        "--since", type=Path, help="Previous backup directory; back up only what changed since"
+    )
+    parser.add_argument("--jobs", type=int, default=4, help="Collections backed up in parallel")
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="Documents per cursor batch and write"
+    )
+    args = parser.parse_args()
+
+    # Database configuration
+    if args.prod:
+        db_url, db_name, backup_prefix = os.environ["DB_URL_PROD"], "bishl", "prod"
+    else:
+        db_url, db_name, backup_prefix = os.environ["DB_URL"], "bishl_dev", "dev"
+
+    client: MongoClient = MongoClient(db_url, tlsCAFile=certifi.where())
+    kind = "incr" if args.since else "full"
+    backup_dir = Path(f"backups/{backup_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    if args.since:
+        backup_dir = backup_dir.with_name(f"{backup_dir.name}_{kind}")
+
+    print(f"Starting {kind} backup for {db_name}...")
+    try:
+        metadata = backup_database(
+            client[db_name], backup_dir, args.since, args.jobs, args.batch_size, backup_prefix
+        )
+    finally:
+        client.close()
+
+    print(f"\nBackup completed successfully in {backup_dir}")
+    print(f"Total collections backed up: {metadata['total_collections']}")
+    print(f"\nTo restore, use: python restore_db.py --backup {backup_dir}")
+
+
+if __name__ == "__main__":
+    main()
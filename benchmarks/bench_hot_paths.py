@@ -0,0 +1,290 @@
+"""
+Hot Path Benchmarks
+
+Times the stats, standings and license validation hot paths on a synthetic
+league (benchmarks/league.py) held in the in-memory database stand-in of
+tests/fixtures/memory_db.py, so runs need no MongoDB and are repeatable:
+
+    standings                    StatsService._calculate_standings per tournament
+    roster_stats                 StatsService.calculate_roster_stats per match team
+    playup_occurrences           StatsService._find_playup_occurrences per called player
+    playup_occurrences_matchday  the same, grouped per matchday
+    classify_licenses            classify_license_types_for_player per player
+    validate_licenses            validate_licenses_for_player per player
+    get_match_object             routers.matches.get_match_object per match
+
+Results are written to benchmarks/results/<commit>.json (kept locally, not
+versioned) and compared with the most recent earlier result (or --baseline);
+cases slower by more than --threshold are reported as regressions.
+
+Usage:
+    python benchmarks/bench_hot_paths.py [--clubs 8] [--teams 3] [--players 18]
+        [--rounds 14] [--repeat 5] [--only standings,roster_stats]
+        [--baseline FILE] [--threshold 0.2] [--fail-on-regression] [--no-save]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path to allow importing from root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import asyncio
+import copy
+import json
+import platform
+import statistics
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from benchmarks.league import build_league
+from logging_config import logger
+from models.tournaments import CallUpType
+from routers.matches import get_match_object
+from services.player_assignment_service import PlayerAssignmentService
+from services.stats_service import StatsService
+from tests.fixtures.memory_db import MemoryDatabase
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def git_revision() -> tuple[str, bool]:
+    """Short commit hash and whether the working tree has uncommitted changes"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        )
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+async def seed(league: dict[str, list[dict]]) -> MemoryDatabase:
+    db = MemoryDatabase()
+    for collection, documents in league.items():
+        await db[collection].insert_many(documents)
+    return db
+
+
+def build_cases(db: MemoryDatabase, league: dict[str, list[dict]]) -> dict:
+    """Case name -> (setup, operation, number of operations) per timed run"""
+    stats_service = StatsService(db)
+    assignment_service = PlayerAssignmentService(db)
+    season = league["tournaments"][0]["seasons"][0]["alias"]
+
+    matches_by_tournament: dict[str, list[dict]] = {}
+    for match in league["matches"]:
+        matches_by_tournament.setdefault(match["tournament"]["alias"], []).append(match)
+    round_info = {t["alias"]: t["seasons"][0]["rounds"][0] for t in league["tournaments"]}
+    called = sorted(
+        {
+            (match["tournament"]["alias"], entry["player"]["playerId"])
+            for match in league["matches"]
+            for side in ("home", "away")
+            for entry in match[side]["roster"]["players"]
+            if entry["called"]
+        }
+    )
+    classified = []
+
+    async def standings(_):
+        for matches in matches_by_tournament.values():
+            stats_service._calculate_standings(matches)
+
+    async def roster_stats(_):
+        for match in league["matches"]:
+            for team_flag in ("home", "away"):
+                await stats_service.calculate_roster_stats(match["_id"], team_flag)
+
+    def playup(call_up_type: CallUpType):
+        async def run(_):
+            for t_alias, player_id in called:
+                stats_service._find_playup_occurrences(
+                    player_id,
+                    matches_by_tournament[t_alias],
+                    t_alias,
+                    season,
+                    call_up_type,
+                    round_info[t_alias],
+                )
+
+        return run
+
+    def player_copies():
+        return copy.deepcopy(league["players"])
+
+    async def classify(players):
+        for player in players:
+            await assignment_service.classify_license_types_for_player(player)
+
+    def classified_copies():
+        return copy.deepcopy(classified)
+
+    async def validate(players):
+        for player in players:
+            await assignment_service.validate_licenses_for_player(player)
+
+    async def match_objects(_):
+        for match in league["matches"]:
+            await get_match_object(db, match["_id"])
+
+    async def prepare_classified():
+        players = player_copies()
+        await classify(players)
+        classified.extend(players)
+
+    no_setup = lambda: None  # noqa: E731
+    return {
+        "standings": (no_setup, standings, len(matches_by_tournament)),
+        "roster_stats": (no_setup, roster_stats, 2 * len(league["matches"])),
+        "playup_occurrences": (no_setup, playup(CallUpType.MATCH), len(called)),
+        "playup_occurrences_matchday": (no_setup, playup(CallUpType.MATCHDAY), len(called)),
+        "classify_licenses": (player_copies, classify, len(league["players"])),
+        "validate_licenses": (classified_copies, validate, len(league["players"])),
+        "get_match_object": (no_setup, match_objects, len(league["matches"])),
+    }, prepare_classified
+
+
+async def measure(
+    setup: Callable[[], object], operation: Callable[[object], Awaitable], repeat: int
+) -> list[float]:
+    await operation(setup())  # warm-up
+    timings = []
+    for _ in range(repeat):
+        data = setup()
+        start = time.perf_counter()
+        await operation(data)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def latest_result(exclude: Path | None) -> Path | None:
+    results = [
+        p for p in RESULTS_DIR.glob("*.json") if exclude is None or p.resolve() != exclude.resolve()
+    ]
+    return max(results, key=lambda p: p.stat().st_mtime, default=None)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print per-case deltas against a baseline; returns the regressed case names"""
+    if baseline.get("params") != current["params"]:
+        print("baseline was run with different parameters, deltas are not comparable")
+    regressions = []
+    print(f"\ncompared with {baseline['commit']} ({baseline['timestamp']}):")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            print(f"  {name:<30} new")
+            continue
+        delta = result["median_ms"] / before["median_ms"] - 1
+        flag = ""
+        if delta > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<30} {delta * 100:+7.1f}%{flag}")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict:
+    league = build_league(args.clubs, args.teams, args.players, args.rounds, args.seed)
+    db = await seed(league)
+    cases, prepare_classified = build_cases(db, league)
+    await prepare_classified()
+    selected = args.only.split(",") if args.only else list(cases)
+    unknown = set(selected) - set(cases)
+    if unknown:
+        raise SystemExit(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "params": {
+            "clubs": args.clubs,
+            "teams": args.teams,
+            "players": args.players,
+            "rounds": args.rounds,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "dataset": {name: len(docs) for name, docs in league.items()},
+        "results": {},
+    }
+    print(
+        ", ".join(f"{count} {name}" for name, count in report["dataset"].items())
+        + f"; {args.repeat} runs"
+    )
+    for name in selected:
+        setup, operation, ops = cases[name]
+        timings = await measure(setup, operation, args.repeat)
+        median = statistics.median(timings)
+        report["results"][name] = {
+            "ops": ops,
+            "median_ms": round(median, 3),
+            "min_ms": round(min(timings), 3),
+            "max_ms": round(max(timings), 3),
+            "per_op_us": round(median * 1000 / max(ops, 1), 2),
+        }
+        print(
+            f"{name:>30}: median {median:9.2f} ms  min {min(timings):9.2f} ms"
+            f"  {ops:6d} ops  {median * 1000 / max(ops, 1):9.1f} us/op"
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark stats and license hot paths.")
+    parser.add_argument("--clubs", type=int, default=8, help="Number of clubs")
+    parser.add_argument("--teams", type=int, default=3, help="Teams per club")
+    parser.add_argument("--players", type=int, default=18, help="Players per team")
+    parser.add_argument("--rounds", type=int, default=14, help="Matchdays per tournament")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed of the generator")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--only", help="Comma-separated case names to run")
+    parser.add_argument("--baseline", type=Path, help="Result file to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Slowdown reported as regression (0.2 = 20%%)"
+    )
+    parser.add_argument(
+        "--fail-on-regression", action="store_true", help="Exit with status 1 on regressions"
+    )
+    parser.add_argument("--no-save", action="store_true", help="Do not write the result file")
+    args = parser.parse_args()
+
+    # Service log lines would dominate the timings
+    logger.remove()
+
+    report = asyncio.run(run(args))
+
+    output = None
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        suffix = "-dirty" if report["dirty"] else ""
+        output = RESULTS_DIR / f"{report['commit']}{suffix}.json"
+        output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nresults written to {output}")
+
+    baseline_path = args.baseline or latest_result(exclude=output)
+    if baseline_path is None:
+        return
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions = compare(report, baseline, args.threshold)
+    if regressions and args.fail_on_regression:
+        raise SystemExit(f"Regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
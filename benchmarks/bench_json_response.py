@@ -0,0 +1,88 @@
+"""
+JSON Response Benchmark
+
+Compares the legacy list-response path (model -> jsonable_encoder ->
+JSONResponse) with FastJSONResponse on one page of MatchListBase items, the
+shape returned by GET /matches and GET /matches/calendar.
+
+Usage:
+    python benchmarks/bench_json_response.py [--size 500] [--repeat 20]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path to allow importing from root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models.matches import MatchListBase
+from routers.matches import convert_seconds_to_times
+from services.json_response import FastJSONResponse
+from services.pagination import PaginationHelper
+from tests.fixtures.data_fixtures import create_test_match
+
+
+def build_page(size: int) -> dict:
+    """A paginated response of `size` matches as get_matches builds it"""
+    kickoff = datetime(2025, 9, 6, 11, 0)
+    items = []
+    for i in range(size):
+        match = create_test_match(
+            match_id=str(ObjectId()), start_date=kickoff + timedelta(hours=2 * i)
+        )
+        items.append(MatchListBase(**convert_seconds_to_times(match)))
+    return PaginationHelper.create_response(items=items, page=1, page_size=size, total_count=size)
+
+
+def legacy(page: dict) -> bytes:
+    return JSONResponse(content=jsonable_encoder(page)).body
+
+
+def fast(page: dict) -> bytes:
+    return FastJSONResponse(content=page).body
+
+
+def measure(fn, page: dict, repeat: int) -> list[float]:
+    fn(page)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(page)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization.")
+    parser.add_argument("--size", type=int, default=500, help="Matches per page")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per path")
+    args = parser.parse_args()
+
+    page = build_page(args.size)
+    if legacy(page) != fast(page):
+        raise SystemExit("Serialized bodies differ - the benchmark would be meaningless")
+
+    print(f"{args.size} matches, {len(fast(page)) / 1024:.0f} KiB body, {args.repeat} runs")
+    results = {
+        name: measure(fn, page, args.repeat) for name, fn in (("legacy", legacy), ("fast", fast))
+    }
+    for name, timings in results.items():
+        print(
+            f"{name:>8}: median {statistics.median(timings):7.2f} ms"
+            f"  min {min(timings):7.2f} ms  max {max(timings):7.2f} ms"
+        )
+    speedup = statistics.median(results["legacy"]) / statistics.median(results["fast"])
+    print(f"speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
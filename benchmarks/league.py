@@ -0,0 +1,357 @@
+"""
+Synthetic League Generator
+
+Builds a deterministic league for benchmarks: N clubs with M teams each
+(cycling through the age groups below), K licensed players per team and one
+tournament per age group playing R matchdays of a round robin. Every match is
+finished with rosters, scores, penalties and team stats, and rosters include
+players called up from the club's next younger team, so play-up tracking and
+multi-license validation have real work to do.
+
+All documents follow the shapes of tests/fixtures/data_fixtures.py.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from tests.fixtures.data_fixtures import (
+    _CURRENT_SEASON_ALIAS,
+    _CURRENT_SEASON_NAME,
+    create_test_called_from_team,
+    create_test_club,
+    create_test_match,
+    create_test_player,
+    create_test_roster_player,
+)
+
+# (age group, player age), oldest first; a team's play-up source is the next entry
+AGE_GROUPS = [("HERREN", 26), ("U19", 17), ("U16", 14), ("U13", 11)]
+CALLED_PLAYERS_PER_ROSTER = 2
+SEASON_START = datetime(2025, 9, 6, 11, 0)
+
+
+def _team(club: dict, index: int) -> dict:
+    age_group = AGE_GROUPS[index % len(AGE_GROUPS)][0]
+    name = f"{club['clubName']} {age_group}"
+    team_id = str(ObjectId())
+    return {
+        "_id": team_id,
+        "teamId": team_id,
+        "name": name,
+        "alias": f"{club['clubAlias']}-{age_group.lower()}",
+        "fullName": name,
+        "shortName": f"{club['clubAlias'][:6].upper()} {age_group}",
+        "tinyName": f"{club['clubAlias'][:3].upper()}{index}",
+        "ageGroup": age_group,
+        "logo": None,
+        "clubId": club["_id"],
+        "clubName": club["clubName"],
+        "clubAlias": club["clubAlias"],
+        "teamNumber": 1 + index // len(AGE_GROUPS),
+        "active": True,
+        "published": True,
+    }
+
+
+def _license(club: dict, team: dict, license_type: str, pass_no: str) -> dict:
+    return {
+        "clubId": club["_id"],
+        "clubName": club["clubName"],
+        "clubAlias": club["clubAlias"],
+        "clubType": "MAIN",
+        "teams": [
+            {
+                "teamId": team["_id"],
+                "teamName": team["name"],
+                "teamAlias": team["alias"],
+                "teamType": "COMPETITIVE",
+                "teamAgeGroup": team["ageGroup"],
+                "passNo": pass_no,
+                "licenseType": license_type,
+                "status": "UNKNOWN",
+                "invalidReasonCodes": [],
+                "source": "BISHL",
+                "adminOverride": False,
+                "active": True,
+            }
+        ],
+    }
+
+
+def _players(rng: random.Random, club: dict, team: dict, count: int) -> list[dict]:
+    age = dict(AGE_GROUPS)[team["ageGroup"]]
+    players = []
+    for i in range(count):
+        player_id = str(ObjectId())
+        birthdate = datetime(datetime.now().year - age, rng.randint(1, 12), rng.randint(1, 28))
+        players.append(
+            create_test_player(
+                test_id=player_id,
+                _id=player_id,
+                playerId=player_id,
+                firstName=f"Player{i}",
+                lastName=team["alias"],
+                displayFirstName=f"Player{i}",
+                displayLastName=team["alias"],
+                birthdate=birthdate,
+                position="Goalie" if i == 0 else "Skater",
+                assignedTeams=[_license(club, team, "PRIMARY", f"{rng.randint(10000, 99999)}")],
+            )
+        )
+    return players
+
+
+def _event_player(player: dict, jersey: int) -> dict:
+    return {
+        "playerId": player["_id"],
+        "firstName": player["firstName"],
+        "lastName": player["lastName"],
+        "jerseyNumber": jersey,
+    }
+
+
+def _roster(rng: random.Random, team: dict, squads: dict, feeder: dict | None) -> list[dict]:
+    roster = []
+    for jersey, player in enumerate(squads[team["_id"]], start=1):
+        roster.append(
+            create_test_roster_player(
+                player["_id"],
+                jersey_number=jersey,
+                player=_event_player(player, jersey),
+                playerPosition=(
+                    {"key": "G", "value": "Goalie"}
+                    if jersey == 1
+                    else {"key": "F", "value": "Forward"}
+                ),
+                periodsPlayed=[1, 2] if jersey == 1 else [],
+            )
+        )
+    if feeder is not None:
+        for player in rng.sample(squads[feeder["_id"]][1:], CALLED_PLAYERS_PER_ROSTER):
+            jersey = len(roster) + 1
+            roster.append(
+                create_test_roster_player(
+                    player["_id"],
+                    jersey_number=jersey,
+                    player=_event_player(player, jersey),
+                    called=True,
+                    calledFromTeam=create_test_called_from_team(
+                        team_id=feeder["_id"], team_name=feeder["name"], team_alias=feeder["alias"]
+                    ),
+                )
+            )
+    return roster
+
+
+def _events(rng: random.Random, roster: list[dict], goals: int) -> tuple[list, list]:
+    skaters = [r["player"] for r in roster[1:]]
+    scores = []
+    for _ in range(goals):
+        scorer = rng.choice(skaters)
+        assist = rng.choice(skaters) if rng.random() < 0.8 else None
+        scores.append(
+            {
+                "_id": str(ObjectId()),
+                "matchSeconds": rng.randint(0, 2999),
+                "goalPlayer": dict(scorer),
+                "assistPlayer": dict(assist) if assist and assist is not scorer else None,
+                "isPPG": False,
+                "isSHG": False,
+                "isGWG": False,
+            }
+        )
+    penalties = []
+    for _ in range(rng.randint(0, 4)):
+        start = rng.randint(0, 2879)
+        penalties.append(
+            {
+                "_id": str(ObjectId()),
+                "matchSecondsStart": start,
+                "matchSecondsEnd": start + 120,
+                "penaltyPlayer": dict(rng.choice(skaters)),
+                "penaltyCode": {"key": "B", "value": "Beinstellen"},
+                "penaltyMinutes": 2,
+                "isGM": False,
+                "isMP": False,
+            }
+        )
+    scores.sort(key=lambda s: s["matchSeconds"])
+    penalties.sort(key=lambda p: p["matchSecondsStart"])
+    return scores, penalties
+
+
+def _team_stats(goals_for: int, goals_against: int) -> dict:
+    won, lost = goals_for > goals_against, goals_for < goals_against
+    return {
+        "gamePlayed": 1,
+        "goalsFor": goals_for,
+        "goalsAgainst": goals_against,
+        "points": 3 if won else 0 if lost else 1,
+        "win": int(won),
+        "loss": int(lost),
+        "draw": int(not won and not lost),
+        "otWin": 0,
+        "otLoss": 0,
+        "soWin": 0,
+        "soLoss": 0,
+    }
+
+
+def _match_team(team: dict, roster: list, scores: list, penalties: list, stats: dict) -> dict:
+    return {
+        "clubId": team["clubId"],
+        "clubName": team["clubName"],
+        "clubAlias": team["clubAlias"],
+        "teamId": team["_id"],
+        "teamAlias": team["alias"],
+        "name": team["name"],
+        "fullName": team["fullName"],
+        "shortName": team["shortName"],
+        "tinyName": team["tinyName"],
+        "logo": None,
+        "roster": {
+            "players": roster,
+            "status": "SUBMITTED",
+            "published": True,
+            "playerCount": len(roster),
+        },
+        "scores": scores,
+        "penalties": penalties,
+        "stats": stats,
+    }
+
+
+def _pairings(team_ids: list[str], rounds: int) -> list[list[tuple[str, str]]]:
+    """Round robin by the circle method, repeated (home/away swapped) as needed"""
+    ids = list(team_ids) + ([None] if len(team_ids) % 2 else [])
+    schedule = []
+    for r in range(rounds):
+        offset = r % (len(ids) - 1)
+        rotated = [ids[0]] + ids[1:][offset:] + ids[1:][:offset]
+        half = len(rotated) // 2
+        pairs = zip(rotated[:half], reversed(rotated[half:]), strict=True)
+        second_leg = (r // (len(ids) - 1)) % 2
+        schedule.append(
+            [(b, a) if second_leg else (a, b) for a, b in pairs if a is not None and b is not None]
+        )
+    return schedule
+
+
+def _tournament(age_group: str, rounds: int) -> dict:
+    return {
+        "_id": str(ObjectId()),
+        "name": f"Bench Liga {age_group}",
+        "alias": f"bench-{age_group.lower()}",
+        "tinyName": age_group,
+        "ageGroup": {"key": age_group, "value": age_group},
+        "published": True,
+        "active": True,
+        "seasons": [
+            {
+                "_id": str(ObjectId()),
+                "name": _CURRENT_SEASON_NAME,
+                "alias": _CURRENT_SEASON_ALIAS,
+                "published": True,
+                "rounds": [
+                    {
+                        "_id": str(ObjectId()),
+                        "name": "Hauptrunde",
+                        "alias": "hauptrunde",
+                        "sortOrder": 1,
+                        "createStandings": True,
+                        "createStats": True,
+                        "published": True,
+                        "matchdays": [
+                            {
+                                "_id": str(ObjectId()),
+                                "name": f"{n}. Spieltag",
+                                "alias": f"{n}-spieltag",
+                                "startDate": SEASON_START + timedelta(weeks=n - 1),
+                                "createStandings": True,
+                                "createStats": True,
+                                "published": True,
+                            }
+                            for n in range(1, rounds + 1)
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def build_league(
+    clubs: int = 8,
+    teams_per_club: int = 3,
+    players_per_team: int = 18,
+    rounds: int = 14,
+    seed: int = 42,
+) -> dict[str, list[dict]]:
+    """Documents per collection for a synthetic league"""
+    rng = random.Random(seed)
+    league: dict[str, list[dict]] = {
+        "clubs": [],
+        "teams": [],
+        "players": [],
+        "tournaments": [],
+        "matches": [],
+    }
+    squads: dict[str, list[dict]] = {}
+    feeders: dict[str, dict] = {}
+    by_age_group: dict[str, list[dict]] = {age_group: [] for age_group, _ in AGE_GROUPS}
+
+    for c in range(clubs):
+        club = create_test_club(test_id=f"bench{c:03d}", clubName=f"Club {c:03d}")
+        teams = [_team(club, i) for i in range(teams_per_club)]
+        club["teams"] = teams
+        league["clubs"].append(club)
+        league["teams"] += teams
+        for team in teams:
+            squads[team["_id"]] = _players(rng, club, team, players_per_team)
+            league["players"] += squads[team["_id"]]
+            by_age_group[team["ageGroup"]].append(team)
+        for older, younger in zip(teams, teams[1:], strict=False):
+            feeders[older["_id"]] = younger
+            # Called-up players hold a second license in the older team
+            for player in squads[younger["_id"]][1 : 1 + CALLED_PLAYERS_PER_ROSTER * 2]:
+                player["assignedTeams"][0]["teams"].append(
+                    _license(club, older, "SECONDARY", f"{rng.randint(10000, 99999)}A")["teams"][0]
+                )
+
+    for age_group, teams in by_age_group.items():
+        if len(teams) < 2:
+            continue
+        tournament = _tournament(age_group, rounds)
+        league["tournaments"].append(tournament)
+        team_by_id = {team["_id"]: team for team in teams}
+        matchdays = tournament["seasons"][0]["rounds"][0]["matchdays"]
+        for matchday, pairs in zip(matchdays, _pairings(list(team_by_id), rounds), strict=True):
+            for slot, (home_id, away_id) in enumerate(pairs):
+                home, away = team_by_id[home_id], team_by_id[away_id]
+                home_goals, away_goals = rng.randint(0, 8), rng.randint(0, 8)
+                home_roster = _roster(rng, home, squads, feeders.get(home_id))
+                away_roster = _roster(rng, away, squads, feeders.get(away_id))
+                match = create_test_match(
+                    status="FINISHED", start_date=matchday["startDate"] + timedelta(hours=2 * slot)
+                )
+                match.update(
+                    matchId=len(league["matches"]) + 1,
+                    tournament={"name": tournament["name"], "alias": tournament["alias"]},
+                    matchday={"name": matchday["name"], "alias": matchday["alias"]},
+                    home=_match_team(
+                        home,
+                        home_roster,
+                        *_events(rng, home_roster, home_goals),
+                        _team_stats(home_goals, away_goals),
+                    ),
+                    away=_match_team(
+                        away,
+                        away_roster,
+                        *_events(rng, away_roster, away_goals),
+                        _team_stats(away_goals, home_goals),
+                    ),
+                )
+                league["matches"].append(match)
+    return league
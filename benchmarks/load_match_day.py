@@ -0,0 +1,409 @@
+"""
+Match-Day Load Test
+
+Replays a weighted match-day request mix with concurrent virtual users, the
+way locust would, and reports throughput and p50/p95/p99 latency per route.
+Database commands per request come from the difference of two GET /metrics
+scrapes (bishl_http_request_db_queries), divided by the requests this tool
+sent, so cached responses count as zero queries.
+
+Tasks (default weight):
+
+    calendar            GET  /matches/calendar                         (10)
+    today               GET  /matches/today                            (20)
+    upcoming            GET  /matches/upcoming                         (10)
+    rest_of_week        GET  /matches/rest-of-week                      (5)
+    match_detail        GET  /matches/{match_id}                       (15)
+    score_entry         POST /matches/{match_id}/{team_flag}/scores     (3)
+    roster_validate     POST /matches/{match_id}/{team_flag}/roster/validate (2)
+    reftool_matches     GET  /reftool/matches                           (4)
+    reftool_match       GET  /reftool/matches/{match_id}                (3)
+    reftool_day_strip   GET  /reftool/day-strip                         (2)
+
+Without --url the app runs in-process on the in-memory database
+(tests/fixtures/memory_db.py) seeded with a synthetic league
+(benchmarks/league.py) whose middle matchday is rescheduled to today and in
+progress. With --url it targets a running instance; --token must then be an
+access token with the ADMIN role, and the matches of today are discovered
+through the API. Score entry adds real goals, so never point it at production.
+
+--mix takes a JSON object of task weights. --mix-from-metrics derives the
+weights from a saved /metrics scrape of production, replaying the recorded
+route mix. --capture-queries (in-process only) saves one sample per query shape
+for scripts/create_indexes.py --advise.
+
+Usage:
+    python benchmarks/load_match_day.py [--users 20] [--duration 30]
+        [--wait-min 0.5] [--wait-max 2.0] [--url http://localhost:8080 --token JWT]
+        [--mix weights.json | --mix-from-metrics metrics.txt] [--output report.json]
+        [--capture-queries queries.json]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path to allow importing from root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import httpx
+
+TASKS = {
+    # name: (method, route template, default weight)
+    "calendar": ("GET", "/matches/calendar", 10),
+    "today": ("GET", "/matches/today", 20),
+    "upcoming": ("GET", "/matches/upcoming", 10),
+    "rest_of_week": ("GET", "/matches/rest-of-week", 5),
+    "match_detail": ("GET", "/matches/{match_id}", 15),
+    "score_entry": ("POST", "/matches/{match_id}/{team_flag}/scores", 3),
+    "roster_validate": ("POST", "/matches/{match_id}/{team_flag}/roster/validate", 2),
+    "reftool_matches": ("GET", "/reftool/matches", 4),
+    "reftool_match": ("GET", "/reftool/matches/{match_id}", 3),
+    "reftool_day_strip": ("GET", "/reftool/day-strip", 2),
+}
+
+METRIC_LINE = re.compile(r'^(\w+)\{method="([^"]*)",route="([^"]*)"(?:,status="[^"]*")?\} (\S+)$')
+
+
+@dataclass
+class LiveMatch:
+    """A match of today with the roster players that can score"""
+
+    match_id: str
+    tournament: str
+    players: dict[str, list[dict]] = field(default_factory=dict)
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[int, int] = field(default_factory=dict)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def parse_db_queries(metrics_text: str) -> dict[tuple[str, str], tuple[float, float]]:
+    """(method, route) -> (sum of DB queries, requests) from a /metrics scrape"""
+    result: dict[tuple[str, str], list[float]] = {}
+    for line in metrics_text.splitlines():
+        found = METRIC_LINE.match(line)
+        if not found:
+            continue
+        name, method, route, value = found.groups()
+        if name == "bishl_http_request_db_queries_sum":
+            result.setdefault((method, route), [0.0, 0.0])[0] += float(value)
+        elif name == "bishl_http_request_db_queries_count":
+            result.setdefault((method, route), [0.0, 0.0])[1] += float(value)
+    return {key: (total, count) for key, (total, count) in result.items()}
+
+
+def parse_request_counts(metrics_text: str) -> dict[tuple[str, str], float]:
+    """(method, route) -> requests served, from a /metrics scrape"""
+    counts: dict[tuple[str, str], float] = {}
+    for line in metrics_text.splitlines():
+        found = METRIC_LINE.match(line)
+        if found and found.group(1) == "bishl_http_request_duration_seconds_count":
+            _, method, route, value = found.groups()
+            counts[(method, route)] = counts.get((method, route), 0) + float(value)
+    return counts
+
+
+def load_mix(args: argparse.Namespace) -> dict[str, float]:
+    if args.mix:
+        weights = json.loads(Path(args.mix).read_text(encoding="utf-8"))
+    elif args.mix_from_metrics:
+        counts = parse_request_counts(Path(args.mix_from_metrics).read_text(encoding="utf-8"))
+        weights = {
+            name: counts.get((method, route), 0) for name, (method, route, _) in TASKS.items()
+        }
+    else:
+        weights = {name: weight for name, (_, _, weight) in TASKS.items()}
+    unknown = set(weights) - set(TASKS)
+    if unknown:
+        raise SystemExit(f"Unknown tasks in mix: {', '.join(sorted(unknown))}")
+    weights = {name: weight for name, weight in weights.items() if weight > 0}
+    if not weights:
+        raise SystemExit("The request mix has no task with a positive weight")
+    return weights
+
+
+async def in_process_client(capture_queries: bool) -> tuple[httpx.AsyncClient, str, Any]:
+    """
+    Client for the app running on a seeded in-memory database, an admin token
+    and, with capture_queries, the IndexAdvisor listening to its commands
+    """
+    # Same fallback as tests/fixtures/data_fixtures.py, set before config is imported
+    os.environ.setdefault("CURRENT_SEASON", "2026")
+
+    from authentication import AuthHandler
+    from benchmarks.league import build_league
+    from logging_config import logger
+    from main import app
+    from services.index_advisor import IndexAdvisor
+    from services.request_metrics import db_command_listener
+    from tests.fixtures.data_fixtures import create_test_user
+    from tests.fixtures.memory_db import MemoryDatabase
+
+    # Service log lines would dominate the timings
+    logger.remove()
+
+    league = build_league()
+    schedule_match_day(league, datetime.now())
+    admin = create_test_user(roles=["ADMIN", "REF_ADMIN"])
+    league["users"] = [admin]
+
+    advisor = IndexAdvisor() if capture_queries else None
+    listeners = [db_command_listener, advisor] if advisor else [db_command_listener]
+    db = MemoryDatabase("bishl_load", event_listeners=listeners)
+    for collection, documents in league.items():
+        await db[collection].insert_many(documents)
+    app.state.mongodb = db
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=60
+    )
+    return client, AuthHandler().encode_token(admin), advisor
+
+
+def schedule_match_day(league: dict[str, list[dict]], today: datetime) -> None:
+    """Move the season so its middle matchday is today: earlier ones finished, it in progress"""
+    by_matchday: dict[str, list[dict]] = {}
+    for match in league["matches"]:
+        by_matchday.setdefault(match["matchday"]["alias"], []).append(match)
+    aliases = list(by_matchday)
+    current = len(aliases) // 2
+    first_match = min(m["startDate"] for m in by_matchday[aliases[current]])
+    offset = timedelta(days=(today.date() - first_match.date()).days)
+
+    for match in league["matches"]:
+        match["startDate"] += offset
+    for tournament in league["tournaments"]:
+        for matchday in tournament["seasons"][0]["rounds"][0]["matchdays"]:
+            for key in ("startDate", "endDate"):
+                if matchday.get(key):
+                    matchday[key] += offset
+    for index, alias in enumerate(aliases[current:], start=current):
+        status = {"key": "INPROGRESS", "value": "Live"} if index == current else None
+        for match in by_matchday[alias]:
+            match["matchStatus"] = status or {"key": "SCHEDULED", "value": "angesetzt"}
+
+
+async def discover_live_matches(client: httpx.AsyncClient, headers: dict) -> list[LiveMatch]:
+    """Matches of today, with roster players for score entry"""
+    response = await client.get("/matches/today")
+    response.raise_for_status()
+    live = []
+    for listed in response.json():
+        match_id = listed.get("_id") or listed.get("id")
+        detail = await client.get(f"/matches/{match_id}", headers=headers)
+        if detail.status_code != 200:
+            continue
+        match = detail.json()["data"]
+        entry = LiveMatch(match_id=match_id, tournament=match["tournament"]["alias"])
+        for team_flag in ("home", "away"):
+            roster = match[team_flag].get("roster") or {}
+            players = roster.get("players", []) if isinstance(roster, dict) else roster
+            entry.players[team_flag] = [p["player"] for p in players if p.get("player")]
+        live.append(entry)
+    return live
+
+
+def build_request(name: str, rng: random.Random, live: list[LiveMatch], today: date) -> tuple:
+    """(method, url, json body) for one task"""
+    method, route, _ = TASKS[name]
+    if name in ("match_detail", "reftool_match"):
+        return method, route.format(match_id=rng.choice(live).match_id), None
+    if name in ("score_entry", "roster_validate"):
+        match = rng.choice(live)
+        team_flag = rng.choice(["home", "away"])
+        url = route.format(match_id=match.match_id, team_flag=team_flag)
+        if name == "roster_validate":
+            return method, url, None
+        players = match.players[team_flag]
+        body = {
+            "matchTime": f"{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+            "goalPlayer": rng.choice(players),
+        }
+        return method, url, body
+    if name == "calendar":
+        return method, f"{route}?tournament={rng.choice(live).tournament}", None
+    if name == "reftool_matches":
+        end = today + timedelta(days=6)
+        return method, f"{route}?start_date={today}&end_date={end}", None
+    if name == "reftool_day_strip":
+        return method, f"{route}?year={today.year}&month={today.month}", None
+    return method, route, None
+
+
+async def virtual_user(
+    client: httpx.AsyncClient,
+    headers: dict,
+    mix: dict[str, float],
+    live: list[LiveMatch],
+    stats: dict[str, RouteStats],
+    deadline: float,
+    args: argparse.Namespace,
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    today = date.today()
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, url, body = build_request(name, rng, live, today)
+        route_stats = stats.setdefault(name, RouteStats())
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, json=body, headers=headers)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        route_stats.latencies.append((time.perf_counter() - start) * 1000)
+        route_stats.statuses[status] = route_stats.statuses.get(status, 0) + 1
+        if not 200 <= status < 300:
+            route_stats.errors += 1
+        await asyncio.sleep(rng.uniform(args.wait_min, args.wait_max))
+
+
+async def scrape_metrics(client: httpx.AsyncClient, metrics_token: str | None) -> str:
+    headers = {"Authorization": f"Bearer {metrics_token}"} if metrics_token else {}
+    response = await client.get("/metrics", headers=headers)
+    return response.text if response.status_code == 200 else ""
+
+
+async def run(args: argparse.Namespace) -> dict:
+    mix = load_mix(args)
+    advisor = None
+    if args.url:
+        if not args.token:
+            raise SystemExit("--token is required with --url")
+        if args.capture_queries:
+            raise SystemExit("--capture-queries needs the in-process app")
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        token = args.token
+    else:
+        client, token, advisor = await in_process_client(bool(args.capture_queries))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with client:
+        live = await discover_live_matches(client, headers)
+        if not live:
+            raise SystemExit("No matches today; score entry and match tasks need one")
+        print(f"{len(live)} matches today, {args.users} users, {args.duration:g}s")
+
+        before = parse_db_queries(await scrape_metrics(client, args.metrics_token))
+        stats: dict[str, RouteStats] = {}
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                virtual_user(client, headers, mix, live, stats, deadline, args, args.seed + n)
+                for n in range(args.users)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        after = parse_db_queries(await scrape_metrics(client, args.metrics_token))
+
+    if advisor:
+        advisor.save(args.capture_queries)
+        print(f"{len(advisor.samples)} query shapes written to {args.capture_queries}")
+    return report(stats, before, after, elapsed, args)
+
+
+def report(
+    stats: dict[str, RouteStats],
+    before: dict[tuple[str, str], tuple[float, float]],
+    after: dict[tuple[str, str], tuple[float, float]],
+    elapsed: float,
+    args: argparse.Namespace,
+) -> dict:
+    total = sum(len(s.latencies) for s in stats.values())
+    result = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "target": args.url or "in-process",
+        "users": args.users,
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "routes": {},
+    }
+    print(
+        f"\n{'task':<20} {'reqs':>6} {'err':>5} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8}"
+        f" {'p99 ms':>8} {'db ops':>7}"
+    )
+    for name in TASKS:
+        route_stats = stats.get(name)
+        if not route_stats:
+            continue
+        method, route, _ = TASKS[name]
+        db_sum = after.get((method, route), (0, 0))[0] - before.get((method, route), (0, 0))[0]
+        count = len(route_stats.latencies)
+        entry = {
+            "method": method,
+            "route": route,
+            "requests": count,
+            "errors": route_stats.errors,
+            "statuses": {str(k): v for k, v in sorted(route_stats.statuses.items())},
+            "rps": round(count / elapsed, 2),
+            "p50_ms": round(percentile(route_stats.latencies, 50), 2),
+            "p95_ms": round(percentile(route_stats.latencies, 95), 2),
+            "p99_ms": round(percentile(route_stats.latencies, 99), 2),
+            # None when /metrics is unavailable
+            "db_ops_per_request": round(db_sum / count, 2) if after else None,
+        }
+        result["routes"][name] = entry
+        db_ops = "-" if entry["db_ops_per_request"] is None else f"{entry['db_ops_per_request']:g}"
+        print(
+            f"{name:<20} {count:>6} {route_stats.errors:>5} {entry['rps']:>7.1f}"
+            f" {entry['p50_ms']:>8.1f} {entry['p95_ms']:>8.1f} {entry['p99_ms']:>8.1f}"
+            f" {db_ops:>7}"
+        )
+    print(f"\n{total} requests in {elapsed:.1f}s, {result['throughput_rps']:.1f} req/s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay match-day traffic and report latency.")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--wait-min", type=float, default=0.5, help="Min think time in seconds")
+    parser.add_argument("--wait-max", type=float, default=2.0, help="Max think time in seconds")
+    parser.add_argument("--url", help="Base URL of a running instance (default: in-process)")
+    parser.add_argument("--token", help="ADMIN access token, required with --url")
+    parser.add_argument("--metrics-token", help="Bearer token for GET /metrics")
+    mix = parser.add_mutually_exclusive_group()
+    mix.add_argument("--mix", help="JSON file of task weights")
+    mix.add_argument("--mix-from-metrics", help="Saved /metrics scrape to take weights from")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed of the users")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    parser.add_argument(
+        "--capture-queries", type=Path, help="Save query samples for create_indexes.py --advise"
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
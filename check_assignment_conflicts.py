@@ -7,6 +7,8 @@ from typing import Any
 
 import motor.motor_asyncio
 
+from services.assignment_conflict_service import AssignmentConflictService
+
 
 class AssignmentConflictChecker:
     def __init__(self, is_prod: bool = False):
@@ -20,220 +22,62 @@ class AssignmentConflictChecker:
         self.client = motor.motor_asyncio.AsyncIOMotorClient(DB_URL)
         self.db = self.client[DB_NAME]
         self.is_prod = is_prod
+        self.service = AssignmentConflictService(self.db)
+        self._assigned: list[dict[str, Any]] | None = None
 
     async def close(self):
         self.client.close()
 
+    async def _get_assigned_with_matches(self) -> list[dict[str, Any]]:
+        """Load ASSIGNED assignments joined with their matches once per run"""
+        if self._assigned is None:
+            self._assigned = await self.service.get_assigned_with_matches()
+            print(f"Found {len(self._assigned)} assignments with status ASSIGNED")
+        return self._assigned
+
     async def check_assignment_conflicts(self) -> list[dict[str, Any]]:
         """
         Check for conflicts between assignments collection and match documents
         Returns list of conflicts found
         """
-        conflicts = []
-
-        # Get all assignments with status ASSIGNED
-        assignments = await self.db.assignments.find({"status": "ASSIGNED"}).to_list(None)
-
-        print(f"Found {len(assignments)} assignments with status ASSIGNED")
-
-        for assignment in assignments:
-            match_id = assignment.get("matchId")
-            referee_user_id = assignment.get("referee", {}).get("userId")
-            position = assignment.get("position")
-
-            if not match_id or not referee_user_id or not position:
-                print(f"Skipping assignment {assignment.get('_id')} - missing required fields")
-                continue
-
-            # Get the corresponding match
-            match = await self.db.matches.find_one({"_id": match_id})
-
-            if not match:
-                conflicts.append(
-                    {
-                        "type": "MATCH_NOT_FOUND",
-                        "assignment_id": assignment.get("_id"),
-                        "match_id": match_id,
-                        "assigned_referee": assignment.get("referee"),
-                        "position": position,
-                        "issue": f"Match with ID {match_id} not found",
-                    }
-                )
-                continue
-
-            # Check if the referee is properly set in the match
-            match_referee_key = f"referee{position}"
-            match_referee = match.get(match_referee_key)
-
-            if not match_referee:
-                # Referee is not set in match at all
-                conflicts.append(
-                    {
-                        "type": "REFEREE_NOT_SET_IN_MATCH",
-                        "assignment_id": assignment.get("_id"),
-                        "match_id": match_id,
-                        "assigned_referee": assignment.get("referee"),
-                        "position": position,
-                        "match_referee": None,
-                        "match_info": {
-                            "tournament": match.get("tournament", {}).get("name"),
-                            "home_team": match.get("home", {}).get("fullName"),
-                            "away_team": match.get("away", {}).get("fullName"),
-                            "start_date": match.get("startDate"),
-                            "referee1": match.get("referee1"),
-                            "referee2": match.get("referee2"),
-                        },
-                        "issue": f"Referee not set in match at position {position}",
-                    }
-                )
-            elif match_referee.get("userId") != referee_user_id:
-                # Different referee is set in match
-                conflicts.append(
-                    {
-                        "type": "REFEREE_MISMATCH",
-                        "assignment_id": assignment.get("_id"),
-                        "match_id": match_id,
-                        "assigned_referee": assignment.get("referee"),
-                        "position": position,
-                        "match_referee": match_referee,
-                        "match_info": {
-                            "tournament": match.get("tournament", {}).get("name"),
-                            "home_team": match.get("home", {}).get("fullName"),
-                            "away_team": match.get("away", {}).get("fullName"),
-                            "start_date": match.get("startDate"),
-                            "referee1": match.get("referee1"),
-                            "referee2": match.get("referee2"),
-                        },
-                        "issue": f"Different referee in match: assigned={referee_user_id}, match={match_referee.get('userId')}",
-                    }
-                )
-
-        return conflicts
+        return self.service.find_sync_conflicts(await self._get_assigned_with_matches())
 
     async def analyze_ref_admin_workflow_issues(self) -> dict[str, Any]:
         """
         Specific analysis of REF_ADMIN workflow issues
         Returns detailed statistics about the assignment workflow problems
         """
-        analysis = {
-            "total_assigned_status": 0,
-            "properly_set_in_match": 0,
-            "missing_from_match": 0,
-            "wrong_referee_in_match": 0,
-            "issues_by_position": {"1": 0, "2": 0},
-            "issues_by_tournament": {},
-            "issues_by_referee": {},
-            "recent_issues": [],
-            "oldest_issue_date": None,
-        }
-
-        # Get all assignments with status ASSIGNED
-        assignments = await self.db.assignments.find({"status": "ASSIGNED"}).to_list(None)
-
-        analysis["total_assigned_status"] = len(assignments)
-
-        for assignment in assignments:
-            match_id = assignment.get("matchId")
-            referee_user_id = assignment.get("referee", {}).get("userId")
-            position = assignment.get("position")
-
-            if not match_id or not referee_user_id or not position:
-                continue
-
-            # Get the corresponding match
-            match = await self.db.matches.find_one({"_id": match_id})
-
-            if not match:
-                continue
-
-            # Check if the referee is properly set in the match
-            match_referee_key = f"referee{position}"
-            match_referee = match.get(match_referee_key)
-
-            if not match_referee:
-                # Issue: Referee not set in match at all
-                analysis["missing_from_match"] += 1
-                analysis["issues_by_position"][str(position)] += 1
-
-                # Track by tournament
-                tournament = match.get("tournament", {}).get("name", "Unknown")
-                if tournament not in analysis["issues_by_tournament"]:
-                    analysis["issues_by_tournament"][tournament] = 0
-                analysis["issues_by_tournament"][tournament] += 1
-
-                # Track by referee
-                referee_name = f"{assignment.get('referee', {}).get('firstName', '')} {assignment.get('referee', {}).get('lastName', '')}".strip()
-                if not referee_name:
-                    referee_name = f"Unknown ({referee_user_id})"
-                if referee_name not in analysis["issues_by_referee"]:
-                    analysis["issues_by_referee"][referee_name] = {
-                        "missing_from_match": 0,
-                        "wrong_referee_in_match": 0,
-                        "total_issues": 0,
-                        "userId": referee_user_id,
-                        "club": assignment.get("referee", {}).get("clubName", "Unknown"),
-                    }
-                analysis["issues_by_referee"][referee_name]["missing_from_match"] += 1
-                analysis["issues_by_referee"][referee_name]["total_issues"] += 1
-
-                # Track recent issues (get assignment creation date from statusHistory)
-                status_history = assignment.get("statusHistory", [])
-                assigned_entry = None
-                for entry in status_history:
-                    if entry.get("status") == "ASSIGNED":
-                        assigned_entry = entry
-                        break
-
-                if assigned_entry:
-                    issue_date = assigned_entry.get("updateDate")
-                    if issue_date:
-                        analysis["recent_issues"].append(
-                            {
-                                "assignment_id": assignment.get("_id"),
-                                "match_id": match_id,
-                                "referee_name": f"{assignment.get('referee', {}).get('firstName', '')} {assignment.get('referee', {}).get('lastName', '')}",
-                                "position": position,
-                                "tournament": tournament,
-                                "assigned_date": issue_date,
-                                "match_date": match.get("startDate"),
-                                "assigned_by": assigned_entry.get("updatedByName", "Unknown"),
-                            }
-                        )
+        return self.service.analyze_workflow(await self._get_assigned_with_matches())
+
+    async def check_double_bookings(
+        self, from_date: datetime | None = None, match_duration_minutes: int = 90
+    ) -> list[dict[str, Any]]:
+        """Find referees set on overlapping matches"""
+        return await self.service.find_double_bookings(
+            from_date=from_date, match_duration_minutes=match_duration_minutes
+        )
 
-                        # Track oldest issue
-                        if (
-                            not analysis["oldest_issue_date"]
-                            or issue_date < analysis["oldest_issue_date"]
-                        ):
-                            analysis["oldest_issue_date"] = issue_date
-
-            elif match_referee.get("userId") != referee_user_id:
-                # Issue: Different referee is set in match
-                analysis["wrong_referee_in_match"] += 1
-                analysis["issues_by_position"][str(position)] += 1
-
-                # Track by referee
-                referee_name = f"{assignment.get('referee', {}).get('firstName', '')} {assignment.get('referee', {}).get('lastName', '')}".strip()
-                if not referee_name:
-                    referee_name = f"Unknown ({referee_user_id})"
-                if referee_name not in analysis["issues_by_referee"]:
-                    analysis["issues_by_referee"][referee_name] = {
-                        "missing_from_match": 0,
-                        "wrong_referee_in_match": 0,
-                        "total_issues": 0,
-                        "userId": referee_user_id,
-                        "club": assignment.get("referee", {}).get("clubName", "Unknown"),
-                    }
-                analysis["issues_by_referee"][referee_name]["wrong_referee_in_match"] += 1
-                analysis["issues_by_referee"][referee_name]["total_issues"] += 1
-            else:
-                # Properly set
-                analysis["properly_set_in_match"] += 1
-
-        # Sort recent issues by date (newest first)
-        analysis["recent_issues"].sort(key=lambda x: x["assigned_date"], reverse=True)
+    async def print_double_bookings_report(self, double_bookings: list[dict[str, Any]]):
+        """Print referees that are set on overlapping matches"""
+        print("\n" + "=" * 80)
+        print("REFEREE DOUBLE BOOKINGS")
+        print(f"Total double bookings found: {len(double_bookings)}")
+        print("=" * 80)
 
-        return analysis
+        if not double_bookings:
+            print("✅ No referee is set on overlapping matches.")
+            return
+
+        for i, booking in enumerate(double_bookings, 1):
+            referee = booking["referee"]
+            print(
+                f"\n{i}. {referee.get('firstName')} {referee.get('lastName')} ({referee.get('userId')})"
+            )
+            for match_id, match_info in zip(booking["match_ids"], booking["matches"], strict=True):
+                print(
+                    f"   {match_info.get('start_date')} - {match_info.get('home_team')} vs "
+                    f"{match_info.get('away_team')} ({match_info.get('tournament')}) [{match_id}]"
+                )
 
     async def print_ref_admin_analysis(self, analysis: dict[str, Any]):
         """Print detailed analysis of REF_ADMIN workflow issues"""
@@ -413,6 +257,17 @@ async def main():
     parser.add_argument(
         "--prod", action="store_true", help="Use production database (default: development)"
     )
+    parser.add_argument(
+        "--all-dates",
+        action="store_true",
+        help="Check double bookings for past matches too (default: from today)",
+    )
+    parser.add_argument(
+        "--match-duration",
+        type=int,
+        default=90,
+        help="Assumed match slot length in minutes for double-booking detection",
+    )
 
     args = parser.parse_args()
 
@@ -431,6 +286,16 @@ async def main():
         analysis = await checker.analyze_ref_admin_workflow_issues()
         await checker.print_ref_admin_analysis(analysis)
 
+        from_date = (
+            None
+            if args.all_dates
+            else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        )
+        double_bookings = await checker.check_double_bookings(
+            from_date=from_date, match_duration_minutes=args.match_duration
+        )
+        await checker.print_double_bookings_report(double_bookings)
+
         print("\n" + "=" * 80)
         print("Check completed!")
 
@@ -29,6 +29,71 @@ class Settings(BaseSettings):
         default=20, description="Default number of results per page for pagination"
     )
 
+    # Response Cache
+    RESPONSE_CACHE_ENABLED: bool = Field(
+        default=True, description="Serve opted-in public read endpoints from the response cache"
+    )
+    RESPONSE_CACHE_SIZE: int = Field(
+        default=1024, description="Max cached responses kept per worker (LRU)"
+    )
+    CACHE_BUS_MODE: str = Field(
+        default="auto",
+        description="Cache invalidation feed: auto (change streams if available), "
+        "change_stream, poll (dbHash, expensive) or off",
+    )
+    CACHE_BUS_POLL_INTERVAL: float = Field(
+        default=30.0, description="Seconds between dbHash polls without change streams"
+    )
+
+    # Match listings read model
+    MATCH_LISTINGS_ENABLED: bool = Field(
+        default=False,
+        description="Serve public match lists from matchListings "
+        "(run scripts/rebuild_match_listings.py first)",
+    )
+
+    # Live match stream
+    LIVE_EVENT_BUFFER_SIZE: int = Field(
+        default=200, description="Events kept per match for Last-Event-ID resume"
+    )
+    LIVE_EVENT_QUEUE_SIZE: int = Field(
+        default=100, description="Pending events per viewer before it is resynced by snapshot"
+    )
+    LIVE_KEEPALIVE_SECONDS: float = Field(
+        default=15.0, description="Seconds between SSE keepalive comments"
+    )
+
+    # Metrics
+    METRICS_ENABLED: bool = Field(
+        default=True, description="Record request/DB metrics and serve them on GET /metrics"
+    )
+    METRICS_TOKEN: str = Field(
+        default="", description="Bearer token for GET /metrics; admins can always read it"
+    )
+    METRICS_PUBLIC: bool = Field(
+        default=False, description="Serve GET /metrics without a token or admin login"
+    )
+
+    QUERY_GUARD_MODE: str = Field(
+        default="off",
+        description="N+1 detection per request (needs METRICS_ENABLED): off, log or raise",
+    )
+    QUERY_GUARD_THRESHOLD: int = Field(
+        default=10, description="Identical-shape queries per request reported as N+1"
+    )
+
+    # Slow request profiling
+    PROFILE_SLOW_REQUEST_SECONDS: float = Field(
+        default=0.0, description="Profile requests slower than this many seconds (0 disables)"
+    )
+    PROFILE_SAMPLE_INTERVAL_MS: float = Field(
+        default=5.0, description="Stack sampling interval of the request profiler"
+    )
+    PROFILE_DIR: str = Field(default="logs/profiles", description="Where profiles are written")
+    PROFILE_MAX_FILES: int = Field(
+        default=200, description="Profiles kept before the oldest are deleted"
+    )
+
     # CORS Configuration
     CORS_ORIGINS: str = Field(
         default="*", description="Comma-separated list of allowed CORS origins"
@@ -42,6 +107,12 @@ class Settings(BaseSettings):
     # JWT Configuration
     JWT_SECRET: str = Field(default="", description="Secret key for JWT token generation")
     JWT_ALGORITHM: str = Field(default="HS256", description="Algorithm for JWT encoding")
+    TOKEN_CACHE_SIZE: int = Field(
+        default=2048, description="Max verified access tokens kept in the per-worker cache"
+    )
+    PASSWORD_HASH_WORKERS: int = Field(
+        default=4, description="Max concurrent password hash/verify operations (thread pool size)"
+    )
 
     # Mail Configuration
     MAIL_ENABLED: bool = Field(
@@ -61,11 +132,75 @@ class Settings(BaseSettings):
     )
     USE_CREDENTIALS: bool = Field(default=True, description="Use SMTP credentials")
     VALIDATE_CERTS: bool = Field(default=True, description="Validate SSL certificates")
+    MAIL_TIMEOUT: float = Field(
+        default=30.0, description="Seconds before an SMTP command times out"
+    )
+    MAIL_BATCH_SIZE: int = Field(
+        default=50, description="Queued emails sent over one SMTP connection"
+    )
+    MAIL_RATE_PER_MINUTE: int = Field(
+        default=30, description="Max emails sent per minute across all workers (provider limit)"
+    )
+    MAIL_MAX_ATTEMPTS: int = Field(
+        default=6, description="Failed deliveries of an email before it is given up"
+    )
+    MAIL_RETRY_DELAY: float = Field(
+        default=60.0, description="Seconds before the first email retry; doubles per retry"
+    )
+    MAIL_POLL_INTERVAL: float = Field(
+        default=10.0, description="Seconds between checks for emails queued by other workers"
+    )
+    MAIL_OUTBOX_RETENTION_DAYS: int = Field(
+        default=30, description="Days sent emails are kept in the mail outbox"
+    )
 
     # Cloudinary Configuration
     CLDY_CLOUD_NAME: str = Field(default="", description="Cloudinary cloud name")
     CLDY_API_KEY: str = Field(default="", description="Cloudinary API key")
     CLDY_API_SECRET: str = Field(default="", description="Cloudinary API secret")
+    MEDIA_BACKEND: str = Field(
+        default="cloudinary", description="Media storage: cloudinary, or local for offline use"
+    )
+    MEDIA_LOCAL_DIR: str = Field(default="media", description="Directory of the local backend")
+    MEDIA_LOCAL_URL: str = Field(
+        default="/media", description="URL prefix of files stored by the local backend"
+    )
+    MEDIA_WORKERS: int = Field(default=4, description="Threads running media uploads/deletes")
+    MEDIA_RETRIES: int = Field(default=3, description="Retries of transient media errors")
+    MEDIA_RETRY_DELAY: float = Field(
+        default=0.5, description="Seconds before the first media retry; doubles per retry"
+    )
+    MEDIA_CHUNK_SIZE: int = Field(
+        default=6_000_000, description="Bytes per chunk of media uploads (min. 5 MB)"
+    )
+    MEDIA_FOLDER_PREFIX: str = Field(
+        default="", description="Folder of this deployment's uploads, e.g. demo/; scopes deletions"
+    )
+    MEDIA_URL_CACHE_SIZE: int = Field(
+        default=4096, description="Image URLs whose size variants are kept in memory"
+    )
+    MEDIA_CLEANUP_INTERVAL: float = Field(
+        default=30.0, description="Seconds between media cleanup runs; 0 disables the worker"
+    )
+    MEDIA_CLEANUP_DELAY: float = Field(
+        default=60.0, description="Seconds a replaced media file is kept before its deletion"
+    )
+    MEDIA_CLEANUP_BATCH_SIZE: int = Field(
+        default=100, description="Media files deleted per call (Cloudinary allows 100)"
+    )
+    MEDIA_CLEANUP_MAX_ATTEMPTS: int = Field(
+        default=8, description="Failed deletions of a media file before it is given up"
+    )
+    MEDIA_SWEEP_INTERVAL_HOURS: float = Field(
+        default=0.0, description="Hours between orphaned media sweeps; 0 (default) disables them"
+    )
+    MEDIA_SWEEP_DISCARD: bool = Field(
+        default=False,
+        description="Let the sweep discard orphans (needs MEDIA_FOLDER_PREFIX); else only report",
+    )
+    MEDIA_SWEEP_GRACE_HOURS: float = Field(
+        default=24.0, description="Minimum age of an unreferenced media file to count as orphan"
+    )
 
     # ISHD API Configuration
     ISHD_API_URL: str = Field(default="", description="ISHD federation API URL")
@@ -81,6 +216,18 @@ class Settings(BaseSettings):
     SYS_ADMIN_PASSWORD: str = Field(
         default="", description="System admin password for import scripts"
     )
+    IMPORT_CONCURRENCY: int = Field(
+        default=8, description="Max concurrent API calls of the import scripts"
+    )
+    IMPORT_CHUNK_SIZE: int = Field(
+        default=1000, description="CSV rows parsed and validated together by the import scripts"
+    )
+    IMPORT_BATCH_SIZE: int = Field(
+        default=500, description="Operations per bulk_write of the import scripts"
+    )
+    UNASSIGNED_MAIL_CONCURRENCY: int = Field(
+        default=5, description="Max concurrent emails sent by the unassigned-matches job"
+    )
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
@@ -1,24 +1,6 @@
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
-from pydantic import SecretStr
-
 from config import settings
 from logging_config import logger
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=SecretStr(settings.MAIL_PASSWORD),
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS,
-)
-
-fastmail = FastMail(conf)
-
 
 async def send_email(
     subject: str, recipients: list, body: str, cc: list | None = None, reply_to: list | None = None
@@ -27,6 +9,9 @@ async def send_email(
 
     Emails can be disabled in development by setting MAIL_ENABLED=False.
     When disabled, emails are logged but not sent.
+
+    In the API the message is queued in the mail outbox and sent in the
+    background; scripts without a bound outbox send it directly.
     """
     logger.info(f"Sending email '{subject}' to {recipients}.")
 
@@ -34,12 +19,10 @@ async def send_email(
         logger.info(f"Email sending disabled (MAIL_ENABLED=False). Skipping email to {recipients}")
         return
 
-    message = MessageSchema(
-        subject=subject,
-        recipients=recipients,
-        cc=cc or [],
-        body=body,
-        subtype=MessageType.html,
-        reply_to=reply_to or [],
-    )
-    await fastmail.send_message(message)
+    # services imports this module, so the outbox is imported on first use
+    from services.mail_outbox import deliver, mail_outbox
+
+    if mail_outbox.db is not None:
+        await mail_outbox.enqueue(subject, recipients, body, cc, reply_to)
+    else:
+        await deliver(subject, recipients, body, cc, reply_to)
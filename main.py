@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 import traceback
-import uuid
 from contextlib import asynccontextmanager
 from datetime import datetime
 
@@ -23,9 +22,11 @@ from routers.documents import router as documents_router
 from routers.matchdays import router as matchdays_router
 from routers.matches import router as matches_router
 from routers.messages import router as messages_router
+from routers.metrics import router as metrics_router
 from routers.penalties import router as penalties_router
 from routers.players import router as players_router
 from routers.posts import router as posts_router
+from routers.profiles import router as profiles_router
 from routers.reftool import router as reftool_router
 
 # import uvicorn
@@ -38,6 +39,13 @@ from routers.teams import router as teams_router
 from routers.tournaments import router as tournaments_router
 from routers.users import router as users_router
 from routers.venues import router as venues_router
+from services.invalidation_bus import InvalidationBus
+from services.mail_outbox import mail_outbox
+from services.media_cleanup import MediaCleanupWorker
+from services.media_service import media_service
+from services.request_metrics import RequestMetricsMiddleware, db_command_listener
+from services.request_profiler import RequestProfilerMiddleware, correlation_id_of
+from services.response_cache import CACHED_COLLECTIONS, ResponseCacheMiddleware, response_cache
 
 
 @asynccontextmanager
@@ -45,15 +53,40 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting BISHL API server...")
     logger.info(f"Connecting to MongoDB: {settings.DB_NAME}")
-    app.state.client = AsyncIOMotorClient(settings.DB_URL, tlsCAFile=certifi.where())
+    app.state.client = AsyncIOMotorClient(
+        settings.DB_URL,
+        tlsCAFile=certifi.where(),
+        event_listeners=[db_command_listener] if settings.METRICS_ENABLED else [],
+    )
     app.state.mongodb_client = app.state.client  # Keep backward compatibility
     app.state.mongodb = app.state.client[settings.DB_NAME]
     logger.info("MongoDB connection established")
 
+    # Drop cached responses on any write, including ones made by scripts
+    app.state.invalidation_bus = InvalidationBus(
+        app.state.mongodb, tuple(sorted(CACHED_COLLECTIONS))
+    )
+    app.state.invalidation_bus.subscribe(
+        lambda event: response_cache.invalidate_keys(event.collection, event.keys)
+    )
+    await app.state.invalidation_bus.start()
+
+    # Delete replaced and orphaned media files in the background
+    app.state.media_cleanup = MediaCleanupWorker(app.state.mongodb)
+    await app.state.media_cleanup.start()
+
+    # Queue emails and send them in the background
+    mail_outbox.bind(app.state.mongodb)
+    await mail_outbox.start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down BISHL API server...")
+    await app.state.invalidation_bus.stop()
+    await app.state.media_cleanup.stop()
+    await mail_outbox.stop()
+    media_service.shutdown()
     app.state.client.close()
     logger.info("MongoDB connection closed")
 
@@ -138,6 +171,13 @@ All errors return a standardized format with correlation IDs for debugging:
         {"name": "venues", "description": "Venue and location management"},
     ],
 )
+# Innermost: assigns the correlation id and profiles slow requests
+app.add_middleware(RequestProfilerMiddleware)
+# Times requests that reach a route; cache hits are counted by the cache
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+# Added before CORS so CORS headers wrap cached responses as well
+app.add_middleware(ResponseCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -151,7 +191,7 @@ app.add_middleware(
 @app.exception_handler(BISHLException)
 async def bishl_exception_handler(request: Request, exc: BISHLException):
     """Handle all BISHL custom exceptions"""
-    correlation_id = str(uuid.uuid4())
+    correlation_id = correlation_id_of(request)
 
     error_response = {
         "error": {
@@ -181,7 +221,7 @@ async def bishl_exception_handler(request: Request, exc: BISHLException):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle FastAPI HTTPExceptions with consistent format"""
-    correlation_id = str(uuid.uuid4())
+    correlation_id = correlation_id_of(request)
 
     error_response = {
         "error": {
@@ -210,7 +250,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Catch-all handler for unexpected exceptions"""
-    correlation_id = str(uuid.uuid4())
+    correlation_id = correlation_id_of(request)
 
     # Log full traceback for unexpected errors
     # Use repr() to avoid KeyError when exception message contains braces
@@ -239,6 +279,7 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 
 app.include_router(root_router, prefix="", tags=["root"])
+app.include_router(metrics_router, prefix="", tags=["root"])
 app.include_router(configs_router, prefix="/configs", tags=["configs"])
 
 app.include_router(users_router, prefix="/users", tags=["users"])
@@ -273,6 +314,7 @@ app.include_router(
 )
 app.include_router(posts_router, prefix="/posts", tags=["posts"])
 app.include_router(documents_router, prefix="/documents", tags=["documents"])
+app.include_router(profiles_router, prefix="/profiles", tags=["root"])
 app.include_router(players_router, prefix="/players", tags=["players"])
 
 # if __name__ == "__main__":
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""
+Restore MongoDB collections from a backup_db.py backup
+
+An incremental backup names the backup it is based on, so restoring one walks
+the chain back to a full backup. Per collection the newest full dump replaces
+the collection's documents (indexes are kept), and every later incremental
+dump is applied as upserts by _id. All files are checked against the SHA-256
+in _metadata.json before anything is written. Documents are streamed and
+written in batches.
+
+Backups written before the NDJSON format (<collection>.json arrays) are
+refused: they stored ObjectIds and datetimes as strings and carry no
+checksums, so restoring them would silently change the documents' types.
+
+Usage:
+    python restore_db.py --backup backups/<dir> [--prod] [--collections a,b] [--verify-only]
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from bson import json_util
+from pymongo import ReplaceOne
+
+from backup_db import load_metadata
+
+
+def backup_chain(backup_dir: Path) -> list[tuple[Path, dict[str, Any]]]:
+    """The backup and the backups it is based on, oldest first"""
+    chain = []
+    current: Path | None = Path(backup_dir)
+    while current is not None:
+        metadata = load_metadata(current)
+        if isinstance(metadata["collections"], list):
+            raise ValueError(
+                f"{current} is a legacy JSON backup: its ObjectIds and dates are strings and "
+                "its files have no checksums, so it cannot be restored faithfully"
+            )
+        chain.append((current, metadata))
+        current = Path(metadata["base"]) if metadata.get("base") else None
+    return chain[::-1]
+
+
+def collection_layers(
+    chain: list[tuple[Path, dict[str, Any]]], name: str
+) -> list[tuple[Path, dict[str, Any]]]:
+    """(file, entry) to apply for one collection: its newest full dump and the later increments"""
+    layers: list[tuple[Path, dict[str, Any]]] = []
+    for backup_dir, metadata in chain:
+        entry = metadata["collections"].get(name)
+        if entry is None:
+            continue
+        if entry["mode"] == "full":
+            layers = []
+        layers.append((backup_dir / entry["file"], entry))
+    return layers
+
+
+def read_batches(path: Path, batch_size: int = 1000) -> Iterator[list[dict[str, Any]]]:
+    """Documents of a backup file in batches"""
+    batch = []
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            batch.append(json_util.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def verify_file(path: Path, entry: dict[str, Any]) -> None:
+    """Raise ValueError unless the file matches the count and checksum of its entry"""
+    checksum = hashlib.sha256()
+    count = 0
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            checksum.update(line)
+            count += 1
+    if count != entry["count"] or checksum.hexdigest() != entry["sha256"]:
+        raise ValueError(
+            f"{path}: {count} documents, sha256 {checksum.hexdigest()}; "
+            f"expected {entry['count']}, {entry['sha256']}"
+        )
+
+
+def restore_collection(
+    collection, layers: list[tuple[Path, dict[str, Any]]], batch_size: int = 1000
+) -> int:
+    """Apply the layers of one collection; returns the number of documents written"""
+    written = 0
+    for path, entry in layers:
+        if entry["mode"] == "full":
+            collection.delete_many({})
+            for batch in read_batches(path, batch_size):
+                collection.insert_many(batch, ordered=False)
+                written += len(batch)
+            continue
+        for batch in read_batches(path, batch_size):
+            collection.bulk_write(
+                [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in batch],
+                ordered=False,
+            )
+            written += len(batch)
+    return written
+
+
+def restore_database(
+    db,
+    backup_dir: Path,
+    collections: list[str] | None = None,
+    batch_size: int = 1000,
+    verify_only: bool = False,
+) -> dict[str, int]:
+    """Verify the backup chain and restore it into db; returns documents written per collection"""
+    chain = backup_chain(backup_dir)
+    latest = chain[-1][1]["collections"]
+    names = collections or sorted(latest)
+    layers = {name: collection_layers(chain, name) for name in names}
+    missing = [name for name, name_layers in layers.items() if not name_layers]
+    if missing:
+        raise ValueError(f"Not in backup: {', '.join(missing)}")
+
+    for name_layers in layers.values():
+        for path, entry in name_layers:
+            verify_file(path, entry)
+    print(f"Verified {sum(map(len, layers.values()))} files from {len(chain)} backup(s)")
+    if verify_only:
+        return {}
+
+    restored = {}
+    for name, name_layers in layers.items():
+        restored[name] = restore_collection(db[name], name_layers, batch_size)
+        print(f"  → {name}: {restored[name]} documents from {len(name_layers)} file(s)")
+    return restored
+
+
+def main() -> None:
+    import certifi
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description="Restore MongoDB collections from a backup")
+    parser.add_argument("--backup", type=Path, required=True, help="Backup directory")
+    parser.add_argument("--prod", action="store_true", help="Restore into production database")
+    parser.add_argument("--collections", help="Comma-separated collections (default: all)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per write")
+    parser.add_argument(
+        "--verify-only", action="store_true", help="Only check the backup files' checksums"
+    )
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    args = parser.parse_args()
+
+    # Database configuration
+    if args.prod:
+        db_url, db_name = os.environ["DB_URL_PROD"], "bishl"
+    else:
+        db_url, db_name = os.environ["DB_URL"], "bishl_dev"
+
+    if not (args.verify_only or args.yes):
+        response = input(f"This replaces documents in {db_name}. Continue? (y/N): ")
+        if response.strip().lower() != "y":
+            print("Restore cancelled")
+            return
+
+    client: MongoClient = MongoClient(db_url, tlsCAFile=certifi.where())
+    try:
+        restored = restore_database(
+            client[db_name],
+            args.backup,
+            args.collections.split(",") if args.collections else None,
+            args.batch_size,
+            args.verify_only,
+        )
+    finally:
+        client.close()
+
+    if not args.verify_only:
+        print(f"\nRestored {len(restored)} collections into {db_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 # filename: routers/assignments.py
 from datetime import datetime
 from enum import Enum
-from typing import Any
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query, Request, status
 from fastapi.encoders import jsonable_encoder
@@ -14,11 +13,16 @@ from exceptions import (
     ResourceNotFoundException,
 )
 from logging_config import logger
-from mail_service import send_email
 from models.assignments import AssignmentBase, AssignmentDB, AssignmentStatus, AssignmentUpdate
 from models.responses import StandardResponse
+from services.assignment_conflict_service import (
+    DEFAULT_MATCH_DURATION_MINUTES,
+    AssignmentConflictService,
+)
 from services.assignment_service import AssignmentService
 from services.message_service import MessageService
+from services.response_cache import invalidates_cache
+from services.unassigned_match_service import UnassignedMatchService
 
 DEBUG_LEVEL = settings.DEBUG_LEVEL
 
@@ -78,7 +82,7 @@ async def get_assignments_by_match(
 ):
     mongodb = request.app.state.mongodb
 
-    if not any(role in ["ADMIN", "REF_ADMIN", "CLUB_ADMIN"] for role in token_payload.roles):
+    if not token_payload.has_any_role("ADMIN", "REF_ADMIN", "CLUB_ADMIN"):
         raise AuthorizationException(
             message="Admin, Ref-Admin or Club-Admin role required",
             details={"user_roles": token_payload.roles},
@@ -163,10 +167,7 @@ async def get_assignments_by_user(
     token_payload: TokenPayload = Depends(auth.auth_wrapper),
 ) -> StandardResponse:
     mongodb = request.app.state.mongodb
-    if not (
-        user_id == token_payload.sub
-        or any(role in ["ADMIN", "REF_ADMIN"] for role in token_payload.roles)
-    ):
+    if not (user_id == token_payload.sub or token_payload.has_any_role("ADMIN", "REF_ADMIN")):
         raise AuthorizationException(
             message="Not authorized to view assignments for other users",
             details={"requested_user": user_id, "requester": token_payload.sub},
@@ -195,6 +196,7 @@ async def get_assignments_by_user(
     status_code=status.HTTP_201_CREATED,
     response_model=StandardResponse[AssignmentDB],
 )
+@invalidates_cache("matches")
 async def create_assignment(
     request: Request,
     assignment_data: AssignmentBase = Body(...),
@@ -204,7 +206,7 @@ async def create_assignment(
 ) -> JSONResponse:
     mongodb = request.app.state.mongodb
 
-    if not any(role in ["ADMIN", "REFEREE", "REF_ADMIN"] for role in token_payload.roles):
+    if not token_payload.has_any_role("ADMIN", "REFEREE", "REF_ADMIN"):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
 
     match_id = assignment_data.matchId
@@ -229,8 +231,8 @@ async def create_assignment(
         # check if really ref_admin or admin
         if (
             ref_admin
-            and "REF_ADMIN" not in token_payload.roles
-            and "ADMIN" not in token_payload.roles
+            and not token_payload.has_role("REF_ADMIN")
+            and not token_payload.has_role("ADMIN")
         ):
             raise AuthorizationException(message="Not authorized to be referee admin")
 
@@ -367,6 +369,7 @@ async def create_assignment(
     response_description="Update an assignment",
     response_model=StandardResponse[AssignmentDB],
 )
+@invalidates_cache("matches")
 async def update_assignment(
     request: Request,
     assignment_id: str = Path(..., description="Assignment ID"),
@@ -377,14 +380,18 @@ async def update_assignment(
 ):
     mongodb = request.app.state.mongodb
 
-    if not any(role in ["ADMIN", "REFEREE", "REF_ADMIN"] for role in token_payload.roles):
+    if not token_payload.has_any_role("ADMIN", "REFEREE", "REF_ADMIN"):
         raise AuthorizationException(message="Not authorized")
 
     user_id = token_payload.sub
     ref_admin = assignment_data.refAdmin
 
     # check if really ref_admin
-    if ref_admin and "REF_ADMIN" not in token_payload.roles and "ADMIN" not in token_payload.roles:
+    if (
+        ref_admin
+        and not token_payload.has_role("REF_ADMIN")
+        and not token_payload.has_role("ADMIN")
+    ):
         raise AuthorizationException(message="Not authorized to be ref_admin")
 
     # get assignment from db
@@ -683,308 +690,35 @@ async def update_assignment(
 async def get_unassigned_matches_in_14_days(
     request: Request,
     send_emails: bool = Query(False, description="Whether to send notification emails"),
+    dry_run: bool = Query(
+        False, description="Render notifications and report timings without sending"
+    ),
 ):
-    mongodb = request.app.state.mongodb
-
-    # Calculate date exactly 14 days from now
     from datetime import timedelta
 
+    # Calculate date exactly 14 days from now
     target_date = datetime.now() + timedelta(days=14)
-    start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
-    end_of_day = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-    logger.debug(f"Searching for matches between {start_of_day} and {end_of_day}")
-
-    # Find matches starting exactly in 14 days with no referees assigned
-    matches_cursor = mongodb["matches"].find(
-        {
-            "startDate": {"$gte": start_of_day, "$lte": end_of_day},
-            "$and": [
-                {"$or": [{"referee1": {"$exists": False}}, {"referee1": None}]},
-                {"$or": [{"referee2": {"$exists": False}}, {"referee2": None}]},
-                {"tournament.alias": {"$nin": ["bambini", "bambini-lk2mini"]}},
-            ],
-        }
-    )
 
-    matches = await matches_cursor.to_list(length=None)
+    service = UnassignedMatchService(request.app.state.mongodb)
+    result = await service.run(target_date, send_emails=send_emails, dry_run=dry_run)
+    matches = result["matches"]
 
     if not matches:
+        data = {
+            "message": "No unassigned matches found for 14 days from now",
+            "matches": [],
+            "emails_sent": 0,
+            "target_date": target_date.strftime("%Y-%m-%d"),
+        }
+        if dry_run:
+            data["notifications"] = []
+            data["timings"] = result["timings"]
         return StandardResponse(
             success=True,
-            data={
-                "message": "No unassigned matches found for 14 days from now",
-                "matches": [],
-                "emails_sent": 0,
-                "target_date": target_date.strftime("%Y-%m-%d"),
-            },
+            data=data,
             message="No unassigned matches found for 14 days from now",
         )
 
-    emails_sent = 0
-
-    # --- Step 1: pre-fetch matchday owners directly from DB, keyed by matchday alias tuple ---
-    # Avoids making internal HTTP requests and eliminates SSL issues with self-calls.
-    matchday_owner_cache: dict[tuple[str, str, str, str], dict | None] = {}
-    for match in matches:
-        t_alias = match.get("tournament", {}).get("alias")
-        s_alias = match.get("season", {}).get("alias")
-        r_alias = match.get("round", {}).get("alias")
-        md_alias = match.get("matchday", {}).get("alias")
-        key = (t_alias, s_alias, r_alias, md_alias)
-        if all(key) and key not in matchday_owner_cache:
-            try:
-                pipeline = [
-                    {"$match": {"alias": t_alias}},
-                    {"$unwind": "$seasons"},
-                    {"$match": {"seasons.alias": s_alias}},
-                    {"$unwind": "$seasons.rounds"},
-                    {"$match": {"seasons.rounds.alias": r_alias}},
-                    {"$unwind": "$seasons.rounds.matchdays"},
-                    {"$match": {"seasons.rounds.matchdays.alias": md_alias}},
-                    {"$project": {"_id": 0, "owner": "$seasons.rounds.matchdays.owner"}},
-                ]
-                result = await mongodb["tournaments"].aggregate(pipeline).to_list(length=1)
-                owner = result[0].get("owner") if result else None
-                matchday_owner_cache[key] = owner if (owner and owner.get("clubId")) else None
-                logger.debug(f"Matchday owner cache: {key} -> {matchday_owner_cache[key]}")
-            except Exception as e:
-                logger.warning(f"Failed to fetch matchday owner for key {key}: {str(e)}")
-                matchday_owner_cache[key] = None
-
-    # --- Step 2: group matches by responsible club (matchday owner takes priority) ---
-    # club_id -> {"matches": [...], "matchday_owner": <owner dict or None>}
-    matches_by_club: dict[str, dict[str, Any]] = {}
-
-    for match in matches:
-        t_alias = match.get("tournament", {}).get("alias")
-        s_alias = match.get("season", {}).get("alias")
-        r_alias = match.get("round", {}).get("alias")
-        md_alias = match.get("matchday", {}).get("alias")
-        key = (t_alias, s_alias, r_alias, md_alias)
-        matchday_owner = matchday_owner_cache.get(key)
-
-        if matchday_owner:
-            club_id = matchday_owner.get("clubId")
-        else:
-            club_id = match.get("home", {}).get("clubId")
-
-        if club_id:
-            if club_id not in matches_by_club:
-                matches_by_club[club_id] = {"matches": [], "matchday_owner": matchday_owner}
-            matches_by_club[club_id]["matches"].append(match)
-
-    # --- Step 3: build email content per club, always log, conditionally send ---
-    for club_id, group in matches_by_club.items():
-        try:
-            club_matches = group["matches"]
-            matchday_owner = group["matchday_owner"]
-            is_matchday_owner = matchday_owner is not None
-
-            # Find club admins
-            club_admins = (
-                await mongodb["users"]
-                .find({"roles": "CLUB_ADMIN", "club.clubId": club_id})
-                .to_list(length=None)
-            )
-
-            if is_matchday_owner:
-                club_name = matchday_owner.get("clubName", "Unknown Club")
-            else:
-                club_name = club_matches[0].get("home", {}).get("clubName", "Unknown Club")
-
-            admin_emails = [a.get("email") for a in club_admins if a.get("email")]
-            ligenleitung_email = settings.LIGENLEITUNG_EMAIL
-            ref_admin_email = settings.REF_ADMIN_EMAIL
-
-            # Fetch club document and extract refereeContact
-            referee_contact_email: str | None = None
-            club_doc = await mongodb["clubs"].find_one({"_id": club_id})
-            if club_doc:
-                referee_contact = club_doc.get("refereeContact", {}) or {}
-                referee_contact_email = referee_contact.get("email") or None
-                if not referee_contact_email:
-                    logger.warning(
-                        f"[unassigned-14d] Club {club_name} ({club_id}) has no refereeContact.email"
-                    )
-            else:
-                logger.warning(
-                    f"[unassigned-14d] No club document found for clubId={club_id} ({club_name})"
-                )
-
-            # Resolve recipients / CC / reply_to
-            reply_to = [ref_admin_email] if ref_admin_email else []
-
-            if referee_contact_email:
-                # Primary: refereeContact is the main recipient; club admins + ligenleitung in CC
-                recipients = [referee_contact_email]
-                cc_emails = [e for e in admin_emails if e != referee_contact_email]
-                if ligenleitung_email:
-                    cc_emails.append(ligenleitung_email)
-            elif admin_emails:
-                # Fallback: club admins as recipients, ligenleitung in CC
-                recipients = admin_emails
-                cc_emails = [ligenleitung_email] if ligenleitung_email else []
-            elif ligenleitung_email:
-                # Final fallback: only ligenleitung
-                recipients = [ligenleitung_email]
-                cc_emails = []
-            else:
-                recipients = []
-                cc_emails = []
-
-            # Dev-mode override: collapse everything to ADMIN_USER (only when mail sending is enabled)
-            is_dev = settings.ENVIRONMENT == "development"
-            if is_dev and settings.MAIL_ENABLED and settings.ADMIN_USER:
-                recipients = [settings.ADMIN_USER]
-                cc_emails = []
-
-            role_label = "matchday-owner" if is_matchday_owner else "home-club"
-
-            if is_matchday_owner:
-                email_subject = (
-                    f"BISHL - Schiedsrichter-Einteilung erforderlich (Spieltag {club_name})"
-                )
-            else:
-                email_subject = (
-                    f"BISHL - Schiedsrichter-Einteilung erforderlich (Heimspiele {club_name})"
-                )
-
-            # Build match table rows and plain-text summary for logging
-            match_rows = ""
-            log_lines: list[str] = []
-            for m in club_matches:
-                tournament_name = m.get("tournament", {}).get("name", "Unknown Tournament")
-                home_team = m.get("home", {}).get("fullName", "Unknown Team")
-                away_team = m.get("away", {}).get("fullName", "Unknown Team")
-                start_date = m.get("startDate")
-                venue_name = m.get("venue", {}).get("name", "Unknown Venue")
-
-                if start_date:
-                    weekdays_german = [
-                        "Montag",
-                        "Dienstag",
-                        "Mittwoch",
-                        "Donnerstag",
-                        "Freitag",
-                        "Samstag",
-                        "Sonntag",
-                    ]
-                    weekday = weekdays_german[start_date.weekday()]
-                    formatted_date = start_date.strftime("%d.%m.%Y")
-                    formatted_time = start_date.strftime("%H:%M")
-
-                    match_rows += f"""
-                        <tr>
-                            <td style="padding: 8px; border: 1px solid #ddd;">{tournament_name}</td>
-                            <td style="padding: 8px; border: 1px solid #ddd;">{home_team} - {away_team}</td>
-                            <td style="padding: 8px; border: 1px solid #ddd;">{weekday}, {formatted_date}</td>
-                            <td style="padding: 8px; border: 1px solid #ddd;">{formatted_time}</td>
-                            <td style="padding: 8px; border: 1px solid #ddd;">{venue_name}</td>
-                            <td style="padding: 8px; border: 1px solid #ddd; min-width: 120px;"></td>
-                            <td style="padding: 8px; border: 1px solid #ddd; min-width: 120px;"></td>
-                        </tr>
-                        """
-                    log_lines.append(
-                        f"  {tournament_name} | {home_team} - {away_team} | {weekday}, {formatted_date} {formatted_time} | {venue_name}"
-                    )
-
-            if is_matchday_owner:
-                email_content = f"""
-                    <h2>BISHL - Schiedsrichter-Einteilung erforderlich</h2>
-                    <p>Hallo,</p>
-                    <p>als Veranstalter des Spieltags ist <strong>{club_name}</strong> dafür verantwortlich, dass für alle Spiele des Spieltags Schiedsrichter gestellt werden. Für folgende Spiele sind noch keine Schiedsrichter eingeteilt:</p>
-
-                    <table style="border-collapse: collapse; width: 100%; margin: 20px 0;">
-                        <thead>
-                            <tr style="background-color: #f5f5f5;">
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Wettbewerb</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Spiel</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Datum</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Zeit</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Ort</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left; min-width: 120px;">SR 1</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left; min-width: 120px;">SR 2</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {match_rows}
-                        </tbody>
-                    </table>
-
-                    <p><strong>Bitte antwortet auf diese E-Mail</strong> und tragt eure Schiedsrichter-Vorschläge direkt in die Felder "SR 1" und "SR 2" in der Tabelle ein. Wir werden die Einteilung anschließend vornehmen.</p>
-                    <p>Bis zum {(target_date - timedelta(days=7)).strftime("%d.%m.")} können nur Schiedsrichter der beteiligten Vereine anfragen. Ab dem {(target_date - timedelta(days=6)).strftime("%d.%m.")} können wieder alle Schiedsrichter anfragen.</p>
-                    <p>Werden erst in den letzten 7 Tagen vor Spielbeginn Schiedsrichter eingeteilt, entstehen höhere Spielgebühren.</p>
-                    <p>Sind drei Tage vor Spielbeginn keine Schiedsrichter eingeteilt, wird das Spiel gewertet.</p>
-                    <p>Bei Fragen wendet euch gerne an das BISHL-Schiedsrichterwesen.</p>
-                    """
-            else:
-                email_content = f"""
-                    <h2>BISHL - Schiedsrichter-Einteilung erforderlich</h2>
-                    <p>Hallo,</p>
-                    <p>für folgende Heimspiele von <strong>{club_name}</strong> sind noch keine Schiedsrichter eingeteilt:</p>
-
-                    <table style="border-collapse: collapse; width: 100%; margin: 20px 0;">
-                        <thead>
-                            <tr style="background-color: #f5f5f5;">
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Wettbewerb</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Spiel</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Datum</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Zeit</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Ort</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left; min-width: 120px;">SR 1</th>
-                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left; min-width: 120px;">SR 2</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {match_rows}
-                        </tbody>
-                    </table>
-
-                    <p><strong>Bitte antwortet auf diese E-Mail</strong> und tragt eure Schiedsrichter-Vorschläge direkt in die Felder "SR 1" und "SR 2" in der Tabelle ein. Wir werden die Einteilung anschließend vornehmen.</p>
-                    <p>Bis zum {(target_date - timedelta(days=7)).strftime("%d.%m.")} können nur Schiedsrichter der beteiligten Vereine anfragen. Als Heimverein ist <strong>{club_name}</strong> nun in der Verantwortung, zwei Schiedsrichter für diese Spiele zu stellen. Ab dem {(target_date - timedelta(days=6)).strftime("%d.%m.")} können wieder alle Schiedsrichter anfragen.</p>
-                    <p>Werden erst in den letzten 7 Tagen vor Spielbeginn Schiedsrichter eingeteilt, entstehen höhere Spielgebühren.</p>
-                    <p>Sind drei Tage vor Spielbeginn keine Schiedsrichter eingeteilt, wird das Spiel gewertet.</p>
-                    <p>Bei Fragen wendet euch gerne an das BISHL-Schiedsrichterwesen.</p>
-                    """
-
-            # Always log full recipient details regardless of send_emails or environment
-            logger.info(
-                f"[unassigned-14d] Email preview | club={club_name} ({club_id}) role={role_label} "
-                f"refereeContact={referee_contact_email} adminEmails={admin_emails} "
-                f"recipients={recipients} cc={cc_emails} reply_to={reply_to} "
-                f"dev_override={is_dev} send_emails={send_emails} matches={len(club_matches)}\n"
-                + "\n".join(log_lines)
-            )
-
-            if not recipients:
-                logger.warning(
-                    f"[unassigned-14d] No recipients resolved for club {club_name} ({club_id}) — skipping"
-                )
-
-            if send_emails:
-                if recipients:
-                    await send_email(
-                        subject=email_subject,
-                        recipients=recipients,
-                        cc=cc_emails,
-                        reply_to=reply_to,
-                        body=email_content,
-                    )
-                    emails_sent += len(recipients)
-                    logger.info(
-                        f"[unassigned-14d] Email sent for {club_name} | recipients={recipients} "
-                        f"cc={cc_emails} reply_to={reply_to}"
-                    )
-                else:
-                    logger.warning(
-                        f"[unassigned-14d] No recipients at all for club {club_name} ({club_id}) — email not sent"
-                    )
-
-        except Exception as e:
-            logger.opt(exception=True).error(
-                f"[unassigned-14d] Failed processing club {club_id}: {str(e)}"
-            )
-
     # Return the matches and email status
     match_list = []
     for match in matches:
@@ -1000,24 +734,81 @@ async def get_unassigned_matches_in_14_days(
         }
         match_list.append(match_info)
 
+    data = {
+        "message": f"Found {len(matches)} unassigned matches in 14 days",
+        "matches": jsonable_encoder(match_list),
+        "emails_sent": result["emails_sent"],
+        "target_date": target_date.strftime("%Y-%m-%d"),
+    }
+    if dry_run:
+        data["notifications"] = [
+            {
+                "club_id": n["club_id"],
+                "club_name": n["club_name"],
+                "role": n["role"],
+                "recipients": n["recipients"],
+                "cc": n["cc"],
+                "reply_to": n["reply_to"],
+                "subject": n["subject"],
+                "match_count": n["match_count"],
+            }
+            for n in result["notifications"]
+        ]
+        data["timings"] = result["timings"]
+
     return StandardResponse(
         success=True,
-        data={
-            "message": f"Found {len(matches)} unassigned matches in 14 days",
-            "matches": jsonable_encoder(match_list),
-            "emails_sent": emails_sent,
-            "target_date": target_date.strftime("%Y-%m-%d"),
-        },
+        data=data,
         message=f"Found {len(matches)} unassigned matches in 14 days",
     )
 
 
+# GET assignment/match conflicts and referee double bookings ======
+@router.get(
+    "/conflicts",
+    response_description="Check assignments against matches and detect referee double bookings",
+)
+async def get_assignment_conflicts(
+    request: Request,
+    from_date: datetime | None = Query(
+        None, description="Only check double bookings for matches starting at or after this date"
+    ),
+    to_date: datetime | None = Query(
+        None, description="Only check double bookings for matches starting at or before this date"
+    ),
+    match_duration_minutes: int = Query(
+        DEFAULT_MATCH_DURATION_MINUTES, ge=1, description="Assumed match slot length in minutes"
+    ),
+    token_payload: TokenPayload = Depends(auth.auth_wrapper),
+) -> StandardResponse:
+    if not token_payload.has_any_role("ADMIN", "REF_ADMIN"):
+        raise AuthorizationException(
+            message="Admin or Ref-Admin role required",
+            details={"user_roles": token_payload.roles},
+        )
+
+    service = AssignmentConflictService(request.app.state.mongodb)
+    result = await service.check(
+        from_date=from_date, to_date=to_date, match_duration_minutes=match_duration_minutes
+    )
+
+    return StandardResponse(
+        success=True,
+        data=jsonable_encoder(result),
+        message=(
+            f"Found {len(result['conflicts'])} assignment conflicts and "
+            f"{len(result['double_bookings'])} double bookings"
+        ),
+    )
+
+
 # DELETE =====================================================================
 @router.delete(
     "/{id}",
     response_description="Delete an assignment",
     status_code=status.HTTP_204_NO_CONTENT,
 )
+@invalidates_cache("matches")
 async def delete_assignment(
     request: Request,
     id: str = Path(..., description="Assignment ID"),
@@ -1027,7 +818,7 @@ async def delete_assignment(
 ) -> Response:
     mongodb = request.app.state.mongodb
 
-    if not any(role in ["ADMIN", "REF_ADMIN"] for role in token_payload.roles):
+    if not token_payload.has_any_role("ADMIN", "REF_ADMIN"):
         raise AuthorizationException(
             message="Admin or Ref Admin role required", details={"user_roles": token_payload.roles}
         )
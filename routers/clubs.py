@@ -1,7 +1,5 @@
 import json
 
-import cloudinary
-import cloudinary.uploader
 from fastapi import (
     APIRouter,
     Depends,
@@ -28,19 +26,21 @@ from exceptions import (
 from logging_config import logger
 from models.clubs import ClubBase, ClubDB, ClubUpdate
 from models.responses import PaginatedResponse, StandardResponse
+from services.media_cleanup import MediaCleanupService
+from services.media_service import media_service
+from services.media_urls import add_image_variants
 from services.pagination import PaginationHelper
-from utils import configure_cloudinary
+from services.response_cache import cache_response, invalidates_cache
 
 router = APIRouter()
 auth = AuthHandler()
-configure_cloudinary()
 
 
 # upload file
 async def handle_logo_upload(logo: UploadFile, alias: str) -> str:
     if logo:
-        result = cloudinary.uploader.upload(
-            logo.file,
+        result = await media_service.upload(
+            logo,
             folder="logos/",
             public_id=alias,
             overwrite=True,
@@ -52,21 +52,9 @@ async def handle_logo_upload(logo: UploadFile, alias: str) -> str:
     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No logo uploaded.")
 
 
-# Helper function to delete file from Cloudinary
-async def delete_from_cloudinary(logo_url: str):
-    if logo_url:
-        try:
-            public_id = logo_url.rsplit("/", 1)[-1].split(".")[0]
-            result = cloudinary.uploader.destroy(f"logos/{public_id}")
-            logger.info(f"Logo deleted from Cloudinary: logos/{public_id}")
-            logger.debug(f"Result: {result}")
-            return result
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e)) from e
-
-
 # list all clubs
 @router.get("", response_description="List all clubs", response_model=PaginatedResponse[ClubDB])
+@cache_response("clubs")
 async def list_clubs(
     request: Request,
     active: bool | None = None,
@@ -90,13 +78,17 @@ async def list_clubs(
         message=f"Retrieved {len(items)} clubs",
     )
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(paginated_result))
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=add_image_variants(jsonable_encoder(paginated_result)),
+    )
 
 
 # get club by Alias
 @router.get(
     "/{alias}", response_description="Get a single club", response_model=StandardResponse[ClubDB]
 )
+@cache_response("clubs", keys={"clubs": "club:{alias}"})
 async def get_club(alias: str, request: Request) -> StandardResponse[ClubDB]:
     mongodb = request.app.state.mongodb
     if (club := await mongodb["clubs"].find_one({"alias": alias})) is not None:
@@ -114,6 +106,7 @@ async def get_club(alias: str, request: Request) -> StandardResponse[ClubDB]:
     response_description="Get a single club by ID",
     response_model=StandardResponse[ClubDB],
 )
+@cache_response("clubs", keys={"clubs": "club:{id}"})
 async def get_club_by_id(id: str, request: Request) -> JSONResponse:
     mongodb = request.app.state.mongodb
     if (club := await mongodb["clubs"].find_one({"_id": id})) is not None:
@@ -132,6 +125,7 @@ async def get_club_by_id(id: str, request: Request) -> JSONResponse:
 
 # create new club
 @router.post("", response_description="Add new club", response_model=StandardResponse[ClubDB])
+@invalidates_cache("clubs")
 async def create_club(
     request: Request,
     name: str = Form(...),
@@ -235,6 +229,7 @@ async def create_club(
 
 # Update club
 @router.patch("/{id}", response_description="Update club", response_model=StandardResponse[ClubDB])
+@invalidates_cache("clubs")
 async def update_club(
     request: Request,
     id: str,
@@ -295,17 +290,17 @@ async def update_club(
     if logo:
         # Case 1: New file uploaded - always replace/set logo
         logger.debug("Logo handling: Uploading new logo file")
-        if existing_club.get("logoUrl"):
-            logger.debug(f"Logo handling: Deleting existing logo: {existing_club['logoUrl']}")
-            await delete_from_cloudinary(existing_club["logoUrl"])
         club_data["logoUrl"] = await handle_logo_upload(logo, existing_club["alias"])
         logger.debug(f"Logo handling: New logo uploaded: {club_data['logoUrl']}")
+        await MediaCleanupService(mongodb).discard_url(
+            existing_club.get("logoUrl"), replaced_by=club_data["logoUrl"]
+        )
     elif logoUrl == "":
         # Case 2: Empty string means delete the logo
         logger.debug("Logo handling: Deleting logo (empty string received)")
         if existing_club.get("logoUrl"):
-            await delete_from_cloudinary(existing_club["logoUrl"])
-            logger.debug(f"Logo handling: Deleted existing logo: {existing_club['logoUrl']}")
+            await MediaCleanupService(mongodb).discard_url(existing_club["logoUrl"])
+            logger.debug(f"Logo handling: Discarded existing logo: {existing_club['logoUrl']}")
         club_data["logoUrl"] = None
     elif logoUrl is not None:
         # Case 3: logoUrl has a value (URL string) - keep/update URL
@@ -362,6 +357,7 @@ async def update_club(
 
 # Delete club
 @router.delete("/{id}", response_description="Delete club")
+@invalidates_cache("clubs")
 async def delete_club(
     request: Request,
     id: str,
@@ -380,8 +376,11 @@ async def delete_club(
     logger.info(f"Deleting club: {existing_club.get('name', id)}")
     result = await mongodb["clubs"].delete_one({"_id": id})
     if result.deleted_count == 1:
-        if existing_club.get("logoUrl"):
-            await delete_from_cloudinary(existing_club["logoUrl"])
+        media_cleanup = MediaCleanupService(mongodb)
+        for logo_url in [existing_club.get("logoUrl")] + [
+            team.get("logoUrl") for team in existing_club.get("teams") or []
+        ]:
+            await media_cleanup.discard_url(logo_url)
         logger.info(f"Club deleted successfully: {existing_club.get('name', id)}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     raise DatabaseOperationException(
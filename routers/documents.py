@@ -1,8 +1,6 @@
 from datetime import datetime
 from typing import Any
 
-import cloudinary
-import cloudinary.uploader
 from fastapi import (
     APIRouter,
     Depends,
@@ -27,19 +25,19 @@ from exceptions import (
 )
 from models.documents import DocumentBase, DocumentDB, DocumentUpdate
 from models.responses import PaginatedResponse, StandardResponse
+from services.media_cleanup import MediaCleanupService
+from services.media_service import media_service
 from services.pagination import PaginationHelper
-from utils import configure_cloudinary
 
 router = APIRouter()
 auth = AuthHandler()
-configure_cloudinary()
 
 
 # Helper function to upload file to Cloudinary
-def upload_to_cloudinary(title: str, file: UploadFile):
+async def upload_to_cloudinary(title: str, file: UploadFile):
     try:
-        result = cloudinary.uploader.upload(
-            file.file, public_id=file.filename, resource_type="raw", folder="docs/"
+        result = await media_service.upload(
+            file, public_id=file.filename, resource_type="raw", folder="docs/"
         )
         logger.info(f"Document uploaded to Cloudinary: {result['public_id']}")
         return result
@@ -71,16 +69,6 @@ def validate_file_type(file: UploadFile):
         )
 
 
-# Helper function to delete file from Cloudinary
-async def delete_from_cloudinary(public_id: str):
-    try:
-        result = cloudinary.uploader.destroy(public_id, resource_type="raw")
-        logger.info(f"Document deleted from Cloudinary: {public_id}")
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
-
-
 # Helper function to check for reserved aliases
 def check_reserved_aliases(alias: str):
     reserved_aliases = ["categories"]
@@ -230,7 +218,7 @@ async def upload_document(
     validate_file_type(file)
 
     # upload file
-    result = upload_to_cloudinary(title, file)
+    result = await upload_to_cloudinary(title, file)
 
     # data preparation for storing in database
     document = DocumentBase(
@@ -328,8 +316,10 @@ async def update_document(
             )
         # result = upload_to_cloudinary(title, file)
         validate_file_type(file)
-        await delete_from_cloudinary(existing_doc["publicId"])
-        result = upload_to_cloudinary(title, file)
+        result = await upload_to_cloudinary(title, file)
+        await MediaCleanupService(mongodb).discard(
+            existing_doc.get("publicId"), "raw", replaced_by=result["public_id"]
+        )
         doc_data["url"] = result["secure_url"]
         doc_data["publicId"] = result["public_id"]
         doc_data["fileName"] = file.filename
@@ -402,7 +392,7 @@ async def delete_document(
         raise HTTPException(status_code=404, detail=f"Document with id {id} not found.")
     result = await mongodb["documents"].delete_one({"_id": id})
     if result.deleted_count == 1:
-        await delete_from_cloudinary(existing_doc["publicId"])
+        await MediaCleanupService(mongodb).discard(existing_doc.get("publicId"), "raw")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     raise HTTPException(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete document"
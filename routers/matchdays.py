@@ -11,6 +11,9 @@ from logging_config import logger
 from models.matchday_responses import MatchdayLinks, MatchdayResponse
 from models.responses import StandardResponse
 from models.tournaments import MatchdayBase, MatchdayDB, MatchdayUpdate
+from services.match_listing_service import MatchListingService
+from services.media_urls import add_image_variants
+from services.response_cache import cache_response, invalidates_cache
 from utils import DEBUG_LEVEL, my_jsonable_encoder
 
 router = APIRouter()
@@ -23,6 +26,7 @@ auth = AuthHandler()
     response_description="List all matchdays for a round",
     response_model=StandardResponse[list[MatchdayResponse]],
 )
+@cache_response("tournaments", keys={"tournaments": "tournament:{tournament_alias}"})
 async def get_matchdays_for_round(
     request: Request,
     tournament_alias: str = Path(
@@ -83,11 +87,13 @@ async def get_matchdays_for_round(
                             matchdays.append(matchday_response)
                         return JSONResponse(
                             status_code=status.HTTP_200_OK,
-                            content=jsonable_encoder(
-                                StandardResponse(
-                                    success=True,
-                                    data=matchdays,
-                                    message=f"Retrieved {len(matchdays)} matchdays",
+                            content=add_image_variants(
+                                jsonable_encoder(
+                                    StandardResponse(
+                                        success=True,
+                                        data=matchdays,
+                                        message=f"Retrieved {len(matchdays)} matchdays",
+                                    )
                                 )
                             ),
                         )
@@ -110,6 +116,7 @@ async def get_matchdays_for_round(
     response_description="Get one matchday of a round",
     response_model=StandardResponse[MatchdayResponse],
 )
+@cache_response("tournaments", keys={"tournaments": "tournament:{tournament_alias}"})
 async def get_matchday(
     request: Request,
     tournament_alias: str = Path(
@@ -170,11 +177,13 @@ async def get_matchday(
                                 )
                                 return JSONResponse(
                                     status_code=status.HTTP_200_OK,
-                                    content=jsonable_encoder(
-                                        StandardResponse(
-                                            success=True,
-                                            data=matchday_response,
-                                            message="Matchday retrieved successfully",
+                                    content=add_image_variants(
+                                        jsonable_encoder(
+                                            StandardResponse(
+                                                success=True,
+                                                data=matchday_response,
+                                                message="Matchday retrieved successfully",
+                                            )
                                         )
                                     ),
                                 )
@@ -190,6 +199,7 @@ async def get_matchday(
     response_description="Add a new matchday to a round",
     response_model=StandardResponse[MatchdayDB],
 )
+@invalidates_cache("tournaments")
 async def add_matchday(
     request: Request,
     tournament_alias: str = Path(
@@ -301,6 +311,7 @@ async def add_matchday(
     response_description="Update a matchday of a round",
     response_model=StandardResponse[MatchdayDB],
 )
+@invalidates_cache("tournaments", "matches")
 async def update_matchday(
     request: Request,
     matchday_id: str = Path(..., description="The ID of the matchday to update"),
@@ -437,6 +448,17 @@ async def update_matchday(
                 collection="tournaments.matchdays",
                 details={"error": str(e), "matchday_id": matchday_id},
             ) from e
+
+        matchday_path = f"seasons.{season_index}.rounds.{round_index}.matchdays.{matchday_index}"
+        if f"{matchday_path}.matchSettings" in update_data["$set"]:
+            await MatchListingService(mongodb).refresh_scope(
+                tournament_alias,
+                season_alias,
+                round_alias,
+                tournament["seasons"][season_index]["rounds"][round_index]["matchdays"][
+                    matchday_index
+                ]["alias"],
+            )
     else:
         if DEBUG_LEVEL > 10:
             print("no update needed")
@@ -503,6 +525,7 @@ async def update_matchday(
 
 # delete matchday of a round
 @router.delete("/{matchday_id}", response_description="Delete a matchday of a round")
+@invalidates_cache("tournaments")
 async def delete_matchday(
     request: Request,
     tournament_alias: str = Path(
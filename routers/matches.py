@@ -1,11 +1,11 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any
 
 import isodate
 from bson import ObjectId
 from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from authentication import AuthHandler, TokenPayload
 from config import settings
@@ -26,6 +26,14 @@ from models.matches import (
     RosterStatus,
 )
 from models.responses import PaginatedResponse, StandardResponse
+from services.json_response import FastJSONResponse
+from services.live_match_service import (
+    build_snapshot,
+    goal_totals,
+    live_match_hub,
+    stream_match_events,
+)
+from services.match_listing_service import MATCH_LISTINGS, MatchListingService
 from services.match_permission_service import MatchAction, MatchPermissionService
 from services.match_settings_service import resolve_match_settings, resolve_match_settings_batch
 from services.match_transition_service import (
@@ -34,6 +42,7 @@ from services.match_transition_service import (
     validate_match_transition,
 )
 from services.pagination import PaginationHelper
+from services.response_cache import cache_response, invalidates_cache
 from services.stats_service import StatsService
 from services.tournament_service import TournamentService
 from utils import (
@@ -203,6 +212,7 @@ async def get_match_object(mongodb, match_id: str) -> MatchDB:
 
 # get matches for calendar view (no pagination, lightweight response)
 @router.get("/calendar", response_description="Get matches for calendar view")
+@cache_response("matches", "tournaments")
 async def get_matches_calendar(
     request: Request,
     tournament: str | None = None,
@@ -253,10 +263,10 @@ async def get_matches_calendar(
     }
 
     # Fetch all matches (no pagination) - typically a season has 100-300 matches
-    matches = await mongodb["matches"].find(query, projection).sort("startDate", 1).to_list(None)
+    matches = await find_match_list(mongodb, query, projection).to_list(None)
 
     # Resolve match settings from hierarchy
-    matches = await resolve_match_settings_batch(mongodb, matches)
+    matches = await resolve_match_list_settings(mongodb, matches)
 
     # Convert to lightweight format
     results = []
@@ -264,44 +274,39 @@ async def get_matches_calendar(
         match = convert_seconds_to_times(match)
         results.append(MatchListBase(**match))
 
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status.HTTP_200_OK,
-        content=jsonable_encoder(
-            {
-                "success": True,
-                "data": results,
-                "message": f"Retrieved {len(results)} matches for calendar",
-            }
-        ),
+        content={
+            "success": True,
+            "data": results,
+            "message": f"Retrieved {len(results)} matches for calendar",
+        },
     )
 
 
-# get today's matches
-@router.get(
-    "/today", response_model=list[MatchListBase], response_description="Get today's matches"
-)
-async def get_todays_matches(
-    request: Request,
-    tournament: str | None = None,
+# Home page widgets leave out the heavy per-team fields
+MATCH_LIST_PROJECTION = {
+    "home.roster": 0,
+    "home.scores": 0,
+    "home.penalties": 0,
+    "away.roster": 0,
+    "away.scores": 0,
+    "away.penalties": 0,
+}
+
+
+def build_match_list_query(
     season: str | None = None,
+    tournament: str | None = None,
     round: str | None = None,
     matchday: str | None = None,
     referee: str | None = None,
     club: str | None = None,
     team: str | None = None,
     assigned: bool | None = None,
-) -> JSONResponse:
-    mongodb = request.app.state.mongodb
-
-    # Get today's date range
-    today = datetime.now().date()
-    start_of_day = datetime.combine(today, datetime.min.time())
-    end_of_day = datetime.combine(today, datetime.max.time())
-
-    query: dict[str, Any] = {
-        "season.alias": season if season else settings.CURRENT_SEASON,
-        "startDate": {"$gte": start_of_day, "$lte": end_of_day},
-    }
+) -> dict[str, Any]:
+    """Filter shared by the today, upcoming and rest-of-week widgets (without startDate)"""
+    query: dict[str, Any] = {"season.alias": season if season else settings.CURRENT_SEASON}
 
     if tournament:
         query["tournament.alias"] = tournament
@@ -330,40 +335,43 @@ async def get_todays_matches(
                 {"referee1.userId": {"$exists": True}},
                 {"referee2.userId": {"$exists": True}},
             ]
+    return query
 
-    if DEBUG_LEVEL > 20:
-        logger.debug(f"today's matches query: {query}")
 
-    # Project only necessary fields, excluding roster, scores, and penalties
-    projection = {
-        "home.roster": 0,
-        "home.scores": 0,
-        "home.penalties": 0,
-        "away.roster": 0,
-        "away.scores": 0,
-        "away.penalties": 0,
-    }
+def bucket_matches_by_day(matches: list[dict]) -> dict[date, list[dict]]:
+    """Group matches sorted by startDate into calendar days, keeping their order"""
+    days: dict[date, list[dict]] = {}
+    for match in matches:
+        days.setdefault(match["startDate"].date(), []).append(match)
+    return days
 
-    matches = await mongodb["matches"].find(query, projection).sort("startDate", 1).to_list(None)
 
-    matches = await resolve_match_settings_batch(mongodb, matches)
+def find_match_list(mongodb, query: dict[str, Any], projection: dict = MATCH_LIST_PROJECTION):
+    """Matches sorted by start, read from the matchListings read model when it is enabled"""
+    if settings.MATCH_LISTINGS_ENABLED:
+        return mongodb[MATCH_LISTINGS].find(query).sort("startDate", 1)
+    return mongodb["matches"].find(query, projection).sort("startDate", 1)
 
-    # Convert to MatchListBase objects and parse time fields
-    results = []
-    for match in matches:
-        match = convert_seconds_to_times(match)
-        results.append(MatchListBase(**match))
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(results))
+async def resolve_match_list_settings(mongodb, matches: list[dict]) -> list[dict]:
+    """Resolve match settings in one batch; listings already carry them"""
+    if settings.MATCH_LISTINGS_ENABLED:
+        return matches
+    return await resolve_match_settings_batch(mongodb, matches)
 
 
-# get upcoming matches (next day with matches)
+async def to_match_list(mongodb, matches: list[dict]) -> list[MatchListBase]:
+    """Resolve match settings once for all matches and convert them for list responses"""
+    matches = await resolve_match_list_settings(mongodb, matches)
+    return [MatchListBase(**convert_seconds_to_times(match)) for match in matches]
+
+
+# get today's matches
 @router.get(
-    "/upcoming",
-    response_model=list[MatchListBase],
-    response_description="Get upcoming matches for next day where matches exist",
+    "/today", response_model=list[MatchListBase], response_description="Get today's matches"
 )
-async def get_upcoming_matches(
+@cache_response("matches", "tournaments")
+async def get_todays_matches(
     request: Request,
     tournament: str | None = None,
     season: str | None = None,
@@ -376,91 +384,66 @@ async def get_upcoming_matches(
 ) -> JSONResponse:
     mongodb = request.app.state.mongodb
 
-    # Get current time and start searching from tomorrow
-    today = datetime.now()
-    tomorrow_start = datetime.combine(today.date() + timedelta(days=1), datetime.min.time())
-
-    # Build base query to find minimum start date
-    base_query: dict[str, Any] = {
-        "season.alias": season if season else settings.CURRENT_SEASON,
-        "startDate": {"$gte": tomorrow_start},
+    # Get today's date range
+    today = datetime.now().date()
+    query = build_match_list_query(
+        season, tournament, round, matchday, referee, club, team, assigned
+    )
+    query["startDate"] = {
+        "$gte": datetime.combine(today, datetime.min.time()),
+        "$lte": datetime.combine(today, datetime.max.time()),
     }
 
-    if tournament:
-        base_query["tournament.alias"] = tournament
-    if round:
-        base_query["round.alias"] = round
-    if matchday:
-        base_query["matchday.alias"] = matchday
-    if referee:
-        base_query["$or"] = [{"referee1.userId": referee}, {"referee2.userId": referee}]
-    if club:
-        if team:
-            base_query["$or"] = [
-                {"$and": [{"home.clubAlias": club}, {"home.teamAlias": team}]},
-                {"$and": [{"away.clubAlias": club}, {"away.teamAlias": team}]},
-            ]
-        else:
-            base_query["$or"] = [{"home.clubAlias": club}, {"away.clubAlias": club}]
-    if assigned is not None:
-        if not assigned:  # assigned == False
-            base_query["$and"] = [
-                {"referee1.userId": {"$exists": False}},
-                {"referee2.userId": {"$exists": False}},
-            ]
-        elif assigned:  # assigned == True
-            base_query["$or"] = [
-                {"referee1.userId": {"$exists": True}},
-                {"referee2.userId": {"$exists": True}},
-            ]
-
     if DEBUG_LEVEL > 20:
-        logger.debug(f"upcoming matches base query: {base_query}")
+        logger.debug(f"today's matches query: {query}")
 
-    # Find the minimum start date for upcoming matches
-    min_date_result = (
-        await mongodb["matches"].find(base_query).sort("startDate", 1).limit(1).to_list(1)
-    )
+    matches = await find_match_list(mongodb, query).to_list(None)
+    results = await to_match_list(mongodb, matches)
 
-    if not min_date_result:
-        # No upcoming matches found
-        return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder([]))
+    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(results))
 
-    min_start_date = min_date_result[0]["startDate"]
-    match_date = min_start_date.date()
 
-    # Create date range for the found date
-    start_of_day = datetime.combine(match_date, datetime.min.time())
-    end_of_day = datetime.combine(match_date, datetime.max.time())
+# get upcoming matches (next day with matches)
+@router.get(
+    "/upcoming",
+    response_model=list[MatchListBase],
+    response_description="Get upcoming matches for next day where matches exist",
+)
+@cache_response("matches", "tournaments")
+async def get_upcoming_matches(
+    request: Request,
+    tournament: str | None = None,
+    season: str | None = None,
+    round: str | None = None,
+    matchday: str | None = None,
+    referee: str | None = None,
+    club: str | None = None,
+    team: str | None = None,
+    assigned: bool | None = None,
+) -> JSONResponse:
+    mongodb = request.app.state.mongodb
 
-    # Build final query for matches on the found date
-    final_query = base_query.copy()
-    final_query["startDate"] = {"$gte": start_of_day, "$lte": end_of_day}
+    # Start searching from tomorrow
+    tomorrow = datetime.now().date() + timedelta(days=1)
+    query = build_match_list_query(
+        season, tournament, round, matchday, referee, club, team, assigned
+    )
+    query["startDate"] = {"$gte": datetime.combine(tomorrow, datetime.min.time())}
 
     if DEBUG_LEVEL > 20:
-        logger.debug(f"upcoming matches final query for {match_date}: {final_query}")
+        logger.debug(f"upcoming matches query: {query}")
 
-    # Project only necessary fields, excluding roster, scores, and penalties
-    projection = {
-        "home.roster": 0,
-        "home.scores": 0,
-        "home.penalties": 0,
-        "away.roster": 0,
-        "away.scores": 0,
-        "away.penalties": 0,
-    }
-
-    matches = (
-        await mongodb["matches"].find(final_query, projection).sort("startDate", 1).to_list(None)
-    )
+    # One sorted query; stop reading once the first match day is complete, which
+    # usually happens within the first batch
+    matches: list[dict] = []
+    cursor = find_match_list(mongodb, query)
+    async for match in cursor:
+        if matches and match["startDate"].date() != matches[0]["startDate"].date():
+            break
+        matches.append(match)
+    await cursor.close()
 
-    matches = await resolve_match_settings_batch(mongodb, matches)
-
-    # Convert to MatchListBase objects and parse time fields
-    results = []
-    for match in matches:
-        match = convert_seconds_to_times(match)
-        results.append(MatchListBase(**match))
+    results = await to_match_list(mongodb, matches)
 
     return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(results))
 
@@ -470,6 +453,7 @@ async def get_upcoming_matches(
     "/rest-of-week",
     response_description="Get matches for rest of current week (tomorrow until Sunday)",
 )
+@cache_response("matches", "tournaments")
 async def get_rest_of_week_matches(
     request: Request,
     tournament: str | None = None,
@@ -494,88 +478,35 @@ async def get_rest_of_week_matches(
 
     end_of_week = today + timedelta(days=days_until_sunday)
 
-    # Build base query
-    base_query: dict[str, Any] = {"season.alias": season if season else settings.CURRENT_SEASON}
-
-    if tournament:
-        base_query["tournament.alias"] = tournament
-    if round:
-        base_query["round.alias"] = round
-    if matchday:
-        base_query["matchday.alias"] = matchday
-    if referee:
-        base_query["$or"] = [{"referee1.userId": referee}, {"referee2.userId": referee}]
-    if club:
-        if team:
-            base_query["$or"] = [
-                {"$and": [{"home.clubAlias": club}, {"home.teamAlias": team}]},
-                {"$and": [{"away.clubAlias": club}, {"away.teamAlias": team}]},
-            ]
-        else:
-            base_query["$or"] = [{"home.clubAlias": club}, {"away.clubAlias": club}]
-    if assigned is not None:
-        if not assigned:  # assigned == False
-            base_query["$and"] = [
-                {"referee1.userId": {"$exists": False}},
-                {"referee2.userId": {"$exists": False}},
-            ]
-        elif assigned:  # assigned == True
-            base_query["$or"] = [
-                {"referee1.userId": {"$exists": True}},
-                {"referee2.userId": {"$exists": True}},
-            ]
+    # One range query for the whole week, bucketed by day below
+    query = build_match_list_query(
+        season, tournament, round, matchday, referee, club, team, assigned
+    )
+    query["startDate"] = {
+        "$gte": datetime.combine(tomorrow, datetime.min.time()),
+        "$lte": datetime.combine(end_of_week, datetime.max.time()),
+    }
 
     if DEBUG_LEVEL > 20:
-        logger.debug(f"this week matches base query: {base_query}")
+        logger.debug(f"this week matches query: {query}")
 
-    # Initialize result structure
-    week_matches = []
+    matches = await find_match_list(mongodb, query).to_list(None)
+    days = bucket_matches_by_day(await resolve_match_list_settings(mongodb, matches))
 
-    # Loop through each day from tomorrow until Sunday
+    # Every day until Sunday is listed, including days without matches
+    week_matches = []
     current_date = tomorrow
     while current_date <= end_of_week:
-        start_of_day = datetime.combine(current_date, datetime.min.time())
-        end_of_day = datetime.combine(current_date, datetime.max.time())
-
-        # Build query for this specific day
-        day_query = base_query.copy()
-        day_query["startDate"] = {"$gte": start_of_day, "$lte": end_of_day}
-
-        if DEBUG_LEVEL > 20:
-            logger.debug(f"this week matches query for {current_date}: {day_query}")
-
-        # Project only necessary fields, excluding roster, scores, and penalties
-        projection = {
-            "home.roster": 0,
-            "home.scores": 0,
-            "home.penalties": 0,
-            "away.roster": 0,
-            "away.scores": 0,
-            "away.penalties": 0,
-        }
-
-        matches = (
-            await mongodb["matches"].find(day_query, projection).sort("startDate", 1).to_list(None)
-        )
-
-        matches = await resolve_match_settings_batch(mongodb, matches)
-
-        # Convert to MatchListBase objects and parse time fields
-        day_matches = []
-        for match in matches:
-            match = convert_seconds_to_times(match)
-            day_matches.append(MatchListBase(**match))
-
-        # Add day data to result
         week_matches.append(
             {
                 "date": current_date.isoformat(),
                 "dayName": current_date.strftime("%A"),
-                "matches": day_matches,
+                "matches": [
+                    MatchListBase(**convert_seconds_to_times(match))
+                    for match in days.get(current_date, [])
+                ],
             }
         )
-
-        # Move to next day
         current_date += timedelta(days=1)
 
     return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(week_matches))
@@ -674,9 +605,7 @@ async def get_matches(
         message=f"Retrieved {len(results)} matches",
     )
 
-    return JSONResponse(
-        status_code=status.HTTP_200_OK, content=jsonable_encoder(paginated_response)
-    )
+    return FastJSONResponse(status_code=status.HTTP_200_OK, content=paginated_response)
 
 
 # get one match by id
@@ -691,8 +620,40 @@ async def get_match(
     return StandardResponse(success=True, data=match, message="Match retrieved successfully")
 
 
+# live event stream of one match (Server-Sent Events)
+@router.get("/{match_id}/live", response_description="Stream live score/penalty/status deltas")
+async def stream_match_live(
+    match_id: str,
+    request: Request,
+    last_event_id: str | None = Query(
+        None, description="Resume after this event id (alternative to the Last-Event-ID header)"
+    ),
+) -> StreamingResponse:
+    """
+    Push channel for live tickers, replacing polling of GET /matches/{match_id}.
+
+    Sends a `snapshot` event on connect, then `score`, `penalty` and `match`
+    deltas as they are committed. Reconnecting clients resume via Last-Event-ID.
+    """
+    mongodb = request.app.state.mongodb
+    if await mongodb["matches"].find_one({"_id": match_id}, {"_id": 1}) is None:
+        raise ResourceNotFoundException(resource_type="Match", resource_id=match_id)
+
+    return StreamingResponse(
+        stream_match_events(
+            mongodb,
+            match_id,
+            last_event_id=request.headers.get("last-event-id") or last_event_id,
+            is_disconnected=request.is_disconnected,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # create new match
 @router.post("", response_description="Add new match", response_model=StandardResponse[MatchDB])
+@invalidates_cache("matches", "tournaments")
 async def create_match(
     request: Request,
     match: MatchBase = Body(...),
@@ -874,6 +835,7 @@ async def create_match(
         stats_service = StatsService(mongodb)
         await stats_service.calculate_roster_stats(result.inserted_id, "home")
         await stats_service.calculate_roster_stats(result.inserted_id, "away")
+        await MatchListingService(mongodb).refresh(result.inserted_id)
 
         # PHASE 1 OPTIMIZATION: Skip player card stats calculation during match creation
         # Player stats will be calculated when match status changes to FINISHED
@@ -941,6 +903,7 @@ async def get_allowed_transitions_for_match(
 @router.patch(
     "/{match_id}", response_description="Update match", response_model=StandardResponse[MatchDB]
 )
+@invalidates_cache("matches", "tournaments")
 async def update_match(
     request: Request,
     match_id: str,
@@ -1330,6 +1293,26 @@ async def update_match(
         raise HTTPException(status_code=500, detail=str(e)) from e
 
     updated_match = await get_match_object(mongodb, match_id)
+    await MatchListingService(mongodb).refresh(match_id)
+
+    live_state = updated_match.model_dump(
+        include={"matchStatus", "finishType", "startDate", "home", "away"}
+    )
+    live_match_hub.publish(
+        match_id,
+        "match",
+        {
+            "matchStatus": live_state.get("matchStatus"),
+            "finishType": live_state.get("finishType"),
+            "startDate": live_state.get("startDate"),
+            "goals": goal_totals(live_state),
+        },
+    )
+    # Scores/penalties replaced wholesale: resync viewers instead of diffing
+    if stats_recalc_needed and live_match_hub.viewer_count(match_id):
+        snapshot = await build_snapshot(mongodb, match_id)
+        if snapshot:
+            live_match_hub.publish(match_id, "snapshot", snapshot)
 
     # Recalculate standings and player card stats whenever a terminal status
     # (FINISHED or FORFEITED) is involved — either as the old or new status —
@@ -1393,6 +1376,7 @@ async def update_match(
         403: {"description": "Not authorized"},
     },
 )
+@invalidates_cache("matches", "tournaments")
 async def delete_match(
     request: Request,
     match_id: str,
@@ -1441,6 +1425,7 @@ async def delete_match(
         result = await mongodb["matches"].delete_one({"_id": match_id})
         if result.deleted_count == 0:
             raise ResourceNotFoundException(resource_type="Match", resource_id=match_id)
+        await MatchListingService(mongodb).remove(match_id)
 
         logger.info(
             "Match deleted",
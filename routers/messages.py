@@ -8,6 +8,7 @@ from fastapi.responses import JSONResponse, Response
 
 from authentication import AuthHandler, TokenPayload
 from models.messages import MessageBase, MessageDB
+from services.message_service import MessageService
 
 router = APIRouter()
 auth = AuthHandler()
@@ -138,31 +139,6 @@ async def get_chatted_users(
     request: Request,
     token_payload: TokenPayload = Depends(auth.auth_wrapper),
 ):
-    mongodb = request.app.state.mongodb
-    user_id = token_payload.sub
-    sent_message_user_ids = await mongodb["messages"].distinct(
-        "receiver.userId", {"sender.userId": user_id}
-    )
-    received_message_user_ids = await mongodb["messages"].distinct(
-        "sender.userId", {"receiver.userId": user_id}
-    )
-    chatted_user_ids = list(set(sent_message_user_ids + received_message_user_ids))
-    chatted_users = []
-    for chat_user_id in chatted_user_ids:
-        chat_user = await mongodb["users"].find_one(
-            {"_id": chat_user_id}, {"firstName": 1, "lastName": 1}
-        )
-        if chat_user:
-            unread_count = 0
-            unread_count = await mongodb["messages"].count_documents(
-                {"sender.userId": chat_user_id, "receiver.userId": user_id, "read": False}
-            )
-            chatted_users.append(
-                {
-                    "userId": chat_user_id,
-                    "firstName": chat_user["firstName"],
-                    "lastName": chat_user["lastName"],
-                    "unreadCount": unread_count,
-                }
-            )
-    return JSONResponse(status_code=status.HTTP_200_OK, content=chatted_users)
+    message_service = MessageService(request.app.state.mongodb)
+    chatted_users = await message_service.get_chat_partners(token_payload.sub)
+    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(chatted_users))
@@ -0,0 +1,109 @@
+"""
+Metrics Router - Prometheus scrape endpoint
+
+Exposes request latency, per-request database cost, per-collection MongoDB
+command counters, password hashing latency and response cache counters of
+this worker.
+
+The endpoint needs the METRICS_TOKEN bearer token or an admin's access
+token, unless METRICS_PUBLIC opens it.
+"""
+
+import hmac
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from authentication import AuthHandler
+from config import settings
+from exceptions import (
+    AuthenticationException,
+    AuthorizationException,
+    ResourceNotFoundException,
+)
+from services.request_metrics import format_metric, metrics
+from services.response_cache import response_cache
+
+router = APIRouter()
+auth = AuthHandler()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _authorize(request: Request) -> None:
+    """Accept the metrics token or an admin's access token"""
+    if settings.METRICS_PUBLIC:
+        return
+    header = request.headers.get("authorization", "")
+    # Compared as bytes: compare_digest rejects non-ASCII str
+    if settings.METRICS_TOKEN and hmac.compare_digest(
+        header.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+    ):
+        return
+    scheme, _, credentials = header.partition(" ")
+    if scheme.lower() != "bearer" or not credentials:
+        raise AuthenticationException(message="Metrics token or admin login required")
+    token_payload = auth.decode_token(credentials)
+    if not token_payload.has_role("ADMIN"):
+        raise AuthorizationException(
+            message="Admin role required", details={"user_roles": token_payload.roles}
+        )
+
+
+def _auth_metrics() -> list[str]:
+    snapshot = AuthHandler.metrics.snapshot()
+    lines = format_metric(
+        "bishl_auth_operations_total",
+        "counter",
+        "Password hash and verify operations",
+        [({"operation": op}, s["count"]) for op, s in snapshot.items()],
+    )
+    lines += format_metric(
+        "bishl_auth_operation_seconds_total",
+        "counter",
+        "Time spent hashing and verifying passwords",
+        [
+            ({"operation": op}, round(s["avg_ms"] * s["count"] / 1000, 6))
+            for op, s in snapshot.items()
+        ],
+    )
+    lines += format_metric(
+        "bishl_auth_operation_wait_seconds_total",
+        "counter",
+        "Time password operations waited for a hashing worker",
+        [
+            ({"operation": op}, round(s["avg_wait_ms"] * s["count"] / 1000, 6))
+            for op, s in snapshot.items()
+        ],
+    )
+    return lines
+
+
+def _response_cache_metrics() -> list[str]:
+    stats = response_cache.stats()
+    lines = format_metric(
+        "bishl_response_cache_entries", "gauge", "Cached responses", [({}, stats["entries"])]
+    )
+    lines += format_metric(
+        "bishl_response_cache_lookups_total",
+        "counter",
+        "Response cache lookups",
+        [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])],
+    )
+    lines += format_metric(
+        "bishl_response_cache_invalidations_total",
+        "counter",
+        "Response cache invalidations",
+        [({}, stats["invalidations"])],
+    )
+    return lines
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request) -> PlainTextResponse:
+    if not settings.METRICS_ENABLED:
+        raise ResourceNotFoundException(resource_type="Endpoint", resource_id="metrics")
+    _authorize(request)
+
+    body = metrics.render() + "\n".join(_auth_metrics() + _response_cache_metrics()) + "\n"
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
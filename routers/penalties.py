@@ -8,6 +8,7 @@ from models.matches import PenaltiesBase, PenaltiesDB, PenaltiesUpdate
 from models.responses import StandardResponse
 from services.match_permission_service import MatchPermissionService
 from services.penalty_service import PenaltyService
+from services.response_cache import invalidates_cache
 
 router = APIRouter()
 auth = AuthHandler()
@@ -38,6 +39,7 @@ async def get_penalty_sheet(
     response_model=StandardResponse[PenaltiesDB],
     status_code=status.HTTP_201_CREATED,
 )
+@invalidates_cache("matches")
 async def create_penalty(
     request: Request,
     match_id: str = Path(..., description="The id of the match"),
@@ -86,6 +88,7 @@ async def get_one_penalty(
     response_description="Patch one penalty",
     response_model=StandardResponse[PenaltiesDB],
 )
+@invalidates_cache("matches")
 async def patch_one_penalty(
     request: Request,
     match_id: str = Path(..., description="The id of the match"),
@@ -116,6 +119,7 @@ async def patch_one_penalty(
 
 # delete one penalty
 @router.delete("/{penalty_id}", response_description="Delete one penalty")
+@invalidates_cache("matches")
 async def delete_one_penalty(
     request: Request,
     match_id: str = Path(..., description="The id of the match"),
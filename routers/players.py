@@ -6,15 +6,13 @@ from datetime import datetime
 from typing import Any
 
 import aiohttp
-import cloudinary
-import cloudinary.uploader
 from bson.objectid import ObjectId
 from fastapi import APIRouter, Depends, File, Form, Query, Request, UploadFile, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, EmailStr, HttpUrl
 
-from authentication import AuthHandler, TokenPayload
+from authentication import AuthHandler, TokenPayload, role_mask
 from config import settings
 from exceptions import (
     AuthorizationException,
@@ -37,14 +35,17 @@ from models.players import (
     Source,
 )
 from models.responses import LicenceStats, PaginatedResponse, StandardResponse
+from services.json_response import FastJSONResponse
+from services.media_cleanup import MediaCleanupService
+from services.media_service import media_service
+from services.media_urls import add_image_variants
 from services.pagination import PaginationHelper
 from services.performance_monitor import monitor_query
 from services.player_assignment_service import PlayerAssignmentService
-from utils import DEBUG_LEVEL, configure_cloudinary, my_jsonable_encoder
+from utils import DEBUG_LEVEL, my_jsonable_encoder
 
 router = APIRouter()
 auth = AuthHandler()
-configure_cloudinary()
 
 
 class PassCheckRequest(BaseModel):
@@ -67,7 +68,7 @@ async def pass_check_request(
     mongodb = request.app.state.mongodb
 
     # check for correct user roles (ADMIN, CLUB_ADMIN)
-    if not any(role in token_payload.roles for role in ["ADMIN", "CLUB_ADMIN"]):
+    if not token_payload.has_any_role("ADMIN", "CLUB_ADMIN"):
         raise AuthorizationException(
             message="Admin or Club Admin role required",
             details={"user_roles": token_payload.roles},
@@ -135,8 +136,10 @@ async def pass_check_request(
 
 # Helper function to get current user with roles, assumes AuthHandler is set up
 def get_current_user_with_roles(required_roles: list[str]):
+    required_mask = role_mask(required_roles)
+
     async def role_checker(token_payload: TokenPayload = Depends(auth.auth_wrapper)):
-        if not any(role in token_payload.roles for role in required_roles):
+        if not token_payload.role_mask & required_mask:
             raise AuthorizationException(
                 message=f"Required role(s) not met. Need one of: {', '.join(required_roles)}",
                 details={"user_roles": token_payload.roles},
@@ -218,8 +221,8 @@ async def get_wko_rules(request: Request):
 # upload file
 async def handle_image_upload(image: UploadFile, playerId) -> str:
     if image:
-        result = cloudinary.uploader.upload(
-            image.file,
+        result = await media_service.upload(
+            image,
             folder="players",
             public_id=playerId,
             overwrite=True,
@@ -232,26 +235,6 @@ async def handle_image_upload(image: UploadFile, playerId) -> str:
     raise ValidationException(field="image", message="No image file provided for upload")
 
 
-async def delete_from_cloudinary(image_url: str):
-    if image_url:
-        public_id = None
-        try:
-            public_id = image_url.rsplit("/", 1)[-1].split(".")[0]
-            result = cloudinary.uploader.destroy(f"players/{public_id}")
-            logger.info(f"Document deleted from Cloudinary: players/{public_id}")
-            logger.debug(f"Cloudinary deletion result: {result}")
-            return result
-        except Exception as e:
-            raise ExternalServiceException(
-                service_name="Cloudinary",
-                message="Failed to delete image",
-                details={
-                    "public_id": f"players/{public_id}" if public_id else "unknown",
-                    "error": str(e),
-                },
-            ) from e
-
-
 # BOOTSTRAP PLAYER LICENCE CLASSIFICATION (heuristic classification)
 # ----------------------
 @router.post(
@@ -279,7 +262,7 @@ async def bootstrap_classification(
     Only accessible by admins.
     """
     mongodb = request.app.state.mongodb
-    if "ADMIN" not in token_payload.roles:
+    if not token_payload.has_role("ADMIN"):
         raise AuthorizationException(
             message="Admin role required for license assignment bootstrap",
             details={"user_roles": token_payload.roles},
@@ -335,7 +318,7 @@ async def bootstrap_validation(
     Only accessible by admins.
     """
     mongodb = request.app.state.mongodb
-    if "ADMIN" not in token_payload.roles:
+    if not token_payload.has_role("ADMIN"):
         raise AuthorizationException(
             message="Admin role required for license validation bootstrap",
             details={"user_roles": token_payload.roles},
@@ -395,7 +378,7 @@ async def bootstrap_all(
     Only accessible by admins.
     """
     mongodb = request.app.state.mongodb
-    if "ADMIN" not in token_payload.roles:
+    if not token_payload.has_role("ADMIN"):
         raise AuthorizationException(
             message="Admin role required for full license bootstrap",
             details={"user_roles": token_payload.roles},
@@ -779,12 +762,12 @@ async def get_possible_teams(
 
     # Auth check
 
-    if "PLAYER_ADMIN" in token_payload.roles or "ADMIN" in token_payload.roles:
+    if token_payload.has_any_role("PLAYER_ADMIN", "ADMIN"):
         if not club_id:
             raise AuthorizationException("Club ID required for PLAYER_ADMIN or ADMIN")
         else:
             target_club_id = club_id
-    elif "CLUB_ADMIN" in token_payload.roles:
+    elif token_payload.has_role("CLUB_ADMIN"):
         target_club_id = token_payload.clubId
         if not target_club_id:
             raise AuthorizationException("Club ID required for CLUB_ADMIN")
@@ -1205,11 +1188,11 @@ async def auto_optimize_player(
     mongodb = request.app.state.mongodb
     user_club_id = token_payload.clubId
     user_role = "ADMIN"
-    if "CLUB_ADMIN" in token_payload.roles:
+    if token_payload.has_role("CLUB_ADMIN"):
         user_role = "CLUB_ADMIN"
-    elif "PLAYER_ADMIN" in token_payload.roles:
+    elif token_payload.has_role("PLAYER_ADMIN"):
         user_role = "PLAYER_ADMIN"
-    elif "ADMIN" not in token_payload.roles:
+    elif not token_payload.has_role("ADMIN"):
         raise AuthorizationException(
             message="Admin, Club Admin, or Player Admin role required",
             details={"user_roles": token_payload.roles},
@@ -1552,7 +1535,7 @@ async def get_players_for_club(
     token_payload: TokenPayload = Depends(auth.auth_wrapper),
 ) -> JSONResponse:
     mongodb = request.app.state.mongodb
-    if not any(role in token_payload.roles for role in ["ADMIN", "CLUB_ADMIN", "LEAGUE_ADMIN"]):
+    if not token_payload.has_any_role("ADMIN", "CLUB_ADMIN", "LEAGUE_ADMIN"):
         raise AuthorizationException(
             message="Admin, Club Admin, or League Admin role required",
             details={"user_roles": token_payload.roles},
@@ -1587,7 +1570,9 @@ async def get_players_for_club(
         total_count=result["total"],
         message=f"Retrieved {len(validated_items)} players for club {club_alias}",
     )
-    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(paginated_result))
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK, content=add_image_variants(paginated_result)
+    )
 
 
 # GET ALL PLAYERS FOR ONE CLUB/TEAM
@@ -1611,7 +1596,7 @@ async def get_players_for_team(
 ) -> JSONResponse:
     mongodb = request.app.state.mongodb
     logger.debug(f"User roles: {token_payload.roles}")
-    if not any(role in token_payload.roles for role in ["ADMIN", "CLUB_ADMIN", "LEAGUE_ADMIN"]):
+    if not token_payload.has_any_role("ADMIN", "CLUB_ADMIN", "LEAGUE_ADMIN"):
         raise AuthorizationException(
             message="Admin, Club Admin, or League Admin role required",
             details={"user_roles": token_payload.roles},
@@ -1658,7 +1643,9 @@ async def get_players_for_team(
         total_count=result["total"],
         message=f"Retrieved {len(validated_items)} players for team {team_alias} in club {club_alias}",
     )
-    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(paginated_result))
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK, content=add_image_variants(paginated_result)
+    )
 
 
 # GET MERGED PLAYER POOL FOR TEAM (including partnership teams)
@@ -1683,7 +1670,7 @@ async def get_player_pool_for_team(
     """
     mongodb = request.app.state.mongodb
 
-    if not any(role in token_payload.roles for role in ["ADMIN", "CLUB_ADMIN", "LEAGUE_ADMIN"]):
+    if not token_payload.has_any_role("ADMIN", "CLUB_ADMIN", "LEAGUE_ADMIN"):
         raise AuthorizationException(
             message="Admin, Club Admin, or League Admin role required",
             details={"user_roles": token_payload.roles},
@@ -1747,17 +1734,16 @@ async def get_player_pool_for_team(
             player_dict["sourceTeamAlias"] = src_team_alias
             pool.append(player_dict)
 
-    return JSONResponse(
+    add_image_variants(pool)
+    return FastJSONResponse(
         status_code=status.HTTP_200_OK,
-        content=jsonable_encoder(
-            StandardResponse[list[Any]](
-                success=True,
-                message=(
-                    f"Retrieved {len(pool)} players in pool for team {team_alias} "
-                    f"in club {club_alias} ({len(team_sources)} source team(s))"
-                ),
-                data=pool,
-            )
+        content=StandardResponse[list[Any]](
+            success=True,
+            message=(
+                f"Retrieved {len(pool)} players in pool for team {team_alias} "
+                f"in club {club_alias} ({len(team_sources)} source team(s))"
+            ),
+            data=pool,
         ),
     )
 
@@ -1780,7 +1766,7 @@ async def get_players(
     token_payload: TokenPayload = Depends(auth.auth_wrapper),
 ) -> JSONResponse:
     mongodb = request.app.state.mongodb
-    if not any(role in token_payload.roles for role in ["ADMIN", "LEAGUE_ADMIN"]):
+    if not token_payload.has_any_role("ADMIN", "LEAGUE_ADMIN"):
         raise AuthorizationException(
             message="Admin or League Admin role required",
             details={"user_roles": token_payload.roles},
@@ -1848,7 +1834,9 @@ async def get_players(
         total_count=total_count,
         message=f"Retrieved {len(validated_items)} players",
     )
-    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(paginated_result))
+    return FastJSONResponse(
+        status_code=status.HTTP_200_OK, content=add_image_variants(paginated_result)
+    )
 
 
 # GET ONE PLAYER
@@ -1912,7 +1900,7 @@ async def create_player(
     token_payload: TokenPayload = Depends(auth.auth_wrapper),
 ) -> JSONResponse:
     mongodb = request.app.state.mongodb
-    if not any(role in token_payload.roles for role in ["ADMIN", "PLAYER_ADMIN"]):
+    if not token_payload.has_any_role("ADMIN", "PLAYER_ADMIN"):
         raise AuthorizationException(
             message="Admin or Player Admin role required",
             details={"user_roles": token_payload.roles},
@@ -2061,7 +2049,7 @@ async def update_player(
     token_payload: TokenPayload = Depends(auth.auth_wrapper),
 ):
     mongodb = request.app.state.mongodb
-    if not any(role in token_payload.roles for role in ["ADMIN", "CLUB_ADMIN", "PLAYER_ADMIN"]):
+    if not token_payload.has_any_role("ADMIN", "CLUB_ADMIN", "PLAYER_ADMIN"):
         raise AuthorizationException(
             message="Admin, Club Admin, or Player Admin role required",
             details={"user_roles": token_payload.roles},
@@ -2167,17 +2155,17 @@ async def update_player(
     if image:
         # Case 1: New file uploaded - always replace/set image
         logger.debug("Image handling: Uploading new image file")
-        if existing_player.get("imageUrl"):
-            logger.debug(f"Image handling: Deleting existing image: {existing_player['imageUrl']}")
-            await delete_from_cloudinary(existing_player["imageUrl"])
         player_data["imageUrl"] = await handle_image_upload(image, id)
         logger.debug(f"Image handling: New image uploaded: {player_data['imageUrl']}")
+        await MediaCleanupService(mongodb).discard_url(
+            existing_player.get("imageUrl"), replaced_by=player_data["imageUrl"]
+        )
     elif imageUrl == "":
         # Case 2: Empty string means delete the image
         logger.debug("Image handling: Deleting image (empty string received)")
         if existing_player.get("imageUrl"):
-            await delete_from_cloudinary(existing_player["imageUrl"])
-            logger.debug(f"Image handling: Deleted existing image: {existing_player['imageUrl']}")
+            await MediaCleanupService(mongodb).discard_url(existing_player["imageUrl"])
+            logger.debug(f"Image handling: Discarded existing image: {existing_player['imageUrl']}")
         player_data["imageUrl"] = None
     elif imageUrl is not None:
         # Case 3: imageUrl has a value (URL string) - keep/update URL
@@ -2301,7 +2289,7 @@ async def delete_player(
     request: Request, id: str, token_payload: TokenPayload = Depends(auth.auth_wrapper)
 ) -> Response:
     mongodb = request.app.state.mongodb
-    if "ADMIN" not in token_payload.roles:
+    if not token_payload.has_role("ADMIN"):
         raise AuthorizationException(
             message="Admin role required", details={"user_roles": token_payload.roles}
         )
@@ -2310,7 +2298,7 @@ async def delete_player(
         raise ResourceNotFoundException(resource_type="Player", resource_id=id)
     delete_result = await mongodb["players"].delete_one({"_id": id})
     if delete_result.deleted_count == 1:
-        await delete_from_cloudinary(existing_player["imageUrl"])
+        await MediaCleanupService(mongodb).discard_url(existing_player.get("imageUrl"))
         logger.info(f"Player deleted successfully: {id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     raise ResourceNotFoundException(resource_type="Player", resource_id=id)
@@ -1,8 +1,6 @@
 import json
 from datetime import datetime
 
-import cloudinary
-import cloudinary.uploader
 from fastapi import (
     APIRouter,
     Depends,
@@ -27,20 +25,22 @@ from exceptions import (
 from logging_config import logger
 from models.posts import PostBase, PostDB, PostUpdate, Revision, User
 from models.responses import PaginatedResponse, StandardResponse
+from services.media_cleanup import MediaCleanupService
+from services.media_service import media_service
 from services.pagination import PaginationHelper
-from utils import configure_cloudinary, my_jsonable_encoder
+from services.response_cache import cache_response, invalidates_cache
+from utils import my_jsonable_encoder
 
 router = APIRouter()
 auth = AuthHandler()
-configure_cloudinary()
 
 DEBUG_LEVEL = settings.DEBUG_LEVEL
 
 
 async def handle_image_upload(image: UploadFile, public_id: str):
     if image:
-        result = cloudinary.uploader.upload(
-            image.file,
+        result = await media_service.upload(
+            image,
             folder="posts",
             public_id=public_id,
             overwrite=True,
@@ -60,21 +60,9 @@ async def handle_image_upload(image: UploadFile, public_id: str):
         return result["url"]
 
 
-# Helper function to delete file from Cloudinary
-async def delete_from_cloudinary(image_url: str):
-    if image_url:
-        try:
-            public_id = image_url.rsplit("/", 1)[-1].split(".")[0]
-            result = cloudinary.uploader.destroy(f"posts/{public_id}")
-            logger.debug(f"Post Image deleted from Cloudinary: posts/{public_id}")
-            logger.debug(f"Result: {result}")
-            return result
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e)) from e
-
-
 # list all posts
 @router.get("", response_description="List all posts", response_model=PaginatedResponse[PostDB])
+@cache_response("posts")
 async def get_posts(
     request: Request,
     featured: bool | None = None,
@@ -112,6 +100,7 @@ async def get_posts(
 @router.get(
     "/{alias}", response_description="Get post by alias", response_model=StandardResponse[PostDB]
 )
+@cache_response("posts")
 async def get_post(request: Request, alias: str) -> JSONResponse:
     mongodb = request.app.state.mongodb
     query = {"alias": alias}
@@ -132,6 +121,7 @@ async def get_post(request: Request, alias: str) -> JSONResponse:
 
 # create post
 @router.post("", response_model=StandardResponse[PostDB], response_description="Create post")
+@invalidates_cache("posts")
 async def create_post(
     request: Request,
     title: str = Form(...),
@@ -228,6 +218,7 @@ async def create_post(
 
 # update Post
 @router.patch("/{id}", response_model=StandardResponse[PostDB], response_model_by_alias=True)
+@invalidates_cache("posts")
 async def update_post(
     request: Request,
     id: str,
@@ -315,19 +306,19 @@ async def update_post(
     if image:
         # Case 1: New file uploaded - always replace/set image
         logger.debug("Image handling: Uploading new image file")
-        if existing_post.get("imageUrl"):
-            logger.debug(f"Image handling: Deleting existing image: {existing_post['imageUrl']}")
-            await delete_from_cloudinary(existing_post["imageUrl"])
         # Use the provided alias or fall back to existing post's alias
         image_alias = post_data.get("alias", existing_post.get("alias", id))
         post_data["imageUrl"] = await handle_image_upload(image, image_alias)
         logger.debug(f"Image handling: New image uploaded: {post_data['imageUrl']}")
+        await MediaCleanupService(mongodb).discard_url(
+            existing_post.get("imageUrl"), replaced_by=post_data["imageUrl"]
+        )
     elif imageUrl == "":
         # Case 2: Empty string means delete the image
         logger.debug("Image handling: Deleting image (empty string received)")
         if existing_post.get("imageUrl"):
-            await delete_from_cloudinary(existing_post["imageUrl"])
-            logger.debug(f"Image handling: Deleted existing image: {existing_post['imageUrl']}")
+            await MediaCleanupService(mongodb).discard_url(existing_post["imageUrl"])
+            logger.debug(f"Image handling: Discarded existing image: {existing_post['imageUrl']}")
         post_data["imageUrl"] = None
     elif imageUrl is not None:
         # Case 3: imageUrl has a value (URL string) - keep/update URL
@@ -409,6 +400,7 @@ async def update_post(
 
 # delete post
 @router.delete("/{id}", response_description="Delete post")
+@invalidates_cache("posts")
 async def delete_post(
     request: Request, id: str, token_payload: TokenPayload = Depends(auth.auth_wrapper)
 ) -> Response:
@@ -420,7 +412,7 @@ async def delete_post(
         raise HTTPException(status_code=404, detail=f"Post with id {id} not found")
     result = await mongodb["posts"].delete_one({"_id": id})
     if result.deleted_count == 1:
-        await delete_from_cloudinary(existing_post["imageUrl"])
+        await MediaCleanupService(mongodb).discard_url(existing_post.get("imageUrl"))
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND, detail=f"Post with id {id} not found"
@@ -0,0 +1,48 @@
+"""
+Profiles Router - Admin access to slow-request profiles
+
+Lists and serves the reports written by RequestProfilerMiddleware to
+logs/profiles/, named by the request's correlation id.
+"""
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
+
+from authentication import AuthHandler, TokenPayload
+from exceptions import AuthorizationException, ResourceNotFoundException
+from models.responses import StandardResponse
+from services.request_profiler import list_profiles, profile_path
+
+router = APIRouter()
+auth = AuthHandler()
+
+
+def _require_admin(token_payload: TokenPayload) -> None:
+    if not token_payload.has_role("ADMIN"):
+        raise AuthorizationException(
+            message="Admin role required", details={"user_roles": token_payload.roles}
+        )
+
+
+@router.get("", response_description="List recent slow-request profiles")
+async def get_profiles(
+    limit: int = 50,
+    token_payload: TokenPayload = Depends(auth.auth_wrapper),
+) -> StandardResponse[list[dict]]:
+    _require_admin(token_payload)
+    profiles = list_profiles()[: max(limit, 0)]
+    return StandardResponse(
+        success=True, data=profiles, message=f"Retrieved {len(profiles)} profiles"
+    )
+
+
+@router.get("/{profile_id}", response_description="Download one profile")
+async def get_profile(
+    profile_id: str,
+    token_payload: TokenPayload = Depends(auth.auth_wrapper),
+) -> FileResponse:
+    _require_admin(token_payload)
+    path = profile_path(profile_id)
+    if path is None:
+        raise ResourceNotFoundException(resource_type="Profile", resource_id=profile_id)
+    return FileResponse(path, media_type="text/plain", filename=path.name)
@@ -14,6 +14,7 @@ from exceptions import AuthorizationException, ValidationException
 from models.reftool import DayGroupResponse, DayStripResponse, RefereeOptions, SummaryCounts
 from models.responses import StandardResponse
 from services.assignment_service import AssignmentService
+from services.json_response import FastJSONResponse
 
 router = APIRouter()
 auth = AuthHandler()
@@ -26,8 +27,7 @@ def get_assignment_service(request: Request) -> AssignmentService:
 
 
 def _require_reftool_role(token_payload: TokenPayload) -> None:
-    allowed = {"ADMIN", "REF_ADMIN", "REFEREE"}
-    if not any(role in allowed for role in token_payload.roles):
+    if not token_payload.has_any_role("ADMIN", "REF_ADMIN", "REFEREE"):
         raise AuthorizationException(
             message="ADMIN, REF_ADMIN, or REFEREE role required",
             details={"user_roles": token_payload.roles},
@@ -139,8 +139,10 @@ async def get_day_strip(
         for s in summaries
     ]
 
-    return StandardResponse(
-        success=True,
-        data=day_strips,
-        message="Day summaries retrieved successfully",
+    return FastJSONResponse(
+        content=StandardResponse(
+            success=True,
+            data=day_strips,
+            message="Day summaries retrieved successfully",
+        )
     )
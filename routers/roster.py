@@ -1,7 +1,9 @@
 # filename: routers/roster.py
 from datetime import datetime
 
-from fastapi import APIRouter, Body, Depends, Path, Request
+from fastapi import APIRouter, Body, Depends, Path, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from authentication import AuthHandler, TokenPayload
@@ -13,7 +15,9 @@ from models.responses import StandardResponse
 from models.tournaments import CallUpMode, CallUpType
 from services.match_permission_service import MatchPermissionService
 from services.match_settings_service import resolve_match_settings
+from services.media_urls import add_image_variants
 from services.player_assignment_service import PlayerAssignmentService
+from services.response_cache import invalidates_cache
 from services.roster_service import RosterService
 
 
@@ -39,7 +43,7 @@ async def get_roster(
     request: Request,
     match_id: str = Path(..., description="The match id of the roster"),
     team_flag: str = Path(..., description="The team flag (home/away) of the roster"),
-) -> StandardResponse[Roster]:
+) -> JSONResponse:
     """
     Get the complete roster object for a team.
 
@@ -53,11 +57,14 @@ async def get_roster(
 
     player_count = len(roster.players)
 
-    return StandardResponse(
+    response = StandardResponse(
         success=True,
         data=roster,
         message=f"Retrieved roster with {player_count} players for {team_flag} team",
     )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK, content=add_image_variants(jsonable_encoder(response))
+    )
 
 
 @router.get(
@@ -69,7 +76,7 @@ async def get_roster_players(
     request: Request,
     match_id: str = Path(..., description="The match id of the roster"),
     team_flag: str = Path(..., description="The team flag (home/away) of the roster"),
-) -> StandardResponse[list[RosterPlayer]]:
+) -> JSONResponse:
     """
     Get only the player list from a roster.
 
@@ -80,11 +87,14 @@ async def get_roster_players(
 
     players = await service.get_roster_players(match_id, team_flag)
 
-    return StandardResponse(
+    response = StandardResponse(
         success=True,
         data=players,
         message=f"Retrieved {len(players)} roster players for {team_flag} team",
     )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK, content=add_image_variants(jsonable_encoder(response))
+    )
 
 
 @router.put(
@@ -92,6 +102,7 @@ async def get_roster_players(
     response_description="Update roster of a team",
     response_model=StandardResponse[Roster],
 )
+@invalidates_cache("matches")
 async def update_roster(
     request: Request,
     match_id: str = Path(..., description="The match id of the roster"),
@@ -313,6 +324,7 @@ def _validate_regular_player(
     response_description="Validate roster player eligibility",
     response_model=StandardResponse[Roster],
 )
+@invalidates_cache("matches")
 async def validate_roster(
     request: Request,
     match_id: str = Path(..., description="The match id of the roster"),
@@ -479,6 +491,7 @@ async def validate_roster(
     response_description="Update goalie period appearance for a roster player",
     response_model=StandardResponse[RosterPlayer],
 )
+@invalidates_cache("matches")
 async def update_goalie_appearance(
     request: Request,
     match_id: str = Path(..., description="The match id"),
@@ -16,6 +16,9 @@ from logging_config import logger
 from models.responses import StandardResponse
 from models.round_responses import RoundLinks, RoundResponse
 from models.tournaments import RoundBase, RoundDB, RoundUpdate
+from services.match_listing_service import MatchListingService
+from services.media_urls import add_image_variants
+from services.response_cache import cache_response, invalidates_cache
 from utils import DEBUG_LEVEL, my_jsonable_encoder
 
 router = APIRouter()
@@ -28,6 +31,7 @@ auth = AuthHandler()
     response_description="List all rounds for a season",
     response_model=StandardResponse[list[RoundResponse]],
 )
+@cache_response("tournaments", keys={"tournaments": "tournament:{tournament_alias}"})
 async def get_rounds_for_season(
     request: Request,
     tournament_alias: str = Path(
@@ -84,9 +88,11 @@ async def get_rounds_for_season(
                     rounds.append(round_response)
                 return JSONResponse(
                     status_code=status.HTTP_200_OK,
-                    content=jsonable_encoder(
-                        StandardResponse(
-                            success=True, data=rounds, message=f"Retrieved {len(rounds)} rounds"
+                    content=add_image_variants(
+                        jsonable_encoder(
+                            StandardResponse(
+                                success=True, data=rounds, message=f"Retrieved {len(rounds)} rounds"
+                            )
                         )
                     ),
                 )
@@ -104,6 +110,7 @@ async def get_rounds_for_season(
     response_description="Get one round of a season",
     response_model=StandardResponse[RoundResponse],
 )
+@cache_response("tournaments", keys={"tournaments": "tournament:{tournament_alias}"})
 async def get_round(
     request: Request,
     tournament_alias: str = Path(
@@ -158,11 +165,13 @@ async def get_round(
                         )
                         return JSONResponse(
                             status_code=status.HTTP_200_OK,
-                            content=jsonable_encoder(
-                                StandardResponse(
-                                    success=True,
-                                    data=round_response,
-                                    message="Round retrieved successfully",
+                            content=add_image_variants(
+                                jsonable_encoder(
+                                    StandardResponse(
+                                        success=True,
+                                        data=round_response,
+                                        message="Round retrieved successfully",
+                                    )
                                 )
                             ),
                         )
@@ -178,6 +187,7 @@ async def get_round(
 @router.post(
     "", response_description="Add a new round to a season", response_model=StandardResponse[RoundDB]
 )
+@invalidates_cache("tournaments")
 async def add_round(
     request: Request,
     tournament_alias: str = Path(
@@ -292,6 +302,7 @@ async def add_round(
     response_description="Update a round of a season",
     response_model=StandardResponse[RoundDB],
 )
+@invalidates_cache("tournaments", "matches")
 async def update_round(
     request: Request,
     round_id: str = Path(..., description="The id of the round to update"),
@@ -426,6 +437,13 @@ async def update_round(
             raise DatabaseOperationException(
                 operation="update_round", collection="tournaments", details={"error": str(e)}
             ) from e
+
+        if f"seasons.{season_index}.rounds.{round_index}.matchSettings" in update_data["$set"]:
+            await MatchListingService(mongodb).refresh_scope(
+                tournament_alias,
+                season_alias,
+                tournament["seasons"][season_index]["rounds"][round_index]["alias"],
+            )
     else:
         if DEBUG_LEVEL > 10:
             print("no update needed")
@@ -484,6 +502,7 @@ async def update_round(
 
 # delete round from a season
 @router.delete("/{round_id}", response_description="Delete a single round from a season")
+@invalidates_cache("tournaments")
 async def delete_round(
     request: Request,
     tournament_alias: str = Path(
@@ -7,6 +7,7 @@ from exceptions import ResourceNotFoundException
 from models.matches import ScoresBase, ScoresDB, ScoresUpdate
 from models.responses import StandardResponse
 from services.match_permission_service import MatchPermissionService
+from services.response_cache import invalidates_cache
 from services.score_service import ScoreService
 
 router = APIRouter()
@@ -40,6 +41,7 @@ async def get_score_sheet(
     response_model=StandardResponse[ScoresDB],
     status_code=status.HTTP_201_CREATED,
 )
+@invalidates_cache("matches", "tournaments")
 async def create_score(
     request: Request,
     match_id: str = Path(..., description="The id of the match"),
@@ -84,6 +86,7 @@ async def get_one_score(
 @router.patch(
     "/{score_id}", response_description="Patch one score", response_model=StandardResponse[ScoresDB]
 )
+@invalidates_cache("matches")
 async def patch_one_score(
     request: Request,
     match_id: str = Path(..., description="The id of the match"),
@@ -112,6 +115,7 @@ async def patch_one_score(
 @router.delete(
     "/{score_id}", response_description="Delete one score", status_code=status.HTTP_204_NO_CONTENT
 )
+@invalidates_cache("matches", "tournaments")
 async def delete_one_score(
     request: Request,
     match_id: str = Path(..., description="The id of the match"),
@@ -12,6 +12,8 @@ from logging_config import logger
 from models.responses import StandardResponse
 from models.season_responses import SeasonLinks, SeasonResponse
 from models.tournaments import SeasonBase, SeasonDB, SeasonUpdate
+from services.match_listing_service import MatchListingService
+from services.response_cache import cache_response, invalidates_cache
 from services.stats_service import StatsService
 
 router = APIRouter()
@@ -24,6 +26,7 @@ auth = AuthHandler()
     response_description="List all seasons for a tournament",
     response_model=StandardResponse[list[SeasonResponse]],
 )
+@cache_response("tournaments", keys={"tournaments": "tournament:{tournament_alias}"})
 async def get_seasons_for_tournament(
     request: Request,
     tournament_alias: str = Path(
@@ -72,6 +75,7 @@ async def get_seasons_for_tournament(
     response_description="Get a single season",
     response_model=StandardResponse[SeasonResponse],
 )
+@cache_response("tournaments", keys={"tournaments": "tournament:{tournament_alias}"})
 async def get_season(
     request: Request,
     tournament_alias: str = Path(
@@ -127,6 +131,7 @@ async def get_season(
     response_description="Add new season to tournament",
     response_model=StandardResponse[SeasonDB],
 )
+@invalidates_cache("tournaments")
 async def create_season(
     request: Request,
     tournament_alias: str = Path(..., description="The alias of the tournament to add a season to"),
@@ -195,6 +200,7 @@ async def create_season(
     response_description="Update a season in tournament",
     response_model=StandardResponse[SeasonDB],
 )
+@invalidates_cache("tournaments", "matches")
 async def update_season(
     request: Request,
     season_id: str,
@@ -274,6 +280,11 @@ async def update_season(
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e)) from e
 
+        if f"seasons.{season_index}.matchSettings" in update_data["$set"]:
+            await MatchListingService(mongodb).refresh_scope(
+                tournament_alias, tournament["seasons"][season_index]["alias"]
+            )
+
     else:
         # No changes detected in the payload compared to the existing season data
         # Fetch current season to return
@@ -324,6 +335,7 @@ async def update_season(
     response_description="Recalculate roster and player card stats for all FINISHED matches in a season",
     response_model=StandardResponse[dict],
 )
+@invalidates_cache("tournaments", "matches")
 async def recalc_season_stats(
     request: Request,
     tournament_alias: str = Path(..., description="The alias of the tournament"),
@@ -468,6 +480,7 @@ async def recalc_season_stats(
 
 # delete season from tournament
 @router.delete("/{season_id}", response_description="Delete a single season from a tournament")
+@invalidates_cache("tournaments")
 async def delete_season(
     request: Request,
     tournament_alias: str = Path(
@@ -2,8 +2,6 @@
 import json
 from typing import Any
 
-import cloudinary
-import cloudinary.uploader
 from fastapi import (
     APIRouter,
     Depends,
@@ -27,19 +25,21 @@ from exceptions import (
 )
 from models.clubs import TeamBase, TeamDB, TeamPartnerships, TeamUpdate
 from models.responses import PaginatedResponse, StandardResponse
+from services.media_cleanup import MediaCleanupService
+from services.media_service import media_service
+from services.media_urls import add_image_variants
 from services.pagination import PaginationHelper
-from utils import configure_cloudinary
+from services.response_cache import invalidates_cache
 
 router = APIRouter()
 auth = AuthHandler()
-configure_cloudinary()
 
 
 # upload file
 async def handle_logo_upload(logo: UploadFile, alias: str) -> str:
     if logo:
-        result = cloudinary.uploader.upload(
-            logo.file,
+        result = await media_service.upload(
+            logo,
             folder="logos/teams",
             public_id=alias,
             overwrite=True,
@@ -51,19 +51,6 @@ async def handle_logo_upload(logo: UploadFile, alias: str) -> str:
     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No logo uploaded.")
 
 
-# Helper function to delete file from Cloudinary
-async def delete_from_cloudinary(logo_url: str):
-    if logo_url:
-        try:
-            public_id = logo_url.rsplit("/", 1)[-1].split(".")[0]
-            result = cloudinary.uploader.destroy(f"logos/teams/{public_id}")
-            print("Logo deleted from Cloudinary:", f"logos/teams/{public_id}")
-            print("Result:", result)
-            return result
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e)) from e
-
-
 # list all teams of one club
 @router.get(
     "", response_description="List all teams of one club", response_model=PaginatedResponse[TeamDB]
@@ -98,7 +85,8 @@ async def list_teams_of_one_club(
         )
 
         return JSONResponse(
-            status_code=status.HTTP_200_OK, content=jsonable_encoder(paginated_result)
+            status_code=status.HTTP_200_OK,
+            content=add_image_variants(jsonable_encoder(paginated_result)),
         )
     raise ResourceNotFoundException(
         resource_type="Club", resource_id=club_alias, details={"query_field": "alias"}
@@ -145,6 +133,7 @@ async def get_team(
 @router.post(
     "", response_description="Add new team to a club", response_model=StandardResponse[TeamDB]
 )
+@invalidates_cache("clubs")
 async def create_team(
     request: Request,
     club_alias: str = Path(..., description="Club alias to create team for"),
@@ -268,6 +257,7 @@ async def create_team(
 @router.patch(
     "/{team_id}", response_description="Update team", response_model=StandardResponse[TeamDB]
 )
+@invalidates_cache("clubs")
 async def update_team(
     request: Request,
     team_id: str,
@@ -358,6 +348,9 @@ async def update_team(
         team_data["logoUrl"] = await handle_logo_upload(
             logo, f"{club['alias']}--{current_team_alias}"
         )
+        await MediaCleanupService(mongodb).discard_url(
+            club["teams"][team_index].get("logoUrl"), replaced_by=team_data["logoUrl"]
+        )
     elif logoUrl is not None:  # Explicitly check for None to allow empty string if needed
         team_data["logoUrl"] = str(logoUrl)
     # If logoUrl is provided and it's an empty string or None, we might want to clear the existing logo.
@@ -424,6 +417,7 @@ async def update_team(
 
 # Delete team
 @router.delete("/{team_id}", response_description="Delete team")
+@invalidates_cache("clubs")
 async def delete_team(
     request: Request,
     club_alias: str = Path(..., description="Club alias to delete team from"),
@@ -453,6 +447,8 @@ async def delete_team(
     )
 
     if delete_result.modified_count == 1:
+        team = next(team for team in club["teams"] if team["_id"] == team_id)
+        await MediaCleanupService(mongodb).discard_url(team.get("logoUrl"))
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     else:
         # This case should ideally be caught by the team_exists check above,
@@ -12,6 +12,7 @@ from models.responses import PaginatedResponse, StandardResponse
 from models.tournament_responses import TournamentLinks, TournamentResponse
 from models.tournaments import TournamentBase, TournamentUpdate
 from services.pagination import PaginationHelper
+from services.response_cache import cache_response, invalidates_cache
 
 router = APIRouter()
 auth = AuthHandler()
@@ -61,6 +62,7 @@ auth = AuthHandler()
         }
     },
 )
+@cache_response("tournaments")
 async def get_tournaments(
     request: Request,
     page: int = Query(1, ge=1, description="Page number"),
@@ -110,6 +112,7 @@ async def get_tournaments(
     response_description="Get a single tournament",
     response_model=StandardResponse[TournamentResponse],
 )
+@cache_response("tournaments", keys={"tournaments": "tournament:{tournament_alias}"})
 async def get_tournament(
     request: Request,
     tournament_alias: str,
@@ -145,6 +148,7 @@ async def get_tournament(
     response_description="Add new tournament",
     response_model=StandardResponse[TournamentResponse],
 )
+@invalidates_cache("tournaments")
 async def create_tournament(
     request: Request,
     tournament: TournamentBase = Body(...),
@@ -203,6 +207,7 @@ async def create_tournament(
     response_description="Update tournament",
     response_model=StandardResponse[TournamentResponse],
 )
+@invalidates_cache("tournaments")
 async def update_tournament(
     request: Request,
     tournament_id: str,
@@ -307,6 +312,7 @@ async def update_tournament(
 
 # delete tournament
 @router.delete("/{id}", response_description="Delete tournament")
+@invalidates_cache("tournaments")
 async def delete_tournament(
     request: Request,
     id: str,
@@ -1,5 +1,6 @@
 # filename routers/users.py
 import json
+import time
 from datetime import UTC, date, datetime
 from typing import Any
 
@@ -16,8 +17,10 @@ from models.assignments import AssignmentDB
 from models.matches import MatchDB
 from models.responses import PaginatedResponse, StandardResponse
 from models.users import Club, CurrentUser, LoginBase, Role, UserBase, UserUpdate
+from services.match_listing_service import MatchListingService
 from services.match_service import MatchService
 from services.pagination import PaginationHelper
+from services.response_cache import invalidates_cache
 
 router = APIRouter()
 auth = AuthHandler()
@@ -74,13 +77,13 @@ async def register(
     mongodb = request.app.state.mongodb
 
     # Check if logged-in user has ADMIN role
-    if "ADMIN" not in token_payload.roles:
+    if not token_payload.has_role("ADMIN"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to register a new user"
         )
 
     # Hash the password before inserting into the database
-    newUser.password = auth.get_password_hash(newUser.password)
+    newUser.password = await auth.get_password_hash_async(newUser.password)
 
     # Check for existing user or email
     existing_user = await mongodb["users"].find_one({"email": newUser.email})
@@ -111,12 +114,17 @@ async def register(
 )
 async def login(request: Request, loginUser: LoginBase = Body(...)) -> JSONResponse:
     mongodb = request.app.state.mongodb
+    login_start = time.perf_counter()
     existing_user = await mongodb["users"].find_one(
         {"email": {"$regex": f"^{loginUser.email}$", "$options": "i"}}
     )
-    if (existing_user is None) or (
-        not auth.verify_password(loginUser.password, existing_user["password"])
-    ):
+    is_valid, new_hash = (
+        await auth.verify_and_upgrade_password(loginUser.password, existing_user["password"])
+        if existing_user is not None
+        else (False, None)
+    )
+    if not is_valid:
+        auth.metrics.record("login_failed", (time.perf_counter() - login_start) * 1000)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email and/or password",
@@ -124,14 +132,11 @@ async def login(request: Request, loginUser: LoginBase = Body(...)) -> JSONRespo
         )
 
     # Auto-upgrade password from bcrypt to argon2 if needed
-    if auth.needs_rehash(existing_user["password"]):
-        new_hash = auth.get_password_hash(loginUser.password)
+    if new_hash:
         await mongodb["users"].update_one(
             {"_id": existing_user["_id"]}, {"$set": {"password": new_hash}}
         )
-        logger.info(
-            f"Upgraded password hash for user {existing_user['email']} from bcrypt to argon2"
-        )
+        logger.info(f"Upgraded password hash for user {existing_user['email']} to argon2")
 
     # Calculate referee points if user is a referee
     if "REFEREE" in existing_user.get("roles", []):
@@ -147,6 +152,10 @@ async def login(request: Request, loginUser: LoginBase = Body(...)) -> JSONRespo
     access_token = auth.encode_token(existing_user)
     refresh_token = auth.encode_refresh_token(existing_user)
 
+    login_ms = (time.perf_counter() - login_start) * 1000
+    auth.metrics.record("login", login_ms)
+    logger.debug(f"Login for user {existing_user['_id']} took {login_ms:.1f} ms")
+
     response = StandardResponse(
         success=True, data=CurrentUser(**existing_user), message="Login successful"
     )
@@ -197,6 +206,7 @@ async def me(
 @router.patch(
     "/{user_id}", response_description="Update a user", response_model=StandardResponse[CurrentUser]
 )
+@invalidates_cache("matches")
 async def update_user(
     request: Request,
     user_id: str,
@@ -212,7 +222,7 @@ async def update_user(
     mongodb = request.app.state.mongodb
 
     # Check if user is trying to update their own profile or is an admin
-    is_admin = any(role in ["ADMIN", "REF_ADMIN"] for role in token_payload.roles)
+    is_admin = token_payload.has_any_role("ADMIN", "REF_ADMIN")
     is_self_update = user_id == token_payload.sub
 
     if not (is_admin or is_self_update):
@@ -232,10 +242,11 @@ async def update_user(
             status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can update roles"
         )
 
+    hashed_password = await auth.get_password_hash_async(password) if password else None
     try:
         user_data = UserUpdate(
             email=email,
-            password=auth.get_password_hash(password) if password else None,
+            password=hashed_password,
             firstName=firstName,
             lastName=lastName,
             club=Club(**json.loads(club)) if club else None,
@@ -287,6 +298,15 @@ async def update_user(
                             {"startDate": {"$gte": now}, "referee2.userId": user_id},
                             {"$set": {"referee2.level": new_level_str}},
                         )
+                        await MatchListingService(mongodb).refresh_many(
+                            {
+                                "startDate": {"$gte": now},
+                                "$or": [
+                                    {"referee1.userId": user_id},
+                                    {"referee2.userId": user_id},
+                                ],
+                            }
+                        )
                         logger.info(
                             "Referee level propagated to assignments and matches",
                             extra={
@@ -406,9 +426,7 @@ async def get_all_referees(
     token_payload: TokenPayload = Depends(auth.auth_wrapper),
 ) -> JSONResponse:
     mongodb = request.app.state.mongodb
-    if not any(
-        role in ["ADMIN", "REFEREE", "REF_ADMIN", "CLUB_ADMIN"] for role in token_payload.roles
-    ):
+    if not token_payload.has_any_role("ADMIN", "REFEREE", "REF_ADMIN", "CLUB_ADMIN"):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
 
     # Build query with referee role and optional active filter
@@ -545,7 +563,7 @@ async def reset_password(request: Request, payload: dict = Body(...)) -> JSONRes
         user_id = token_data.sub
 
         # Hash new password
-        hashed_password = auth.get_password_hash(new_password)
+        hashed_password = await auth.get_password_hash_async(new_password)
 
         # Update password in database
         result = await mongodb["users"].update_one(
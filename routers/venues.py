@@ -1,7 +1,5 @@
 from datetime import datetime
 
-import cloudinary
-import cloudinary.uploader
 from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, UploadFile, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse, Response
@@ -13,6 +11,8 @@ from authentication import AuthHandler, TokenPayload
 from exceptions import AuthorizationException, ResourceNotFoundException
 from models.responses import PaginatedResponse, StandardResponse
 from models.venues import VenueBase, VenueDB, VenueUpdate
+from services.media_cleanup import MediaCleanupService
+from services.media_service import media_service
 from services.pagination import PaginationHelper
 
 router = APIRouter()
@@ -21,8 +21,8 @@ auth = AuthHandler()
 
 async def handle_image_upload(image: UploadFile, public_id: str):
     if image:
-        result = cloudinary.uploader.upload(
-            image.file,
+        result = await media_service.upload(
+            image,
             folder="venues",
             public_id=public_id,
             overwrite=True,
@@ -42,18 +42,6 @@ async def handle_image_upload(image: UploadFile, public_id: str):
         return result["url"]
 
 
-async def delete_from_cloudinary(image_url: str):
-    if image_url:
-        try:
-            public_id = image_url.rsplit("/", 1)[-1].split(".")[0]
-            result = cloudinary.uploader.destroy(f"venues/{public_id}")
-            logger.info(f"Venue Image deleted from Cloudinary: venues/{public_id}")
-            logger.debug(f"Result: {result}")
-            return result
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e)) from e
-
-
 # list all venues
 @router.get("", response_description="List all venues", response_model=PaginatedResponse[VenueDB])
 async def list_venues(
@@ -262,17 +250,17 @@ async def update_venue(
     if image:
         # Case 1: New file uploaded - always replace/set image
         logger.debug("Image handling: Uploading new image file")
-        if existing_venue.get("imageUrl"):
-            logger.debug(f"Image handling: Deleting existing image: {existing_venue['imageUrl']}")
-            await delete_from_cloudinary(existing_venue["imageUrl"])
         venue_data["imageUrl"] = await handle_image_upload(image, existing_venue["alias"])
         logger.debug(f"Image handling: New image uploaded: {venue_data['imageUrl']}")
+        await MediaCleanupService(mongodb).discard_url(
+            existing_venue.get("imageUrl"), replaced_by=venue_data["imageUrl"]
+        )
     elif imageUrl == "":
         # Case 2: Empty string means delete the image
         logger.debug("Image handling: Deleting image (empty string received)")
         if existing_venue.get("imageUrl"):
-            await delete_from_cloudinary(existing_venue["imageUrl"])
-            logger.debug(f"Image handling: Deleted existing image: {existing_venue['imageUrl']}")
+            await MediaCleanupService(mongodb).discard_url(existing_venue["imageUrl"])
+            logger.debug(f"Image handling: Discarded existing image: {existing_venue['imageUrl']}")
         venue_data["imageUrl"] = None
     elif imageUrl is not None:
         # Case 3: imageUrl has a value (URL string) - keep/update URL
@@ -348,7 +336,7 @@ async def delete_venue(
         raise ResourceNotFoundException(resource_type="Venue", resource_id=id)
     result = await mongodb["venues"].delete_one({"_id": id})
     if result.deleted_count == 1:
-        await delete_from_cloudinary(existing_venue["imageUrl"])
+        await MediaCleanupService(mongodb).discard_url(existing_venue.get("imageUrl"))
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND, detail=f"Venue with id {id} not found"
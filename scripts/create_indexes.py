@@ -1,11 +1,18 @@
 """
 MongoDB Index Creation Script
 
-Run this to create all necessary indexes for optimal query performance.
-Should be run once after deployment and whenever index strategy changes.
+Brings the database indexes in line with the manifest in
+services/index_manifest.py. Should be run once after deployment and whenever
+the manifest changes.
+
+By default missing indexes are created, changed ones rebuilt, and indexes the
+manifest does not list are reported. --diff only reports, --drop also drops
+unlisted indexes. --advise explains query samples captured by
+services/index_advisor.py and reports the query shapes that still scan whole
+collections.
 
 Usage:
-    python scripts/create_indexes.py [--prod]
+    python scripts/create_indexes.py [--prod] [--diff | --drop] [--advise queries.json]
 """
 
 import sys
@@ -19,144 +26,56 @@ import asyncio
 import os
 
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import OperationFailure
 
 from logging_config import logger
-
-# Set up argument parser
-parser = argparse.ArgumentParser(description="Create MongoDB indexes.")
-parser.add_argument("--prod", action="store_true", help="Create indexes in production database.")
-args = parser.parse_args()
-
-# Get environment variables based on --prod flag
-if args.prod:
-    DB_URL = os.environ["DB_URL_PROD"]
-    DB_NAME = "bishl"
-else:
-    DB_URL = os.environ["DB_URL"]
-    DB_NAME = "bishl_dev"
-
-print("DB_URL:", DB_URL)
-print("DB_NAME:", DB_NAME)
-
-
-async def create_indexes():
-    """Create all necessary indexes for optimal query performance"""
-
-    client = AsyncIOMotorClient(DB_URL)
-    db = client[DB_NAME]
-
-    logger.info(f"Starting index creation for database: {DB_NAME}...")
-
-    async def create_index_safe(collection, keys, **kwargs):
-        """Helper to create index and skip if already exists"""
-        index_name = kwargs.get("name", "unnamed")
-        is_unique = kwargs.get("unique", False)
-        try:
-            await collection.create_index(keys, **kwargs)
-            logger.info(f"  ✓ Created index: {index_name}")
-        except OperationFailure as e:
-            error_str = str(e)
-            if "already exists" in error_str or "IndexOptionsConflict" in error_str:
-                logger.info(f"  ↷ Index already exists: {index_name}")
-            elif "duplicate key" in error_str or "dup key" in error_str:
-                if is_unique:
-                    logger.warning(
-                        f"  ⚠ Cannot create unique index {index_name}: duplicate values exist in collection. "
-                        f"Clean up duplicates first before creating this unique index."
-                    )
-                else:
-                    logger.error(f"  ✗ Failed to create index {index_name}: {error_str}")
-                    raise
-            else:
-                logger.error(f"  ✗ Failed to create index {index_name}: {error_str}")
-                raise
-
+from services.index_advisor import IndexAdvisor
+from services.index_manifest import apply_index_changes, diff_indexes
+
+
+async def create_indexes(db, diff_only: bool, drop: bool) -> None:
+    """Report the index diff and apply it unless diff_only"""
+    changes = await diff_indexes(db)
+    if not changes:
+        logger.info("Indexes match the manifest")
+        return
+
+    logger.info(f"{len(changes)} index changes:")
+    for change in changes:
+        keys = ", ".join(f"{field}: {direction}" for field, direction in change.keys)
+        logger.info(f"  {change.action:<8} {change.collection}.{change.name} ({keys})")
+    if diff_only:
+        return
+
+    applied = await apply_index_changes(db, changes, drop=drop)
+    skipped = [c for c in changes if c.action == "drop" and not drop]
+    logger.info(f"Applied {len(applied)} of {len(changes)} index changes")
+    if skipped:
+        logger.info(f"{len(skipped)} unlisted indexes kept; run with --drop to remove them")
+
+
+async def advise(db, samples: Path) -> None:
+    """Report captured query shapes that end in a COLLSCAN"""
+    advisor = IndexAdvisor.load(samples)
+    findings = await advisor.explain_samples(db)
+    logger.info(f"{len(findings)} of {len(advisor.samples)} query shapes scan a whole collection")
+    for finding in findings:
+        logger.info(f"  {finding['count']:>6}x {finding['shape']}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Get environment variables based on --prod flag
+    if args.prod:
+        db_url, db_name = os.environ["DB_URL_PROD"], "bishl"
+    else:
+        db_url, db_name = os.environ["DB_URL"], "bishl_dev"
+    print("DB_NAME:", db_name)
+
+    client = AsyncIOMotorClient(db_url)
     try:
-        # Matches indexes
-        logger.info("Creating matches collection indexes...")
-        await create_index_safe(
-            db.matches,
-            [("tournament.alias", 1), ("season.alias", 1), ("round.alias", 1)],
-            name="tournament_season_round_idx",
-            background=True,
-        )
-
-        await create_index_safe(
-            db.matches,
-            [("tournament.alias", 1), ("season.alias", 1), ("matchday.alias", 1)],
-            name="tournament_season_matchday_idx",
-            background=True,
-        )
-
-        await create_index_safe(
-            db.matches,
-            [("status", 1), ("startDate", 1)],
-            name="status_startdate_idx",
-            background=True,
-        )
-
-        await create_index_safe(
-            db.matches, [("home.teamId", 1)], name="home_team_idx", background=True
-        )
-
-        await create_index_safe(
-            db.matches, [("away.teamId", 1)], name="away_team_idx", background=True
-        )
-
-        # Players indexes
-        logger.info("Creating players collection indexes...")
-        await create_index_safe(
-            db.players, [("alias", 1)], unique=True, name="alias_unique_idx", background=True
-        )
-
-        await create_index_safe(
-            db.players,
-            [("lastName", 1), ("firstName", 1), ("yearOfBirth", 1)],
-            name="player_lookup_idx",
-            background=True,
-        )
-
-        await create_index_safe(
-            db.players, [("assignedClubs.clubId", 1)], name="assigned_clubs_idx", background=True
-        )
-
-        # Tournaments indexes
-        logger.info("Creating tournaments collection indexes...")
-        await create_index_safe(
-            db.tournaments,
-            [("alias", 1)],
-            unique=True,
-            name="tournament_alias_unique_idx",
-            background=True,
-        )
-
-        # Users indexes
-        logger.info("Creating users collection indexes...")
-        await create_index_safe(
-            db.users, [("email", 1)], unique=True, name="email_unique_idx", background=True
-        )
-
-        await create_index_safe(db.users, [("club.clubId", 1)], name="club_idx", background=True)
-
-        # Assignments indexes
-        logger.info("Creating assignments collection indexes...")
-        await create_index_safe(db.assignments, [("matchId", 1)], name="match_idx", background=True)
-
-        await create_index_safe(db.assignments, [("userId", 1)], name="user_idx", background=True)
-
-        await create_index_safe(db.assignments, [("status", 1)], name="status_idx", background=True)
-
-        logger.info("Index creation completed successfully")
-
-        # List all indexes for verification
-        logger.info("\nVerifying created indexes:")
-        for collection_name in ["matches", "players", "tournaments", "users", "assignments"]:
-            indexes = await db[collection_name].index_information()
-            logger.info(f"\n{collection_name} indexes:")
-            for idx_name, idx_info in indexes.items():
-                logger.info(f"  - {idx_name}: {idx_info.get('key', [])}")
-
+        db = client[db_name]
+        await create_indexes(db, diff_only=args.diff, drop=args.drop)
+        if args.advise:
+            await advise(db, args.advise)
     except Exception as e:
         logger.error(f"Error creating indexes: {str(e)}")
         raise
@@ -165,4 +84,14 @@ async def create_indexes():
 
 
 if __name__ == "__main__":
-    asyncio.run(create_indexes())
+    parser = argparse.ArgumentParser(description="Create MongoDB indexes.")
+    parser.add_argument(
+        "--prod", action="store_true", help="Create indexes in production database."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--diff", action="store_true", help="Only report index changes.")
+    mode.add_argument("--drop", action="store_true", help="Also drop unlisted indexes.")
+    parser.add_argument(
+        "--advise", type=Path, help="Explain captured query samples and report COLLSCANs."
+    )
+    asyncio.run(main(parser.parse_args()))
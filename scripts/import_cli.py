@@ -23,13 +23,16 @@ Options:
     --file PATH       Path to CSV file (default: data/data_<entity>.csv)
     --delete-all      Delete all existing records before import
     --import-all      Import all records (bypass confirmations)
-    --dry-run         Show what would be imported without making changes
+    --dry-run         Report what would change without writing anything
+    --report PATH     Write a per-row CSV report (schedule, hobby-players, referees)
+    --batch-size N    Operations per bulk_write (hobby-players, referees)
 
 Examples:
     python scripts/import_cli.py players --prod --import-all
     python scripts/import_cli.py schedule --demo --file data/schedule_2025.csv
     python scripts/import_cli.py schedule --env demo
     python scripts/import_cli.py tournaments --dry-run
+    python scripts/import_cli.py referees --dry-run --report referees_report.csv
 """
 
 import sys
@@ -108,7 +111,19 @@ class ImportCLI:
         parser.add_argument(
             "--dry-run",
             action="store_true",
-            help="Show what would be imported without making changes",
+            help="Report what would change without writing anything",
+        )
+
+        parser.add_argument(
+            "--report",
+            type=str,
+            help="Write a per-row CSV report (schedule, hobby-players, referees)",
+        )
+
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Operations per bulk_write (default: IMPORT_BATCH_SIZE setting)",
         )
 
         parser.add_argument(
@@ -220,7 +235,12 @@ class ImportCLI:
         if not os.path.exists(csv_path):
             return False, f"Schedule CSV file not found: {csv_path}"
 
-        return self.service.import_schedule(csv_path, import_all=self.args.import_all)
+        return self.service.import_schedule(
+            csv_path,
+            import_all=self.args.import_all,
+            report_path=self.args.report,
+            dry_run=self.args.dry_run,
+        )
 
     def import_teams(self) -> tuple[bool, str]:
         """Import teams"""
@@ -242,14 +262,12 @@ class ImportCLI:
         if not os.path.exists(csv_path):
             return False, f"Hobby players CSV file not found: {csv_path}"
 
-        if self.args.dry_run:
-            logger.info(f"DRY RUN: would import hobby players from {csv_path}")
-            logger.info(f"DRY RUN: import_all={self.args.import_all}")
-            return True, "Dry run complete — no changes made"
-
         return self.service.import_hobby_players(
             csv_path,
             import_all=self.args.import_all,
+            dry_run=self.args.dry_run,
+            batch_size=self.args.batch_size,
+            report_path=self.args.report,
         )
 
     def import_referees(self) -> tuple[bool, str]:
@@ -263,19 +281,14 @@ class ImportCLI:
         send_email = getattr(self.args, "send_email", False)
         strategy = getattr(self.args, "strategy", "merge")
 
-        if self.args.dry_run:
-            logger.info(f"DRY RUN: would import referees from {csv_path}")
-            logger.info(
-                f"DRY RUN: strategy={strategy}, send_email={send_email}, "
-                f"import_all={self.args.import_all}"
-            )
-            return True, "Dry run complete — no changes made"
-
         return self.service.import_referees(
             csv_path,
             import_all=self.args.import_all,
             send_email=send_email,
             strategy=strategy,
+            dry_run=self.args.dry_run,
+            batch_size=self.args.batch_size,
+            report_path=self.args.report,
         )
 
     def _resolve_environment(self) -> str:
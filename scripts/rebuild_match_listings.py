@@ -0,0 +1,57 @@
+"""
+Match Listings Rebuild Script
+
+Rebuilds the matchListings read model (services/match_listing_service.py)
+from the matches collection and removes listings of deleted matches. Run it
+once before enabling MATCH_LISTINGS_ENABLED, and after imports or scripts that
+write matches directly.
+
+Usage:
+    python scripts/rebuild_match_listings.py [--prod] [--batch-size 500]
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to Python path to allow importing from root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import asyncio
+import os
+
+import certifi
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from logging_config import logger
+from services.match_listing_service import MatchListingService
+
+
+async def rebuild(db_url: str, db_name: str, batch_size: int) -> None:
+    client = AsyncIOMotorClient(db_url, tlsCAFile=certifi.where())
+    try:
+        service = MatchListingService(client[db_name])
+        await service.ensure_indexes()
+        result = await service.rebuild(batch_size=batch_size)
+        logger.info(f"Listed {result['listed']} matches, removed {result['removed']} orphans")
+    finally:
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the matchListings read model.")
+    parser.add_argument("--prod", action="store_true", help="Use the production database.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Matches per bulk write")
+    args = parser.parse_args()
+
+    if args.prod:
+        db_url, db_name = os.environ["DB_URL_PROD"], "bishl"
+    else:
+        db_url, db_name = os.environ["DB_URL"], os.environ.get("DB_NAME", "bishl_dev")
+    print("DB_NAME:", db_name)
+
+    asyncio.run(rebuild(db_url, db_name, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Assignment Conflict Service - Consistency checks between assignments and matches
+
+Detects ASSIGNED assignments whose referee is missing from (or different in) the
+match document, and referees that are double-booked on overlapping matches.
+All checks run on a single `$lookup` aggregation (assignments joined with their
+match) or one matches query, never one round trip per assignment.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from logging_config import logger
+
+DEFAULT_MATCH_DURATION_MINUTES = 90
+
+MATCH_INFO_PROJECTION = {
+    "_id": 1,
+    "tournament": 1,
+    "home": 1,
+    "away": 1,
+    "startDate": 1,
+    "referee1": 1,
+    "referee2": 1,
+}
+
+
+class AssignmentConflictService:
+    """Service for detecting assignment/match inconsistencies and double bookings"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def get_assigned_with_matches(self) -> list[dict]:
+        """
+        Load all ASSIGNED assignments joined with their match in one aggregation.
+
+        Each returned assignment carries its match under the "match" key, or None if
+        the match does not exist.
+        """
+        pipeline = [
+            {"$match": {"status": "ASSIGNED"}},
+            {
+                "$lookup": {
+                    "from": "matches",
+                    "localField": "matchId",
+                    "foreignField": "_id",
+                    "pipeline": [{"$project": MATCH_INFO_PROJECTION}],
+                    "as": "match",
+                }
+            },
+            {"$set": {"match": {"$ifNull": [{"$first": "$match"}, None]}}},
+        ]
+        return await self.db["assignments"].aggregate(pipeline).to_list(length=None)
+
+    @staticmethod
+    def _match_info(match: dict) -> dict:
+        return {
+            "tournament": match.get("tournament", {}).get("name"),
+            "home_team": match.get("home", {}).get("fullName"),
+            "away_team": match.get("away", {}).get("fullName"),
+            "start_date": match.get("startDate"),
+            "referee1": match.get("referee1"),
+            "referee2": match.get("referee2"),
+        }
+
+    @staticmethod
+    def _referee_name(assignment: dict) -> str:
+        referee = assignment.get("referee", {})
+        return f"{referee.get('firstName', '')} {referee.get('lastName', '')}".strip()
+
+    def find_sync_conflicts(self, assignments: list[dict]) -> list[dict[str, Any]]:
+        """
+        Compare joined assignments with their match documents.
+
+        Args:
+            assignments: Output of get_assigned_with_matches()
+
+        Returns:
+            List of conflicts of type MATCH_NOT_FOUND, REFEREE_NOT_SET_IN_MATCH or
+            REFEREE_MISMATCH
+        """
+        conflicts = []
+        for assignment in assignments:
+            match_id = assignment.get("matchId")
+            referee_user_id = assignment.get("referee", {}).get("userId")
+            position = assignment.get("position")
+
+            if not match_id or not referee_user_id or not position:
+                logger.debug(
+                    f"Skipping assignment {assignment.get('_id')} - missing required fields"
+                )
+                continue
+
+            match = assignment.get("match")
+            if not match:
+                conflicts.append(
+                    {
+                        "type": "MATCH_NOT_FOUND",
+                        "assignment_id": assignment.get("_id"),
+                        "match_id": match_id,
+                        "assigned_referee": assignment.get("referee"),
+                        "position": position,
+                        "issue": f"Match with ID {match_id} not found",
+                    }
+                )
+                continue
+
+            match_referee = match.get(f"referee{position}")
+            if not match_referee:
+                conflicts.append(
+                    {
+                        "type": "REFEREE_NOT_SET_IN_MATCH",
+                        "assignment_id": assignment.get("_id"),
+                        "match_id": match_id,
+                        "assigned_referee": assignment.get("referee"),
+                        "position": position,
+                        "match_referee": None,
+                        "match_info": self._match_info(match),
+                        "issue": f"Referee not set in match at position {position}",
+                    }
+                )
+            elif match_referee.get("userId") != referee_user_id:
+                conflicts.append(
+                    {
+                        "type": "REFEREE_MISMATCH",
+                        "assignment_id": assignment.get("_id"),
+                        "match_id": match_id,
+                        "assigned_referee": assignment.get("referee"),
+                        "position": position,
+                        "match_referee": match_referee,
+                        "match_info": self._match_info(match),
+                        "issue": f"Different referee in match: assigned={referee_user_id}, match={match_referee.get('userId')}",
+                    }
+                )
+        return conflicts
+
+    def analyze_workflow(self, assignments: list[dict]) -> dict[str, Any]:
+        """
+        Aggregate REF_ADMIN workflow statistics from joined assignments.
+
+        Args:
+            assignments: Output of get_assigned_with_matches()
+
+        Returns:
+            Dict with totals and breakdowns by position, tournament and referee
+        """
+        analysis: dict[str, Any] = {
+            "total_assigned_status": len(assignments),
+            "properly_set_in_match": 0,
+            "missing_from_match": 0,
+            "wrong_referee_in_match": 0,
+            "issues_by_position": {"1": 0, "2": 0},
+            "issues_by_tournament": {},
+            "issues_by_referee": {},
+            "recent_issues": [],
+            "oldest_issue_date": None,
+        }
+
+        for assignment in assignments:
+            match_id = assignment.get("matchId")
+            referee_user_id = assignment.get("referee", {}).get("userId")
+            position = assignment.get("position")
+            match = assignment.get("match")
+
+            if not match_id or not referee_user_id or not position or not match:
+                continue
+
+            match_referee = match.get(f"referee{position}")
+            if match_referee and match_referee.get("userId") == referee_user_id:
+                analysis["properly_set_in_match"] += 1
+                continue
+
+            issue_key = "missing_from_match" if not match_referee else "wrong_referee_in_match"
+            analysis[issue_key] += 1
+            analysis["issues_by_position"][str(position)] = (
+                analysis["issues_by_position"].get(str(position), 0) + 1
+            )
+
+            referee_name = self._referee_name(assignment) or f"Unknown ({referee_user_id})"
+            referee_stats = analysis["issues_by_referee"].setdefault(
+                referee_name,
+                {
+                    "missing_from_match": 0,
+                    "wrong_referee_in_match": 0,
+                    "total_issues": 0,
+                    "userId": referee_user_id,
+                    "club": assignment.get("referee", {}).get("clubName", "Unknown"),
+                },
+            )
+            referee_stats[issue_key] += 1
+            referee_stats["total_issues"] += 1
+
+            if issue_key != "missing_from_match":
+                continue
+
+            tournament = match.get("tournament", {}).get("name", "Unknown")
+            analysis["issues_by_tournament"][tournament] = (
+                analysis["issues_by_tournament"].get(tournament, 0) + 1
+            )
+
+            # Track recent issues (assignment date taken from statusHistory)
+            assigned_entry = next(
+                (e for e in assignment.get("statusHistory", []) if e.get("status") == "ASSIGNED"),
+                None,
+            )
+            issue_date = assigned_entry.get("updateDate") if assigned_entry else None
+            if issue_date:
+                analysis["recent_issues"].append(
+                    {
+                        "assignment_id": assignment.get("_id"),
+                        "match_id": match_id,
+                        "referee_name": self._referee_name(assignment),
+                        "position": position,
+                        "tournament": tournament,
+                        "assigned_date": issue_date,
+                        "match_date": match.get("startDate"),
+                        "assigned_by": assigned_entry.get("updatedByName", "Unknown"),
+                    }
+                )
+                if not analysis["oldest_issue_date"] or issue_date < analysis["oldest_issue_date"]:
+                    analysis["oldest_issue_date"] = issue_date
+
+        analysis["recent_issues"].sort(key=lambda x: x["assigned_date"], reverse=True)
+        return analysis
+
+    async def find_double_bookings(
+        self,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        match_duration_minutes: int = DEFAULT_MATCH_DURATION_MINUTES,
+    ) -> list[dict[str, Any]]:
+        """
+        Find referees set on two matches whose time slots overlap.
+
+        Each match occupies [startDate, startDate + match_duration_minutes). Slots are
+        grouped per referee, sorted by start and swept once, keeping the slot that
+        ends last; any slot starting before that end overlaps it.
+
+        Args:
+            from_date: Only consider matches starting at or after this date
+            to_date: Only consider matches starting at or before this date
+            match_duration_minutes: Assumed length of a match slot
+
+        Returns:
+            List of DOUBLE_BOOKING conflicts, one per overlapping pair
+        """
+        query: dict[str, Any] = {
+            "startDate": {"$ne": None},
+            "$or": [{"referee1.userId": {"$ne": None}}, {"referee2.userId": {"$ne": None}}],
+        }
+        if from_date or to_date:
+            date_range: dict[str, Any] = {"$ne": None}
+            if from_date:
+                date_range["$gte"] = from_date
+            if to_date:
+                date_range["$lte"] = to_date
+            query["startDate"] = date_range
+
+        matches = (
+            await self.db["matches"]
+            .find(query, MATCH_INFO_PROJECTION)
+            .sort("startDate", 1)
+            .to_list(length=None)
+        )
+
+        slots_by_referee: dict[str, list[tuple[datetime, dict, dict]]] = {}
+        for match in matches:
+            for position in (1, 2):
+                referee = match.get(f"referee{position}")
+                if referee and referee.get("userId"):
+                    slots_by_referee.setdefault(referee["userId"], []).append(
+                        (match["startDate"], match, referee)
+                    )
+
+        duration = timedelta(minutes=match_duration_minutes)
+        conflicts = []
+        for referee_id, slots in slots_by_referee.items():
+            slots.sort(key=lambda s: s[0])
+            latest_end: datetime | None = None
+            latest_match: dict | None = None
+            for start, match, referee in slots:
+                if latest_end is not None and latest_match is not None and start < latest_end:
+                    conflicts.append(
+                        {
+                            "type": "DOUBLE_BOOKING",
+                            "referee": {
+                                "userId": referee_id,
+                                "firstName": referee.get("firstName"),
+                                "lastName": referee.get("lastName"),
+                                "clubName": referee.get("clubName"),
+                            },
+                            "match_ids": [latest_match["_id"], match["_id"]],
+                            "matches": [
+                                self._match_info(latest_match),
+                                self._match_info(match),
+                            ],
+                            "issue": f"Referee {referee_id} is set on overlapping matches starting {latest_match['startDate']} and {start}",
+                        }
+                    )
+                end = start + duration
+                if latest_end is None or end > latest_end:
+                    latest_end = end
+                    latest_match = match
+        return conflicts
+
+    async def check(
+        self,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        match_duration_minutes: int = DEFAULT_MATCH_DURATION_MINUTES,
+    ) -> dict[str, Any]:
+        """
+        Run all checks.
+
+        Returns:
+            Dict with sync conflicts, workflow analysis and double bookings
+        """
+        assignments = await self.get_assigned_with_matches()
+        conflicts = self.find_sync_conflicts(assignments)
+        analysis = self.analyze_workflow(assignments)
+        double_bookings = await self.find_double_bookings(
+            from_date=from_date, to_date=to_date, match_duration_minutes=match_duration_minutes
+        )
+        logger.info(
+            f"Assignment conflict check: {len(assignments)} ASSIGNED, "
+            f"{len(conflicts)} sync conflicts, {len(double_bookings)} double bookings"
+        )
+        return {
+            "conflicts": conflicts,
+            "analysis": analysis,
+            "double_bookings": double_bookings,
+        }
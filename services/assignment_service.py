@@ -17,6 +17,7 @@ from exceptions import (
 from logging_config import logger
 from models.assignments import AssignmentDB, AssignmentReferee, AssignmentStatus, StatusHistory
 from models.reftool import RefereeOptions, RefToolReferee
+from services.match_listing_service import MatchListingService
 
 
 class AssignmentService:
@@ -174,6 +175,7 @@ class AssignmentService:
             },
             session=session,
         )
+        await MatchListingService(self.db).refresh(match_id, session=session)
 
         if settings.DEBUG_LEVEL > 0:
             logger.debug(
@@ -187,6 +189,7 @@ class AssignmentService:
         await self.db["matches"].update_one(
             {"_id": match_id}, {"$set": {f"referee{position}": None}}, session=session
         )
+        await MatchListingService(self.db).refresh(match_id, session=session)
 
     async def update_match_ref_assignment_status(
         self,
@@ -201,6 +204,7 @@ class AssignmentService:
             {"$set": {f"referee{position}.assignmentStatus": assignment_status}},
             session=session,
         )
+        await MatchListingService(self.db).refresh(match_id, session=session)
 
     async def create_assignment(
         self,
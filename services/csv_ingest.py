@@ -0,0 +1,213 @@
+"""
+CSV Ingest - Chunked, column-wise CSV import engine
+
+Shared by the referee and hobby-player imports of ImportService. A file is
+read in chunks of IMPORT_CHUNK_SIZE rows. Each chunk holds its values per
+column, so JSON columns are parsed once per distinct value (the same club or
+tournament blob repeats on every row) and required-field checks run over a
+whole column. Importers then plan one write per row against lookups loaded
+once per chunk, and BulkWriter sends the writes with bulk_write in batches of
+IMPORT_BATCH_SIZE.
+
+In a dry run BulkWriter writes nothing. Every row still gets a RowResult
+saying what would change, including the old and new values of changed fields.
+"""
+
+import csv
+import json
+from collections.abc import Iterator
+from typing import Any, NamedTuple
+
+from pymongo import UpdateOne
+
+from logging_config import logger
+
+MISSING = object()
+
+
+class RowResult(NamedTuple):
+    """Outcome of one CSV row: its status (created, updated, skipped, ...) and message"""
+
+    row: int
+    status: str
+    message: str
+
+
+def parse_json_cell(value: Any, cache: dict[str, Any]) -> Any:
+    """Parse a JSON column once per distinct value; the same blob repeats on every row"""
+    if not isinstance(value, str):
+        return value
+    if value not in cache:
+        cache[value] = json.loads(value) if value.strip() else None
+    return cache[value]
+
+
+def write_row_report(path: str, results: list[RowResult]) -> None:
+    """One CSV line per input row with its status and message"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["row", "status", "message"])
+        writer.writerows(results)
+
+
+class CsvChunk:
+    """A block of CSV rows stored column by column, with the first error of each row"""
+
+    def __init__(self, first_row: int, rows: list[dict[str, Any]]):
+        self.numbers = list(range(first_row, first_row + len(rows)))
+        names = {name for row in rows for name in row if name is not None}
+        self.columns: dict[str, list[Any]] = {
+            name: [row.get(name) for row in rows] for name in names
+        }
+        self.errors: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def text(self, *names: str) -> list[str]:
+        """Stripped values of the first non-empty column among names (fallback aliases)"""
+        values = [""] * len(self)
+        for name in reversed(names):
+            for i, value in enumerate(self.columns.get(name, ())):
+                if value and value.strip():
+                    values[i] = value.strip()
+        return values
+
+    def json(self, name: str, cache: dict[str, Any]) -> list[Any]:
+        """Parsed JSON values; invalid cells become None and reject their row"""
+        values = []
+        for i, value in enumerate(self.columns.get(name) or [None] * len(self)):
+            try:
+                values.append(parse_json_cell(value, cache))
+            except json.JSONDecodeError as e:
+                values.append(None)
+                self.reject(i, f"Invalid JSON in {name}: {e}")
+        return values
+
+    def require(self, values: list[Any], message: str) -> None:
+        """Reject the rows whose value is empty"""
+        for i, value in enumerate(values):
+            if not value:
+                self.reject(i, message)
+
+    def reject(self, index: int, message: str) -> None:
+        self.errors.setdefault(index, message)
+
+    def valid(self) -> Iterator[int]:
+        """Indexes of the rows without errors"""
+        return (i for i in range(len(self)) if i not in self.errors)
+
+
+def read_csv_chunks(csv_path: str, chunk_size: int, delimiter: str = ";") -> Iterator[CsvChunk]:
+    """Read a CSV file in chunks; row numbers are file lines, the header being line 1"""
+    with open(csv_path, encoding="utf-8") as f:
+        reader = csv.DictReader(
+            f, delimiter=delimiter, quotechar='"', doublequote=True, skipinitialspace=True
+        )
+        rows: list[dict[str, Any]] = []
+        first_row = 2
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield CsvChunk(first_row, rows)
+                first_row += len(rows)
+                rows = []
+        if rows:
+            yield CsvChunk(first_row, rows)
+
+
+def get_path(doc: dict[str, Any], path: str) -> Any:
+    """Value of a dotted field, MISSING if absent"""
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return MISSING
+        value = value[part]
+    return value
+
+
+def changed_fields(doc: dict[str, Any], fields: dict[str, Any]) -> dict[str, Any]:
+    """The $set fields whose value differs from doc"""
+    return {path: value for path, value in fields.items() if get_path(doc, path) != value}
+
+
+def apply_set(doc: dict[str, Any], fields: dict[str, Any]) -> None:
+    """Apply $set fields to a cached doc so later rows see the planned state"""
+    for path, value in fields.items():
+        *parents, last = path.split(".")
+        target = doc
+        for part in parents:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        target[last] = value
+
+
+def describe_changes(doc: dict[str, Any], fields: dict[str, Any]) -> str:
+    """'field: old → new' for each changed field; nested lists are abbreviated"""
+
+    def show(value: Any) -> str:
+        if value is MISSING:
+            return "∅"
+        if isinstance(value, list | dict):
+            return f"<{type(value).__name__} of {len(value)}>"
+        return repr(value)
+
+    return ", ".join(
+        f"{path}: {show(get_path(doc, path))} → {show(v)}" for path, v in fields.items()
+    )
+
+
+def plan_update(writer: "BulkWriter", collection: str, doc: dict[str, Any], fields: dict) -> str:
+    """
+    Queue a $set of the fields that differ from doc and apply it to doc.
+
+    Returns the description of the change, or "" when nothing differs.
+    """
+    changes = changed_fields(doc, fields)
+    if not changes:
+        return ""
+    description = describe_changes(doc, changes)
+    writer.update(collection, {"_id": doc["_id"]}, changes)
+    apply_set(doc, changes)
+    return description
+
+
+class BulkWriter:
+    """Queues writes per collection and sends them with bulk_write in batches"""
+
+    def __init__(self, db, batch_size: int, dry_run: bool = False):
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.dry_run = dry_run
+        self.pending: dict[str, list[Any]] = {}
+        self.queued = 0
+        self.batches = 0
+
+    def update(self, collection: str, filter: dict[str, Any], fields: dict[str, Any]) -> None:
+        self.add(collection, UpdateOne(filter, {"$set": fields}))
+
+    def add(self, collection: str, operation: Any) -> None:
+        self.queued += 1
+        if self.dry_run:
+            return
+        operations = self.pending.setdefault(collection, [])
+        operations.append(operation)
+        if len(operations) >= self.batch_size:
+            self._send(collection)
+
+    def flush(self) -> None:
+        for collection in list(self.pending):
+            self._send(collection)
+
+    def _send(self, collection: str) -> None:
+        operations = self.pending.pop(collection, [])
+        if not operations:
+            return
+        # Ordered, so that several rows touching one document apply in file order
+        result = self.db[collection].bulk_write(operations, ordered=True)
+        self.batches += 1
+        logger.info(
+            f"bulk_write {collection}: {len(operations)} ops, "
+            f"{result.modified_count} modified, {result.upserted_count} upserted"
+        )
@@ -8,7 +8,12 @@ Provides common functionality for all data import operations:
 - Progress tracking and logging
 """
 
+import asyncio
+import csv
+import json
+from collections import defaultdict
 from collections.abc import Callable
+from datetime import UTC, datetime
 from typing import Any
 
 import certifi
@@ -18,6 +23,64 @@ from pymongo.database import Database
 
 from config import settings
 from logging_config import logger
+from services.csv_ingest import (
+    BulkWriter,
+    RowResult,
+    apply_set,
+    parse_json_cell,
+    plan_update,
+    read_csv_chunks,
+    write_row_report,
+)
+
+# Referee notifications: subject and HTML body, formatted with email and the
+# values of the notice
+REFEREE_MAILS = {
+    "created": (
+        "BISHL - Schiedsrichter-Account angelegt",
+        """
+<p>Hallo {first_name},</p>
+<p>dein Schiedsrichter-Account wurde erfolgreich angelegt.</p>
+<p>Hier sind deine Login-Details:</p>
+<ul>
+  <li><strong>E-Mail:</strong> {email}</li>
+  <li><strong>Passwort:</strong> {password}</li>
+</ul>
+<p>Bitte logge dich bei www.bishl.de ein und ändere dein Passwort.</p>
+<p>Falls du Fragen hast, melde dich bitte über website@bishl.de</p>
+<p>Viele Grüße,<br>Das BISHL-Team</p>
+""",
+    ),
+    "upgraded": (
+        "BISHL - Du bist nun auch Schiedsrichter",
+        """
+<p>Hallo {first_name},</p>
+<p>du bist jetzt als Schiedsrichter bei der BISHL registriert.</p>
+<p>Du kannst dich mit deinen bekannten Login-Daten anmelden:</p>
+<ul>
+  <li><strong>E-Mail:</strong> {email}</li>
+  <li><strong>Passwort:</strong> Dein bestehendes Passwort</li>
+</ul>
+<p>Bitte logge dich bei www.bishl.de ein und aktualisiere dein Profil mit deinen Schiedsrichter-Daten, falls nötig.</p>
+<p>Falls du Fragen hast, melde dich bitte über website@bishl.de</p>
+<p>Viele Grüße,<br>Das BISHL-Team</p>
+""",
+    ),
+    "email_changed": (
+        "BISHL - Deine Login-E-Mail wurde geändert",
+        """
+<p>Hallo {first_name},</p>
+<p>deine Login-E-Mail-Adresse für dein Schiedsrichter-Account auf www.bishl.de wurde aktualisiert.</p>
+<p>Ab sofort meldest du dich mit folgender E-Mail-Adresse an:</p>
+<ul>
+  <li><strong>Neue E-Mail (Login):</strong> {email}</li>
+</ul>
+<p>Bitte verwende ab sofort diese Adresse, um dich bei www.bishl.de einzuloggen.</p>
+<p>Falls du diese Änderung nicht erwartet hast, melde dich bitte über website@bishl.de</p>
+<p>Viele Grüße,<br>Das BISHL-Team</p>
+""",
+    ),
+}
 
 
 class ImportService:
@@ -130,299 +193,344 @@ class ImportService:
             raise RuntimeError("Database not connected. Call connect_db() first.")
         return self.db[collection_name]
 
-    def import_schedule(self, csv_path: str, import_all: bool = False) -> tuple[bool, str]:
+    def import_schedule(
+        self,
+        csv_path: str,
+        import_all: bool = False,
+        report_path: str | None = None,
+        concurrency: int | None = None,
+        dry_run: bool = False,
+    ) -> tuple[bool, str]:
         """
         Import match schedule from CSV file
 
+        Clubs, teams, tournament trees and the existing matches of the file's
+        seasons are loaded once, every row is validated against them up front,
+        and the matches are then created through the API concurrently. Missing
+        matchdays are created first, and the dates of all touched rounds and
+        matchdays are recalculated once at the end.
+
         Args:
             csv_path: Path to CSV file containing schedule data
             import_all: If True, import all matches. If False, stop after first match
+            report_path: Optional CSV file receiving one line per row (status, message)
+            concurrency: Max parallel API calls (default: settings.IMPORT_CONCURRENCY)
+            dry_run: If True, validate and report the matches that would be created
+                     without calling the API
 
         Returns:
             Tuple of (success: bool, message: str)
         """
-        import csv
-        import json
-        from datetime import datetime
-
-        from fastapi.encoders import jsonable_encoder
-
-        from models.matches import (
-            MatchBase,
-            MatchMatchday,
-            MatchRound,
-            MatchSeason,
-            MatchTeam,
-            MatchTournament,
-            MatchVenue,
-        )
-        from models.tournaments import MatchdayBase
-
         if not self.token or not self.headers:
             return False, "Not authenticated. Call authenticate() first."
 
-        collection = self.get_collection("matches")
-
         try:
-            with open(csv_path, encoding="utf-8") as f:
-                reader = csv.DictReader(
-                    f, delimiter=";", quotechar='"', doublequote=True, skipinitialspace=True
+            results = asyncio.run(
+                self._import_schedule_async(
+                    csv_path, import_all, concurrency or settings.IMPORT_CONCURRENCY, dry_run
                 )
-                rows = list(reader)
-
-            progress = ImportProgress(len(rows), "Importing schedule")
-            matches_created = 0
-            matches_skipped = 0
-
-            for row in rows:
-                try:
-                    # Parse tournament data
-                    tournament_data = row.get("tournament")
-                    if isinstance(tournament_data, str):
-                        tournament_data = json.loads(tournament_data)
-                    if not tournament_data:
-                        progress.add_error("Missing tournament data")
-                        continue
-                    tournament = MatchTournament(**tournament_data)
-
-                    # Parse season data
-                    season_data = row.get("season")
-                    if isinstance(season_data, str):
-                        season_data = json.loads(season_data)
-                    if not season_data:
-                        progress.add_error("Missing season data")
-                        continue
-                    season = MatchSeason(**season_data)
-
-                    # Parse round data
-                    round_data = row.get("round")
-                    if isinstance(round_data, str):
-                        round_data = json.loads(round_data)
-                    if not round_data:
-                        progress.add_error("Missing round data")
-                        continue
-                    round = MatchRound(**round_data)
-
-                    # Parse matchday data
-                    matchday_data = row.get("matchday")
-                    if isinstance(matchday_data, str):
-                        matchday_data = json.loads(matchday_data)
-                    if not matchday_data:
-                        progress.add_error("Missing matchday data")
-                        continue
-                    matchday = MatchMatchday(**matchday_data)
-
-                    # Parse venue data
-                    venue_data = row.get("venue")
-                    if isinstance(venue_data, str):
-                        venue_data = json.loads(venue_data)
-                    if not venue_data:
-                        progress.add_error("Missing venue data")
-                        continue
-                    venue = MatchVenue(**venue_data)
-
-                    # Parse published flag
-                    published_value = row.get("published")
-                    if isinstance(published_value, str):
-                        published_value = published_value.lower() == "true"
-                    published_value = (
-                        published_value if isinstance(published_value, bool) else False
-                    )
-
-                    # Parse start date
-                    start_date_str = row.get("startDate")
-                    start_date = None
-                    if start_date_str:
-                        try:
-                            start_date = datetime.strptime(start_date_str, "%Y-%m-%d %H:%M:%S%z")
-                        except ValueError:
-                            progress.add_error(f"Invalid startDate format: {start_date_str}")
-                            continue
-
-                    # Get aliases
-                    t_alias = tournament.alias
-                    s_alias = season.alias
-                    r_alias = round.alias
-                    md_alias = matchday.alias
-
-                    # Check if round exists
-                    round_url = (
-                        f"{self.base_url}/tournaments/{t_alias}/seasons/{s_alias}/rounds/{r_alias}"
-                    )
-                    round_response = self.session.get(round_url)
-                    if round_response.status_code != 200:
-                        progress.add_error(f"Round does not exist: {t_alias}/{s_alias}/{r_alias}")
-                        continue
-
-                    # round_db = RoundDB(**round_response.json().get("data", {}))
+            )
+        except FileNotFoundError:
+            error_msg = f"CSV file not found: {csv_path}"
+            logger.error(error_msg)
+            return False, error_msg
+        except Exception as e:
+            error_msg = f"Schedule import failed: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
 
-                    # Check if matchday exists, create if needed
-                    matchday_url = f"{self.base_url}/tournaments/{t_alias}/seasons/{s_alias}/rounds/{r_alias}/matchdays/{md_alias}"
-                    matchday_response = self.session.get(matchday_url)
-                    if matchday_response.status_code != 200:
-                        new_matchday_data = row.get("newMatchday")
-                        logger.info(
-                            f"Creating new matchday: {t_alias}/{s_alias}/{r_alias}/{md_alias}"
-                        )
-                        if isinstance(new_matchday_data, str):
-                            new_matchday_data = json.loads(new_matchday_data)
+        if report_path:
+            write_row_report(report_path, results)
+            logger.info(f"Row report written to {report_path}")
+
+        counts = dict.fromkeys(("created", "skipped", "error"), 0)
+        for result in results:
+            counts[result.status] += 1
+        for result in results:
+            if result.status == "error":
+                logger.warning(f"Row {result.row}: {result.message}")
+        result_msg = (
+            f"Created {counts['created']} matches, skipped {counts['skipped']}, "
+            f"{counts['error']} rows with errors"
+        )
+        if dry_run:
+            result_msg = f"Dry run, nothing written — {result_msg}"
+        return True, result_msg
 
-                        if not new_matchday_data:
-                            progress.add_error("Missing newMatchday data for matchday creation")
-                            continue
+    async def _import_schedule_async(
+        self, csv_path: str, import_all: bool, concurrency: int, dry_run: bool = False
+    ) -> list[RowResult]:
+        import ssl
 
-                        new_matchday = MatchdayBase(**new_matchday_data)
-                        new_matchday.published = True
+        import httpx
 
-                        create_md_response = self.session.post(
-                            f"{self.base_url}/tournaments/{t_alias}/seasons/{s_alias}/rounds/{r_alias}/matchdays",
-                            json=jsonable_encoder(new_matchday),
-                        )
-                        if create_md_response.status_code != 201:
-                            progress.add_error(
-                                f"Failed to create matchday: {t_alias}/{s_alias}/{r_alias}/{md_alias}"
-                            )
-                            continue
-
-                    # Fetch home club and team
-                    home_club_alias = row.get("homeClubAlias")
-                    home_team_alias = row.get("homeTeamAlias")
-
-                    home_club_response = self.session.get(
-                        f"{self.base_url}/clubs/{home_club_alias}"
+        with open(csv_path, encoding="utf-8") as f:
+            reader = csv.DictReader(
+                f, delimiter=";", quotechar='"', doublequote=True, skipinitialspace=True
+            )
+            rows = list(reader)
+
+        lookups = self._load_schedule_lookups(rows)
+        results: list[RowResult] = []
+        planned: list[dict[str, Any]] = []
+        seen_keys = set(lookups["existing"])
+        for number, row in enumerate(rows, start=2):  # line 1 is the header
+            try:
+                plan = self._plan_schedule_row(row, lookups)
+            except Exception as e:
+                results.append(RowResult(number, "error", str(e)))
+                continue
+            label = f"{plan['home']}-{plan['away']}"
+            if plan["key"] in seen_keys:
+                results.append(RowResult(number, "skipped", f"Exists: {label}"))
+                continue
+            seen_keys.add(plan["key"])
+            plan["row"] = number
+            planned.append(plan)
+
+        if not import_all and len(planned) > 1:
+            logger.info("import_all flag not set, importing the first new match only")
+            results += [
+                RowResult(plan["row"], "skipped", "Not imported (import_all not set)")
+                for plan in planned[1:]
+            ]
+            planned = planned[:1]
+
+        if dry_run:
+            for matchday_key in sorted(
+                {plan["matchday_key"] for plan in planned} & set(lookups["new_matchdays"])
+            ):
+                logger.info(f"Would create matchday: {'/'.join(matchday_key)}")
+            results += [
+                RowResult(plan["row"], "created", f"Would create: {plan['home']}-{plan['away']}")
+                for plan in planned
+            ]
+            return sorted(results, key=lambda result: result.row)
+
+        progress = ImportProgress(len(planned), "Importing schedule")
+        verify: ssl.SSLContext | bool = (
+            ssl.create_default_context(cafile=certifi.where()) if self.session.verify else False
+        )
+        async with httpx.AsyncClient(
+            base_url=self.base_url, headers=self.headers, verify=verify, timeout=60
+        ) as client:
+            failed_matchdays = await self._create_missing_matchdays(client, planned, lookups)
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def create(plan: dict[str, Any]) -> RowResult:
+                label = f"{plan['home']}-{plan['away']}"
+                if plan["matchday_key"] in failed_matchdays:
+                    return RowResult(plan["row"], "error", failed_matchdays[plan["matchday_key"]])
+                async with semaphore:
+                    try:
+                        response = await client.post("/matches", json=plan["match"])
+                    except httpx.HTTPError as e:
+                        return RowResult(plan["row"], "error", f"{label}: {e}")
+                if response.status_code != 201:
+                    return RowResult(
+                        plan["row"],
+                        "error",
+                        f"Failed to create match (HTTP {response.status_code}): {label}",
                     )
-                    if home_club_response.status_code != 200:
-                        progress.add_error(f"Home club not found: {home_club_alias}")
-                        continue
-                    home_club = home_club_response.json().get("data")
+                progress.update(message=f"Created: {label}")
+                return RowResult(plan["row"], "created", label)
 
-                    home_team_response = self.session.get(
-                        f"{self.base_url}/clubs/{home_club_alias}/teams/{home_team_alias}"
-                    )
-                    if home_team_response.status_code != 200:
-                        progress.add_error(
-                            f"Home team not found: {home_club_alias}/{home_team_alias}"
-                        )
-                        continue
-                    home_team = home_team_response.json().get("data")
-
-                    home = MatchTeam(
-                        clubId=home_club.get("_id"),
-                        clubName=home_club.get("name"),
-                        clubAlias=home_club.get("alias"),
-                        teamId=home_team.get("_id"),
-                        teamAlias=home_team.get("alias"),
-                        name=home_team.get("name"),
-                        fullName=home_team.get("fullName"),
-                        shortName=home_team.get("shortName"),
-                        tinyName=home_team.get("tinyName"),
-                        logo=home_club.get("logoUrl"),
-                    )
+            results += await asyncio.gather(*(create(plan) for plan in planned))
+            await self._refresh_schedule_dates(client, planned)
 
-                    # Fetch away club and team
-                    away_club_alias = row.get("awayClubAlias")
-                    away_team_alias = row.get("awayTeamAlias")
+        return sorted(results, key=lambda result: result.row)
 
-                    away_club_response = self.session.get(
-                        f"{self.base_url}/clubs/{away_club_alias}"
-                    )
-                    if away_club_response.status_code != 200:
-                        progress.add_error(f"Away club not found: {away_club_alias}")
-                        continue
-                    away_club = away_club_response.json().get("data")
+    def _load_schedule_lookups(self, rows: list[dict[str, Any]]) -> dict[str, Any]:
+        """Clubs with their teams, tournament trees and existing match keys, one query each"""
+        club_aliases = {row.get(f"{side}ClubAlias") for row in rows for side in ("home", "away")}
+        t_aliases, s_aliases = set(), set()
+        json_cache: dict[str, Any] = {}
+        for row in rows:
+            for field, aliases in (("tournament", t_aliases), ("season", s_aliases)):
+                try:
+                    aliases.add(parse_json_cell(row.get(field), json_cache).get("alias"))
+                except (ValueError, AttributeError):
+                    continue  # reported by the row validation
 
-                    away_team_response = self.session.get(
-                        f"{self.base_url}/clubs/{away_club_alias}/teams/{away_team_alias}"
-                    )
-                    if away_team_response.status_code != 200:
-                        progress.add_error(
-                            f"Away team not found: {away_club_alias}/{away_team_alias}"
-                        )
-                        continue
-                    away_team = away_team_response.json().get("data")
-
-                    away = MatchTeam(
-                        clubId=away_club.get("_id"),
-                        clubName=away_club.get("name"),
-                        clubAlias=away_club.get("alias"),
-                        teamId=away_team.get("_id"),
-                        teamAlias=away_team.get("alias"),
-                        name=away_team.get("name"),
-                        fullName=away_team.get("fullName"),
-                        shortName=away_team.get("shortName"),
-                        tinyName=away_team.get("tinyName"),
-                        logo=away_club.get("logoUrl"),
-                    )
+        clubs = {
+            club["alias"]: club
+            for club in self.get_collection("clubs").find({"alias": {"$in": list(club_aliases)}})
+        }
+        tournaments = {
+            tournament["alias"]: tournament
+            for tournament in self.get_collection("tournaments").find(
+                {"alias": {"$in": list(t_aliases)}}
+            )
+        }
+        existing = {
+            match_key(match)
+            for match in self.get_collection("matches").find(
+                {
+                    "tournament.alias": {"$in": list(t_aliases)},
+                    "season.alias": {"$in": list(s_aliases)},
+                },
+                {
+                    "startDate": 1,
+                    "home.clubId": 1,
+                    "home.teamId": 1,
+                    "away.clubId": 1,
+                    "away.teamId": 1,
+                },
+            )
+        }
+        logger.info(
+            f"Loaded {len(clubs)} clubs, {len(tournaments)} tournaments, "
+            f"{len(existing)} existing matches"
+        )
+        return {
+            "clubs": clubs,
+            "tournaments": tournaments,
+            "existing": existing,
+            "json": json_cache,
+            "new_matchdays": {},
+        }
 
-                    # Create match
-                    new_match = MatchBase(
-                        tournament=tournament,
-                        season=season,
-                        round=round,
-                        matchday=matchday,
-                        venue=venue,
-                        published=published_value,
-                        home=home,
-                        away=away,
-                        startDate=start_date,
-                    )
+    def _plan_schedule_row(self, row: dict[str, Any], lookups: dict[str, Any]) -> dict[str, Any]:
+        """Validate one row against the lookups; raises ValueError with the reason"""
+        from fastapi.encoders import jsonable_encoder
 
-                    new_match_data = jsonable_encoder(new_match)
-
-                    # Check if match already exists
-                    query = {
-                        "startDate": start_date,
-                        "home.clubId": home.clubId,
-                        "home.teamId": home.teamId,
-                        "away.clubId": away.clubId,
-                        "away.teamId": away.teamId,
-                    }
-                    match_exists = collection.find_one(query)
-
-                    if not match_exists:
-                        response = self.session.post(
-                            f"{self.base_url}/matches", json=new_match_data
-                        )
-                        if response.status_code == 201:
-                            matches_created += 1
-                            progress.update(
-                                message=f"Created: {home.fullName} - {away.fullName} in {t_alias}/{r_alias}/{md_alias}"
-                            )
-
-                            if not import_all:
-                                logger.info("import_all flag not set, stopping after first match")
-                                break
-                        else:
-                            progress.add_error(
-                                f"Failed to create match (HTTP {response.status_code}): {home.fullName} - {away.fullName}"
-                            )
-                    else:
-                        matches_skipped += 1
-                        progress.update(
-                            message=f"Skipped (exists): {home.fullName} - {away.fullName}"
-                        )
+        from models.matches import (
+            MatchBase,
+            MatchMatchday,
+            MatchRound,
+            MatchSeason,
+            MatchTournament,
+            MatchVenue,
+        )
+        from models.tournaments import MatchdayBase
 
-                except json.JSONDecodeError as e:
-                    progress.add_error(f"Invalid JSON in row: {str(e)}")
-                except Exception as e:
-                    progress.add_error(f"Error processing row: {str(e)}")
+        parts = {}
+        for field, model in (
+            ("tournament", MatchTournament),
+            ("season", MatchSeason),
+            ("round", MatchRound),
+            ("matchday", MatchMatchday),
+            ("venue", MatchVenue),
+        ):
+            try:
+                data = parse_json_cell(row.get(field), lookups["json"])
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON in {field}: {e}") from e
+            if not data:
+                raise ValueError(f"Missing {field} data")
+            parts[field] = model(**data)
+
+        published = str(row.get("published", "")).lower() == "true"
+        start_date = None
+        if row.get("startDate"):
+            try:
+                start_date = datetime.strptime(row["startDate"], "%Y-%m-%d %H:%M:%S%z")
+            except ValueError as e:
+                raise ValueError(f"Invalid startDate format: {row['startDate']}") from e
+
+        t_alias, s_alias = parts["tournament"].alias, parts["season"].alias
+        r_alias, md_alias = parts["round"].alias, parts["matchday"].alias
+        season = next(
+            (
+                s
+                for s in (lookups["tournaments"].get(t_alias) or {}).get("seasons", [])
+                if s.get("alias") == s_alias
+            ),
+            None,
+        )
+        round_data = next(
+            (r for r in (season or {}).get("rounds", []) if r.get("alias") == r_alias), None
+        )
+        if round_data is None:
+            raise ValueError(f"Round does not exist: {t_alias}/{s_alias}/{r_alias}")
+
+        matchday_key = (t_alias, s_alias, r_alias, md_alias)
+        if not any(md.get("alias") == md_alias for md in round_data.get("matchdays") or []):
+            if matchday_key not in lookups["new_matchdays"]:
+                new_matchday_data = parse_json_cell(row.get("newMatchday"), lookups["json"])
+                if not new_matchday_data:
+                    raise ValueError("Missing newMatchday data for matchday creation")
+                new_matchday = MatchdayBase(**new_matchday_data)
+                new_matchday.published = True
+                lookups["new_matchdays"][matchday_key] = jsonable_encoder(new_matchday)
+
+        home = self._schedule_team(row, "home", lookups["clubs"])
+        away = self._schedule_team(row, "away", lookups["clubs"])
+        match = MatchBase(**parts, published=published, home=home, away=away, startDate=start_date)
+        match_data = jsonable_encoder(match)
+        return {
+            "match": match_data,
+            "key": match_key({**match_data, "startDate": start_date}),
+            "matchday_key": matchday_key,
+            "home": home.fullName,
+            "away": away.fullName,
+        }
 
-            summary = progress.summary()
-            logger.info(summary)
+    @staticmethod
+    def _schedule_team(row: dict[str, Any], side: str, clubs: dict[str, dict]):
+        from models.matches import MatchTeam
+
+        club_alias, team_alias = row.get(f"{side}ClubAlias"), row.get(f"{side}TeamAlias")
+        club = clubs.get(club_alias)
+        if club is None:
+            raise ValueError(f"{side.capitalize()} club not found: {club_alias}")
+        team = next((t for t in club.get("teams") or [] if t.get("alias") == team_alias), None)
+        if team is None:
+            raise ValueError(f"{side.capitalize()} team not found: {club_alias}/{team_alias}")
+        return MatchTeam(
+            clubId=str(club["_id"]),
+            clubName=club.get("name"),
+            clubAlias=club.get("alias"),
+            teamId=str(team["_id"]),
+            teamAlias=team.get("alias"),
+            name=team.get("name"),
+            fullName=team.get("fullName"),
+            shortName=team.get("shortName"),
+            tinyName=team.get("tinyName"),
+            logo=club.get("logoUrl"),
+        )
 
-            result_msg = (
-                f"Created {matches_created} matches, skipped {matches_skipped} existing matches"
+    async def _create_missing_matchdays(
+        self, client, planned: list[dict[str, Any]], lookups: dict[str, Any]
+    ) -> dict[tuple, str]:
+        """Create each missing matchday once; returns the error per matchday that failed"""
+        failed = {}
+        needed = {plan["matchday_key"] for plan in planned} & set(lookups["new_matchdays"])
+        for t_alias, s_alias, r_alias, md_alias in sorted(needed):
+            logger.info(f"Creating new matchday: {t_alias}/{s_alias}/{r_alias}/{md_alias}")
+            response = await client.post(
+                f"/tournaments/{t_alias}/seasons/{s_alias}/rounds/{r_alias}/matchdays",
+                json=lookups["new_matchdays"][(t_alias, s_alias, r_alias, md_alias)],
             )
-            return True, result_msg
+            if response.status_code != 201:
+                failed[(t_alias, s_alias, r_alias, md_alias)] = (
+                    f"Failed to create matchday: {t_alias}/{s_alias}/{r_alias}/{md_alias}"
+                )
+        return failed
 
-        except FileNotFoundError:
-            error_msg = f"CSV file not found: {csv_path}"
-            logger.error(error_msg)
-            return False, error_msg
-        except Exception as e:
-            error_msg = f"Schedule import failed: {str(e)}"
-            logger.error(error_msg)
-            return False, error_msg
+    async def _refresh_schedule_dates(self, client, planned: list[dict[str, Any]]) -> None:
+        """
+        Recalculate start/end dates of every touched round and matchday once.
+
+        Concurrent match creation updates them from parallel requests, so the
+        last write may not have seen every new match; an empty PATCH recomputes
+        them from the matches.
+        """
+        touched = {plan["matchday_key"] for plan in planned}
+        tournaments = {
+            tournament["alias"]: tournament
+            for tournament in self.get_collection("tournaments").find(
+                {"alias": {"$in": list({key[0] for key in touched})}}
+            )
+        }
+        for t_alias, s_alias, r_alias in sorted({key[:3] for key in touched}):
+            season = next(s for s in tournaments[t_alias]["seasons"] if s.get("alias") == s_alias)
+            round_data = next(r for r in season["rounds"] if r.get("alias") == r_alias)
+            base = f"/tournaments/{t_alias}/seasons/{s_alias}/rounds"
+            await client.patch(f"{base}/{round_data['_id']}", json={})
+            for matchday in round_data.get("matchdays") or []:
+                if (t_alias, s_alias, r_alias, matchday.get("alias")) in touched:
+                    await client.patch(f"{base}/{r_alias}/matchdays/{matchday['_id']}", json={})
 
     def import_referees(
         self,
@@ -430,11 +538,17 @@ class ImportService:
         import_all: bool = False,
         send_email: bool = False,
         strategy: str = "merge",
+        dry_run: bool = False,
+        batch_size: int | None = None,
+        report_path: str | None = None,
     ) -> tuple[bool, str]:
         """
         Import referees from a semicolon-delimited CSV file using a configurable strategy.
 
         Existing users are matched by firstName + lastName (case-sensitive).
+        The file is read in chunks (services.csv_ingest); users and club logos
+        are loaded once per chunk and updates are sent with bulk_write.
+        Fields that already hold the CSV value are not written.
 
         CSV columns (semicolon-delimited):
             firstName, lastName, email, club (JSON), level, passNo, ishdLevel
@@ -449,10 +563,7 @@ class ImportService:
             strategy:   Controls how the CSV is reconciled against the database.
 
                         "merge"  (default)
-                            Step 1 — Deactivate all current referees by setting
-                                     referee.active = False on every user that has a
-                                     referee sub-document.
-                            Step 2 — Loop CSV rows:
+                            Rows:
                                 Found   → Reactivate (active=True) and update level,
                                           passNo, ishdLevel.  If the email in the CSV
                                           differs from the stored email, update it too
@@ -460,6 +571,8 @@ class ImportService:
                                           that their login credential has changed.
                                 Not found → Create new user/referee and optionally
                                             send a welcome email.
+                            Afterwards every active referee that no row matched
+                            is deactivated (referee.active = False).
                             Use this strategy for a full roster replacement, e.g.
                             at the start of a new season.
 
@@ -478,6 +591,10 @@ class ImportService:
                             Not found → Skip (no changes made).
                             Use this strategy to refresh data for known referees
                             without creating new accounts.
+            dry_run:     If True, write nothing and send no email; the result and
+                         report describe what would change.
+            batch_size:  Operations per bulk_write (default: settings.IMPORT_BATCH_SIZE)
+            report_path: Optional CSV file receiving one line per row (status, message)
 
         Returns:
             Tuple of (success: bool, message: str)
@@ -495,12 +612,6 @@ class ImportService:
             service.import_referees("data/referees.csv", strategy="update",
                                     import_all=True)
         """
-        import asyncio
-        import csv
-        import json
-        import random
-        import string
-
         # Validate strategy value early so callers get a clear error
         valid_strategies = ("merge", "insert", "update")
         if strategy not in valid_strategies:
@@ -512,8 +623,8 @@ class ImportService:
         if not self.token or not self.headers:
             return False, "Not authenticated. Call authenticate() first."
 
-        clubs_collection = self.get_collection("clubs")
         users_collection = self.get_collection("users")
+        writer = BulkWriter(self.db, batch_size or settings.IMPORT_BATCH_SIZE, dry_run)
 
         # ------------------------------------------------------------------
         # BACKUP — capture all users that carry referee data so we can
@@ -522,333 +633,19 @@ class ImportService:
         # rollback would be both wrong (wrong collection name) and dangerous
         # (would delete all users).  We scope the backup to referee docs only.
         # ------------------------------------------------------------------
-        referee_backup = list(users_collection.find({"referee": {"$exists": True}}))
-        logger.info(f"Backed up {len(referee_backup)} referee user(s) for rollback safety")
+        referee_backup = []
+        if not dry_run:
+            referee_backup = list(users_collection.find({"referee": {"$exists": True}}))
+            logger.info(f"Backed up {len(referee_backup)} referee user(s) for rollback safety")
 
         try:
-            with open(csv_path, encoding="utf-8") as f:
-                reader = csv.DictReader(
-                    f, delimiter=";", quotechar='"', doublequote=True, skipinitialspace=True
-                )
-                rows = list(reader)
-
-            progress = ImportProgress(len(rows), f"Importing referees [{strategy}]")
-            created = 0
-            updated = 0
-            skipped = 0
-            email_changed = 0
-
-            # ------------------------------------------------------------------
-            # MERGE: deactivate all existing referees before processing the CSV.
-            # They will be selectively reactivated as each matching row is found.
-            # Only target documents where 'referee' is a real object (type 3).
-            # Using dot-notation $set on a null referee field causes MongoDB
-            # error 28 "Cannot create field in element {referee: null}".
-            # ------------------------------------------------------------------
-            if strategy == "merge":
-                deactivated = users_collection.update_many(
-                    {"referee": {"$type": "object"}},
-                    {"$set": {"referee.active": False}},
-                )
-                logger.info(
-                    f"[merge] Deactivated {deactivated.modified_count} referee(s) before import"
-                )
-
-            for row in rows:
-                try:
-                    first_name = row.get("firstName", "").strip()
-                    last_name = row.get("lastName", "").strip()
-                    email = (row.get("email") or "").strip()
-
-                    if not email:
-                        progress.add_error(
-                            f"No email for referee {first_name} {last_name} — skipping"
-                        )
-                        continue
-
-                    # Parse club JSON
-                    club_raw = row.get("club")
-                    club = None
-                    if isinstance(club_raw, str) and club_raw.strip():
-                        try:
-                            club = json.loads(club_raw)
-                        except json.JSONDecodeError:
-                            pass
-
-                    if not club:
-                        progress.add_error(f"No club data for referee {email} — skipping")
-                        continue
-
-                    # Enrich club with logoUrl from DB
-                    if club.get("clubId"):
-                        club_doc = clubs_collection.find_one({"_id": club["clubId"]})
-                        if club_doc and club_doc.get("logoUrl"):
-                            club["logoUrl"] = club_doc["logoUrl"]
-
-                    level = (row.get("level") or "n/a").strip()
-                    pass_no = row.get("passNo") or None
-                    ishd_level = row.get("ishdLevel") or None
-
-                    # ----------------------------------------------------------
-                    # Look up the user by firstName + lastName (not by email).
-                    # Email may change between imports; the name is the stable key.
-                    # ----------------------------------------------------------
-                    existing_user = users_collection.find_one(
-                        {"firstName": first_name, "lastName": last_name}
-                    )
-
-                    if existing_user:
-                        # -------------------------------------------------------
-                        # User EXISTS — behaviour depends on strategy
-                        # -------------------------------------------------------
-
-                        if strategy == "insert":
-                            # insert: skip existing users entirely
-                            skipped += 1
-                            progress.update(
-                                message=f"[insert] Skipped existing: {first_name} {last_name}"
-                            )
-                            continue
-
-                        # merge / update: update the referee's fields
-                        stored_email = existing_user.get("email", "")
-                        update_fields: dict = {
-                            "referee.active": True,
-                            "referee.level": level,
-                            "referee.passNo": pass_no,
-                            "referee.ishdLevel": ishd_level,
-                            "referee.club": club,
-                        }
-
-                        # Handle email change
-                        if email != stored_email:
-                            update_fields["email"] = email
-                            email_changed += 1
-                            logger.info(
-                                f"[{strategy}] Email changed for {first_name} {last_name}: "
-                                f"{stored_email} → {email}"
-                            )
-
-                            # Notify the user about the credential change if requested
-                            if send_email:
-                                try:
-                                    from mail_service import send_email as _send_email
-
-                                    subject = "BISHL - Deine Login-E-Mail wurde geändert"
-                                    body = f"""
-<p>Hallo {first_name},</p>
-<p>deine Login-E-Mail-Adresse für dein Schiedsrichter-Account auf www.bishl.de wurde aktualisiert.</p>
-<p>Ab sofort meldest du dich mit folgender E-Mail-Adresse an:</p>
-<ul>
-  <li><strong>Neue E-Mail (Login):</strong> {email}</li>
-</ul>
-<p>Bitte verwende ab sofort diese Adresse, um dich bei www.bishl.de einzuloggen.</p>
-<p>Falls du diese Änderung nicht erwartet hast, melde dich bitte über website@bishl.de</p>
-<p>Viele Grüße,<br>Das BISHL-Team</p>
-"""
-                                    asyncio.run(_send_email(subject, [email], body))
-                                    logger.info(f"Email-change notification sent to {email}")
-                                except Exception as mail_err:
-                                    logger.warning(
-                                        f"Failed to send email-change notification to {email}: {mail_err}"
-                                    )
-
-                        users_collection.update_one(
-                            {"_id": existing_user["_id"]},
-                            {"$set": update_fields},
-                        )
-
-                        # Ensure the REFEREE role is present
-                        roles = existing_user.get("roles", [])
-                        if "REFEREE" not in roles:
-                            roles.append("REFEREE")
-                            users_collection.update_one(
-                                {"_id": existing_user["_id"]}, {"$set": {"roles": roles}}
-                            )
-
-                        updated += 1
-                        progress.update(
-                            message=f"[{strategy}] Updated: {first_name} {last_name} ({email})"
-                        )
-                        continue
-
-                    else:
-                        # -------------------------------------------------------
-                        # User does NOT EXIST — behaviour depends on strategy
-                        # -------------------------------------------------------
-
-                        if strategy == "update":
-                            # update: skip rows where no matching user exists
-                            skipped += 1
-                            progress.update(
-                                message=f"[update] Not found, skipped: {first_name} {last_name}"
-                            )
-                            continue
-
-                        # merge / insert: create a new user account
-
-                    # ----------------------------------------------------------
-                    # CREATE or UPGRADE — reached by merge (not found by name)
-                    # and insert (not found by name).
-                    #
-                    # A user may already exist under a different name match but
-                    # share the same email (e.g. they registered independently
-                    # before becoming a referee).  Check by email first:
-                    #   • Found by email → upgrade: add REFEREE role + set
-                    #     referee sub-document.  No new account is created.
-                    #   • Not found by email → register a brand-new account via
-                    #     the API with a generated password.
-                    # ----------------------------------------------------------
-                    existing_by_email = users_collection.find_one({"email": email})
-
-                    if existing_by_email:
-                        # Upgrade an existing user to referee.
-                        # Set the whole referee sub-document (not dot-notation fields)
-                        # to avoid MongoDB error 28 when the field is currently null.
-                        users_collection.update_one(
-                            {"_id": existing_by_email["_id"]},
-                            {
-                                "$set": {
-                                    "referee": {
-                                        "club": club,
-                                        "level": level,
-                                        "passNo": pass_no,
-                                        "ishdLevel": ishd_level,
-                                        "active": True,
-                                    }
-                                }
-                            },
-                        )
-                        roles = existing_by_email.get("roles", [])
-                        if "REFEREE" not in roles:
-                            roles.append("REFEREE")
-                            users_collection.update_one(
-                                {"_id": existing_by_email["_id"]},
-                                {"$set": {"roles": roles}},
-                            )
-                        updated += 1
-                        progress.update(
-                            message=f"[{strategy}] Upgraded existing user to referee: {email}"
-                        )
-
-                        # Send notification email to the upgraded user
-                        if send_email:
-                            try:
-                                from mail_service import send_email as _send_email
-
-                                user_first_name = existing_by_email.get("firstName", "")
-                                subject = "BISHL - Du bist nun auch Schiedsrichter"
-                                body = f"""
-<p>Hallo {user_first_name},</p>
-<p>du bist jetzt als Schiedsrichter bei der BISHL registriert.</p>
-<p>Du kannst dich mit deinen bekannten Login-Daten anmelden:</p>
-<ul>
-  <li><strong>E-Mail:</strong> {email}</li>
-  <li><strong>Passwort:</strong> Dein bestehendes Passwort</li>
-</ul>
-<p>Bitte logge dich bei www.bishl.de ein und aktualisiere dein Profil mit deinen Schiedsrichter-Daten, falls nötig.</p>
-<p>Falls du Fragen hast, melde dich bitte über website@bishl.de</p>
-<p>Viele Grüße,<br>Das BISHL-Team</p>
-"""
-                                asyncio.run(_send_email(subject, [email], body))
-                                logger.info(f"Referee upgrade notification sent to {email}")
-                            except Exception as mail_err:
-                                logger.warning(
-                                    f"Failed to send upgrade notification to {email}: {mail_err}"
-                                )
-
-                        # Upgrades are idempotent updates — do NOT apply the
-                        # import_all safety stop here.  That stop only makes sense
-                        # for brand-new account creation where a random password
-                        # was generated and a single test-creation is desired.
-                        continue
-
-                    # No match by email either — register a brand-new account
-                    random_password = "".join(
-                        random.choices(string.ascii_letters + string.digits, k=12)
-                    )
-
-                    new_user = {
-                        "email": email,
-                        "password": random_password,
-                        "firstName": first_name,
-                        "lastName": last_name,
-                        "roles": ["REFEREE"],
-                        "referee": {
-                            "club": club,
-                            "level": level,
-                            "passNo": pass_no,
-                            "ishdLevel": ishd_level,
-                            "active": True,
-                        },
-                    }
-
-                    register_url = f"{self.base_url}/users/register"
-                    response = self.session.post(register_url, json=new_user)
-
-                    if response.status_code == 201:
-                        created += 1
-                        progress.update(message=f"[{strategy}] Created: {email}")
-
-                        # Optionally send welcome email to new referee
-                        if send_email:
-                            try:
-                                from mail_service import send_email as _send_email
-
-                                subject = "BISHL - Schiedsrichter-Account angelegt"
-                                body = f"""
-<p>Hallo {first_name},</p>
-<p>dein Schiedsrichter-Account wurde erfolgreich angelegt.</p>
-<p>Hier sind deine Login-Details:</p>
-<ul>
-  <li><strong>E-Mail:</strong> {email}</li>
-  <li><strong>Passwort:</strong> {random_password}</li>
-</ul>
-<p>Bitte logge dich bei www.bishl.de ein und ändere dein Passwort.</p>
-<p>Falls du Fragen hast, melde dich bitte über website@bishl.de</p>
-<p>Viele Grüße,<br>Das BISHL-Team</p>
-"""
-                                asyncio.run(_send_email(subject, [email], body))
-                                logger.info(f"Welcome email sent to {email}")
-                            except Exception as mail_err:
-                                logger.warning(
-                                    f"Failed to send welcome email to {email}: {mail_err}"
-                                )
-                        else:
-                            logger.info(
-                                f"Skipping welcome email for {email} (--send-email not set)"
-                            )
-
-                        if not import_all:
-                            logger.info(
-                                "--import-all not set, stopping after first created referee"
-                            )
-                            break
-                    else:
-                        progress.add_error(
-                            f"Failed to register {email} "
-                            f"(HTTP {response.status_code}): {response.text}"
-                        )
-
-                except json.JSONDecodeError as e:
-                    progress.add_error(
-                        f"Invalid JSON in row for {row.get('firstName', '?')} "
-                        f"{row.get('lastName', '?')}: {e}"
-                    )
-                except Exception as e:
-                    progress.add_error(
-                        f"Error processing row {row.get('firstName', '?')} "
-                        f"{row.get('lastName', '?')}: {e}"
-                    )
-
-            summary = progress.summary()
-            logger.info(summary)
-
-            result_msg = (
-                f"Referees [{strategy}]: {created} created, {updated} updated "
-                f"({email_changed} email change(s)), {skipped} skipped"
+            results, notices, matched, registered = self._ingest_referees(
+                csv_path, import_all, strategy, writer
             )
-            return True, result_msg
+            deactivated = 0
+            if strategy == "merge":
+                deactivated = self._deactivate_unmatched_referees(writer, matched, registered)
+            writer.flush()
 
         except FileNotFoundError:
             error_msg = f"CSV file not found: {csv_path}"
@@ -886,11 +683,249 @@ class ImportService:
 
             return False, error_msg
 
-    def import_hobby_players(self, csv_path: str, import_all: bool = False) -> tuple[bool, str]:
+        # Notifications go out once their writes are stored
+        for kind, email, values in notices:
+            if dry_run or not send_email:
+                logger.info(f"Not sending {kind} email to {email} (--send-email not set)")
+                continue
+            self._send_referee_mail(kind, email, values)
+
+        counts = self._report_rows(results, report_path)
+        email_changed = sum(1 for kind, _, _ in notices if kind == "email_changed")
+        result_msg = (
+            f"Referees [{strategy}]: {counts['created']} created, {counts['updated']} updated "
+            f"({email_changed} email change(s)), {counts['unchanged']} unchanged, "
+            f"{counts['skipped']} skipped, {deactivated} deactivated, {counts['error']} errors"
+        )
+        if dry_run:
+            result_msg = f"Dry run, nothing written — {result_msg}"
+        return True, result_msg
+
+    def _ingest_referees(
+        self, csv_path: str, import_all: bool, strategy: str, writer: BulkWriter
+    ) -> tuple[list[RowResult], list[tuple[str, str, dict]], set, set[str]]:
+        """
+        Plan and queue the writes of every referee row.
+
+        Returns the row results, the notifications (kind, email, template
+        values), the _ids of the existing users the rows matched and the
+        emails of the referees registered through the API.
+        """
+        users_collection = self.get_collection("users")
+        clubs_collection = self.get_collection("clubs")
+        json_cache: dict[str, Any] = {}
+        logo_urls: dict[Any, str | None] = {}
+        by_name: dict[tuple[str, str], dict] = {}
+        by_email: dict[str, dict] = {}
+        registered: set[str] = set()
+        matched: set = set()
+        results: list[RowResult] = []
+        notices: list[tuple[str, str, dict]] = []
+
+        for chunk in read_csv_chunks(csv_path, settings.IMPORT_CHUNK_SIZE):
+            first_names, last_names = chunk.text("firstName"), chunk.text("lastName")
+            emails, levels = chunk.text("email"), chunk.text("level")
+            pass_nos, ishd_levels = chunk.text("passNo"), chunk.text("ishdLevel")
+            clubs = chunk.json("club", json_cache)
+            chunk.require(emails, "No email — skipping")
+            chunk.require(clubs, "No club data — skipping")
+            valid = list(chunk.valid())
+
+            # One query per chunk for the users, one for the club logos
+            for user in users_collection.find(
+                {
+                    "$or": [
+                        {"lastName": {"$in": list({last_names[i] for i in valid})}},
+                        {"email": {"$in": list({emails[i] for i in valid})}},
+                    ]
+                },
+                {"firstName": 1, "lastName": 1, "email": 1, "roles": 1, "referee": 1},
+            ):
+                by_name.setdefault((user.get("firstName"), user.get("lastName")), user)
+                by_email.setdefault(user.get("email"), user)
+            club_ids = {clubs[i].get("clubId") for i in valid} - set(logo_urls) - {None}
+            if club_ids:
+                logo_urls.update(dict.fromkeys(club_ids))
+                for club_doc in clubs_collection.find(
+                    {"_id": {"$in": list(club_ids)}}, {"logoUrl": 1}
+                ):
+                    logo_urls[club_doc["_id"]] = club_doc.get("logoUrl")
+
+            stop = False
+            for i in valid:
+                number, email = chunk.numbers[i], emails[i]
+                name = f"{first_names[i]} {last_names[i]}"
+                club = clubs[i]
+                if logo_urls.get(club.get("clubId")):
+                    club = {**club, "logoUrl": logo_urls[club["clubId"]]}
+                referee = {
+                    "club": club,
+                    "level": levels[i] or "n/a",
+                    "passNo": pass_nos[i] or None,
+                    "ishdLevel": ishd_levels[i] or None,
+                    "active": True,
+                }
+
+                # ----------------------------------------------------------
+                # Look up the user by firstName + lastName (not by email).
+                # Email may change between imports; the name is the stable key.
+                # ----------------------------------------------------------
+                user = by_name.get((first_names[i], last_names[i]))
+                if user is not None:
+                    if strategy == "insert":
+                        results.append(RowResult(number, "skipped", f"Exists: {name}"))
+                        continue
+                    matched.add(user["_id"])
+                    # Dot-notation $set on a null referee field causes MongoDB
+                    # error 28, so a missing sub-document is set as a whole.
+                    if isinstance(user.get("referee"), dict):
+                        fields = {f"referee.{key}": value for key, value in referee.items()}
+                    else:
+                        fields = {"referee": referee}
+                    if email != user.get("email"):
+                        fields["email"] = email
+                        notices.append(("email_changed", email, {"first_name": first_names[i]}))
+                        logger.info(
+                            f"[{strategy}] Email changed for {name}: {user.get('email')} → {email}"
+                        )
+                elif strategy == "update":
+                    results.append(RowResult(number, "skipped", f"Not found: {name}"))
+                    continue
+                elif (user := by_email.get(email)) is not None:
+                    # A user registered independently before becoming a
+                    # referee: upgrade the account instead of creating one.
+                    matched.add(user["_id"])
+                    fields = {"referee": referee}
+                    notices.append(("upgraded", email, {"first_name": user.get("firstName", "")}))
+                elif email in registered:
+                    results.append(RowResult(number, "skipped", f"Duplicate row: {email}"))
+                    continue
+                else:
+                    results.append(
+                        self._register_referee(
+                            number, first_names[i], last_names[i], email, referee, writer, notices
+                        )
+                    )
+                    registered.add(email)
+                    if results[-1].status == "created" and not import_all:
+                        logger.info("--import-all not set, stopping after first created referee")
+                        stop = True
+                        break
+                    continue
+
+                roles = user.get("roles") or []
+                if "REFEREE" not in roles:
+                    fields["roles"] = [*roles, "REFEREE"]
+                change = plan_update(writer, "users", user, fields)
+                if change:
+                    results.append(RowResult(number, "updated", f"{name}: {change}"))
+                else:
+                    results.append(RowResult(number, "unchanged", name))
+
+            results += [
+                RowResult(chunk.numbers[i], "error", message) for i, message in chunk.errors.items()
+            ]
+            if stop:
+                break
+
+        return sorted(results, key=lambda result: result.row), notices, matched, registered
+
+    def _register_referee(
+        self,
+        number: int,
+        first_name: str,
+        last_name: str,
+        email: str,
+        referee: dict[str, Any],
+        writer: BulkWriter,
+        notices: list[tuple[str, str, dict]],
+    ) -> RowResult:
+        """Register a new referee account through the API with a generated password"""
+        import random
+        import string
+
+        if writer.dry_run:
+            return RowResult(number, "created", f"Would register {email}")
+
+        random_password = "".join(random.choices(string.ascii_letters + string.digits, k=12))
+        new_user = {
+            "email": email,
+            "password": random_password,
+            "firstName": first_name,
+            "lastName": last_name,
+            "roles": ["REFEREE"],
+            "referee": referee,
+        }
+        response = self.session.post(f"{self.base_url}/users/register", json=new_user)
+        if response.status_code != 201:
+            return RowResult(
+                number,
+                "error",
+                f"Failed to register {email} (HTTP {response.status_code}): {response.text}",
+            )
+        notices.append(("created", email, {"first_name": first_name, "password": random_password}))
+        return RowResult(number, "created", f"Registered {email}")
+
+    def _deactivate_unmatched_referees(
+        self, writer: BulkWriter, matched: set, registered: set[str]
+    ) -> int:
+        """merge: deactivate the active referees no CSV row matched or registered"""
+        deactivated = 0
+        # Only documents where 'referee' is a real object: dot-notation $set on
+        # a null referee fails with MongoDB error 28.
+        for user in self.get_collection("users").find(
+            {"referee": {"$type": "object"}, "referee.active": {"$ne": False}},
+            {"firstName": 1, "lastName": 1, "email": 1},
+        ):
+            # Users registered by this run are already in users but not in matched
+            if user["_id"] in matched or user.get("email") in registered:
+                continue
+            writer.update("users", {"_id": user["_id"]}, {"referee.active": False})
+            deactivated += 1
+            logger.info(f"[merge] Deactivate {user.get('firstName')} {user.get('lastName')}")
+        return deactivated
+
+    def _send_referee_mail(self, kind: str, email: str, values: dict[str, str]) -> None:
+        """Send one of REFEREE_MAILS; failures are logged, not raised"""
+        from mail_service import send_email as _send_email
+
+        subject, body = REFEREE_MAILS[kind]
+        try:
+            asyncio.run(_send_email(subject, [email], body.format(email=email, **values)))
+            logger.info(f"Referee {kind} email sent to {email}")
+        except Exception as mail_err:
+            logger.warning(f"Failed to send referee {kind} email to {email}: {mail_err}")
+
+    @staticmethod
+    def _report_rows(results: list[RowResult], report_path: str | None) -> dict[str, int]:
+        """Write the row report, log the errors and count the rows per status"""
+        if report_path:
+            write_row_report(report_path, results)
+            logger.info(f"Row report written to {report_path}")
+        counts: dict[str, int] = defaultdict(int)
+        for result in results:
+            counts[result.status] += 1
+            if result.status == "error":
+                logger.warning(f"Row {result.row}: {result.message}")
+            elif result.status != "unchanged":
+                logger.info(f"Row {result.row}: {result.status} {result.message}")
+        logger.info(", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+        return counts
+
+    def import_hobby_players(
+        self,
+        csv_path: str,
+        import_all: bool = False,
+        dry_run: bool = False,
+        batch_size: int | None = None,
+        report_path: str | None = None,
+    ) -> tuple[bool, str]:
         """
         Import hobby players from a semicolon-delimited CSV file.
 
-        Identifies players by firstName + lastName + birthdate.
+        Identifies players by firstName + lastName + birthdate. The file is read
+        in chunks (services.csv_ingest); players and clubs are loaded once per
+        chunk and assignedTeams updates are sent with bulk_write.
 
         CSV columns (semicolon-delimited):
             clubAlias, teamAlias, updateMode, firstName, lastName, birthdate
@@ -906,302 +941,25 @@ class ImportService:
                      Identified by firstName + lastName; birthdate is optional
                      (if multiple players share the same name, all are processed).
 
+        Args:
+            csv_path: Path to the CSV file.
+            import_all: If False, stop after the first processed row.
+            dry_run: If True, write nothing; the result and report describe
+                     what would change.
+            batch_size: Operations per bulk_write (default: settings.IMPORT_BATCH_SIZE)
+            report_path: Optional CSV file receiving one line per row (status, message)
+
         Returns:
             Tuple of (success: bool, message: str)
         """
-        import csv
-        from datetime import datetime
-
-        from models.clubs import ClubDB, TeamDB
-        from models.players import AssignedClubs, AssignedTeams, PlayerDB, Source
-
         if not self.token or not self.headers:
             return False, "Not authenticated. Call authenticate() first."
 
-        players_collection = self.get_collection("players")
-
+        writer = BulkWriter(self.db, batch_size or settings.IMPORT_BATCH_SIZE, dry_run)
+        tally = {"created": 0, "added": 0, "removed": 0, "skipped": 0}
         try:
-            with open(csv_path, encoding="utf-8") as f:
-                reader = csv.DictReader(
-                    f, delimiter=";", quotechar='"', doublequote=True, skipinitialspace=True
-                )
-                rows = list(reader)
-
-            progress = ImportProgress(len(rows), "Importing hobby players")
-            created = 0
-            added = 0
-            removed = 0
-            skipped = 0
-
-            for row in rows:
-                try:
-                    first_name = (row.get("firstName") or row.get("Vorname") or "").strip()
-                    last_name = (row.get("lastName") or row.get("Nachname") or "").strip()
-                    club_alias = (row.get("clubAlias") or "").strip()
-                    team_alias = (row.get("teamAlias") or "").strip()
-                    update_mode = (row.get("updateMode") or "").strip().upper()
-                    birthdate_raw = (row.get("birthdate") or "").strip()
-
-                    if not first_name or not last_name:
-                        progress.add_error(f"Missing firstName/lastName in row: {row}")
-                        continue
-
-                    if not club_alias or not team_alias:
-                        progress.add_error(
-                            f"Missing clubAlias/teamAlias for {first_name} {last_name}"
-                        )
-                        continue
-
-                    if update_mode not in ("ADD", "REMOVE"):
-                        progress.add_error(
-                            f"Unknown updateMode '{update_mode}' for {first_name} {last_name}"
-                        )
-                        continue
-
-                    modify_date = datetime.now()
-
-                    # ----------------------------------------------------------
-                    # REMOVE: find by name (birthdate optional), remove team
-                    # ----------------------------------------------------------
-                    if update_mode == "REMOVE":
-                        query: dict = {"firstName": first_name, "lastName": last_name}
-                        if birthdate_raw:
-                            try:
-                                birthdate = datetime.strptime(birthdate_raw, "%d.%m.%Y")
-                                query["birthdate"] = birthdate
-                            except ValueError:
-                                pass  # birthdate is optional for REMOVE
-
-                        matching_players = list(players_collection.find(query))
-                        if not matching_players:
-                            progress.add_error(
-                                f"REMOVE: Player not found: {first_name} {last_name}"
-                            )
-                            continue
-
-                        for player_doc in matching_players:
-                            player = PlayerDB(**player_doc)
-                            player_id = player_doc["_id"]
-
-                            assigned_clubs = list(player.assignedTeams or [])
-                            new_assigned_clubs = []
-                            team_found = False
-
-                            for ac in assigned_clubs:
-                                if ac.clubAlias == club_alias:
-                                    remaining_teams = [
-                                        t for t in ac.teams if t.teamAlias != team_alias
-                                    ]
-                                    if len(remaining_teams) < len(ac.teams):
-                                        team_found = True
-                                    if remaining_teams:
-                                        ac.teams = remaining_teams
-                                        new_assigned_clubs.append(ac)
-                                    # else: drop club entirely (no more teams)
-                                else:
-                                    new_assigned_clubs.append(ac)
-
-                            if not team_found:
-                                logger.info(
-                                    f"REMOVE: Team '{team_alias}' not found in "
-                                    f"{first_name} {last_name}'s assignments"
-                                )
-                                continue
-
-                            assignments_data = [ac.model_dump() for ac in new_assigned_clubs]
-                            players_collection.update_one(
-                                {"_id": player_id},
-                                {"$set": {"assignedTeams": assignments_data}},
-                            )
-                            removed += 1
-                            progress.update(
-                                message=f"REMOVE: Removed {team_alias} from {first_name} {last_name}"
-                            )
-
-                        if not import_all:
-                            logger.info("--import-all not set, stopping after first REMOVE")
-                            break
-                        continue
-
-                    # ----------------------------------------------------------
-                    # ADD: birthdate is mandatory
-                    # ----------------------------------------------------------
-                    if not birthdate_raw:
-                        progress.add_error(
-                            f"{update_mode}: birthdate is mandatory for {first_name} {last_name}"
-                        )
-                        continue
-
-                    try:
-                        birthdate = datetime.strptime(birthdate_raw, "%d.%m.%Y")
-                    except ValueError:
-                        progress.add_error(
-                            f"{update_mode}: Invalid birthdate format '{birthdate_raw}' "
-                            f"for {first_name} {last_name}"
-                        )
-                        continue
-
-                    # Look up the club in the DB
-                    club_res = self.db.clubs.find_one({"alias": club_alias})
-                    if club_res is None:
-                        progress.add_error(f"Club '{club_alias}' not found in DB")
-                        continue
-                    club = ClubDB(**club_res)
-
-                    # Look up the team via API
-                    team_url = f"{self.base_url}/clubs/{club_alias}/teams/{team_alias}"
-                    team_response = self.session.get(team_url)
-                    if team_response.status_code != 200:
-                        progress.add_error(
-                            f"Team '{team_alias}' not found via API "
-                            f"(HTTP {team_response.status_code})"
-                        )
-                        continue
-
-                    team_data = team_response.json()
-                    if "data" in team_data:
-                        team_data = team_data["data"]
-                    team_db = TeamDB(**team_data)
-
-                    # Find existing player by name + birthdate
-                    player_query = {
-                        "firstName": first_name,
-                        "lastName": last_name,
-                        "birthdate": birthdate,
-                    }
-                    existing_doc = players_collection.find_one(player_query)
-
-                    if existing_doc:
-                        player = PlayerDB(**existing_doc)
-                        player_id = existing_doc["_id"]
-                        logger.info(f"ADD: Player {first_name} {last_name} exists")
-                    else:
-                        # Create player via API.
-                        # The /players/ endpoint uses Form() fields, so we must send
-                        # multipart/form-data (not JSON).  The session has
-                        # Content-Type: application/json baked in, so we override it
-                        # for this request only by passing headers= explicitly.
-                        form_data = {
-                            "firstName": first_name,
-                            "lastName": last_name,
-                            "displayFirstName": first_name,
-                            "displayLastName": last_name,
-                            "birthdate": birthdate.strftime("%Y-%m-%dT%H:%M:%S"),
-                            "managedByISHD": "false",
-                            "source": "BISHL",
-                        }
-                        create_response = self.session.post(
-                            f"{self.base_url}/players",
-                            data=form_data,
-                            headers={"Content-Type": "application/x-www-form-urlencoded"},
-                        )
-                        if create_response.status_code != 201:
-                            progress.add_error(
-                                f"{update_mode}: Failed to create player "
-                                f"{first_name} {last_name} "
-                                f"(HTTP {create_response.status_code}): {create_response.text}"
-                            )
-                            continue
-
-                        player_id = create_response.json()["data"]["_id"]
-                        # The router stores _id as a plain string (str(ObjectId())),
-                        # NOT as a BSON ObjectId.  Querying with ObjectId(player_id)
-                        # would never match — use the raw string directly.
-                        existing_doc = players_collection.find_one({"_id": player_id})
-                        if not existing_doc:
-                            progress.add_error(
-                                f"{update_mode}: Could not fetch newly created player "
-                                f"{first_name} {last_name}"
-                            )
-                            continue
-                        player = PlayerDB(**existing_doc)
-                        player_id = existing_doc["_id"]
-                        created += 1
-                        logger.info(f"{update_mode}: Created player {first_name} {last_name}")
-
-                    # Build the new team assignment object
-                    new_team = AssignedTeams(
-                        teamId=str(team_db.id),
-                        passNo=row.get("passNo", "H-LIGA"),
-                        active=False,
-                        source=Source.BISHL,
-                        modifyDate=modify_date,
-                        teamName=team_db.name,
-                        teamAlias=team_db.alias,
-                        teamIshdId=team_db.ishdId if team_db.ishdId is not None else "",
-                        teamAgeGroup=team_db.ageGroup,
-                    )
-
-                    assigned_clubs = [
-                        AssignedClubs(**ac.model_dump()) for ac in (player.assignedTeams or [])
-                    ]
-
-                    existing_club = next(
-                        (ac for ac in assigned_clubs if ac.clubId == str(club.id)), None
-                    )
-
-                    if existing_club:
-                        existing_team = next(
-                            (t for t in existing_club.teams if t.teamAlias == team_alias), None
-                        )
-                        if existing_team:
-                            skipped += 1
-                            progress.update(
-                                message=f"ADD: {first_name} {last_name} already in {team_alias}, skipped"
-                            )
-                            if not import_all:
-                                break
-                            continue
-                        else:
-                            existing_club.teams.append(new_team)
-                    else:
-                        assigned_clubs.append(
-                            AssignedClubs(
-                                clubId=str(club.id),
-                                clubName=club.name,
-                                clubAlias=club_alias,
-                                clubIshdId=club.ishdId if club.ishdId is not None else 0,
-                                teams=[new_team],
-                            )
-                        )
-
-                    assignments_data = [ac.model_dump() for ac in assigned_clubs]
-                    update_result = players_collection.update_one(
-                        {"_id": player_id},
-                        {"$set": {"assignedTeams": assignments_data, "managedByISHD": False}},
-                    )
-
-                    if update_result.matched_count == 0:
-                        progress.add_error(
-                            f"{update_mode}: Player document not found for update: "
-                            f"{first_name} {last_name}"
-                        )
-                        continue
-
-                    added += 1
-                    progress.update(
-                        message=f"{update_mode}: Added {team_alias} to {first_name} {last_name}"
-                    )
-
-                    if not import_all:
-                        logger.info("--import-all not set, stopping after first processed row")
-                        break
-
-                except Exception as e:
-                    progress.add_error(
-                        f"Error processing row {row.get('firstName', '?')} "
-                        f"{row.get('lastName', '?')}: {e}"
-                    )
-
-            summary = progress.summary()
-            logger.info(summary)
-
-            result_msg = (
-                f"Hobby players: {created} created, {added} team assignment(s) added, "
-                f"{removed} removed, {skipped} skipped"
-            )
-            return True, result_msg
-
+            results = self._ingest_hobby_players(csv_path, import_all, writer, tally)
+            writer.flush()
         except FileNotFoundError:
             error_msg = f"CSV file not found: {csv_path}"
             logger.error(error_msg)
@@ -1211,6 +969,266 @@ class ImportService:
             logger.opt(exception=True).error("Hobby player import failed: {}", e)
             return False, error_msg
 
+        counts = self._report_rows(results, report_path)
+        result_msg = (
+            f"Hobby players: {tally['created']} created, {tally['added']} team assignment(s) "
+            f"added, {tally['removed']} removed, {tally['skipped']} skipped, "
+            f"{counts['error']} errors"
+        )
+        if dry_run:
+            result_msg = f"Dry run, nothing written — {result_msg}"
+        return True, result_msg
+
+    def _ingest_hobby_players(
+        self, csv_path: str, import_all: bool, writer: BulkWriter, tally: dict[str, int]
+    ) -> list[RowResult]:
+        """Plan and queue the writes of every hobby player row"""
+        players_collection = self.get_collection("players")
+        clubs_collection = self.get_collection("clubs")
+        clubs: dict[str, dict | None] = {}
+        teams: dict[tuple[str, str], Any] = {}
+        players: dict[tuple[str, str], list[dict]] = {}
+        birthdates: dict[str, datetime | None] = {}
+        results: list[RowResult] = []
+
+        for chunk in read_csv_chunks(csv_path, settings.IMPORT_CHUNK_SIZE):
+            first_names = chunk.text("firstName", "Vorname")
+            last_names = chunk.text("lastName", "Nachname")
+            club_aliases, team_aliases = chunk.text("clubAlias"), chunk.text("teamAlias")
+            modes = [mode.upper() for mode in chunk.text("updateMode")]
+            pass_nos = chunk.text("passNo")
+            chunk.require(
+                [f and n for f, n in zip(first_names, last_names, strict=True)],
+                "Missing firstName/lastName",
+            )
+            chunk.require(
+                [c and t for c, t in zip(club_aliases, team_aliases, strict=True)],
+                "Missing clubAlias/teamAlias",
+            )
+            for i, mode in enumerate(modes):
+                if mode not in ("ADD", "REMOVE"):
+                    chunk.reject(i, f"Unknown updateMode '{mode}'")
+            for i, raw in enumerate(chunk.text("birthdate")):
+                if raw not in birthdates:
+                    try:
+                        birthdates[raw] = datetime.strptime(raw, "%d.%m.%Y")
+                    except ValueError:
+                        birthdates[raw] = None
+                # birthdate is optional for REMOVE
+                if modes[i] == "ADD" and birthdates[raw] is None:
+                    chunk.reject(i, f"ADD: birthdate missing or invalid: '{raw}'")
+            birthdate_column = [birthdates[raw] for raw in chunk.text("birthdate")]
+            valid = list(chunk.valid())
+
+            # One query per chunk for the players, one for clubs not seen yet
+            for player in players_collection.find(
+                {"lastName": {"$in": list({last_names[i] for i in valid})}},
+                {
+                    "firstName": 1,
+                    "lastName": 1,
+                    "birthdate": 1,
+                    "assignedTeams": 1,
+                    "managedByISHD": 1,
+                },
+            ):
+                same_name = players.setdefault((player["firstName"], player["lastName"]), [])
+                if all(p["_id"] != player["_id"] for p in same_name):
+                    same_name.append(player)
+            new_aliases = {club_aliases[i] for i in valid if modes[i] == "ADD"} - set(clubs)
+            if new_aliases:
+                clubs.update(dict.fromkeys(new_aliases))
+                for club in clubs_collection.find({"alias": {"$in": list(new_aliases)}}):
+                    clubs[club["alias"]] = club
+
+            stop = False
+            for i in valid:
+                row = {
+                    "first_name": first_names[i],
+                    "last_name": last_names[i],
+                    "club_alias": club_aliases[i],
+                    "team_alias": team_aliases[i],
+                    "birthdate": birthdate_column[i],
+                    "pass_no": pass_nos[i] or "H-LIGA",
+                }
+                plan = self._plan_hobby_add if modes[i] == "ADD" else self._plan_hobby_remove
+                try:
+                    status, message = plan(row, players, clubs, teams, writer, tally)
+                except Exception as e:
+                    status, message = "error", str(e)
+                results.append(RowResult(chunk.numbers[i], status, message))
+                if status != "error" and not import_all:
+                    logger.info("--import-all not set, stopping after first processed row")
+                    stop = True
+                    break
+
+            results += [
+                RowResult(chunk.numbers[i], "error", message) for i, message in chunk.errors.items()
+            ]
+            if stop:
+                break
+
+        return sorted(results, key=lambda result: result.row)
+
+    def _plan_hobby_remove(self, row, players, clubs, teams, writer, tally) -> tuple[str, str]:
+        """REMOVE: find by name (birthdate optional), remove the team from each match"""
+        name = f"{row['first_name']} {row['last_name']}"
+        matching = [
+            player
+            for player in players.get((row["first_name"], row["last_name"]), [])
+            if row["birthdate"] is None or player.get("birthdate") == row["birthdate"]
+        ]
+        if not matching:
+            return "error", f"REMOVE: Player not found: {name}"
+
+        removed = 0
+        for player in matching:
+            assigned_clubs = []
+            team_found = False
+            for assigned_club in player.get("assignedTeams") or []:
+                if assigned_club.get("clubAlias") != row["club_alias"]:
+                    assigned_clubs.append(assigned_club)
+                    continue
+                remaining = [
+                    team
+                    for team in assigned_club.get("teams") or []
+                    if team.get("teamAlias") != row["team_alias"]
+                ]
+                team_found = team_found or len(remaining) < len(assigned_club.get("teams") or [])
+                if remaining:
+                    assigned_clubs.append({**assigned_club, "teams": remaining})
+                # else: drop club entirely (no more teams)
+            if team_found:
+                plan_update(writer, "players", player, {"assignedTeams": assigned_clubs})
+                removed += 1
+
+        if not removed:
+            tally["skipped"] += 1
+            return "skipped", f"REMOVE: {row['team_alias']} not in {name}'s assignments"
+        tally["removed"] += removed
+        return "updated", f"REMOVE: Removed {row['team_alias']} from {name} ({removed} player(s))"
+
+    def _plan_hobby_add(self, row, players, clubs, teams, writer, tally) -> tuple[str, str]:
+        """ADD: create the player if needed and add the team to assignedTeams"""
+        from models.clubs import TeamDB
+        from models.players import AssignedClubs, AssignedTeams, Source
+
+        name = f"{row['first_name']} {row['last_name']}"
+        club = clubs.get(row["club_alias"])
+        if club is None:
+            return "error", f"Club '{row['club_alias']}' not found in DB"
+
+        # The team is looked up via the API once per club and team
+        team_key = (row["club_alias"], row["team_alias"])
+        if team_key not in teams:
+            team_response = self.session.get(
+                f"{self.base_url}/clubs/{row['club_alias']}/teams/{row['team_alias']}"
+            )
+            if team_response.status_code != 200:
+                teams[team_key] = (
+                    f"Team '{row['team_alias']}' not found via API "
+                    f"(HTTP {team_response.status_code})"
+                )
+            else:
+                team_data = team_response.json()
+                teams[team_key] = TeamDB(**team_data.get("data", team_data))
+        team = teams[team_key]
+        if isinstance(team, str):
+            return "error", team
+
+        same_name = players.setdefault((row["first_name"], row["last_name"]), [])
+        player = next((p for p in same_name if p.get("birthdate") == row["birthdate"]), None)
+        created = player is None
+        if created:
+            player = self._create_hobby_player(row, writer)
+            same_name.append(player)
+            tally["created"] += 1
+
+        assigned_clubs = [
+            {**assigned_club, "teams": list(assigned_club.get("teams") or [])}
+            for assigned_club in player.get("assignedTeams") or []
+        ]
+        existing_club = next(
+            (ac for ac in assigned_clubs if ac.get("clubId") == str(club["_id"])), None
+        )
+        if existing_club and any(
+            team_doc.get("teamAlias") == row["team_alias"] for team_doc in existing_club["teams"]
+        ):
+            tally["skipped"] += 1
+            return "skipped", f"ADD: {name} already in {row['team_alias']}"
+
+        new_team = AssignedTeams(
+            teamId=str(team.id),
+            passNo=row["pass_no"],
+            active=False,
+            source=Source.BISHL,
+            modifyDate=datetime.now(),
+            teamName=team.name,
+            teamAlias=team.alias,
+            teamIshdId=team.ishdId if team.ishdId is not None else "",
+            teamAgeGroup=team.ageGroup,
+        ).model_dump()
+        if existing_club:
+            existing_club["teams"].append(new_team)
+        else:
+            assigned_clubs.append(
+                AssignedClubs(
+                    clubId=str(club["_id"]),
+                    clubName=club.get("name"),
+                    clubAlias=row["club_alias"],
+                    clubIshdId=club.get("ishdId") or 0,
+                    teams=[new_team],
+                ).model_dump()
+            )
+
+        fields = {"assignedTeams": assigned_clubs, "managedByISHD": False}
+        if player["_id"] is None:  # dry run, the player would be created
+            apply_set(player, fields)
+        else:
+            plan_update(writer, "players", player, fields)
+        tally["added"] += 1
+        verb = "Would create" if player["_id"] is None else "Created" if created else "Existing"
+        return (
+            "created" if created else "updated",
+            f"ADD: {verb} {name}, added {row['team_alias']}",
+        )
+
+    def _create_hobby_player(self, row: dict[str, Any], writer: BulkWriter) -> dict[str, Any]:
+        """Create a player through the API; in a dry run only a placeholder"""
+        if writer.dry_run:
+            return {"_id": None, "birthdate": row["birthdate"], "assignedTeams": []}
+
+        # The /players/ endpoint uses Form() fields, so we must send
+        # multipart/form-data (not JSON).  The session has
+        # Content-Type: application/json baked in, so we override it
+        # for this request only by passing headers= explicitly.
+        form_data = {
+            "firstName": row["first_name"],
+            "lastName": row["last_name"],
+            "displayFirstName": row["first_name"],
+            "displayLastName": row["last_name"],
+            "birthdate": row["birthdate"].strftime("%Y-%m-%dT%H:%M:%S"),
+            "managedByISHD": "false",
+            "source": "BISHL",
+        }
+        response = self.session.post(
+            f"{self.base_url}/players",
+            data=form_data,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        if response.status_code != 201:
+            raise ValueError(
+                f"ADD: Failed to create player {row['first_name']} {row['last_name']} "
+                f"(HTTP {response.status_code}): {response.text}"
+            )
+        # The router stores _id as a plain string (str(ObjectId())), NOT as a
+        # BSON ObjectId, so the raw string is the filter for the update.
+        logger.info(f"ADD: Created player {row['first_name']} {row['last_name']}")
+        return {
+            "_id": response.json()["data"]["_id"],
+            "birthdate": row["birthdate"],
+            "assignedTeams": [],
+        }
+
     def import_with_rollback(
         self, import_func: Callable, collection_name: str, backup_before: bool = True
     ) -> tuple[bool, str]:
@@ -1319,3 +1337,12 @@ class ImportProgress:
                 summary += f"\n  ... and {len(self.errors) - 10} more errors"
 
         return summary
+
+
+def match_key(match: dict[str, Any]) -> tuple:
+    """Identity of a scheduled match: start (naive UTC, as stored) and both teams"""
+    start = match.get("startDate")
+    if isinstance(start, datetime) and start.tzinfo is not None:
+        start = start.astimezone(UTC).replace(tzinfo=None)
+    home, away = match.get("home") or {}, match.get("away") or {}
+    return (start, home.get("clubId"), home.get("teamId"), away.get("clubId"), away.get("teamId"))
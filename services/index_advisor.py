@@ -0,0 +1,158 @@
+"""
+Index Advisor - Find query shapes that scan whole collections
+
+IndexAdvisor is a pymongo command listener. Registered with a client, it keeps
+one sample command per query shape (services.query_guard.query_shape) and
+counts how often the shape was issued. explain_samples() explains every sample
+against a database with queryPlanner verbosity, which only plans the query,
+and reports the shapes whose winning plan contains a COLLSCAN stage. Their
+plans are logged with QueryPerformanceMonitor.log_query_plan.
+
+Samples are saved as MongoDB Extended JSON, so a workload can be captured in
+one place and explained against another database:
+
+    python benchmarks/load_match_day.py --capture-queries queries.json
+    python scripts/create_indexes.py --advise queries.json
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+from bson import json_util
+from pymongo import monitoring
+
+from logging_config import logger
+from services.performance_monitor import QueryPerformanceMonitor
+from services.query_guard import SHAPE_FIELDS, query_shape
+
+# Commands explain accepts
+EXPLAINABLE_COMMANDS = set(SHAPE_FIELDS)
+
+# Session, transaction and routing fields the driver adds to commands
+DRIVER_FIELDS = {
+    "lsid",
+    "$db",
+    "$clusterTime",
+    "$readPreference",
+    "txnNumber",
+    "startTransaction",
+    "autocommit",
+    "readConcern",
+    "writeConcern",
+}
+
+
+def explainable_command(command_name: str, command: dict) -> dict:
+    """The command without driver fields, with at most one update/delete statement"""
+    cleaned = {key: value for key, value in command.items() if key not in DRIVER_FIELDS}
+    if command_name in ("update", "delete"):
+        field = SHAPE_FIELDS[command_name]
+        cleaned[field] = cleaned.get(field, [])[:1]
+    return cleaned
+
+
+def collscan_stages(plan: Any) -> list[dict]:
+    """COLLSCAN stages anywhere below a winning plan"""
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in collscan_stages(item)]
+    if not isinstance(plan, dict):
+        return []
+    found = [plan] if plan.get("stage") == "COLLSCAN" else []
+    for key, value in plan.items():
+        if key != "rejectedPlans":
+            found += collscan_stages(value)
+    return found
+
+
+def winning_plans(explanation: Any) -> list[dict]:
+    """Winning plans of an explain reply; aggregations nest one per $cursor stage"""
+    if isinstance(explanation, list):
+        return [plan for item in explanation for plan in winning_plans(item)]
+    if not isinstance(explanation, dict):
+        return []
+    if "winningPlan" in explanation:
+        return [explanation["winningPlan"]]
+    return [plan for value in explanation.values() for plan in winning_plans(value)]
+
+
+class IndexAdvisor(monitoring.CommandListener):
+    """Collects one sample command per query shape"""
+
+    def __init__(self):
+        self.samples: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event) -> None:
+        if event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            return
+        shape = query_shape(collection, event.command_name, event.command)
+        with self._lock:
+            sample = self.samples.get(shape)
+            if sample is not None:
+                sample["count"] += 1
+                return
+            self.samples[shape] = {
+                "shape": shape,
+                "collection": collection,
+                "command": explainable_command(event.command_name, event.command),
+                "count": 1,
+            }
+
+    def succeeded(self, event) -> None:
+        pass
+
+    def failed(self, event) -> None:
+        pass
+
+    def save(self, path: Path) -> None:
+        with self._lock:
+            samples = sorted(self.samples.values(), key=lambda s: -s["count"])
+        Path(path).write_text(json_util.dumps(samples, indent=2) + "\n", encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "IndexAdvisor":
+        advisor = cls()
+        for sample in json_util.loads(Path(path).read_text(encoding="utf-8")):
+            advisor.samples[sample["shape"]] = sample
+        return advisor
+
+    async def explain_samples(self, db) -> list[dict[str, Any]]:
+        """
+        Explain every sample against db.
+
+        Returns one finding per shape with a COLLSCAN, most frequent first:
+        shape, collection, count and the scanned filter.
+        """
+        findings = []
+        for sample in sorted(self.samples.values(), key=lambda s: -s["count"]):
+            try:
+                explanation = await db.command(
+                    {"explain": sample["command"], "verbosity": "queryPlanner"}
+                )
+            except Exception as e:
+                logger.warning(f"Could not explain {sample['shape']}: {e}")
+                continue
+            scans = [
+                stage for plan in winning_plans(explanation) for stage in collscan_stages(plan)
+            ]
+            if not scans:
+                continue
+            QueryPerformanceMonitor.log_query_plan(
+                sample["collection"],
+                scans[0].get("filter", {}),
+                {"queryPlanner": {"winningPlan": winning_plans(explanation)[0]}},
+            )
+            findings.append(
+                {
+                    "shape": sample["shape"],
+                    "collection": sample["collection"],
+                    "count": sample["count"],
+                    "filter": json.loads(json_util.dumps(scans[0].get("filter", {}))),
+                }
+            )
+        return findings
@@ -0,0 +1,196 @@
+"""
+Index Manifest - Declarative MongoDB indexes per collection
+
+INDEX_MANIFEST lists every index the application relies on, keyed by
+collection. diff_indexes() compares it with the indexes that exist in a
+database and apply_index_changes() creates what is missing, rebuilds indexes
+whose definition changed and, on request, drops indexes the manifest does not
+list. scripts/create_indexes.py is the command line front end.
+
+Each entry should name the queries it serves; services.index_advisor reports
+query shapes that still end in a COLLSCAN.
+"""
+
+from typing import Any, NamedTuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from logging_config import logger
+from services.mail_outbox import MAIL_OUTBOX, MAIL_OUTBOX_INDEXES
+from services.match_listing_service import LISTING_INDEXES, MATCH_LISTINGS
+from services.media_cleanup import MEDIA_OUTBOX, OUTBOX_INDEXES
+
+# Index options that make two definitions with the same name different
+COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+INDEX_MANIFEST: dict[str, list[IndexModel]] = {
+    "matches": [
+        # Standings, round/matchday date updates, season stats
+        IndexModel(
+            [
+                ("tournament.alias", ASCENDING),
+                ("season.alias", ASCENDING),
+                ("round.alias", ASCENDING),
+            ],
+            name="tournament_season_round_idx",
+        ),
+        IndexModel(
+            [
+                ("tournament.alias", ASCENDING),
+                ("season.alias", ASCENDING),
+                ("matchday.alias", ASCENDING),
+            ],
+            name="tournament_season_matchday_idx",
+        ),
+        # Finished matches of a season (recalc-stats, standings)
+        IndexModel(
+            [
+                ("matchStatus.key", ASCENDING),
+                ("tournament.alias", ASCENDING),
+                ("season.alias", ASCENDING),
+            ],
+            name="status_tournament_season_idx",
+        ),
+        # Calendar and match list widgets
+        IndexModel(
+            [("season.alias", ASCENDING), ("startDate", ASCENDING)], name="season_start_idx"
+        ),
+        IndexModel([("home.clubAlias", ASCENDING), ("startDate", ASCENDING)], name="home_club_idx"),
+        IndexModel([("away.clubAlias", ASCENDING), ("startDate", ASCENDING)], name="away_club_idx"),
+        IndexModel([("home.teamId", ASCENDING)], name="home_team_idx"),
+        IndexModel([("away.teamId", ASCENDING)], name="away_team_idx"),
+        # Referee schedules ($or over both positions), referee level propagation
+        IndexModel(
+            [("referee1.userId", ASCENDING), ("season.alias", ASCENDING), ("startDate", ASCENDING)],
+            name="referee1_season_start_idx",
+        ),
+        IndexModel(
+            [("referee2.userId", ASCENDING), ("season.alias", ASCENDING), ("startDate", ASCENDING)],
+            name="referee2_season_start_idx",
+        ),
+    ],
+    "players": [
+        IndexModel([("alias", ASCENDING)], name="alias_unique_idx", unique=True),
+        IndexModel(
+            [("lastName", ASCENDING), ("firstName", ASCENDING), ("yearOfBirth", ASCENDING)],
+            name="player_lookup_idx",
+        ),
+        IndexModel([("assignedTeams.clubId", ASCENDING)], name="assigned_clubs_idx"),
+        # Club and team rosters
+        IndexModel(
+            [("assignedTeams.clubAlias", ASCENDING), ("assignedTeams.teams.teamAlias", ASCENDING)],
+            name="club_team_alias_idx",
+        ),
+    ],
+    "tournaments": [
+        IndexModel([("alias", ASCENDING)], name="tournament_alias_unique_idx", unique=True),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique_idx", unique=True),
+        IndexModel([("club.clubId", ASCENDING)], name="club_idx"),
+    ],
+    "assignments": [
+        # Assignments of a match, and the duplicate check per match and referee
+        IndexModel(
+            [("matchId", ASCENDING), ("referee.userId", ASCENDING)], name="match_referee_idx"
+        ),
+        IndexModel(
+            [("referee.userId", ASCENDING), ("status", ASCENDING)], name="referee_status_idx"
+        ),
+        IndexModel([("status", ASCENDING)], name="status_idx"),
+    ],
+    "messages": [
+        # Chat partners aggregate ($or over sender and receiver)
+        IndexModel(
+            [
+                ("sender.userId", ASCENDING),
+                ("receiver.userId", ASCENDING),
+                ("timestamp", DESCENDING),
+            ],
+            name="sender_receiver_timestamp_idx",
+        ),
+        IndexModel([("receiver.userId", ASCENDING), ("read", ASCENDING)], name="receiver_read_idx"),
+    ],
+    MATCH_LISTINGS: LISTING_INDEXES,
+    MEDIA_OUTBOX: OUTBOX_INDEXES,
+    MAIL_OUTBOX: MAIL_OUTBOX_INDEXES,
+}
+
+
+class IndexChange(NamedTuple):
+    action: str  # create, rebuild or drop
+    collection: str
+    name: str
+    keys: list[tuple[str, Any]]
+
+
+def _definition(spec: dict) -> tuple:
+    """What identifies an index apart from its name"""
+    keys = spec["key"].items() if isinstance(spec["key"], dict) else spec["key"]
+    # unique/sparse are omitted by the server when false
+    options = tuple((option, spec.get(option) or None) for option in COMPARED_OPTIONS)
+    return (
+        tuple(
+            (field, direction if isinstance(direction, str) else int(direction))
+            for field, direction in keys
+        ),
+        options,
+    )
+
+
+async def diff_indexes(
+    db, manifest: dict[str, list[IndexModel]] | None = None
+) -> list[IndexChange]:
+    """Changes that bring the indexes of db in line with the manifest"""
+    manifest = INDEX_MANIFEST if manifest is None else manifest
+    changes = []
+    for collection, models in manifest.items():
+        existing = await db[collection].index_information()
+        existing.pop("_id_", None)
+        wanted = {model.document["name"]: model.document for model in models}
+        for name, spec in wanted.items():
+            keys = list(spec["key"].items())
+            if name not in existing:
+                changes.append(IndexChange("create", collection, name, keys))
+            elif _definition(existing[name]) != _definition(spec):
+                changes.append(IndexChange("rebuild", collection, name, keys))
+        for name, info in existing.items():
+            if name not in wanted:
+                changes.append(IndexChange("drop", collection, name, list(info["key"])))
+    return changes
+
+
+async def apply_index_changes(
+    db,
+    changes: list[IndexChange],
+    drop: bool = False,
+    manifest: dict[str, list[IndexModel]] | None = None,
+) -> list[IndexChange]:
+    """
+    Create and rebuild indexes; drop unlisted ones only with drop=True.
+
+    Returns the changes that were applied.
+    """
+    manifest = INDEX_MANIFEST if manifest is None else manifest
+    models = {
+        (collection, model.document["name"]): model
+        for collection, collection_models in manifest.items()
+        for model in collection_models
+    }
+    applied = []
+    for change in changes:
+        if change.action == "drop" and not drop:
+            continue
+        collection = db[change.collection]
+        try:
+            if change.action in ("drop", "rebuild"):
+                await collection.drop_index(change.name)
+            if change.action in ("create", "rebuild"):
+                await collection.create_indexes([models[(change.collection, change.name)]])
+        except OperationFailure as e:
+            logger.error(f"  ✗ {change.action} {change.collection}.{change.name} failed: {e}")
+            continue
+        logger.info(f"  ✓ {change.action} {change.collection}.{change.name}")
+        applied.append(change)
+    return applied
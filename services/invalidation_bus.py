@@ -0,0 +1,289 @@
+"""
+Invalidation Bus - Turns database changes into cache invalidation events
+
+Writes reach MongoDB from the routers but also from out-of-band scripts
+(import_*.py, update_*.py, scripts/import_cli.py) that never pass through the
+API's write hooks. The bus tails MongoDB change streams on the collections
+cached responses are built from (services.response_cache.CACHED_COLLECTIONS),
+translates every change into cache keys and hands an
+InvalidationEvent to each subscriber.
+
+Every uvicorn worker runs its own bus, so a change is delivered to all workers
+by MongoDB itself without a separate pub/sub channel.
+
+Change streams need a replica set (Atlas always has one). On a standalone
+server CACHE_BUS_MODE=auto leaves the bus off, so out-of-band writes are only
+seen once the cache is invalidated by an API write. CACHE_BUS_MODE=poll
+instead polls `dbHash` of the watched collections and publishes
+collection-wide events when a hash changes; dbHash reads and hashes whole
+collections under a lock and needs elevated privileges, so it is opt-in.
+
+Cache keys:
+    match:<id>
+    tournament:<t>, season:<t>/<s>, round:<t>/<s>/<r>, matchday:<t>/<s>/<r>/<md>
+    club:<id>, club:<alias>
+    <collection>:<id>  (other collections)
+    <collection>:*  (anything in the collection may have changed)
+"""
+
+import asyncio
+import contextlib
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from config import settings
+from logging_config import logger
+
+# Server error codes meaning "change streams are not available here"
+CHANGE_STREAM_UNSUPPORTED_CODES = {
+    40573,  # $changeStream is only supported on replica sets
+    40324,  # Unrecognized pipeline stage name: '$changeStream'
+    136,  # CappedPositionLost / no oplog
+}
+
+# Resume token is no longer usable; restart the stream from "now"
+RESUME_FAILED_CODES = {
+    260,  # InvalidResumeToken
+    286,  # ChangeStreamHistoryLost
+}
+
+# Cached reads address these collections by alias, which an update event only
+# carries when the server looks up the full document. Other collections skip
+# that lookup; their inserts and replaces still include the document.
+ALIAS_KEYED_COLLECTIONS = ("tournaments", "clubs")
+
+# Only the fields needed to derive cache keys are shipped with each change
+CHANGE_PROJECTION = {
+    "operationType": 1,
+    "ns": 1,
+    "documentKey": 1,
+    "fullDocument._id": 1,
+    "fullDocument.alias": 1,
+    "fullDocument.tournament.alias": 1,
+    "fullDocument.season.alias": 1,
+    "fullDocument.round.alias": 1,
+    "fullDocument.matchday.alias": 1,
+    "updateDescription.updatedFields.alias": 1,
+}
+
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 60.0
+
+
+class InvalidationEvent(NamedTuple):
+    collection: str
+    operation: str
+    keys: frozenset[str]
+
+
+def wildcard_key(collection: str) -> str:
+    return f"{collection}:*"
+
+
+def _alias(document: dict, field: str) -> str | None:
+    value = document.get(field)
+    return value.get("alias") if isinstance(value, dict) else None
+
+
+def _alias_keys(prefix: str, collection: str, document: dict, change: dict[str, Any]) -> set[str]:
+    """
+    Alias key of a changed tournament or club.
+
+    Cached reads are keyed by alias, so a change whose old alias is unknown
+    (deletes, replaces, alias updates, missing documents) maps to the
+    collection wildcard.
+    """
+    alias = document.get("alias")
+    updated = (change.get("updateDescription") or {}).get("updatedFields") or {}
+    if alias and change.get("operationType") in ("insert", "update") and "alias" not in updated:
+        return {f"{prefix}:{alias}"}
+    return {wildcard_key(collection)}
+
+
+def keys_for_change(collection: str, change: dict[str, Any]) -> frozenset[str]:
+    """
+    Translate one change stream document into cache keys.
+
+    Operations without a document (drop, rename, invalidate) map to the
+    collection wildcard.
+    """
+    document_key = change.get("documentKey") or {}
+    document = change.get("fullDocument") or {}
+    doc_id = document_key.get("_id", document.get("_id"))
+    if doc_id is None:
+        return frozenset({wildcard_key(collection)})
+
+    keys: set[str] = set()
+    if collection == "matches":
+        keys.add(f"match:{doc_id}")
+        path: list[str] = []
+        for level in ("tournament", "season", "round", "matchday"):
+            alias = _alias(document, level)
+            if not alias:
+                break
+            path.append(alias)
+            keys.add(f"{level}:{'/'.join(path)}")
+    elif collection == "tournaments":
+        keys.add(f"tournament-id:{doc_id}")
+        keys |= _alias_keys("tournament", collection, document, change)
+    elif collection == "clubs":
+        keys.add(f"club:{doc_id}")
+        keys |= _alias_keys("club", collection, document, change)
+    else:
+        keys.add(f"{collection}:{doc_id}")
+    return frozenset(keys)
+
+
+class InvalidationBus:
+    """Per-worker change feed for cache invalidation"""
+
+    def __init__(
+        self,
+        db,
+        collections: tuple[str, ...],
+        mode: str | None = None,
+        poll_interval: float | None = None,
+    ):
+        self.db = db
+        self.collections = collections
+        self.requested_mode = mode or settings.CACHE_BUS_MODE
+        self.poll_interval = poll_interval or settings.CACHE_BUS_POLL_INTERVAL
+        self.mode: str | None = None  # "change_stream" | "poll" once started
+        self._subscribers: list[Callable[[InvalidationEvent], None]] = []
+        self._tasks: list[asyncio.Task] = []
+        self._resume_tokens: dict[str, Any] = {}
+        self._hashes: dict[str, str] = {}
+        self.events_published = 0
+
+    def subscribe(self, handler: Callable[[InvalidationEvent], None]) -> None:
+        """Register a handler called synchronously for every event"""
+        self._subscribers.append(handler)
+
+    def publish(self, event: InvalidationEvent) -> None:
+        self.events_published += 1
+        for handler in self._subscribers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Invalidation handler {handler!r} failed for {event}: {e!r}")
+
+    async def start(self) -> None:
+        if self.requested_mode == "off":
+            logger.info("Invalidation bus disabled")
+            return
+        if self.requested_mode == "poll":
+            await self._start_polling()
+            return
+        if self.requested_mode == "auto" and not await self._change_streams_available():
+            logger.warning(
+                "Invalidation bus disabled: change streams unavailable "
+                "(set CACHE_BUS_MODE=poll to poll dbHash instead)"
+            )
+            return
+        self.mode = "change_stream"
+        for collection in self.collections:
+            self._tasks.append(asyncio.create_task(self._tail(collection)))
+        logger.info(f"Invalidation bus tailing change streams on {', '.join(self.collections)}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+
+    async def _change_streams_available(self) -> bool:
+        try:
+            async with self.db[self.collections[0]].watch(max_await_time_ms=1) as stream:
+                await stream.try_next()
+            return True
+        except OperationFailure as e:
+            if e.code in CHANGE_STREAM_UNSUPPORTED_CODES:
+                logger.warning(f"Change streams unavailable ({e.code})")
+                return False
+            logger.warning(f"Change stream probe failed: {e!r}")
+            return True
+        except PyMongoError as e:
+            # Connection trouble, not lack of support; the tail loop keeps retrying
+            logger.warning(f"Change stream probe failed: {e!r}")
+            return True
+
+    async def _start_polling(self) -> None:
+        self.mode = "poll"
+        try:
+            self._hashes = await self._collection_hashes()
+        except PyMongoError as e:
+            logger.warning(f"Invalidation bus initial poll failed: {e!r}")
+        self._tasks.append(asyncio.create_task(self._poll()))
+        logger.info(
+            f"Invalidation bus polling {', '.join(self.collections)} every {self.poll_interval}s"
+        )
+
+    async def _tail(self, collection: str) -> None:
+        """Follow one collection's change stream, resuming after errors"""
+        delay = RECONNECT_DELAY_SECONDS
+        while True:
+            try:
+                async with self.db[collection].watch(
+                    [{"$project": CHANGE_PROJECTION}],
+                    full_document=(
+                        "updateLookup" if collection in ALIAS_KEYED_COLLECTIONS else None
+                    ),
+                    resume_after=self._resume_tokens.get(collection),
+                ) as stream:
+                    delay = RECONNECT_DELAY_SECONDS
+                    async for change in stream:
+                        self._resume_tokens[collection] = change["_id"]
+                        self.publish(
+                            InvalidationEvent(
+                                collection=collection,
+                                operation=change.get("operationType", "unknown"),
+                                keys=keys_for_change(collection, change),
+                            )
+                        )
+            except PyMongoError as e:
+                logger.warning(
+                    f"Change stream on {collection} interrupted: {e!r}; retrying in {delay}s"
+                )
+                if isinstance(e, OperationFailure) and e.code in RESUME_FAILED_CODES:
+                    self._resume_tokens.pop(collection, None)
+                # Changes may be missed while reconnecting, so drop everything once
+                self.publish(
+                    InvalidationEvent(
+                        collection=collection,
+                        operation="resync",
+                        keys=frozenset({wildcard_key(collection)}),
+                    )
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+
+    async def _collection_hashes(self) -> dict[str, str]:
+        result = await self.db.command("dbHash", collections=list(self.collections))
+        return result.get("collections", {})
+
+    async def poll_once(self) -> list[str]:
+        """Compare collection hashes with the last poll and publish for changed ones"""
+        hashes = await self._collection_hashes()
+        changed = [c for c in self.collections if hashes.get(c) != self._hashes.get(c)]
+        self._hashes = hashes
+        for collection in changed:
+            self.publish(
+                InvalidationEvent(
+                    collection=collection,
+                    operation="poll",
+                    keys=frozenset({wildcard_key(collection)}),
+                )
+            )
+        return changed
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll_once()
+            except PyMongoError as e:
+                logger.warning(f"Invalidation bus poll failed: {e!r}")
@@ -0,0 +1,52 @@
+"""
+JSON Response - Single-pass serialization for large list responses
+
+The list endpoints used to build Pydantic models, dump them to dicts, walk the
+dicts again with jsonable_encoder and finally json.dumps the result: three
+full walks of the object graph per item. FastJSONResponse hands the content
+straight to pydantic-core's Rust serializer, which writes validated models,
+plain dicts/lists and the usual scalar types (datetime, date, Enum, UUID) to
+bytes in one pass. ObjectId, left in trusted raw Mongo documents, is written as
+its hex string.
+
+The output is byte-identical to JSONResponse(jsonable_encoder(content)) for
+what the API returns: keys by alias, naive datetimes in isoformat, non-ASCII
+kept as UTF-8. Two deliberate differences:
+    - timezone-aware UTC datetimes are written with "Z" instead of "+00:00"
+      (Motor returns naive datetimes, so stored dates are unaffected)
+    - NaN/Infinity become null instead of raising
+
+Models that override model_dump() to add properties (PlayerDB, Suspension)
+must be passed as their model_dump(by_alias=True) dicts, since the Rust
+serializer does not call Python overrides.
+"""
+
+from typing import Any
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+def _fallback(value: Any) -> Any:
+    """Types pydantic-core does not know natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    return jsonable_encoder(value)
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize models, dicts and lists to compact UTF-8 JSON in one pass"""
+    return to_json(content, by_alias=True, fallback=_fallback, inf_nan_mode="null")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse for validated models and trusted documents.
+
+    Pass the content as is - do not run it through jsonable_encoder first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
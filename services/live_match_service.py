@@ -0,0 +1,322 @@
+"""
+Live Match Service - Push channel for live-ticker clients
+
+ScoreService, PenaltyService and update_match publish compact deltas to the
+in-process LiveMatchHub after each committed write. GET /matches/{id}/live
+streams them as Server-Sent Events: a compact snapshot on connect (one
+projected read, no roster conversion or player enrichment), then every delta.
+One write is fanned out to all viewers of the match from memory.
+
+Event ids are "<epoch>-<seq>" per match. A client reconnecting with
+Last-Event-ID receives the missed events from the ring buffer, or a fresh
+snapshot if they are no longer buffered (or the process restarted).
+
+Every payload carries absolute values (goal totals, event objects, new field
+values), so a client may safely apply an event it has already seen.
+
+The hub lives in process memory; viewers must be served by the worker that
+handles the writes (the API runs as a single uvicorn worker).
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from typing import Any, NamedTuple
+
+from fastapi.encoders import jsonable_encoder
+
+from config import settings
+from logging_config import logger
+from utils import parse_time_from_seconds
+
+EVENT_PLAYER_FIELDS = (
+    "playerId",
+    "firstName",
+    "lastName",
+    "jerseyNumber",
+    "displayFirstName",
+    "displayLastName",
+)
+SCORE_FIELDS = ("_id", "matchTime", "isPPG", "isSHG", "isGWG")
+PENALTY_FIELDS = (
+    "_id",
+    "matchTimeStart",
+    "matchTimeEnd",
+    "penaltyCode",
+    "penaltyMinutes",
+    "isGM",
+    "isMP",
+)
+
+SNAPSHOT_PROJECTION = {
+    "matchStatus": 1,
+    "finishType": 1,
+    "startDate": 1,
+    "home.stats.goalsFor": 1,
+    "away.stats.goalsFor": 1,
+    "home.scores": 1,
+    "away.scores": 1,
+    "home.penalties": 1,
+    "away.penalties": 1,
+}
+
+MAX_CHANNELS = 256
+
+
+class LiveEvent(NamedTuple):
+    id: str
+    seq: int
+    type: str
+    data: dict[str, Any]
+
+    def encode(self) -> str:
+        """Server-Sent Events wire format"""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+def _compact_player(player: dict | None) -> dict | None:
+    if not player:
+        return None
+    return {k: player.get(k) for k in EVENT_PLAYER_FIELDS if k in player}
+
+
+def _compact(
+    document: dict, fields: tuple[str, ...], player_fields: tuple[str, ...], partial: bool
+):
+    keys = [k for k in fields + player_fields if not partial or k in document]
+    return jsonable_encoder(
+        {
+            k: _compact_player(document.get(k)) if k in player_fields else document.get(k)
+            for k in keys
+        }
+    )
+
+
+def compact_score(score: dict, partial: bool = False) -> dict:
+    """
+    Reduce a stored score (or the fields of a score update, if partial) to the
+    fields a ticker needs
+    """
+    if "matchTime" not in score and "matchSeconds" in score:
+        score = {**score, "matchTime": parse_time_from_seconds(score["matchSeconds"])}
+    return _compact(score, SCORE_FIELDS, ("goalPlayer", "assistPlayer"), partial)
+
+
+def compact_penalty(penalty: dict, partial: bool = False) -> dict:
+    """
+    Reduce a stored penalty (or the fields of a penalty update, if partial) to
+    the fields a ticker needs
+    """
+    penalty = dict(penalty)
+    if "matchTimeStart" not in penalty and "matchSecondsStart" in penalty:
+        penalty["matchTimeStart"] = parse_time_from_seconds(penalty["matchSecondsStart"])
+    if penalty.get("matchTimeEnd") is None and penalty.get("matchSecondsEnd") is not None:
+        penalty["matchTimeEnd"] = parse_time_from_seconds(penalty["matchSecondsEnd"])
+    return _compact(penalty, PENALTY_FIELDS, ("penaltyPlayer",), partial)
+
+
+def goal_totals(match: dict, team_flag: str | None = None, delta: int = 0) -> dict[str, int]:
+    """Goal totals from a match document, optionally adjusted for a pending write"""
+    totals = {
+        flag: ((match.get(flag) or {}).get("stats") or {}).get("goalsFor") or 0
+        for flag in ("home", "away")
+    }
+    if team_flag:
+        totals[team_flag] += delta
+    return totals
+
+
+class LiveSubscription:
+    """One connected viewer of a match channel"""
+
+    def __init__(self, channel: "_Channel", queue_size: int):
+        self.channel = channel
+        self.queue: asyncio.Queue[LiveEvent] = asyncio.Queue(maxsize=queue_size)
+        # Set when the viewer fell behind and events were dropped
+        self.lagged = False
+
+    def deliver(self, event: LiveEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+    def drain(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.lagged = False
+
+
+class _Channel:
+    def __init__(self, buffer_size: int):
+        self.seq = 0
+        self.buffer: deque[LiveEvent] = deque(maxlen=buffer_size)
+        self.subscribers: set[LiveSubscription] = set()
+
+
+class LiveMatchHub:
+    """In-process fan-out of match deltas to SSE viewers"""
+
+    def __init__(self, buffer_size: int | None = None, queue_size: int | None = None):
+        self.buffer_size = buffer_size or settings.LIVE_EVENT_BUFFER_SIZE
+        self.queue_size = queue_size or settings.LIVE_EVENT_QUEUE_SIZE
+        # Distinguishes event ids of this process from those of a previous one
+        self.epoch = format(int(time.time() * 1000), "x")
+        self._channels: OrderedDict[str, _Channel] = OrderedDict()
+
+    def _channel(self, match_id: str) -> _Channel:
+        channel = self._channels.get(match_id)
+        if channel is None:
+            channel = self._channels[match_id] = _Channel(self.buffer_size)
+            self._evict()
+        else:
+            self._channels.move_to_end(match_id)
+        return channel
+
+    def _evict(self) -> None:
+        if len(self._channels) <= MAX_CHANNELS:
+            return
+        for match_id, channel in list(self._channels.items()):
+            if not channel.subscribers:
+                del self._channels[match_id]
+                if len(self._channels) <= MAX_CHANNELS:
+                    return
+
+    def publish(self, match_id: str, event_type: str, data: dict[str, Any]) -> LiveEvent:
+        """Append an event to the match channel and deliver it to all viewers"""
+        channel = self._channel(match_id)
+        channel.seq += 1
+        event = LiveEvent(
+            id=f"{self.epoch}-{channel.seq}",
+            seq=channel.seq,
+            type=event_type,
+            data=jsonable_encoder(data),
+        )
+        channel.buffer.append(event)
+        for subscription in channel.subscribers:
+            subscription.deliver(event)
+        if settings.DEBUG_LEVEL > 10:
+            logger.debug(
+                f"Live event {event.id} {event_type} for match {match_id} "
+                f"to {len(channel.subscribers)} viewers"
+            )
+        return event
+
+    def subscribe(self, match_id: str) -> LiveSubscription:
+        subscription = LiveSubscription(self._channel(match_id), self.queue_size)
+        subscription.channel.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LiveSubscription) -> None:
+        subscription.channel.subscribers.discard(subscription)
+
+    def current_id(self, match_id: str) -> str:
+        return f"{self.epoch}-{self._channel(match_id).seq}"
+
+    def events_since(self, match_id: str, last_event_id: str | None) -> list[LiveEvent] | None:
+        """
+        Buffered events after last_event_id.
+
+        Returns:
+            The missed events (possibly empty), or None if they cannot be
+            replayed and the client needs a snapshot
+        """
+        if not last_event_id:
+            return None
+        epoch, _, seq_str = last_event_id.partition("-")
+        if epoch != self.epoch or not seq_str.isdigit():
+            return None
+        channel = self._channel(match_id)
+        last_seq = int(seq_str)
+        if last_seq > channel.seq:
+            return None
+        oldest = channel.buffer[0].seq if channel.buffer else channel.seq + 1
+        if last_seq + 1 < oldest:
+            return None
+        return [event for event in channel.buffer if event.seq > last_seq]
+
+    def viewer_count(self, match_id: str) -> int:
+        channel = self._channels.get(match_id)
+        return len(channel.subscribers) if channel else 0
+
+
+live_match_hub = LiveMatchHub()
+
+
+async def build_snapshot(db, match_id: str) -> dict[str, Any] | None:
+    """Compact live state of a match from one projected read"""
+    match = await db["matches"].find_one({"_id": match_id}, SNAPSHOT_PROJECTION)
+    if match is None:
+        return None
+    return {
+        "matchId": match_id,
+        "matchStatus": match.get("matchStatus"),
+        "finishType": match.get("finishType"),
+        "startDate": match.get("startDate"),
+        "goals": goal_totals(match),
+        **{
+            flag: {
+                "scores": [compact_score(s) for s in (match.get(flag) or {}).get("scores") or []],
+                "penalties": [
+                    compact_penalty(p) for p in (match.get(flag) or {}).get("penalties") or []
+                ],
+            }
+            for flag in ("home", "away")
+        },
+    }
+
+
+async def stream_match_events(
+    db,
+    match_id: str,
+    last_event_id: str | None = None,
+    hub: LiveMatchHub | None = None,
+    keepalive_seconds: float | None = None,
+    is_disconnected=None,
+):
+    """
+    Async generator of SSE frames for one viewer.
+
+    Subscribes before reading the snapshot, so no write can fall between the
+    snapshot and the first delta.
+    """
+    hub = hub or live_match_hub
+    keepalive = keepalive_seconds or settings.LIVE_KEEPALIVE_SECONDS
+    subscription = hub.subscribe(match_id)
+    try:
+        missed = hub.events_since(match_id, last_event_id)
+        if missed is None:
+            yield await _snapshot_frame(db, match_id, hub)
+        else:
+            # Everything queued so far is part of the replay
+            subscription.drain()
+            for event in missed:
+                yield event.encode()
+
+        while True:
+            if is_disconnected is not None and await is_disconnected():
+                return
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=keepalive)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if subscription.lagged:
+                subscription.drain()
+                yield await _snapshot_frame(db, match_id, hub)
+                continue
+            yield event.encode()
+    finally:
+        hub.unsubscribe(subscription)
+
+
+async def _snapshot_frame(db, match_id: str, hub: LiveMatchHub) -> str:
+    event_id = hub.current_id(match_id)
+    snapshot = await build_snapshot(db, match_id)
+    return LiveEvent(
+        id=event_id,
+        seq=0,
+        type="snapshot",
+        data=jsonable_encoder(snapshot) if snapshot else {"matchId": match_id, "deleted": True},
+    ).encode()
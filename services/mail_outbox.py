@@ -0,0 +1,262 @@
+"""
+Mail Outbox - Queued email delivery over a shared SMTP connection
+
+mail_service.send_email() used to open an SMTP session on the request path of
+password resets, referee messages, pass-check requests and the unassigned
+matches job. In the API it now only records the message in the `mailOutbox`
+collection and returns; the MailOutbox sender delivers pending messages in
+the background:
+
+- up to MAIL_BATCH_SIZE messages are sent over one SMTP connection
+- at most MAIL_RATE_PER_MINUTE messages leave per minute, counted from the
+  outbox so the limit holds across uvicorn workers
+- transient failures (4xx replies, connection errors) are retried with
+  exponential backoff starting at MAIL_RETRY_DELAY; permanent refusals (5xx)
+  and messages out of MAIL_MAX_ATTEMPTS are marked failed
+- every message records its status, attempts, last error and sentAt; sent
+  and failed messages expire after MAIL_OUTBOX_RETENTION_DAYS
+- bodies can hold live links (password reset tokens), so the body is removed
+  as soon as a message is sent or given up
+
+Scripts never bind a database to the outbox, so send_email() delivers their
+messages directly.
+
+Messages are claimed with a lease (services.outbox), so each one is sent by
+one worker. Enqueueing wakes the local sender; messages queued by another
+worker are picked up within MAIL_POLL_INTERVAL seconds.
+"""
+
+import asyncio
+import contextlib
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr, formatdate, make_msgid
+from typing import Any
+
+import aiosmtplib
+from pymongo import ASCENDING, IndexModel
+
+from config import settings
+from logging_config import logger
+from services.outbox import claim_due
+
+MAIL_OUTBOX = "mailOutbox"
+
+MAIL_OUTBOX_INDEXES = [
+    # Due messages claimed by the sender
+    IndexModel([("status", ASCENDING), ("notBefore", ASCENDING)], name="status_not_before_idx"),
+    # Rate limit window; sent messages expire
+    IndexModel(
+        [("sentAt", ASCENDING)],
+        name="sent_at_ttl_idx",
+        expireAfterSeconds=settings.MAIL_OUTBOX_RETENTION_DAYS * 86400,
+    ),
+    # Failed messages have no sentAt and expire by their creation time
+    IndexModel(
+        [("createdAt", ASCENDING)],
+        name="failed_created_at_ttl_idx",
+        expireAfterSeconds=settings.MAIL_OUTBOX_RETENTION_DAYS * 86400,
+        partialFilterExpression={"status": "failed"},
+    ),
+]
+
+# A claimed message becomes due again if the worker holding it dies
+LEASE_SECONDS = 300
+
+
+def build_message(
+    subject: str,
+    recipients: list[str],
+    body: str,
+    cc: list[str] | None = None,
+    reply_to: list[str] | None = None,
+) -> EmailMessage:
+    """HTML email from the configured sender"""
+    message = EmailMessage()
+    message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = ", ".join(recipients)
+    if cc:
+        message["Cc"] = ", ".join(cc)
+    if reply_to:
+        message["Reply-To"] = ", ".join(reply_to)
+    message["Subject"] = subject
+    message["Date"] = formatdate(localtime=True)
+    message["Message-ID"] = make_msgid(domain=settings.MAIL_FROM.rpartition("@")[2] or None)
+    message.set_content(body, subtype="html")
+    return message
+
+
+def smtp_client() -> aiosmtplib.SMTP:
+    """SMTP client for the configured server; connects when entered"""
+    credentials: dict[str, Any] = {}
+    if settings.USE_CREDENTIALS:
+        credentials = {"username": settings.MAIL_USERNAME, "password": settings.MAIL_PASSWORD}
+    return aiosmtplib.SMTP(
+        hostname=settings.MAIL_SERVER,
+        port=settings.MAIL_PORT,
+        use_tls=settings.MAIL_SSL_TLS,
+        start_tls=settings.MAIL_STARTTLS,
+        validate_certs=settings.VALIDATE_CERTS,
+        timeout=settings.MAIL_TIMEOUT,
+        **credentials,
+    )
+
+
+async def deliver(
+    subject: str,
+    recipients: list[str],
+    body: str,
+    cc: list[str] | None = None,
+    reply_to: list[str] | None = None,
+) -> None:
+    """Send one message right away over its own connection"""
+    async with smtp_client() as smtp:
+        await smtp.send_message(build_message(subject, recipients, body, cc, reply_to))
+
+
+class MailOutbox:
+    """Mail outbox and the background task sending it"""
+
+    def __init__(self):
+        self.db = None
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+
+    def bind(self, db) -> None:
+        """Queue messages in db instead of sending them directly"""
+        self.db = db
+
+    async def enqueue(
+        self,
+        subject: str,
+        recipients: list[str],
+        body: str,
+        cc: list[str] | None = None,
+        reply_to: list[str] | None = None,
+    ) -> Any:
+        """Record a message for delivery; returns its outbox id"""
+        now = datetime.now()
+        result = await self.db[MAIL_OUTBOX].insert_one(
+            {
+                "subject": subject,
+                "recipients": list(recipients),
+                "cc": list(cc or []),
+                "replyTo": list(reply_to or []),
+                "body": body,
+                "status": "pending",
+                "attempts": 0,
+                "notBefore": now,
+                "lastError": None,
+                "createdAt": now,
+                "sentAt": None,
+            }
+        )
+        self._wake.set()
+        return result.inserted_id
+
+    async def start(self) -> None:
+        if self.db is None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Mail outbox sending up to {settings.MAIL_BATCH_SIZE} messages per connection, "
+            f"{settings.MAIL_RATE_PER_MINUTE} per minute"
+        )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), settings.MAIL_POLL_INTERVAL)
+            self._wake.clear()
+            try:
+                while await self.process_batch() >= settings.MAIL_BATCH_SIZE:
+                    pass
+            except Exception as e:
+                logger.warning(f"Mail outbox run failed: {e!r}")
+
+    async def rate_budget(self) -> int:
+        """Messages that may still be sent in the current minute"""
+        since = datetime.now() - timedelta(minutes=1)
+        sent = await self.db[MAIL_OUTBOX].count_documents({"sentAt": {"$gte": since}})
+        return settings.MAIL_RATE_PER_MINUTE - sent
+
+    async def process_batch(self) -> int:
+        """Send one batch of due messages; returns the number of messages handled"""
+        limit = min(settings.MAIL_BATCH_SIZE, await self.rate_budget())
+        if limit <= 0:
+            return 0
+        entries = await claim_due(self.db[MAIL_OUTBOX], limit, LEASE_SECONDS)
+        if not entries:
+            return 0
+        remaining = list(entries)
+        try:
+            async with smtp_client() as smtp:
+                while remaining:
+                    entry = remaining[0]
+                    message = build_message(
+                        entry["subject"],
+                        entry["recipients"],
+                        entry["body"],
+                        entry.get("cc"),
+                        entry.get("replyTo"),
+                    )
+                    try:
+                        refused, _ = await smtp.send_message(message)
+                    except aiosmtplib.SMTPRecipientsRefused as e:
+                        code = min(recipient.code for recipient in e.recipients)
+                        await self._failed(entry, str(e), permanent=code >= 500)
+                    except aiosmtplib.SMTPResponseException as e:
+                        await self._failed(entry, f"{e.code} {e.message}", permanent=e.code >= 500)
+                    else:
+                        await self._sent(entry, refused)
+                    remaining.pop(0)
+        except (aiosmtplib.SMTPException, OSError) as e:
+            for entry in remaining:
+                await self._failed(entry, repr(e))
+        logger.info(f"Mail outbox handled {len(entries)} messages")
+        return len(entries)
+
+    async def _sent(self, entry: dict[str, Any], refused: dict[str, Any]) -> None:
+        update: dict[str, Any] = {
+            "status": "sent",
+            "sentAt": datetime.now(),
+            "attempts": entry.get("attempts", 0) + 1,
+            "lastError": None,
+        }
+        if refused:
+            update["refused"] = {address: str(reply) for address, reply in refused.items()}
+            logger.warning(f"Email '{entry['subject']}' refused for {sorted(refused)}")
+        await self.db[MAIL_OUTBOX].update_one(
+            {"_id": entry["_id"]}, {"$set": update, "$unset": {"claim": "", "body": ""}}
+        )
+
+    async def _failed(self, entry: dict[str, Any], error: str, permanent: bool = False) -> None:
+        attempts = entry.get("attempts", 0) + 1
+        update: dict[str, Any] = {"attempts": attempts, "lastError": error}
+        unset = {"claim": ""}
+        if permanent or attempts >= settings.MAIL_MAX_ATTEMPTS:
+            update["status"] = "failed"
+            unset["body"] = ""
+            logger.error(
+                f"Giving up sending '{entry['subject']}' to {entry['recipients']}: {error}"
+            )
+        else:
+            delay = settings.MAIL_RETRY_DELAY * 2 ** (attempts - 1)
+            update["notBefore"] = datetime.now() + timedelta(seconds=delay)
+            logger.warning(
+                f"Sending '{entry['subject']}' failed ({error}), retrying in {delay:.0f}s"
+            )
+        await self.db[MAIL_OUTBOX].update_one(
+            {"_id": entry["_id"]}, {"$set": update, "$unset": unset}
+        )
+
+
+mail_outbox = MailOutbox()
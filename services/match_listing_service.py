@@ -0,0 +1,136 @@
+"""
+Match Listing Service - Materialized read model for public match lists
+
+`matchListings` holds one compact document per match: only the fields of
+MatchListBase (without rosters, scores or penalties) plus the match settings
+resolved from the tournament hierarchy. The calendar, today, upcoming and
+rest-of-week endpoints read it with plain indexed range queries when
+MATCH_LISTINGS_ENABLED is set, instead of projecting heavy match documents
+and resolving settings on every request.
+
+Listings are refreshed by the write paths that change listed fields (match
+create/update/delete, goals, referee assignments, season/round/matchday
+updates). Writes made outside the API (import and update scripts) are picked
+up by scripts/rebuild_match_listings.py, which also removes orphans.
+"""
+
+from typing import Any
+
+from pymongo import ASCENDING, IndexModel, ReplaceOne
+
+from logging_config import logger
+from models.matches import MatchListBase, MatchListTeam
+from services.match_settings_service import resolve_match_settings_batch
+
+MATCH_LISTINGS = "matchListings"
+
+# Sort key of every listing query; the filters the widgets use come first
+LISTING_INDEXES = [
+    IndexModel([("season.alias", ASCENDING), ("startDate", ASCENDING)], name="season_start_idx"),
+    IndexModel(
+        [("tournament.alias", ASCENDING), ("season.alias", ASCENDING), ("startDate", ASCENDING)],
+        name="tournament_season_start_idx",
+    ),
+    IndexModel([("home.clubAlias", ASCENDING), ("startDate", ASCENDING)], name="home_club_idx"),
+    IndexModel([("away.clubAlias", ASCENDING), ("startDate", ASCENDING)], name="away_club_idx"),
+    IndexModel([("referee1.userId", ASCENDING)], name="referee1_idx"),
+    IndexModel([("referee2.userId", ASCENDING)], name="referee2_idx"),
+]
+
+
+def _listing_projection() -> dict[str, int]:
+    """Match fields copied into a listing; team rosters are never listed"""
+    projection = {"_id": 1}
+    team_fields = [name for name in MatchListTeam.model_fields if name != "roster"]
+    for name in MatchListBase.model_fields:
+        if name in ("id", "matchSettingsSource"):
+            continue
+        if name in ("home", "away"):
+            projection.update({f"{name}.{field}": 1 for field in team_fields})
+        else:
+            projection[name] = 1
+    return projection
+
+
+LISTING_PROJECTION = _listing_projection()
+
+
+class MatchListingService:
+    """Keeps the matchListings read model in sync with matches"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def refresh(self, match_id: str, session=None) -> None:
+        """Rebuild the listing of one match, or remove it when the match is gone.
+
+        A failed refresh never fails the write that triggered it; the listing
+        is repaired by the next refresh or by the rebuild script.
+        """
+        try:
+            if not await self.refresh_many({"_id": match_id}, session=session):
+                await self.remove(match_id, session=session)
+        except Exception as e:
+            logger.error(f"Match listing refresh failed for {match_id}: {e}")
+
+    async def refresh_many(self, query: dict[str, Any], session=None) -> int:
+        """Rebuild the listings of all matches matching query; returns how many"""
+        matches = (
+            await self.db["matches"].find(query, LISTING_PROJECTION, session=session).to_list(None)
+        )
+        return await self._write(matches, session=session)
+
+    async def refresh_scope(
+        self,
+        tournament_alias: str,
+        season_alias: str,
+        round_alias: str | None = None,
+        matchday_alias: str | None = None,
+    ) -> None:
+        """Relist the matches of a season, round or matchday after its match settings changed"""
+        query = {"tournament.alias": tournament_alias, "season.alias": season_alias}
+        if round_alias:
+            query["round.alias"] = round_alias
+        if matchday_alias:
+            query["matchday.alias"] = matchday_alias
+        try:
+            await self.refresh_many(query)
+        except Exception as e:
+            logger.error(f"Match listing refresh failed for {query}: {e}")
+
+    async def remove(self, match_id: str, session=None) -> None:
+        await self.db[MATCH_LISTINGS].delete_one({"_id": match_id}, session=session)
+
+    async def _write(self, matches: list[dict], session=None) -> int:
+        if not matches:
+            return 0
+        listings = await resolve_match_settings_batch(self.db, matches)
+        await self.db[MATCH_LISTINGS].bulk_write(
+            [ReplaceOne({"_id": listing["_id"]}, listing, upsert=True) for listing in listings],
+            ordered=False,
+            session=session,
+        )
+        return len(listings)
+
+    async def rebuild(self, batch_size: int = 500) -> dict[str, int]:
+        """Relist every match in batches and drop listings of deleted matches"""
+        listed_ids = []
+        batch: list[dict] = []
+        async for match in self.db["matches"].find({}, LISTING_PROJECTION).batch_size(batch_size):
+            batch.append(match)
+            if len(batch) >= batch_size:
+                await self._write(batch)
+                listed_ids += [m["_id"] for m in batch]
+                batch = []
+        await self._write(batch)
+        listed_ids += [m["_id"] for m in batch]
+
+        removed = await self.db[MATCH_LISTINGS].delete_many({"_id": {"$nin": listed_ids}})
+        logger.info(
+            "Match listings rebuilt",
+            extra={"listed": len(listed_ids), "removed": removed.deleted_count},
+        )
+        return {"listed": len(listed_ids), "removed": removed.deleted_count}
+
+    async def ensure_indexes(self) -> None:
+        await self.db[MATCH_LISTINGS].create_indexes(LISTING_INDEXES)
@@ -0,0 +1,295 @@
+"""
+Media Cleanup - Deferred deletion of replaced and orphaned media files
+
+Replacing or removing the image of a player, club, team, post or venue, or the
+file of a document, no longer deletes the old file on the request path. The
+routers call MediaCleanupService.discard(), which records the file in the
+`mediaOutbox` collection, and MediaCleanupWorker deletes due entries in the
+background, up to MEDIA_CLEANUP_BATCH_SIZE files per backend call. Failed
+deletions are retried with exponential backoff; after
+MEDIA_CLEANUP_MAX_ATTEMPTS an entry is marked failed and kept for inspection.
+
+An entry becomes due MEDIA_CLEANUP_DELAY seconds after the discard, and a file
+that is still referenced when its turn comes is not deleted. Uploads overwrite
+by alias, so a replacement can reuse the old public id, and the document update
+that follows a discard can still fail; in both cases the file stays.
+
+Only files below MEDIA_FOLDER_PREFIX are discarded: the dev, demo and prod
+databases share Cloudinary credentials, and a database copied from prod holds
+prod URLs that another deployment must never delete.
+
+With MEDIA_SWEEP_INTERVAL_HOURS set (off by default), the worker also lists
+the media folders below MEDIA_FOLDER_PREFIX for files that no document
+references and that are older than MEDIA_SWEEP_GRACE_HOURS (uploads whose
+document write is in flight are younger). The sweep only reports these
+orphans; it discards them with MEDIA_SWEEP_DISCARD set, and only when a
+MEDIA_FOLDER_PREFIX scopes it to this deployment's files.
+
+Every uvicorn worker runs a MediaCleanupWorker. Entries are claimed with a
+lease (services.outbox), so each file is deleted by one of them.
+"""
+
+import asyncio
+import contextlib
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+
+from config import settings
+from logging_config import logger
+from services.media_service import (
+    DELETE_BATCH_LIMIT,
+    MediaService,
+    media_service,
+    public_id_from_url,
+    scoped_folder,
+)
+from services.outbox import claim_due
+
+MEDIA_OUTBOX = "mediaOutbox"
+
+OUTBOX_INDEXES = [
+    # One entry per file, so repeated discards collapse
+    IndexModel(
+        [("publicId", ASCENDING), ("resourceType", ASCENDING)],
+        name="public_id_resource_type_idx",
+        unique=True,
+    ),
+    # Due entries claimed by the worker
+    IndexModel([("status", ASCENDING), ("notBefore", ASCENDING)], name="status_not_before_idx"),
+]
+
+# Fields holding the URL of an uploaded image
+IMAGE_REFERENCES = (
+    ("players", "imageUrl"),
+    ("clubs", "logoUrl"),
+    ("clubs", "teams.logoUrl"),
+    ("posts", "imageUrl"),
+    ("venues", "imageUrl"),
+)
+
+# Folders the routers upload into; logos/ includes logos/teams/
+MEDIA_FOLDERS = (
+    ("players/", "image"),
+    ("logos/", "image"),
+    ("posts/", "image"),
+    ("venues/", "image"),
+    ("docs/", "raw"),
+)
+
+# A claimed entry becomes due again if the worker holding it dies
+LEASE_SECONDS = 300
+MAX_BACKOFF_SECONDS = 3600
+
+
+def _field_values(value: Any, path: list[str]) -> list[Any]:
+    """Values of a dotted field, following arrays like a MongoDB query does"""
+    if isinstance(value, list):
+        return [item for element in value for item in _field_values(element, path)]
+    if not path:
+        return [value]
+    if not isinstance(value, dict):
+        return []
+    return _field_values(value.get(path[0]), path[1:])
+
+
+class MediaCleanupService:
+    """Media outbox: discarded files waiting for their deletion"""
+
+    def __init__(self, db, media: MediaService | None = None):
+        self.db = db
+        self.media = media or media_service
+
+    @property
+    def batch_size(self) -> int:
+        return max(1, min(settings.MEDIA_CLEANUP_BATCH_SIZE, DELETE_BATCH_LIMIT))
+
+    async def discard(
+        self, public_id: str | None, resource_type: str = "image", replaced_by: str | None = None
+    ) -> bool:
+        """
+        Schedule the deletion of a file.
+
+        Nothing is scheduled without a public id, for a file outside
+        MEDIA_FOLDER_PREFIX, or when the replacement was uploaded under the
+        same public id (and overwrote the file).
+        """
+        if not public_id or public_id == replaced_by:
+            return False
+        if not public_id.startswith(scoped_folder("")):
+            logger.info(f"Media of another deployment, not discarded: {public_id}")
+            return False
+        now = datetime.now()
+        with contextlib.suppress(DuplicateKeyError):  # concurrent discard of the same file
+            await self.db[MEDIA_OUTBOX].update_one(
+                {"publicId": public_id, "resourceType": resource_type},
+                {
+                    "$set": {
+                        "status": "pending",
+                        "notBefore": now + timedelta(seconds=settings.MEDIA_CLEANUP_DELAY),
+                        "attempts": 0,
+                        "lastError": None,
+                    },
+                    "$setOnInsert": {"createdAt": now},
+                },
+                upsert=True,
+            )
+        logger.debug(f"Media discarded: {public_id} ({resource_type})")
+        return True
+
+    async def discard_url(self, url: str | None, replaced_by: str | None = None) -> bool:
+        """Schedule the deletion of the image behind a stored imageUrl/logoUrl"""
+        return await self.discard(public_id_from_url(url), "image", public_id_from_url(replaced_by))
+
+    async def referenced_ids(self) -> dict[str, set[str]]:
+        """Public ids that documents still reference, per resource type"""
+        images: set[str] = set()
+        for collection, field in IMAGE_REFERENCES:
+            path = field.split(".")
+            cursor = self.db[collection].find({field: {"$nin": [None, ""]}}, {field: 1})
+            async for doc in cursor:
+                for url in _field_values(doc, path):
+                    public_id = public_id_from_url(url) if isinstance(url, str) else None
+                    if public_id:
+                        images.add(public_id)
+        documents = await self.db["documents"].distinct("publicId")
+        return {"image": images, "raw": {public_id for public_id in documents if public_id}}
+
+    async def process_batch(self) -> int:
+        """Delete one batch of due files; returns the number of entries handled"""
+        entries = await claim_due(self.db[MEDIA_OUTBOX], self.batch_size, LEASE_SECONDS)
+        if not entries:
+            return 0
+        referenced = await self.referenced_ids()
+        done = []
+        by_type: dict[str, list[dict[str, Any]]] = {}
+        for entry in entries:
+            if entry["publicId"] in referenced.get(entry["resourceType"], set()):
+                logger.info(f"Media still referenced, not deleted: {entry['publicId']}")
+                done.append(entry["_id"])
+            else:
+                by_type.setdefault(entry["resourceType"], []).append(entry)
+
+        for resource_type, group in by_type.items():
+            try:
+                results = await self.media.destroy_many(
+                    [entry["publicId"] for entry in group], resource_type
+                )
+            except Exception as e:
+                await self._retry_later(group, repr(e))
+                continue
+            failed = []
+            for entry in group:
+                if results.get(entry["publicId"]) in ("deleted", "not_found"):
+                    done.append(entry["_id"])
+                else:
+                    failed.append(entry)
+            await self._retry_later(failed, "not deleted")
+            logger.info(f"Media cleanup deleted {len(group) - len(failed)} {resource_type} files")
+
+        if done:
+            await self.db[MEDIA_OUTBOX].delete_many({"_id": {"$in": done}})
+        return len(entries)
+
+    async def _retry_later(self, entries: list[dict[str, Any]], error: str) -> None:
+        now = datetime.now()
+        for entry in entries:
+            attempts = entry.get("attempts", 0) + 1
+            update: dict[str, Any] = {"attempts": attempts, "lastError": error}
+            if attempts >= settings.MEDIA_CLEANUP_MAX_ATTEMPTS:
+                update["status"] = "failed"
+                logger.error(f"Giving up deleting media {entry['publicId']}: {error}")
+            else:
+                delay = min(settings.MEDIA_CLEANUP_INTERVAL * 2**attempts, MAX_BACKOFF_SECONDS)
+                update["notBefore"] = now + timedelta(seconds=delay)
+                logger.warning(
+                    f"Deleting media {entry['publicId']} failed ({error}), retrying in {delay:.0f}s"
+                )
+            await self.db[MEDIA_OUTBOX].update_one(
+                {"_id": entry["_id"]}, {"$set": update, "$unset": {"claim": ""}}
+            )
+
+    async def sweep(self) -> list[tuple[str, str]]:
+        """
+        Find unreferenced files older than the grace period.
+
+        Returns the (resource type, public id) of each orphan. They are only
+        discarded with MEDIA_SWEEP_DISCARD and a MEDIA_FOLDER_PREFIX set.
+        """
+        discard = settings.MEDIA_SWEEP_DISCARD
+        if discard and not settings.MEDIA_FOLDER_PREFIX.strip("/"):
+            logger.warning(
+                "Media sweep only reports: MEDIA_SWEEP_DISCARD needs MEDIA_FOLDER_PREFIX"
+            )
+            discard = False
+        referenced = await self.referenced_ids()
+        queued = {
+            (doc["resourceType"], doc["publicId"])
+            async for doc in self.db[MEDIA_OUTBOX].find({}, {"publicId": 1, "resourceType": 1})
+        }
+        cutoff = datetime.now(UTC) - timedelta(hours=settings.MEDIA_SWEEP_GRACE_HOURS)
+        orphans = []
+        for folder, resource_type in MEDIA_FOLDERS:
+            for resource in await self.media.list_resources(scoped_folder(folder), resource_type):
+                public_id = resource["public_id"]
+                if (
+                    public_id in referenced[resource_type]
+                    or (resource_type, public_id) in queued
+                    or resource["created_at"] >= cutoff
+                ):
+                    continue
+                orphans.append((resource_type, public_id))
+                if discard:
+                    await self.discard(public_id, resource_type)
+                else:
+                    logger.info(f"Orphaned media: {public_id} ({resource_type})")
+        action = "discarded" if discard else "found (report only)"
+        logger.info(f"Media sweep {action} {len(orphans)} orphaned files")
+        return orphans
+
+
+class MediaCleanupWorker:
+    """Background tasks draining the media outbox and sweeping for orphans"""
+
+    def __init__(self, db, media: MediaService | None = None):
+        self.service = MediaCleanupService(db, media)
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if settings.MEDIA_CLEANUP_INTERVAL <= 0:
+            logger.info("Media cleanup worker disabled")
+            return
+        self._tasks.append(asyncio.create_task(self._drain()))
+        if settings.MEDIA_SWEEP_INTERVAL_HOURS > 0:
+            self._tasks.append(asyncio.create_task(self._sweep()))
+        logger.info(
+            f"Media cleanup worker running every {settings.MEDIA_CLEANUP_INTERVAL}s, "
+            f"sweeping every {settings.MEDIA_SWEEP_INTERVAL_HOURS}h"
+        )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+
+    async def _drain(self) -> None:
+        while True:
+            await asyncio.sleep(settings.MEDIA_CLEANUP_INTERVAL)
+            try:
+                while await self.service.process_batch() >= self.service.batch_size:
+                    pass
+            except Exception as e:
+                logger.warning(f"Media cleanup run failed: {e!r}")
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(settings.MEDIA_SWEEP_INTERVAL_HOURS * 3600)
+            try:
+                await self.service.sweep()
+            except Exception as e:
+                logger.warning(f"Media sweep failed: {e!r}")
@@ -0,0 +1,314 @@
+"""
+Media Service - Non-blocking image and document uploads
+
+The Cloudinary SDK is synchronous. MediaService runs its calls in a thread
+pool of MEDIA_WORKERS threads, so an upload no longer blocks the event loop
+for its whole network round trip. Transient failures (network errors, rate
+limiting, Cloudinary 5xx) are retried MEDIA_RETRIES times with exponential
+backoff.
+
+Uploads go through the SDK's chunked upload, which reads the file in chunks
+of MEDIA_CHUNK_SIZE bytes, so an UploadFile is streamed from its spooled
+temporary file rather than read into memory in one piece.
+
+Uploads land below MEDIA_FOLDER_PREFIX, the media root of this deployment.
+Deployments sharing one Cloudinary account set different prefixes, so
+deleting one deployment's files can never hit another's.
+
+With MEDIA_BACKEND=local, files are written below MEDIA_LOCAL_DIR instead, so
+uploads work (and can be tested) without Cloudinary credentials or network.
+
+destroy_many() and list_resources() use the Cloudinary Admin API, which is
+rate limited per hour; they serve the background cleanup in
+services.media_cleanup, not request handlers.
+"""
+
+import asyncio
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Protocol
+from urllib.parse import urlparse
+
+import cloudinary.api
+import cloudinary.exceptions
+import cloudinary.uploader
+from fastapi import UploadFile
+
+from config import settings
+from logging_config import logger
+from utils import configure_cloudinary
+
+# Public ids per Admin API delete call, and resources per listing page
+DELETE_BATCH_LIMIT = 100
+LIST_PAGE_SIZE = 500
+
+
+class MediaBackend(Protocol):
+    def upload(self, file: BinaryIO, **options: Any) -> dict[str, Any]: ...
+
+    def destroy(self, public_id: str, **options: Any) -> dict[str, Any]: ...
+
+    def destroy_many(self, public_ids: list[str], resource_type: str) -> dict[str, str]: ...
+
+    def list_resources(self, prefix: str, resource_type: str) -> list[dict[str, Any]]: ...
+
+
+class _KeepOpen:
+    """File wrapper the chunked upload cannot close, so a retry can rewind it"""
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self.name = getattr(file, "name", None)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def __enter__(self) -> "_KeepOpen":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+class CloudinaryBackend:
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        configure_cloudinary()
+
+    def upload(self, file: BinaryIO, **options: Any) -> dict[str, Any]:
+        return cloudinary.uploader.upload_large(
+            _KeepOpen(file), chunk_size=self.chunk_size, **options
+        )
+
+    def destroy(self, public_id: str, **options: Any) -> dict[str, Any]:
+        return cloudinary.uploader.destroy(public_id, **options)
+
+    def destroy_many(self, public_ids: list[str], resource_type: str) -> dict[str, str]:
+        """Delete up to DELETE_BATCH_LIMIT files; maps each id to deleted or not_found"""
+        result = cloudinary.api.delete_resources(public_ids, resource_type=resource_type)
+        return result.get("deleted", {})
+
+    def list_resources(self, prefix: str, resource_type: str) -> list[dict[str, Any]]:
+        """public_id and created_at (aware datetime) of every file below prefix"""
+        resources = []
+        cursor = None
+        while True:
+            page = cloudinary.api.resources(
+                type="upload",
+                resource_type=resource_type,
+                prefix=prefix,
+                max_results=LIST_PAGE_SIZE,
+                next_cursor=cursor,
+            )
+            resources.extend(
+                {
+                    "public_id": resource["public_id"],
+                    "created_at": datetime.fromisoformat(resource["created_at"]),
+                }
+                for resource in page.get("resources", [])
+            )
+            cursor = page.get("next_cursor")
+            if not cursor:
+                return resources
+
+
+class LocalMediaBackend:
+    """Stores uploads on disk with Cloudinary-shaped results"""
+
+    def __init__(self, root: Path, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, public_id: str, options: dict[str, Any]) -> Path:
+        extension = options.get("format") or (
+            "" if options.get("resource_type") == "raw" else "jpg"
+        )
+        return self.root / (f"{public_id}.{extension}" if extension else public_id)
+
+    def upload(self, file: BinaryIO, **options: Any) -> dict[str, Any]:
+        folder = (options.get("folder") or "").strip("/")
+        public_id = options.get("public_id") or Path(getattr(file, "name", "upload")).stem
+        public_id = f"{folder}/{public_id}" if folder else public_id
+        path = self._path(public_id, options)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as target:
+            shutil.copyfileobj(file, target)
+        url = f"{self.base_url}/{path.relative_to(self.root).as_posix()}"
+        return {
+            "public_id": public_id,
+            "url": url,
+            "secure_url": url,
+            "resource_type": options.get("resource_type", "image"),
+            "bytes": path.stat().st_size,
+        }
+
+    def destroy(self, public_id: str, **options: Any) -> dict[str, Any]:
+        path = self._path(public_id, options)
+        if not path.exists():
+            return {"result": "not found"}
+        path.unlink()
+        return {"result": "ok"}
+
+    def destroy_many(self, public_ids: list[str], resource_type: str) -> dict[str, str]:
+        results = {}
+        for public_id in public_ids:
+            result = self.destroy(public_id, resource_type=resource_type)["result"]
+            results[public_id] = "deleted" if result == "ok" else "not_found"
+        return results
+
+    def list_resources(self, prefix: str, resource_type: str) -> list[dict[str, Any]]:
+        resources = []
+        for path in sorted(self.root.rglob("*")):
+            relative = path.relative_to(self.root).as_posix()
+            if not path.is_file() or not relative.startswith(prefix):
+                continue
+            resources.append(
+                {
+                    "public_id": relative if resource_type == "raw" else relative.rsplit(".", 1)[0],
+                    "created_at": datetime.fromtimestamp(path.stat().st_mtime, UTC),
+                }
+            )
+        return resources
+
+
+def scoped_folder(folder: str) -> str:
+    """Folder below MEDIA_FOLDER_PREFIX; the folder itself without a prefix"""
+    prefix = settings.MEDIA_FOLDER_PREFIX.strip("/")
+    return f"{prefix}/{folder.lstrip('/')}" if prefix else folder
+
+
+def public_id_from_url(url: str | None) -> str | None:
+    """
+    The image public id of a URL the media backend returned, None for other URLs.
+
+    Cloudinary URLs end in .../upload/[transformations/]v<version>/<public_id>.<ext>,
+    local backend URLs are MEDIA_LOCAL_URL/<public_id>.<ext>.
+    """
+    if not url:
+        return None
+    path = urlparse(url).path
+    if "/upload/" in path:
+        segments = path.split("/upload/", 1)[1].split("/")
+        for i, segment in enumerate(segments):
+            if re.fullmatch(r"v\d+", segment):
+                segments = segments[i + 1 :]
+                break
+        path = "/".join(segments)
+    else:
+        local = urlparse(settings.MEDIA_LOCAL_URL).path.rstrip("/") + "/"
+        if not path.startswith(local):
+            return None
+        path = path[len(local) :]
+    folder, _, name = path.rpartition("/")
+    name = name.rsplit(".", 1)[0]
+    if not name:
+        return None
+    return f"{folder}/{name}" if folder else name
+
+
+def is_transient(error: Exception) -> bool:
+    """Network failures, rate limiting and server errors; not bad requests or auth"""
+    if isinstance(error, cloudinary.exceptions.RateLimited | cloudinary.exceptions.GeneralError):
+        return True
+    # The SDK raises the base Error for socket, HTTP and response parsing failures
+    return type(error) is cloudinary.exceptions.Error or isinstance(error, OSError)
+
+
+class MediaService:
+    """Runs media backend calls off the event loop with retries"""
+
+    def __init__(
+        self,
+        backend: MediaBackend | None = None,
+        workers: int | None = None,
+        retries: int | None = None,
+        retry_delay: float | None = None,
+    ):
+        self._backend = backend
+        self.workers = workers or settings.MEDIA_WORKERS
+        self.retries = settings.MEDIA_RETRIES if retries is None else retries
+        self.retry_delay = settings.MEDIA_RETRY_DELAY if retry_delay is None else retry_delay
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def backend(self) -> MediaBackend:
+        # Created on first use so importing routers does not configure the SDK
+        if self._backend is None:
+            if settings.MEDIA_BACKEND == "local":
+                self._backend = LocalMediaBackend(
+                    Path(settings.MEDIA_LOCAL_DIR), settings.MEDIA_LOCAL_URL
+                )
+            else:
+                self._backend = CloudinaryBackend(settings.MEDIA_CHUNK_SIZE)
+        return self._backend
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="media")
+        return self._executor
+
+    async def upload(self, file: UploadFile | BinaryIO, **options: Any) -> dict[str, Any]:
+        """Upload a file with backend options (folder, public_id, transformation, ...)"""
+        stream = file.file if isinstance(file, UploadFile) else file
+        start = stream.tell()
+        if "folder" in options:
+            options = {**options, "folder": scoped_folder(options["folder"])}
+
+        def upload() -> dict[str, Any]:
+            stream.seek(start)
+            return self.backend.upload(stream, **options)
+
+        result = await self._run(upload, f"upload to {options.get('folder', '')}")
+        logger.info(f"Media uploaded: {result['public_id']}")
+        return result
+
+    async def destroy(self, public_id: str, **options: Any) -> dict[str, Any]:
+        result = await self._run(
+            lambda: self.backend.destroy(public_id, **options), f"destroy {public_id}"
+        )
+        logger.info(f"Media deleted: {public_id} ({result.get('result')})")
+        return result
+
+    async def destroy_many(self, public_ids: list[str], resource_type: str) -> dict[str, str]:
+        return await self._run(
+            lambda: self.backend.destroy_many(public_ids, resource_type),
+            f"delete of {len(public_ids)} files",
+        )
+
+    async def list_resources(self, prefix: str, resource_type: str) -> list[dict[str, Any]]:
+        return await self._run(
+            lambda: self.backend.list_resources(prefix, resource_type), f"listing of {prefix}"
+        )
+
+    async def _run(self, call, description: str) -> Any:
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            try:
+                return await loop.run_in_executor(self.executor, call)
+            except Exception as e:
+                if attempt >= self.retries or not is_transient(e):
+                    raise
+                delay = self.retry_delay * 2**attempt
+                logger.warning(f"Media {description} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+media_service = MediaService()
@@ -0,0 +1,94 @@
+"""
+Media URLs - Size-specific image URLs for list responses
+
+Stored imageUrl/logoUrl/logo values point at the uploaded original, so a
+40-row player table or a standings table downloaded every picture at full size.
+List responses now carry a sibling <name>Variants object next to each image
+field, e.g. imageUrl → imageVariants, with one Cloudinary delivery URL per
+IMAGE_SIZES entry:
+
+    "logoUrl": ".../image/upload/v1712/logos/buffalos.png",
+    "logoVariants": {
+        "thumb": ".../image/upload/c_fit,w_64,h_64,f_auto,q_auto/v1712/logos/buffalos.png",
+        "list": ...,
+        "detail": ...
+    }
+
+Cloudinary renders a derivative on its first request and serves it from the
+CDN afterwards; f_auto/q_auto pick WebP/AVIF and a quality per client. URLs
+that are not Cloudinary image uploads (local backend, external links) get the
+original for every size.
+
+Variants are a pure function of the URL and the same logos repeat on every
+page, so they are memoized in an LRU cache of MEDIA_URL_CACHE_SIZE entries.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any
+
+from config import settings
+
+# Transformation per size; c_fit keeps logos uncropped
+IMAGE_SIZES = {
+    "thumb": "c_fit,w_64,h_64,f_auto,q_auto",
+    "list": "c_fit,w_160,h_160,f_auto,q_auto",
+    "detail": "c_limit,w_800,h_800,f_auto,q_auto",
+}
+
+# Image fields of the API and the sibling field holding their variants
+IMAGE_FIELDS = {
+    "imageUrl": "imageVariants",
+    "logoUrl": "logoVariants",
+    "logo": "logoVariants",
+}
+
+UPLOAD_MARKER = "/image/upload/"
+VERSION_SEGMENT = re.compile(r"v\d+")
+
+
+def derivative_url(url: str, transformation: str) -> str:
+    """
+    The Cloudinary URL of url with transformation applied after any stored one.
+
+    Returns url unchanged if it is not a Cloudinary image upload URL.
+    """
+    base, marker, path = url.partition(UPLOAD_MARKER)
+    if not marker:
+        return url
+    segments = path.split("/")
+    # Transformations already in the URL come before the version segment
+    position = next(
+        (i for i, segment in enumerate(segments) if VERSION_SEGMENT.fullmatch(segment)), 0
+    )
+    segments.insert(position, transformation)
+    return f"{base}{marker}{'/'.join(segments)}"
+
+
+@lru_cache(maxsize=settings.MEDIA_URL_CACHE_SIZE)
+def _variants(url: str) -> tuple[tuple[str, str], ...]:
+    return tuple((size, derivative_url(url, t)) for size, t in IMAGE_SIZES.items())
+
+
+def image_variants(url: str) -> dict[str, str]:
+    """URL per IMAGE_SIZES entry for an image URL"""
+    return dict(_variants(url))
+
+
+def add_image_variants(content: Any) -> Any:
+    """
+    Add <name>Variants next to every non-empty image field, in place.
+
+    content is a response body of dicts and lists, e.g. the output of
+    jsonable_encoder or model_dump(); models inside it are left alone.
+    """
+    if isinstance(content, list):
+        for item in content:
+            add_image_variants(item)
+    elif isinstance(content, dict):
+        for key, value in list(content.items()):
+            if isinstance(value, dict | list):
+                add_image_variants(value)
+            elif key in IMAGE_FIELDS and value:
+                content[IMAGE_FIELDS[key]] = image_variants(str(value))
+    return content
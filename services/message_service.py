@@ -115,6 +115,78 @@ class MessageService:
 
         return message
 
+    @monitor_query("get_chat_partners")
+    async def get_chat_partners(self, user_id: str) -> list[dict]:
+        """
+        Get all users the given user has exchanged messages with.
+        Replaces: two distinct queries plus one users.find_one and one
+        messages.count_documents per chat partner.
+
+        Args:
+            user_id: User ID of the logged-in user
+
+        Returns:
+            One entry per chat partner with userId, firstName, lastName,
+            unreadCount and lastMessageAt, most recent conversation first.
+            Partners whose user document no longer exists are omitted.
+        """
+        pipeline = [
+            {"$match": {"$or": [{"sender.userId": user_id}, {"receiver.userId": user_id}]}},
+            {
+                "$project": {
+                    "counterpart": {
+                        "$cond": [
+                            {"$eq": ["$sender.userId", user_id]},
+                            "$receiver.userId",
+                            "$sender.userId",
+                        ]
+                    },
+                    "timestamp": 1,
+                    "unread": {
+                        "$cond": [
+                            {
+                                "$and": [
+                                    {"$eq": ["$receiver.userId", user_id]},
+                                    {"$eq": ["$read", False]},
+                                ]
+                            },
+                            1,
+                            0,
+                        ]
+                    },
+                }
+            },
+            {
+                "$group": {
+                    "_id": "$counterpart",
+                    "unreadCount": {"$sum": "$unread"},
+                    "lastMessageAt": {"$max": "$timestamp"},
+                }
+            },
+            {
+                "$lookup": {
+                    "from": "users",
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "pipeline": [{"$project": {"firstName": 1, "lastName": 1}}],
+                    "as": "user",
+                }
+            },
+            {"$unwind": "$user"},
+            {"$sort": {"lastMessageAt": -1}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "userId": "$_id",
+                    "firstName": "$user.firstName",
+                    "lastName": "$user.lastName",
+                    "unreadCount": 1,
+                    "lastMessageAt": 1,
+                }
+            },
+        ]
+        return await self.db["messages"].aggregate(pipeline).to_list(length=None)
+
     def format_match_notification(self, match: dict) -> str:
         """
         Format match details for notification message.
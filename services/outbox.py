@@ -0,0 +1,29 @@
+"""
+Outbox - Claiming due entries of a work queue collection
+
+The media and mail outboxes are collections of entries with a status and a
+notBefore time. Every uvicorn worker runs its own background sender, so an
+entry is leased before it is processed: claim_due() moves notBefore past the
+lease and tags the entries with a token only the claiming worker knows. An
+entry whose worker dies becomes due again when the lease runs out.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+
+async def claim_due(collection, limit: int, lease_seconds: float) -> list[dict[str, Any]]:
+    """Lease up to limit pending entries whose notBefore has passed, oldest first"""
+    now = datetime.now()
+    due = {"status": "pending", "notBefore": {"$lte": now}}
+    cursor = collection.find(due, {"_id": 1}).sort("notBefore", 1).limit(limit)
+    ids = [doc["_id"] async for doc in cursor]
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    await collection.update_many(
+        {"_id": {"$in": ids}, **due},
+        {"$set": {"notBefore": now + timedelta(seconds=lease_seconds), "claim": token}},
+    )
+    return await collection.find({"claim": token}).sort("notBefore", 1).to_list(None)
@@ -17,6 +17,7 @@ from exceptions import (
 )
 from logging_config import logger
 from models.matches import PenaltiesBase, PenaltiesDB, PenaltiesUpdate
+from services.live_match_service import compact_penalty, live_match_hub
 from services.stats_service import StatsService
 from utils import parse_time_from_seconds, parse_time_to_seconds, populate_event_player_fields
 
@@ -225,6 +226,12 @@ class PenaltyService:
             },
         )
 
+        live_match_hub.publish(
+            match_id,
+            "penalty",
+            {"team": team_flag, "action": "created", "penalty": compact_penalty(penalty_data)},
+        )
+
         return await self.get_penalty_by_id(match_id, team_flag, new_penalty_id)
 
     async def update_penalty(
@@ -293,6 +300,17 @@ class PenaltyService:
             extra={"match_id": match_id, "penalty_id": penalty_id, "team_flag": team_flag},
         )
 
+        live_match_hub.publish(
+            match_id,
+            "penalty",
+            {
+                "team": team_flag,
+                "action": "updated",
+                "penaltyId": penalty_id,
+                "changes": compact_penalty(penalty_dict, partial=True),
+            },
+        )
+
         return await self.get_penalty_by_id(match_id, team_flag, penalty_id)
 
     async def delete_penalty(self, match_id: str, team_flag: str, penalty_id: str) -> None:
@@ -367,3 +385,9 @@ class PenaltyService:
                 "minutes": penalty_minutes,
             },
         )
+
+        live_match_hub.publish(
+            match_id,
+            "penalty",
+            {"team": team_flag, "action": "deleted", "penaltyId": penalty_id},
+        )
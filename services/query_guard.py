@@ -0,0 +1,166 @@
+"""
+Query Guard - N+1 query detection per request
+
+Builds on the DB command listener of services.request_metrics. Every command
+issued during a request is reduced to its shape: collection, command and the
+filter/pipeline/update structure with all values replaced by "?". When one
+shape repeats QUERY_GUARD_THRESHOLD times within a request, a loop is issuing
+one query per item (find_one per player, update_one per roster entry...) and
+the guard reports it with the call site in this code base:
+
+    QUERY_GUARD_MODE=log    log a warning (development)
+    QUERY_GUARD_MODE=raise  fail the request with NPlusOneQueryError (tests)
+
+The call site is taken from the await chain of the request task, which is
+suspended on the very command being reported while the listener runs.
+
+Tests can also put a hard budget on endpoints:
+
+    with assert_query_budget(5):
+        await client.get("/matches/...")
+"""
+
+import asyncio
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from config import settings
+from logging_config import logger
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+_OWN_FILES = {str(Path(__file__).resolve()), str(REPO_ROOT / "services" / "request_metrics.py")}
+
+# Field holding the query structure, per command
+SHAPE_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+    "update": "updates",
+    "delete": "deletes",
+}
+
+# Continuations of an earlier command, never an N+1 on their own
+UNGUARDED_COMMANDS = {"getMore", "killCursors"}
+
+# Requests currently captured by assert_query_budget()
+_budget_captures: list[list] = []
+
+
+class NPlusOneQueryError(AssertionError):
+    """A request repeated one query shape more often than allowed"""
+
+
+class QueryViolation(NamedTuple):
+    shape: str
+    count: int
+    call_site: str
+
+
+def _shape(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _shape(value[key]) for key in sorted(value)}
+    if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+        return [_shape(v) for v in value]
+    return "?"
+
+
+def query_shape(collection: str, command_name: str, command: dict) -> str:
+    """Collection, command and query structure without any values"""
+    field = SHAPE_FIELDS.get(command_name)
+    structure = _shape(command.get(field)) if field else None
+    return f"{collection}.{command_name} {json.dumps(structure, sort_keys=True)}"
+
+
+def call_site(task: asyncio.Task | None) -> str:
+    """Innermost frames of this code base in the await chain of a task"""
+    if task is None:
+        return "unknown"
+    frames = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is not None:
+            frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    own = [
+        f
+        for f in frames
+        if f.f_code.co_filename.startswith(str(REPO_ROOT))
+        and "site-packages" not in f.f_code.co_filename
+        and f.f_code.co_filename not in _OWN_FILES
+    ]
+    if not own:
+        return "unknown"
+    return " <- ".join(
+        f"{Path(f.f_code.co_filename).relative_to(REPO_ROOT)}:{f.f_lineno} in {f.f_code.co_name}"
+        for f in reversed(own[-3:])
+    )
+
+
+def active() -> bool:
+    return settings.QUERY_GUARD_MODE != "off" or bool(_budget_captures)
+
+
+def inspect_command(stats, collection: str, command_name: str, command: dict) -> None:
+    """Count the shape of one command for the request; report it at the threshold"""
+    if command_name in UNGUARDED_COMMANDS:
+        return
+    shape = query_shape(collection, command_name, command)
+    count = stats.count_shape(shape)
+    if settings.QUERY_GUARD_MODE == "off" or count != settings.QUERY_GUARD_THRESHOLD:
+        return
+    violation = QueryViolation(shape=shape, count=count, call_site=call_site(stats.task))
+    stats.violations.append(violation)
+    logger.warning(
+        f"Possible N+1: {count}x {shape} in {stats.method} {stats.path} at {violation.call_site}"
+    )
+
+
+def finish_request(stats) -> None:
+    """Hand a finished request to budget captures and enforce raise mode"""
+    for captured in _budget_captures:
+        captured.append(stats)
+    if stats.violations and settings.QUERY_GUARD_MODE == "raise":
+        raise NPlusOneQueryError(_describe(stats))
+
+
+def _describe(stats) -> str:
+    lines = [f"{stats.method} {stats.route}: {stats.queries} queries"]
+    lines += [
+        f"  {int(calls)}x {collection}.{command}"
+        for (collection, command), (calls, *_rest) in sorted(
+            stats.operations.items(), key=lambda item: -item[1][0]
+        )
+    ]
+    lines += [f"  N+1: {v.count}+x {v.shape} at {v.call_site}" for v in stats.violations]
+    return "\n".join(lines)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, max_identical: int | None = None) -> Iterator[list]:
+    """
+    Fail if any request finished inside the block issued more than max_queries
+    MongoDB commands, or repeated one query shape more than max_identical times.
+
+    Yields the list of captured RequestStats.
+    """
+    captured: list = []
+    _budget_captures.append(captured)
+    try:
+        yield captured
+    finally:
+        _budget_captures.remove(captured)
+    for stats in captured:
+        if stats.queries > max_queries:
+            raise AssertionError(f"Query budget of {max_queries} exceeded\n{_describe(stats)}")
+        if max_identical is not None:
+            shape, count = max(stats.shapes.items(), key=lambda item: item[1], default=("", 0))
+            if count > max_identical:
+                raise AssertionError(
+                    f"{count}x identical query {shape} (max {max_identical})\n{_describe(stats)}"
+                )
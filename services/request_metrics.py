@@ -0,0 +1,347 @@
+"""
+Request Metrics - Per-route latency and per-request database cost
+
+RequestMetricsMiddleware times every routed request and records it in a
+latency histogram labelled by route template (e.g. /matches/{match_id}), method
+and status class. DBCommandListener is registered with the Motor client and
+counts every MongoDB command per collection and operation: calls, documents
+returned or written, and time.
+
+The command is attributed to the request that issued it through a ContextVar.
+Motor runs pymongo on a thread pool and copies the caller's context into it,
+so the listener sees the RequestStats of the calling request. That gives a
+"database queries per request" histogram per route, where N+1 loops stand out
+without reading code. services.query_guard uses the same listener to detect
+repeated identical queries within one request.
+
+MetricsRegistry.render() produces Prometheus text exposition format, served
+by GET /metrics.
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable
+from contextvars import ContextVar
+from typing import Any
+
+from pymongo import monitoring
+
+from logging_config import logger
+from services import query_guard
+
+# Seconds; Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Driver housekeeping, not application queries
+IGNORED_COMMANDS = {
+    "hello",
+    "ismaster",
+    "isMaster",
+    "ping",
+    "buildInfo",
+    "endSessions",
+    "saslStart",
+    "saslContinue",
+    "authenticate",
+    "getnonce",
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram (not thread-safe on its own)"""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class RequestStats:
+    """Database work done on behalf of one request"""
+
+    def __init__(
+        self,
+        method: str = "",
+        path: str = "",
+        task: asyncio.Task | None = None,
+        route: str = UNMATCHED_ROUTE,
+    ):
+        self.method = method
+        self.path = path
+        self.task = task
+        self.route = route
+        self.queries = 0
+        self.documents = 0
+        self.db_seconds = 0.0
+        # (collection, command) -> [calls, documents, seconds]
+        self.operations: dict[tuple[str, str], list[float]] = {}
+        # Query shape -> count, and what services.query_guard reported
+        self.shapes: Counter[str] = Counter()
+        self.violations: list[query_guard.QueryViolation] = []
+        self._lock = threading.Lock()
+
+    def record(self, collection: str, command: str, seconds: float, documents: int) -> None:
+        with self._lock:
+            self.queries += 1
+            self.documents += documents
+            self.db_seconds += seconds
+            entry = self.operations.setdefault((collection, command), [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += documents
+            entry[2] += seconds
+
+    def count_shape(self, shape: str) -> int:
+        with self._lock:
+            self.shapes[shape] += 1
+            return self.shapes[shape]
+
+
+current_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def format_metric(
+    name: str, metric_type: str, help_text: str, samples: Iterable[tuple[dict, float]]
+) -> list[str]:
+    """Lines of one metric family in Prometheus text format"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    lines.extend(f"{name}{_labels(**labels)} {value}" for labels, value in samples)
+    return lines
+
+
+def _histogram_lines(
+    name: str, help_text: str, histograms: dict[tuple[tuple[str, Any], ...], Histogram]
+) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for label_items, histogram in sorted(histograms.items()):
+        labels = dict(label_items)
+        for bound, count in zip(histogram.buckets, histogram.counts, strict=True):
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+        lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {round(histogram.sum, 6)}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+class MetricsRegistry:
+    """Process-wide request and database counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency: dict[tuple, Histogram] = {}
+            self._queries_per_request: dict[tuple, Histogram] = {}
+            # (collection, command) -> [calls, documents, seconds, failures]
+            self._commands: dict[tuple[str, str], list[float]] = {}
+
+    def observe_request(
+        self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats
+    ) -> None:
+        key = (("method", method), ("route", route), ("status", f"{status_code // 100}xx"))
+        with self._lock:
+            self._latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self._queries_per_request.setdefault(
+                (("method", method), ("route", route)), Histogram(QUERY_COUNT_BUCKETS)
+            ).observe(stats.queries)
+
+    def observe_command(
+        self, collection: str, command: str, seconds: float, documents: int, failed: bool = False
+    ) -> None:
+        with self._lock:
+            entry = self._commands.setdefault((collection, command), [0, 0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += documents
+            entry[2] += seconds
+            entry[3] += int(failed)
+
+    def render(self) -> str:
+        with self._lock:
+            commands = sorted(self._commands.items())
+            lines = _histogram_lines(
+                "bishl_http_request_duration_seconds",
+                "Latency of routed HTTP requests",
+                self._latency,
+            )
+            lines += _histogram_lines(
+                "bishl_http_request_db_queries",
+                "MongoDB commands issued per HTTP request",
+                self._queries_per_request,
+            )
+        samples = [({"collection": c, "command": op}, v) for (c, op), v in commands]
+        lines += format_metric(
+            "bishl_db_commands_total",
+            "counter",
+            "MongoDB commands by collection and operation",
+            [(labels, v[0]) for labels, v in samples],
+        )
+        lines += format_metric(
+            "bishl_db_documents_total",
+            "counter",
+            "Documents returned or written by MongoDB commands",
+            [(labels, v[1]) for labels, v in samples],
+        )
+        lines += format_metric(
+            "bishl_db_command_seconds_total",
+            "counter",
+            "Time spent in MongoDB commands",
+            [(labels, round(v[2], 6)) for labels, v in samples],
+        )
+        lines += format_metric(
+            "bishl_db_command_failures_total",
+            "counter",
+            "Failed MongoDB commands",
+            [(labels, v[3]) for labels, v in samples],
+        )
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def _command_collection(command_name: str, command: dict) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    target = command.get(command_name)
+    return target if isinstance(target, str) else ""
+
+
+def _documents_in_reply(reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+    if "values" in reply:  # distinct
+        return len(reply["values"])
+    if "value" in reply:  # findAndModify
+        return 1 if reply["value"] is not None else 0
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+class DBCommandListener(monitoring.CommandListener):
+    """pymongo command listener feeding the metrics registry"""
+
+    def __init__(self, registry: MetricsRegistry | None = None):
+        self.registry = registry if registry is not None else metrics
+        self._pending: dict[tuple, tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(event) -> tuple:
+        return (event.connection_id, event.request_id, event.operation_id)
+
+    def started(self, event) -> None:
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = _command_collection(event.command_name, event.command)
+        with self._lock:
+            self._pending[self._key(event)] = (collection, event.command_name)
+        stats = current_request_stats.get()
+        if stats is not None and query_guard.active():
+            try:
+                query_guard.inspect_command(stats, collection, event.command_name, event.command)
+            except Exception as e:
+                logger.error(f"Query guard failed: {e!r}")
+
+    def succeeded(self, event) -> None:
+        self._finish(event, _documents_in_reply(event.reply or {}), failed=False)
+
+    def failed(self, event) -> None:
+        self._finish(event, 0, failed=True)
+
+    def _finish(self, event, documents: int, failed: bool) -> None:
+        with self._lock:
+            pending = self._pending.pop(self._key(event), None)
+        if pending is None:
+            return
+        collection, command = pending
+        seconds = event.duration_micros / 1_000_000
+        try:
+            self.registry.observe_command(collection, command, seconds, documents, failed)
+            stats = current_request_stats.get()
+            if stats is not None:
+                stats.record(collection, command, seconds, documents)
+        except Exception as e:  # never break a query because of metrics
+            logger.error(f"DB command metrics failed: {e!r}")
+
+
+db_command_listener = DBCommandListener()
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the matched route, e.g. /matches/{match_id}/{team_flag}/scores.
+
+    Built from the request path by substituting the path parameters in match
+    order, so it includes the prefixes of included routers.
+    """
+    if scope.get("endpoint") is None:
+        return UNMATCHED_ROUTE
+    params = list(scope.get("path_params", {}).items())
+    segments = scope["path"].split("/")
+    i = 0
+    for index, segment in enumerate(segments):
+        if i < len(params) and segment == str(params[i][1]):
+            segments[index] = f"{{{params[i][0]}}}"
+            i += 1
+    return "/".join(segments)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing routed requests and attributing DB commands to them"""
+
+    def __init__(self, app, registry: MetricsRegistry | None = None):
+        self.app = app
+        self.registry = registry if registry is not None else metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope["method"], scope["path"], asyncio.current_task())
+        token = current_request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_stats.reset(token)
+            stats.route = route_template(scope)
+            self.registry.observe_request(
+                scope["method"], stats.route, status_code, time.perf_counter() - start, stats
+            )
+        query_guard.finish_request(stats)
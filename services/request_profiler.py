@@ -0,0 +1,280 @@
+"""
+Request Profiler - Stack-sampled profiles of slow requests
+
+RequestProfilerMiddleware gives every request a correlation id
+(request.state.correlation_id, also used by the exception handlers in main.py
+and returned as X-Correlation-ID). While PROFILE_SLOW_REQUEST_SECONDS > 0, a
+background thread samples the stack of every in-flight request every
+PROFILE_SAMPLE_INTERVAL_MS. Requests that finish faster than the threshold
+discard their samples; slower ones are written to
+logs/profiles/<timestamp>_<correlation id>.txt.
+
+Sampling is async aware. The request's task is followed through its await
+chain, so a sample taken while the request waits for MongoDB or the ISHD API
+shows where it is waiting ("<await>" leaf); a sample taken while it runs on the
+event loop shows the real Python stack. Samples are aggregated as folded
+stacks ("frame;frame;frame count"), which flamegraph.pl and speedscope read
+after the "#" header lines.
+
+Server-Sent Events streams are never profiled.
+"""
+
+import asyncio
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from config import settings
+from logging_config import logger
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PROFILE_ID_PATTERN = re.compile(r"^\d{8}-\d{6}_[0-9a-f-]{36}$")
+TOP_FUNCTIONS = 30
+
+# Event loop machinery between the loop and the request coroutine
+_SKIPPED_MODULES = ("asyncio/", "selectors.py", "threading.py", "concurrent/futures/")
+
+
+def correlation_id_of(request) -> str:
+    """Correlation id assigned by RequestProfilerMiddleware (or a fresh one)"""
+    return getattr(request.state, "correlation_id", None) or str(uuid.uuid4())
+
+
+def _frame_label(frame) -> str:
+    filename = frame.f_code.co_filename
+    try:
+        filename = str(Path(filename).relative_to(REPO_ROOT))
+    except ValueError:
+        filename = filename.rsplit("site-packages/", 1)[-1]
+    return f"{frame.f_code.co_name} ({filename})"
+
+
+def _keep(frame) -> bool:
+    return not any(part in frame.f_code.co_filename for part in _SKIPPED_MODULES)
+
+
+def _await_chain(task: asyncio.Task) -> list:
+    """Frames of a suspended task from its outermost coroutine to the awaited one"""
+    frames = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is not None:
+            frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+def _running_stack(thread_id: int) -> list:
+    frame = sys._current_frames().get(thread_id)
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+class RequestProfile:
+    """Samples of one in-flight request"""
+
+    def __init__(self, correlation_id: str, method: str, path: str, task, loop, thread_id):
+        self.correlation_id = correlation_id
+        self.method = method
+        self.path = path
+        self.task = task
+        self.loop = loop
+        self.thread_id = thread_id
+        self.started_at = datetime.now()
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.sample_count = 0
+
+    def take_sample(self) -> None:
+        if self.task.done():
+            return
+        if asyncio.current_task(self.loop) is self.task:
+            stack = [_frame_label(f) for f in _running_stack(self.thread_id) if _keep(f)]
+        else:
+            stack = [_frame_label(f) for f in _await_chain(self.task) if _keep(f)]
+            stack.append("<await>")
+        self.samples[tuple(stack)] += 1
+        self.sample_count += 1
+
+    def render(self, duration: float, status_code: int, interval: float) -> str:
+        cumulative: Counter[str] = Counter()
+        own: Counter[str] = Counter()
+        for stack, count in self.samples.items():
+            for label in set(stack):
+                cumulative[label] += count
+            if stack:
+                own[stack[-1]] += count
+        total = max(self.sample_count, 1)
+        lines = [
+            f"# correlation_id: {self.correlation_id}",
+            f"# started_at: {self.started_at.isoformat()}",
+            f"# request: {self.method} {self.path}",
+            f"# status: {status_code}",
+            f"# duration_ms: {duration * 1000:.1f}",
+            f"# samples: {self.sample_count} every {interval * 1000:g} ms",
+            "#",
+            "# cumulative%   self%  function",
+        ]
+        for label, count in cumulative.most_common(TOP_FUNCTIONS):
+            lines.append(f"# {count * 100 / total:10.1f} {own[label] * 100 / total:7.1f}  {label}")
+        lines.append("#")
+        lines += [f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common()]
+        return "\n".join(lines) + "\n"
+
+
+class StackSampler:
+    """Background thread sampling all registered requests at a fixed interval"""
+
+    def __init__(self):
+        self._active: set[RequestProfile] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.add(profile)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def remove(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.discard(profile)
+
+    def _run(self) -> None:
+        while True:
+            interval = settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+            with self._lock:
+                active = list(self._active)
+                if not active:
+                    self._thread = None
+                    return
+            for profile in active:
+                try:
+                    profile.take_sample()
+                except Exception as e:  # a racing frame must not stop the sampler
+                    logger.debug(f"Profiler sample failed: {e!r}")
+            time.sleep(interval)
+
+
+sampler = StackSampler()
+
+
+def profile_dir() -> Path:
+    return Path(settings.PROFILE_DIR)
+
+
+def write_profile(profile: RequestProfile, report: str) -> Path:
+    """Write a report and prune the oldest files beyond PROFILE_MAX_FILES"""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{profile.started_at:%Y%m%d-%H%M%S}_{profile.correlation_id}.txt"
+    path.write_text(report, encoding="utf-8")
+    files = sorted(directory.glob("*.txt"), key=lambda f: f.stat().st_mtime)
+    for old in files[: max(0, len(files) - settings.PROFILE_MAX_FILES)]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def list_profiles() -> list[dict[str, Any]]:
+    """Stored profiles, newest first, with the metadata from their headers"""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in sorted(directory.glob("*.txt"), key=lambda f: f.stat().st_mtime, reverse=True):
+        header: dict[str, Any] = {"id": path.stem, "size": path.stat().st_size}
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                key, sep, value = line[2:].partition(": ")
+                if not line.startswith("# ") or not sep:
+                    break
+                header[key] = value.strip()
+        profiles.append(header)
+    return profiles
+
+
+def profile_path(profile_id: str) -> Path | None:
+    """Path of a stored profile; None for unknown or malformed ids"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = profile_dir() / f"{profile_id}.txt"
+    return path if path.is_file() else None
+
+
+class RequestProfilerMiddleware:
+    """ASGI middleware assigning correlation ids and profiling slow requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        correlation_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["correlation_id"] = correlation_id
+        threshold = settings.PROFILE_SLOW_REQUEST_SECONDS
+        profile = None
+        if threshold > 0:
+            profile = RequestProfile(
+                correlation_id,
+                scope["method"],
+                scope["path"],
+                asyncio.current_task(),
+                asyncio.get_running_loop(),
+                threading.get_ident(),
+            )
+            sampler.add(profile)
+
+        status_code = 500
+        streaming = False
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                streaming = any(
+                    name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in headers
+                )
+                if streaming and profile is not None:
+                    # Event streams stay open for minutes and are never reported
+                    sampler.remove(profile)
+                headers.append((b"x-correlation-id", correlation_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profile is not None:
+                sampler.remove(profile)
+                duration = time.perf_counter() - start
+                if duration >= threshold and not streaming and profile.sample_count:
+                    report = profile.render(
+                        duration, status_code, settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+                    )
+                    try:
+                        path = await asyncio.to_thread(write_profile, profile, report)
+                        logger.warning(
+                            f"[{correlation_id}] Slow request {scope['method']} {scope['path']} "
+                            f"took {duration * 1000:.0f} ms, profile written to {path}"
+                        )
+                    except OSError as e:
+                        logger.error(f"[{correlation_id}] Could not write profile: {e!r}")
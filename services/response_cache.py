@@ -0,0 +1,369 @@
+"""
+Response Cache - In-process HTTP response cache for public read endpoints
+
+Read endpoints opt in with @cache_response("<collection>", ...). The first 200
+response for a path + query string is stored as encoded bytes together with a
+strong ETag; later requests are answered from memory, and requests carrying a
+matching If-None-Match get an empty 304.
+
+Entries are never expired by time. Write endpoints declare which collections
+they modify with @invalidates_cache("<collection>", ...) and the middleware drops
+every entry tagged with one of those collections as soon as the write responds,
+so live scores are never served stale. Writes from other workers and scripts
+arrive through services.invalidation_bus as per-document cache keys: an entry
+built from a single document (keys=... on @cache_response) is only dropped when
+that document changes, all others when anything in their collections changes.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, NamedTuple
+from urllib.parse import parse_qsl, urlencode
+
+from config import settings
+from logging_config import logger
+from services.invalidation_bus import wildcard_key
+
+CACHE_TAGS_ATTR = "__response_cache_tags__"
+CACHE_KEYS_ATTR = "__response_cache_keys__"
+INVALIDATES_ATTR = "__response_cache_invalidates__"
+
+# Collections some cached endpoint is built from; the invalidation bus watches these
+CACHED_COLLECTIONS: set[str] = set()
+
+# Headers recomputed for every cached reply
+_HOP_HEADERS = {b"etag", b"cache-control", b"x-cache", b"content-length"}
+
+
+class CachedResponse(NamedTuple):
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    etag: str
+    tags: tuple[str, ...]
+    # Invalidation bus keys: a document key or the collection wildcard per tag
+    keys: tuple[str, ...] = ()
+
+
+def cache_response(*collections: str, keys: dict[str, str] | None = None):
+    """
+    Mark a GET endpoint as cacheable.
+
+    Args:
+        collections: Collections the response is built from; a write to any of
+            them invalidates the cached entry
+        keys: For collections of which the response reads a single document,
+            the invalidation bus key of that document as a template of the
+            path parameters; changes to other documents keep the entry
+
+    Usage:
+        @router.get("/calendar")
+        @cache_response("matches", "tournaments")
+        async def get_matches_calendar(...):
+
+        @router.get("/{tournament_alias}")
+        @cache_response("tournaments", keys={"tournaments": "tournament:{tournament_alias}"})
+        async def get_tournament(...):
+    """
+
+    def decorator(func):
+        setattr(func, CACHE_TAGS_ATTR, tuple(collections))
+        CACHED_COLLECTIONS.update(collections)
+        setattr(func, CACHE_KEYS_ATTR, dict(keys or {}))
+        return func
+
+    return decorator
+
+
+def invalidates_cache(*collections: str):
+    """
+    Mark a write endpoint as modifying the given collections.
+
+    Usage:
+        @router.patch("/{match_id}")
+        @invalidates_cache("matches", "tournaments")
+        async def update_match(...):
+    """
+
+    def decorator(func):
+        setattr(func, INVALIDATES_ATTR, tuple(collections))
+        return func
+
+    return decorator
+
+
+class ResponseCache:
+    """LRU store of encoded responses, indexed by collection tag"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._keys_by_tag: dict[str, set[str]] = {}
+        # Bumped on every invalidation; a response computed across a bump may
+        # already be stale and is not stored
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(path: str, query_string: bytes | str = b"") -> str:
+        """Cache key from path and query string, independent of parameter order"""
+        if isinstance(query_string, bytes):
+            query_string = query_string.decode("latin-1")
+        if not query_string:
+            return path
+        return f"{path}?{urlencode(sorted(parse_qsl(query_string, keep_blank_values=True)))}"
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        """Strong ETag derived from the encoded body"""
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: CachedResponse, generation: int | None = None) -> bool:
+        """
+        Store an entry.
+
+        Args:
+            key: Cache key from make_key()
+            entry: Response to store
+            generation: Value of self.generation when the response was started;
+                the entry is discarded if an invalidation happened since
+
+        Returns:
+            True if stored
+        """
+        if self.maxsize <= 0:
+            return False
+        if generation is not None and generation != self.generation:
+            return False
+        self._drop(key)
+        self._entries[key] = entry
+        for tag in (*entry.tags, *entry.keys):
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+        return True
+
+    def invalidate(self, *collections: str) -> int:
+        """
+        Drop all entries built from any of the given collections.
+
+        Returns:
+            Number of entries removed
+        """
+        return self._invalidate_tags(collections)
+
+    def invalidate_keys(self, collection: str, keys: frozenset[str] | set[str]) -> int:
+        """
+        Drop the entries affected by a change to one document of a collection.
+
+        Entries keyed to the changed document and entries built from the whole
+        collection are dropped. Keys holding the collection wildcard (drops,
+        resyncs, polling) drop every entry of the collection.
+
+        Returns:
+            Number of entries removed
+        """
+        wildcard = wildcard_key(collection)
+        if wildcard in keys:
+            return self._invalidate_tags((collection,))
+        return self._invalidate_tags((wildcard, *keys))
+
+    def _invalidate_tags(self, tags: tuple[str, ...]) -> int:
+        self.generation += 1
+        self.invalidations += 1
+        keys: set[str] = set()
+        for tag in tags:
+            keys |= self._keys_by_tag.pop(tag, set())
+        for key in keys:
+            self._drop(key)
+        if keys:
+            logger.debug(f"Response cache: invalidated {len(keys)} entries for {tags}")
+        return len(keys)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in (*entry.tags, *entry.keys):
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_SIZE)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware serving @cache_response endpoints from ResponseCache and
+    applying @invalidates_cache hooks of write endpoints.
+
+    The route is only known after routing, so the endpoint markers are read from
+    scope["endpoint"] when the response starts.
+    """
+
+    def __init__(self, app, cache: ResponseCache | None = None):
+        self.app = app
+        self.cache = cache if cache is not None else response_cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RESPONSE_CACHE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] == "GET":
+            await self._handle_read(scope, receive, send)
+        elif scope["method"] in ("POST", "PUT", "PATCH", "DELETE"):
+            await self._handle_write(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _handle_read(self, scope, receive, send):
+        key = self.cache.make_key(scope["path"], scope.get("query_string", b""))
+        if_none_match = self._header(scope, b"if-none-match")
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            await self._send_entry(send, entry, if_none_match, "HIT")
+            return
+
+        generation = self.cache.generation
+        start_message: dict | None = None
+        tags: tuple[str, ...] | None = None
+        chunks: list[bytes] = []
+
+        async def send_wrapper(message):
+            nonlocal start_message, tags
+            if message["type"] == "http.response.start":
+                tags = getattr(scope.get("endpoint"), CACHE_TAGS_ATTR, None)
+                if tags is None or message["status"] != 200:
+                    tags = None
+                    await send(message)
+                    return
+                start_message = message
+                return
+            if message["type"] == "http.response.body" and start_message is not None:
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                body = b"".join(chunks)
+                entry = CachedResponse(
+                    status_code=start_message["status"],
+                    headers=[
+                        (name, value)
+                        for name, value in start_message.get("headers", [])
+                        if name.lower() not in _HOP_HEADERS
+                    ],
+                    body=body,
+                    etag=self.cache.make_etag(body),
+                    tags=tags or (),
+                    keys=self._entry_keys(scope, tags or ()),
+                )
+                self.cache.put(key, entry, generation)
+                await self._send_entry(send, entry, if_none_match, "MISS")
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _handle_write(self, scope, receive, send):
+        invalidated = False
+
+        def invalidate():
+            nonlocal invalidated
+            if invalidated:
+                return
+            invalidated = True
+            collections = getattr(scope.get("endpoint"), INVALIDATES_ATTR, None)
+            if collections:
+                self.cache.invalidate(*collections)
+
+        async def send_wrapper(message):
+            # Invalidate before the client sees the write succeed, so a follow-up
+            # read can never be answered from the old entry
+            if message["type"] == "http.response.start":
+                invalidate()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            invalidate()
+
+    @staticmethod
+    def _entry_keys(scope, tags: tuple[str, ...]) -> tuple[str, ...]:
+        """Document key of each tag declared with keys=..., the collection wildcard otherwise"""
+        templates = getattr(scope.get("endpoint"), CACHE_KEYS_ATTR, {})
+        path_params = scope.get("path_params", {})
+        return tuple(
+            templates[tag].format(**path_params) if tag in templates else wildcard_key(tag)
+            for tag in tags
+        )
+
+    @staticmethod
+    def _header(scope, name: bytes) -> str | None:
+        for key, value in scope.get("headers", []):
+            if key == name:
+                return value.decode("latin-1")
+        return None
+
+    @staticmethod
+    async def _send_entry(send, entry: CachedResponse, if_none_match: str | None, state: str):
+        cache_headers = [
+            (b"etag", entry.etag.encode("latin-1")),
+            (b"cache-control", b"no-cache"),
+            (b"x-cache", state.encode("latin-1")),
+        ]
+        if etag_matches(if_none_match, entry.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": entry.status_code,
+                "headers": entry.headers
+                + cache_headers
+                + [(b"content-length", str(len(entry.body)).encode("latin-1"))],
+            }
+        )
+        await send({"type": "http.response.body", "body": entry.body})
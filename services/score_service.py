@@ -17,6 +17,8 @@ from exceptions import (
 )
 from logging_config import logger
 from models.matches import ScoresBase, ScoresDB, ScoresUpdate
+from services.live_match_service import compact_score, goal_totals, live_match_hub
+from services.match_listing_service import MatchListingService
 from services.stats_service import StatsService
 from utils import parse_time_from_seconds, parse_time_to_seconds, populate_event_player_fields
 
@@ -247,6 +249,7 @@ class ScoreService:
         # Update standings
         await self.stats_service.aggregate_round_standings(t_alias, s_alias, r_alias)
         await self.stats_service.aggregate_matchday_standings(t_alias, s_alias, r_alias, md_alias)
+        await MatchListingService(self.db).refresh(match_id)
 
         logger.info(
             "Score created with incremental updates",
@@ -258,6 +261,17 @@ class ScoreService:
             },
         )
 
+        live_match_hub.publish(
+            match_id,
+            "score",
+            {
+                "team": team_flag,
+                "action": "created",
+                "score": compact_score(score_data),
+                "goals": goal_totals(match, team_flag, 1),
+            },
+        )
+
         return await self.get_score_by_id(match_id, team_flag, new_score_id)
 
     async def update_score(
@@ -316,6 +330,18 @@ class ScoreService:
             extra={"match_id": match_id, "score_id": score_id, "team_flag": team_flag},
         )
 
+        live_match_hub.publish(
+            match_id,
+            "score",
+            {
+                "team": team_flag,
+                "action": "updated",
+                "scoreId": score_id,
+                "changes": compact_score(score_dict, partial=True),
+                "goals": goal_totals(match),
+            },
+        )
+
         return await self.get_score_by_id(match_id, team_flag, score_id)
 
     async def delete_score(self, match_id: str, team_flag: str, score_id: str) -> None:
@@ -405,6 +431,7 @@ class ScoreService:
         # Update standings
         await self.stats_service.aggregate_round_standings(t_alias, s_alias, r_alias)
         await self.stats_service.aggregate_matchday_standings(t_alias, s_alias, r_alias, md_alias)
+        await MatchListingService(self.db).refresh(match_id)
 
         logger.info(
             "Score deleted with decremental updates",
@@ -415,3 +442,14 @@ class ScoreService:
                 "assist_player": assist_player_id,
             },
         )
+
+        live_match_hub.publish(
+            match_id,
+            "score",
+            {
+                "team": team_flag,
+                "action": "deleted",
+                "scoreId": score_id,
+                "goals": goal_totals(match, team_flag, -1),
+            },
+        )
@@ -0,0 +1,471 @@
+"""
+Unassigned Match Service - Batch job notifying clubs about matches without referees
+
+Backs GET /assignments/unassigned-in-14-days (triggered nightly by cron).
+All lookups are batched: one matches query, one tournament-tree load for matchday
+owners and one `$in` query each for club admins and club documents. Emails are
+rendered up front and sent concurrently under a bounded semaphore.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from config import settings
+from logging_config import logger
+from mail_service import send_email
+
+EXCLUDED_TOURNAMENTS = ["bambini", "bambini-lk2mini"]
+
+WEEKDAYS_GERMAN = [
+    "Montag",
+    "Dienstag",
+    "Mittwoch",
+    "Donnerstag",
+    "Freitag",
+    "Samstag",
+    "Sonntag",
+]
+
+MatchdayKey = tuple[str, str, str, str]
+
+
+class UnassignedMatchService:
+    """Service for the unassigned-matches notification job"""
+
+    def __init__(self, db, max_concurrent_emails: int | None = None):
+        self.db = db
+        self.max_concurrent_emails = max(
+            1, max_concurrent_emails or settings.UNASSIGNED_MAIL_CONCURRENCY
+        )
+
+    @staticmethod
+    def matchday_key(match: dict) -> MatchdayKey:
+        """Build the (tournament, season, round, matchday) alias tuple of a match"""
+        return (
+            (match.get("tournament") or {}).get("alias"),
+            (match.get("season") or {}).get("alias"),
+            (match.get("round") or {}).get("alias"),
+            (match.get("matchday") or {}).get("alias"),
+        )
+
+    async def find_unassigned_matches(self, start: datetime, end: datetime) -> list[dict]:
+        """Get all matches in [start, end] with neither referee1 nor referee2 set"""
+        return (
+            await self.db["matches"]
+            .find(
+                {
+                    "startDate": {"$gte": start, "$lte": end},
+                    "$and": [
+                        {"$or": [{"referee1": {"$exists": False}}, {"referee1": None}]},
+                        {"$or": [{"referee2": {"$exists": False}}, {"referee2": None}]},
+                        {"tournament.alias": {"$nin": EXCLUDED_TOURNAMENTS}},
+                    ],
+                }
+            )
+            .to_list(length=None)
+        )
+
+    async def resolve_matchday_owners(self, matches: list[dict]) -> dict[MatchdayKey, dict | None]:
+        """
+        Resolve the owner of every matchday referenced by the given matches.
+
+        Loads the tournament trees of all involved tournaments in a single query
+        (projected down to aliases and matchday owners) and walks them in memory.
+
+        Returns:
+            Mapping of matchday key to owner dict, or None if the matchday has no
+            owner with a clubId
+        """
+        keys = {self.matchday_key(m) for m in matches}
+        keys = {k for k in keys if all(k)}
+        if not keys:
+            return {}
+
+        tournament_aliases = sorted({k[0] for k in keys})
+        tournaments = (
+            await self.db["tournaments"]
+            .find(
+                {"alias": {"$in": tournament_aliases}},
+                {
+                    "_id": 0,
+                    "alias": 1,
+                    "seasons.alias": 1,
+                    "seasons.rounds.alias": 1,
+                    "seasons.rounds.matchdays.alias": 1,
+                    "seasons.rounds.matchdays.owner": 1,
+                },
+            )
+            .to_list(length=None)
+        )
+
+        owners: dict[MatchdayKey, dict | None] = {}
+        for tournament in tournaments:
+            t_alias = tournament.get("alias")
+            for season in tournament.get("seasons") or []:
+                for round_data in season.get("rounds") or []:
+                    for matchday in round_data.get("matchdays") or []:
+                        key = (
+                            t_alias,
+                            season.get("alias"),
+                            round_data.get("alias"),
+                            matchday.get("alias"),
+                        )
+                        if key in keys:
+                            owner = matchday.get("owner")
+                            owners[key] = owner if (owner and owner.get("clubId")) else None
+
+        for key in keys:
+            owners.setdefault(key, None)
+        return owners
+
+    def group_matches_by_club(
+        self, matches: list[dict], owners: dict[MatchdayKey, dict | None]
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Group matches by responsible club (matchday owner takes priority over home club).
+
+        Returns:
+            club_id -> {"matches": [...], "matchday_owner": <owner dict or None>}
+        """
+        matches_by_club: dict[str, dict[str, Any]] = {}
+        for match in matches:
+            matchday_owner = owners.get(self.matchday_key(match))
+            if matchday_owner:
+                club_id = matchday_owner.get("clubId")
+            else:
+                club_id = (match.get("home") or {}).get("clubId")
+
+            if club_id:
+                if club_id not in matches_by_club:
+                    matches_by_club[club_id] = {"matches": [], "matchday_owner": matchday_owner}
+                matches_by_club[club_id]["matches"].append(match)
+        return matches_by_club
+
+    async def fetch_club_contacts(
+        self, club_ids: list[str]
+    ) -> tuple[dict[str, list[str]], dict[str, str | None]]:
+        """
+        Fetch club admin emails and referee contact emails for all clubs at once.
+
+        Returns:
+            Tuple of (club_id -> admin emails, club_id -> refereeContact email)
+        """
+        if not club_ids:
+            return {}, {}
+
+        admins, clubs = await asyncio.gather(
+            self.db["users"]
+            .find(
+                {"roles": "CLUB_ADMIN", "club.clubId": {"$in": club_ids}},
+                {"email": 1, "club.clubId": 1},
+            )
+            .to_list(length=None),
+            self.db["clubs"]
+            .find({"_id": {"$in": club_ids}}, {"refereeContact": 1})
+            .to_list(length=None),
+        )
+
+        admin_emails: dict[str, list[str]] = {club_id: [] for club_id in club_ids}
+        for admin in admins:
+            club_id = (admin.get("club") or {}).get("clubId")
+            if club_id in admin_emails and admin.get("email"):
+                admin_emails[club_id].append(admin["email"])
+
+        referee_contacts: dict[str, str | None] = {}
+        for club in clubs:
+            referee_contact = club.get("refereeContact") or {}
+            referee_contacts[club["_id"]] = referee_contact.get("email") or None
+
+        return admin_emails, referee_contacts
+
+    @staticmethod
+    def resolve_recipients(
+        referee_contact_email: str | None, admin_emails: list[str]
+    ) -> tuple[list[str], list[str], list[str]]:
+        """
+        Resolve (recipients, cc, reply_to) for one club.
+
+        refereeContact is the primary recipient with club admins and Ligenleitung in CC.
+        Without a refereeContact the club admins receive the mail, and if there are
+        none either, only Ligenleitung is notified.
+        """
+        ligenleitung_email = settings.LIGENLEITUNG_EMAIL
+        reply_to = [settings.REF_ADMIN_EMAIL] if settings.REF_ADMIN_EMAIL else []
+
+        if referee_contact_email:
+            recipients = [referee_contact_email]
+            cc_emails = [e for e in admin_emails if e != referee_contact_email]
+            if ligenleitung_email:
+                cc_emails.append(ligenleitung_email)
+        elif admin_emails:
+            recipients = list(admin_emails)
+            cc_emails = [ligenleitung_email] if ligenleitung_email else []
+        elif ligenleitung_email:
+            recipients = [ligenleitung_email]
+            cc_emails = []
+        else:
+            recipients = []
+            cc_emails = []
+
+        # Dev-mode override: collapse everything to ADMIN_USER (only when mail sending is enabled)
+        if settings.ENVIRONMENT == "development" and settings.MAIL_ENABLED and settings.ADMIN_USER:
+            recipients = [settings.ADMIN_USER]
+            cc_emails = []
+
+        return recipients, cc_emails, reply_to
+
+    @staticmethod
+    def render_email(
+        club_name: str, club_matches: list[dict], is_matchday_owner: bool, target_date: datetime
+    ) -> tuple[str, str, list[str]]:
+        """
+        Render subject, HTML body and plain-text log lines for one club.
+
+        Returns:
+            Tuple of (subject, html_body, log_lines)
+        """
+        match_rows = ""
+        log_lines: list[str] = []
+        for m in club_matches:
+            tournament_name = m.get("tournament", {}).get("name", "Unknown Tournament")
+            home_team = m.get("home", {}).get("fullName", "Unknown Team")
+            away_team = m.get("away", {}).get("fullName", "Unknown Team")
+            start_date = m.get("startDate")
+            venue_name = m.get("venue", {}).get("name", "Unknown Venue")
+
+            if start_date:
+                weekday = WEEKDAYS_GERMAN[start_date.weekday()]
+                formatted_date = start_date.strftime("%d.%m.%Y")
+                formatted_time = start_date.strftime("%H:%M")
+
+                match_rows += f"""
+                        <tr>
+                            <td style="padding: 8px; border: 1px solid #ddd;">{tournament_name}</td>
+                            <td style="padding: 8px; border: 1px solid #ddd;">{home_team} - {away_team}</td>
+                            <td style="padding: 8px; border: 1px solid #ddd;">{weekday}, {formatted_date}</td>
+                            <td style="padding: 8px; border: 1px solid #ddd;">{formatted_time}</td>
+                            <td style="padding: 8px; border: 1px solid #ddd;">{venue_name}</td>
+                            <td style="padding: 8px; border: 1px solid #ddd; min-width: 120px;"></td>
+                            <td style="padding: 8px; border: 1px solid #ddd; min-width: 120px;"></td>
+                        </tr>
+                        """
+                log_lines.append(
+                    f"  {tournament_name} | {home_team} - {away_team} | {weekday}, {formatted_date} {formatted_time} | {venue_name}"
+                )
+
+        restricted_until = (target_date - timedelta(days=7)).strftime("%d.%m.")
+        open_from = (target_date - timedelta(days=6)).strftime("%d.%m.")
+
+        if is_matchday_owner:
+            subject = f"BISHL - Schiedsrichter-Einteilung erforderlich (Spieltag {club_name})"
+            intro = f"<p>als Veranstalter des Spieltags ist <strong>{club_name}</strong> dafür verantwortlich, dass für alle Spiele des Spieltags Schiedsrichter gestellt werden. Für folgende Spiele sind noch keine Schiedsrichter eingeteilt:</p>"
+            deadline = f"<p>Bis zum {restricted_until} können nur Schiedsrichter der beteiligten Vereine anfragen. Ab dem {open_from} können wieder alle Schiedsrichter anfragen.</p>"
+        else:
+            subject = f"BISHL - Schiedsrichter-Einteilung erforderlich (Heimspiele {club_name})"
+            intro = f"<p>für folgende Heimspiele von <strong>{club_name}</strong> sind noch keine Schiedsrichter eingeteilt:</p>"
+            deadline = f"<p>Bis zum {restricted_until} können nur Schiedsrichter der beteiligten Vereine anfragen. Als Heimverein ist <strong>{club_name}</strong> nun in der Verantwortung, zwei Schiedsrichter für diese Spiele zu stellen. Ab dem {open_from} können wieder alle Schiedsrichter anfragen.</p>"
+
+        body = f"""
+                    <h2>BISHL - Schiedsrichter-Einteilung erforderlich</h2>
+                    <p>Hallo,</p>
+                    {intro}
+
+                    <table style="border-collapse: collapse; width: 100%; margin: 20px 0;">
+                        <thead>
+                            <tr style="background-color: #f5f5f5;">
+                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Wettbewerb</th>
+                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Spiel</th>
+                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Datum</th>
+                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Zeit</th>
+                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left;">Ort</th>
+                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left; min-width: 120px;">SR 1</th>
+                                <th style="padding: 10px; border: 1px solid #ddd; text-align: left; min-width: 120px;">SR 2</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {match_rows}
+                        </tbody>
+                    </table>
+
+                    <p><strong>Bitte antwortet auf diese E-Mail</strong> und tragt eure Schiedsrichter-Vorschläge direkt in die Felder "SR 1" und "SR 2" in der Tabelle ein. Wir werden die Einteilung anschließend vornehmen.</p>
+                    {deadline}
+                    <p>Werden erst in den letzten 7 Tagen vor Spielbeginn Schiedsrichter eingeteilt, entstehen höhere Spielgebühren.</p>
+                    <p>Sind drei Tage vor Spielbeginn keine Schiedsrichter eingeteilt, wird das Spiel gewertet.</p>
+                    <p>Bei Fragen wendet euch gerne an das BISHL-Schiedsrichterwesen.</p>
+                    """
+        return subject, body, log_lines
+
+    def build_notifications(
+        self,
+        matches_by_club: dict[str, dict[str, Any]],
+        admin_emails: dict[str, list[str]],
+        referee_contacts: dict[str, str | None],
+        target_date: datetime,
+    ) -> list[dict]:
+        """Render one notification (recipients, subject, body) per responsible club"""
+        notifications = []
+        for club_id, group in matches_by_club.items():
+            club_matches = group["matches"]
+            matchday_owner = group["matchday_owner"]
+            is_matchday_owner = matchday_owner is not None
+
+            if is_matchday_owner:
+                club_name = matchday_owner.get("clubName", "Unknown Club")
+            else:
+                club_name = club_matches[0].get("home", {}).get("clubName", "Unknown Club")
+
+            club_admin_emails = admin_emails.get(club_id, [])
+            referee_contact_email = referee_contacts.get(club_id)
+            if club_id not in referee_contacts:
+                logger.warning(
+                    f"[unassigned-14d] No club document found for clubId={club_id} ({club_name})"
+                )
+            elif not referee_contact_email:
+                logger.warning(
+                    f"[unassigned-14d] Club {club_name} ({club_id}) has no refereeContact.email"
+                )
+
+            recipients, cc_emails, reply_to = self.resolve_recipients(
+                referee_contact_email, club_admin_emails
+            )
+            subject, body, log_lines = self.render_email(
+                club_name, club_matches, is_matchday_owner, target_date
+            )
+
+            notifications.append(
+                {
+                    "club_id": club_id,
+                    "club_name": club_name,
+                    "role": "matchday-owner" if is_matchday_owner else "home-club",
+                    "referee_contact": referee_contact_email,
+                    "admin_emails": club_admin_emails,
+                    "recipients": recipients,
+                    "cc": cc_emails,
+                    "reply_to": reply_to,
+                    "subject": subject,
+                    "body": body,
+                    "log_lines": log_lines,
+                    "match_count": len(club_matches),
+                }
+            )
+        return notifications
+
+    async def send_notifications(self, notifications: list[dict]) -> int:
+        """
+        Send all notifications concurrently, at most max_concurrent_emails at a time.
+
+        Failures are logged per club and do not abort the remaining sends.
+
+        Returns:
+            Number of primary recipients that were emailed
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_emails)
+
+        async def _send(notification: dict) -> int:
+            if not notification["recipients"]:
+                logger.warning(
+                    f"[unassigned-14d] No recipients at all for club {notification['club_name']} "
+                    f"({notification['club_id']}) — email not sent"
+                )
+                return 0
+            async with semaphore:
+                try:
+                    await send_email(
+                        subject=notification["subject"],
+                        recipients=notification["recipients"],
+                        cc=notification["cc"],
+                        reply_to=notification["reply_to"],
+                        body=notification["body"],
+                    )
+                except Exception as e:
+                    logger.opt(exception=True).error(
+                        f"[unassigned-14d] Failed sending for club {notification['club_id']}: {str(e)}"
+                    )
+                    return 0
+            logger.info(
+                f"[unassigned-14d] Email sent for {notification['club_name']} | "
+                f"recipients={notification['recipients']} cc={notification['cc']} "
+                f"reply_to={notification['reply_to']}"
+            )
+            return len(notification["recipients"])
+
+        results = await asyncio.gather(*(_send(n) for n in notifications))
+        return sum(results)
+
+    async def run(
+        self, target_date: datetime, send_emails: bool = False, dry_run: bool = False
+    ) -> dict:
+        """
+        Run the notification job for all unassigned matches on target_date.
+
+        Args:
+            target_date: Day to check (time part is ignored)
+            send_emails: Whether to actually send the notification emails
+            dry_run: Never send; include rendered notifications in the result
+
+        Returns:
+            Dict with matches, notifications, emails_sent and per-phase timings (ms)
+        """
+        timings: dict[str, float] = {}
+        job_start = time.perf_counter()
+
+        def _mark(phase: str, started: float) -> float:
+            now = time.perf_counter()
+            timings[phase] = round((now - started) * 1000, 2)
+            return now
+
+        start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_of_day = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        logger.debug(f"Searching for matches between {start_of_day} and {end_of_day}")
+
+        phase_start = time.perf_counter()
+        matches = await self.find_unassigned_matches(start_of_day, end_of_day)
+        phase_start = _mark("fetch_matches_ms", phase_start)
+
+        owners = await self.resolve_matchday_owners(matches)
+        phase_start = _mark("resolve_owners_ms", phase_start)
+
+        matches_by_club = self.group_matches_by_club(matches, owners)
+        admin_emails, referee_contacts = await self.fetch_club_contacts(list(matches_by_club))
+        phase_start = _mark("fetch_contacts_ms", phase_start)
+
+        notifications = self.build_notifications(
+            matches_by_club, admin_emails, referee_contacts, target_date
+        )
+        phase_start = _mark("render_ms", phase_start)
+
+        will_send = send_emails and not dry_run
+        for n in notifications:
+            # Always log full recipient details regardless of send_emails or environment
+            logger.info(
+                f"[unassigned-14d] Email preview | club={n['club_name']} ({n['club_id']}) "
+                f"role={n['role']} refereeContact={n['referee_contact']} "
+                f"adminEmails={n['admin_emails']} recipients={n['recipients']} cc={n['cc']} "
+                f"reply_to={n['reply_to']} send_emails={will_send} dry_run={dry_run} "
+                f"matches={n['match_count']}\n" + "\n".join(n["log_lines"])
+            )
+            if not n["recipients"]:
+                logger.warning(
+                    f"[unassigned-14d] No recipients resolved for club {n['club_name']} "
+                    f"({n['club_id']}) — skipping"
+                )
+
+        emails_sent = 0
+        if will_send:
+            emails_sent = await self.send_notifications(notifications)
+        _mark("send_ms", phase_start)
+        timings["total_ms"] = round((time.perf_counter() - job_start) * 1000, 2)
+
+        logger.info(
+            f"[unassigned-14d] Finished | matches={len(matches)} clubs={len(notifications)} "
+            f"emails_sent={emails_sent} dry_run={dry_run} timings={timings}"
+        )
+
+        return {
+            "matches": matches,
+            "notifications": notifications,
+            "emails_sent": emails_sent,
+            "timings": timings,
+        }
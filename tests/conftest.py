@@ -9,10 +9,15 @@ from contextlib import asynccontextmanager
 
 import pytest
 import pytest_asyncio
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from main import app
+from services.query_guard import assert_query_budget
+from services.request_metrics import db_command_listener
+from services.response_cache import response_cache
+from tests.fixtures.data_fixtures import seed_test_data
+from tests.fixtures.memory_db import MemoryDatabase
 from tests.test_config import TestSettings
 
 # Configure pytest-asyncio to use function-scoped event loops
@@ -27,6 +32,10 @@ os.environ["DB_URL"] = (
 )
 os.environ["ENVIRONMENT"] = "test"
 
+# TEST_DB_BACKEND=memory runs against tests/fixtures/memory_db.py instead of
+# DB_URL, so integration tests, load tests and benchmarks work offline
+USE_MEMORY_DB = os.environ.get("TEST_DB_BACKEND", "mongo").lower() == "memory"
+
 
 @pytest.fixture(scope="function")
 def event_loop():
@@ -71,6 +80,11 @@ app.router.lifespan_context = test_lifespan
 @pytest_asyncio.fixture(scope="session", autouse=True)
 async def cleanup_before_session():
     """Clean database once before all tests in the session"""
+    if USE_MEMORY_DB:
+        print("\n🔧 Using in-memory test database")
+        yield
+        return
+
     settings = TestSettings()
 
     # CRITICAL SAFETY CHECK: Verify we're using test database
@@ -99,6 +113,11 @@ async def cleanup_before_session():
 @pytest_asyncio.fixture(scope="function")
 async def mongodb():
     """MongoDB client for testing - function scoped for isolation"""
+    if USE_MEMORY_DB:
+        # A fresh database per test is already clean
+        yield MemoryDatabase("bishl_test", event_listeners=[db_command_listener])
+        return
+
     settings = TestSettings()
     client = AsyncIOMotorClient(settings.DB_URL)
     db = client[settings.DB_NAME]
@@ -146,8 +165,13 @@ async def client(mongodb):
     settings = TestSettings()
 
     # Create a fresh Motor client bound to the CURRENT event loop
-    motor_client = AsyncIOMotorClient(settings.DB_URL)
-    motor_db = motor_client[settings.DB_NAME]
+    # The command listener feeds query_budget and the N+1 guard
+    if USE_MEMORY_DB:
+        motor_client = mongodb.client
+        motor_db = mongodb
+    else:
+        motor_client = AsyncIOMotorClient(settings.DB_URL, event_listeners=[db_command_listener])
+        motor_db = motor_client[settings.DB_NAME]
 
     # Verify database
     assert motor_db.name == "bishl_test", f"❌ SAFETY: App using wrong database: {motor_db.name}"
@@ -156,9 +180,12 @@ async def client(mongodb):
     app.state.mongodb = motor_db
     app.state.settings = settings
 
+    # Tests seed the database directly, bypassing the write hooks
+    response_cache.clear()
+
     print("✅ App configured with fresh Motor client for test")
 
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
 
     # Cleanup after test
@@ -166,6 +193,24 @@ async def client(mongodb):
     app.state.mongodb = None
 
 
+@pytest_asyncio.fixture
+async def seeded_db(mongodb):
+    """Test database seeded with a club, teams, players, a tournament and matches"""
+    return await seed_test_data(mongodb)
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Limit MongoDB commands per request made through the client fixture.
+
+    Usage:
+        with query_budget(5, max_identical=2):
+            await client.get("/matches")
+    """
+    return assert_query_budget
+
+
 @pytest_asyncio.fixture
 async def admin_token(mongodb):
     """Generate admin token for testing"""
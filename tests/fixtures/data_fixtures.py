@@ -386,3 +386,38 @@ def get_test_assignment_data():
             }
         ],
     }
+
+
+async def seed_test_data(db, matches: int = 3) -> dict[str, list[dict]]:
+    """
+    Insert a small consistent data set: one club, tournament, two teams with
+    players and scheduled matches between them. Works with Motor and with
+    tests/fixtures/memory_db.MemoryDatabase; returns the inserted documents.
+    """
+    club = create_test_club()
+    teams = [create_test_team(), create_test_team()]
+    players = [
+        create_test_player(
+            assignedTeams=[
+                {
+                    "clubId": club["_id"],
+                    "clubName": club["clubName"],
+                    "clubAlias": club["clubAlias"],
+                    "teams": [{"teamId": team["_id"], "teamName": team["name"]}],
+                }
+            ]
+        )
+        for team in teams
+        for _ in range(3)
+    ]
+    data = {
+        "users": [create_test_user(roles=["ADMIN"])],
+        "clubs": [club],
+        "teams": teams,
+        "players": players,
+        "tournaments": [create_test_tournament()],
+        "matches": [create_test_match() for _ in range(matches)],
+    }
+    for collection, documents in data.items():
+        await db[collection].insert_many(documents)
+    return data
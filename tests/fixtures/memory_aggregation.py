@@ -0,0 +1,236 @@
+"""
+Aggregation pipelines of the in-memory MongoDB stand-in
+
+Runs the stages the services use: $match (with $expr), $project, $addFields /
+$set, $unset, $unwind, $group, $sort, $skip, $limit, $count, $lookup (field
+join, sub-pipeline and let variables), $facet and $replaceRoot / $replaceWith.
+"""
+
+import copy
+from typing import Any
+
+from tests.fixtures.memory_query import (
+    MISSING,
+    UnsupportedOperation,
+    evaluate,
+    exclude_paths,
+    get_path,
+    include_paths,
+    matches,
+    remove_path,
+    set_path,
+    sort_key,
+    values_at,
+)
+
+
+def _is_inclusion(value: Any) -> bool:
+    return isinstance(value, bool | int)
+
+
+def _project(doc: dict, spec: dict, variables: dict) -> dict:
+    fields = {k: v for k, v in spec.items() if k != "_id"}
+    id_spec = spec.get("_id", 1)
+    if fields and all(_is_inclusion(v) and not v for v in fields.values()):
+        result = copy.deepcopy(exclude_paths(doc, list(fields)))
+        if _is_inclusion(id_spec) and not id_spec:
+            result.pop("_id", None)
+        return result
+    included = [path for path, value in fields.items() if _is_inclusion(value) and value]
+    result = copy.deepcopy(include_paths(doc, included))
+    if not _is_inclusion(id_spec):
+        result = {"_id": evaluate(id_spec, doc, variables), **result}
+    elif id_spec and "_id" in doc:
+        result = {"_id": doc["_id"], **result}
+    for path, value in fields.items():
+        if not _is_inclusion(value):
+            computed = evaluate(value, doc, variables)
+            if computed is not MISSING:
+                set_path(result, path, computed)
+    return result
+
+
+def _add_fields(doc: dict, spec: dict, variables: dict) -> dict:
+    result = copy.deepcopy(doc)
+    for path, expr in spec.items():
+        value = evaluate(expr, doc, variables)
+        if value is MISSING:
+            remove_path(result, path)
+        else:
+            set_path(result, path, value)
+    return result
+
+
+def _unwind(docs: list[dict], spec: str | dict) -> list[dict]:
+    if isinstance(spec, str):
+        spec = {"path": spec}
+    path = spec["path"].lstrip("$")
+    preserve = spec.get("preserveNullAndEmptyArrays", False)
+    index_field = spec.get("includeArrayIndex")
+    result = []
+    for doc in docs:
+        value = get_path(doc, path)
+        if isinstance(value, list) and value:
+            for index, item in enumerate(value):
+                unwound = copy.copy(doc)
+                _set_copied(unwound, path, item)
+                if index_field:
+                    unwound[index_field] = index
+                result.append(unwound)
+        elif isinstance(value, list) or value is MISSING or value is None:
+            if preserve:
+                kept = copy.copy(doc)
+                if isinstance(value, list):
+                    _set_copied(kept, path, MISSING)
+                if index_field:
+                    kept[index_field] = None
+                result.append(kept)
+        else:
+            result.append(doc)
+    return result
+
+
+def _set_copied(doc: dict, path: str, value: Any) -> None:
+    """Set a dotted path on a shallow copy, copying the objects along the path"""
+    parts = path.split(".")
+    node = doc
+    for part in parts[:-1]:
+        node[part] = copy.copy(node.get(part) or {})
+        node = node[part]
+    if value is MISSING:
+        node.pop(parts[-1], None)
+    else:
+        node[parts[-1]] = value
+
+
+def _accumulate(op: str, operand: Any, group: list[dict], variables: dict) -> Any:
+    if op == "$count":
+        return len(group)
+    values = [evaluate(operand, doc, variables) for doc in group]
+    present = [v for v in values if v is not MISSING]
+    if op == "$sum":
+        total = 0
+        for value in present:
+            if isinstance(value, list):
+                continue
+            if isinstance(value, int | float) and not isinstance(value, bool):
+                total += value
+        return total
+    if op == "$avg":
+        numbers = [v for v in present if isinstance(v, int | float) and not isinstance(v, bool)]
+        return sum(numbers) / len(numbers) if numbers else None
+    if op in ("$max", "$min"):
+        candidates = [v for v in present if v is not None]
+        if not candidates:
+            return None
+        return (max if op == "$max" else min)(candidates, key=sort_key)
+    if op == "$first":
+        return values[0] if values and values[0] is not MISSING else None
+    if op == "$last":
+        return values[-1] if values and values[-1] is not MISSING else None
+    if op == "$push":
+        return present
+    if op == "$addToSet":
+        unique: list = []
+        for value in present:
+            if value not in unique:
+                unique.append(value)
+        return unique
+    raise UnsupportedOperation(f"Accumulator {op} is not supported")
+
+
+def _group(docs: list[dict], spec: dict, variables: dict) -> list[dict]:
+    groups: dict[str, tuple[Any, list[dict]]] = {}
+    for doc in docs:
+        key = evaluate(spec["_id"], doc, variables)
+        key = None if key is MISSING else key
+        groups.setdefault(repr(sort_key(key)) + repr(key), (key, []))[1].append(doc)
+    result = []
+    for key, group in groups.values():
+        output = {"_id": key}
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            ((op, operand),) = accumulator.items()
+            output[field] = _accumulate(op, operand, group, variables)
+        result.append(output)
+    return result
+
+
+def sort_documents(docs: list[dict], spec: list[tuple[str, int]], casefold: bool = False) -> list:
+    docs = list(docs)
+    for key, direction in reversed(spec):
+        docs.sort(key=lambda d, k=key: sort_key(get_path(d, k), casefold), reverse=direction < 0)
+    return docs
+
+
+def _lookup(docs: list[dict], spec: dict, database, variables: dict) -> list[dict]:
+    foreign = database[spec["from"]].documents() if "from" in spec else []
+    result = []
+    for doc in docs:
+        joined = foreign
+        if "localField" in spec:
+            local = values_at(doc, spec["localField"])
+            local = [v for value in local for v in (value if isinstance(value, list) else [value])]
+            if not local:
+                local = [None]
+            joined = [f for f in foreign if matches(f, {spec["foreignField"]: {"$in": local}})]
+        if "pipeline" in spec:
+            bound = {
+                name: evaluate(expr, doc, variables) for name, expr in spec.get("let", {}).items()
+            }
+            joined = run_pipeline(joined, spec["pipeline"], database, {**variables, **bound})
+        else:
+            joined = copy.deepcopy(joined)
+        output = copy.copy(doc)
+        set_path(output, spec["as"], joined)
+        result.append(output)
+    return result
+
+
+def run_pipeline(
+    docs: list[dict], pipeline: list[dict], database, variables: dict | None = None
+) -> list[dict]:
+    """Run an aggregation pipeline over documents; database resolves $lookup"""
+    variables = variables or {}
+    for stage in pipeline:
+        ((name, spec),) = stage.items()
+        if name == "$match":
+            docs = [doc for doc in docs if matches(doc, spec, variables)]
+        elif name == "$project":
+            docs = [_project(doc, spec, variables) for doc in docs]
+        elif name in ("$addFields", "$set"):
+            docs = [_add_fields(doc, spec, variables) for doc in docs]
+        elif name == "$unset":
+            paths = [spec] if isinstance(spec, str) else spec
+            docs = [_project(doc, dict.fromkeys(paths, 0), variables) for doc in docs]
+        elif name == "$unwind":
+            docs = _unwind(docs, spec)
+        elif name == "$group":
+            docs = _group(docs, spec, variables)
+        elif name == "$sort":
+            docs = sort_documents(docs, list(spec.items()))
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif name == "$lookup":
+            docs = _lookup(docs, spec, database, variables)
+        elif name == "$facet":
+            docs = [
+                {
+                    field: run_pipeline(list(docs), sub_pipeline, database, variables)
+                    for field, sub_pipeline in spec.items()
+                }
+            ]
+        elif name in ("$replaceRoot", "$replaceWith"):
+            expr = spec["newRoot"] if name == "$replaceRoot" else spec
+            docs = [evaluate(expr, doc, variables) for doc in docs]
+        elif name == "$sortByCount":
+            docs = _group(docs, {"_id": spec, "count": {"$sum": 1}}, variables)
+            docs = sort_documents(docs, [("count", -1)])
+        else:
+            raise UnsupportedOperation(f"Pipeline stage {name} is not supported")
+    return docs
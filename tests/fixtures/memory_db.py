@@ -0,0 +1,681 @@
+"""
+In-memory stand-in for the Motor database
+
+Lets tests, benchmarks and load tests run without a MongoDB server. It covers
+the part of the Motor API this code base uses:
+
+- find / find_one / count_documents / distinct with the query operators of
+  memory_query, projections (including "array.$"), sort, skip, limit and
+  collation (case-insensitive sorting)
+- insert, update ($set, $inc, $push, $pull, ... with $, $[] and array_filters),
+  replace, delete, find_one_and_update / find_one_and_delete, upserts and
+  bulk_write
+- aggregate with the stages of memory_aggregation ($lookup, $facet, $unwind,
+  $group, ...)
+- unique indexes, sessions and transactions (rolled back on errors)
+- pymongo command monitoring: event_listeners receive started/succeeded
+  events, so request metrics, the N+1 guard and query budgets work unchanged
+
+Documents are deep-copied on the way in and out, as a round trip through BSON
+would, so callers cannot mutate stored state by accident.
+
+    db = MemoryDatabase("bishl_test", event_listeners=[db_command_listener])
+    await db["matches"].insert_many([create_test_match()])
+    service = StatsService(db)
+"""
+
+import copy
+import itertools
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateMany
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import (
+    BulkWriteResult,
+    DeleteResult,
+    InsertManyResult,
+    InsertOneResult,
+    UpdateResult,
+)
+
+from tests.fixtures.memory_aggregation import run_pipeline, sort_documents
+from tests.fixtures.memory_query import (
+    MISSING,
+    apply_update,
+    get_path,
+    matches,
+    project,
+    upsert_document,
+)
+
+_request_ids = itertools.count(1)
+
+
+def _sort_spec(key_or_list, direction: int = 1) -> list[tuple[str, int]]:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return list(key_or_list)
+
+
+class MemoryCursor:
+    """Lazy query result with Motor's chaining API; the command runs on first read"""
+
+    def __init__(self, collection: "MemoryCollection", command: dict, fetch, transform=None):
+        self._collection = collection
+        self._command = command
+        self._fetch = fetch
+        self._transform = transform
+        self._sort: list[tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+        self._casefold = False
+
+    def sort(self, key_or_list, direction: int = 1) -> "MemoryCursor":
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def collation(self, collation: dict | None) -> "MemoryCursor":
+        # Strength 1 and 2 compare case-insensitively
+        self._casefold = bool(collation) and (collation.get("strength") or 3) <= 2
+        return self
+
+    def batch_size(self, size: int) -> "MemoryCursor":
+        return self
+
+    def _results(self) -> list[dict]:
+        command = dict(self._command)
+        if self._sort:
+            command["sort"] = dict(self._sort)
+        with self._collection._database._monitor(self._command_name, command) as reply:
+            docs = self._fetch()
+            if self._sort:
+                docs = sort_documents(docs, self._sort, self._casefold)
+            docs = docs[self._skip :]
+            if self._limit:
+                docs = docs[: self._limit]
+            if self._transform is not None:
+                docs = [self._transform(doc) for doc in docs]
+            docs = copy.deepcopy(docs)
+            reply["cursor"] = {"firstBatch": docs}
+        return docs
+
+    @property
+    def _command_name(self) -> str:
+        return next(iter(self._command))
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        results = self._results()
+        return results if length is None else results[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._results():
+            yield doc
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCollection:
+    """One collection; documents kept in insertion order keyed by _id"""
+
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self._database = database
+        self.name = name
+        self._documents: dict[Any, dict] = {}
+        self._indexes: dict[str, dict] = {"_id_": {"key": [("_id", 1)], "unique": True}}
+
+    @property
+    def database(self) -> "MemoryDatabase":
+        return self._database
+
+    def documents(self) -> list[dict]:
+        """Stored documents (not copies), for stand-in internals such as $lookup"""
+        return list(self._documents.values())
+
+    def _matching(self, query: dict | None) -> list[dict]:
+        if query and set(query) == {"_id"} and not isinstance(query["_id"], dict | list):
+            doc = self._documents.get(query["_id"])
+            return [doc] if doc is not None else []
+        return [doc for doc in self._documents.values() if matches(doc, query)]
+
+    def _monitor(self, command_name: str, command: dict):
+        return self._database._monitor(command_name, {command_name: self.name, **command})
+
+    # ---------- indexes ----------
+
+    async def create_index(self, keys, unique: bool = False, name: str | None = None, **kwargs):
+        spec = _sort_spec(keys)
+        name = name or "_".join(f"{field}_{direction}" for field, direction in spec)
+        self._indexes[name] = {"key": spec, "unique": unique, **kwargs}
+        for doc in self._documents.values():
+            self._check_unique(doc)
+        return name
+
+    async def create_indexes(self, indexes: list) -> list[str]:
+        return [
+            await self.create_index(
+                index.document["key"], **{k: v for k, v in index.document.items() if k != "key"}
+            )
+            for index in indexes
+        ]
+
+    async def index_information(self) -> dict:
+        return copy.deepcopy(self._indexes)
+
+    async def drop_index(self, name: str) -> None:
+        self._indexes.pop(name, None)
+
+    def _check_unique(self, doc: dict) -> None:
+        for name, index in self._indexes.items():
+            if not index.get("unique") or name == "_id_":
+                continue
+            fields = [field for field, _ in index["key"]]
+            key = [get_path(doc, field) for field in fields]
+            if index.get("sparse") and all(value is MISSING for value in key):
+                continue
+            for other in self._documents.values():
+                if other is not doc and other["_id"] != doc["_id"]:
+                    if [get_path(other, field) for field in fields] == key:
+                        raise DuplicateKeyError(
+                            f"E11000 duplicate key error collection: {self.name} index: {name}",
+                            11000,
+                        )
+
+    # ---------- reads ----------
+
+    def find(
+        self, filter: dict | None = None, projection: dict | None = None, session=None, **kwargs
+    ) -> MemoryCursor:
+        filter = filter or {}
+        cursor = MemoryCursor(
+            self,
+            {"find": self.name, "filter": filter},
+            lambda: self._matching(filter),
+            lambda doc: project(doc, projection, filter),
+        )
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        if kwargs.get("skip"):
+            cursor.skip(kwargs["skip"])
+        if kwargs.get("limit"):
+            cursor.limit(kwargs["limit"])
+        return cursor
+
+    async def find_one(
+        self, filter: dict | None = None, projection: dict | None = None, session=None, **kwargs
+    ) -> dict | None:
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        results = await self.find(filter, projection, **kwargs).limit(1).to_list(1)
+        return results[0] if results else None
+
+    async def count_documents(self, filter: dict | None = None, session=None, **kwargs) -> int:
+        with self._monitor("count", {"query": filter or {}}) as reply:
+            reply["n"] = len(self._matching(filter))
+        return reply["n"]
+
+    async def estimated_document_count(self, **kwargs) -> int:
+        return len(self._documents)
+
+    async def distinct(self, key: str, filter: dict | None = None, session=None) -> list:
+        with self._monitor("distinct", {"key": key, "query": filter or {}}) as reply:
+            values: list = []
+            for doc in self._matching(filter):
+                value = get_path(doc, key)
+                for item in value if isinstance(value, list) else [value]:
+                    if item is not MISSING and item not in values:
+                        values.append(item)
+            reply["values"] = copy.deepcopy(values)
+        return reply["values"]
+
+    def aggregate(self, pipeline: list[dict], session=None, **kwargs) -> MemoryCursor:
+        return MemoryCursor(
+            self,
+            {"aggregate": self.name, "pipeline": pipeline},
+            lambda: run_pipeline(self.documents(), pipeline, self._database),
+        )
+
+    # ---------- writes ----------
+
+    def _insert(self, document: dict) -> Any:
+        # pymongo adds the generated _id to the caller's document
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        if document["_id"] in self._documents:
+            raise DuplicateKeyError(
+                f"E11000 duplicate key error collection: {self.name} index: _id_ "
+                f"dup key: {{ _id: {document['_id']!r} }}",
+                11000,
+            )
+        doc = copy.deepcopy(document)
+        self._check_unique(doc)
+        self._documents[doc["_id"]] = doc
+        return doc["_id"]
+
+    async def insert_one(self, document: dict, session=None, **kwargs) -> InsertOneResult:
+        with self._monitor("insert", {"documents": [document]}) as reply:
+            inserted_id = self._insert(document)
+            reply["n"] = 1
+        return InsertOneResult(inserted_id, True)
+
+    async def insert_many(
+        self, documents: list[dict], ordered: bool = True, session=None, **kwargs
+    ) -> InsertManyResult:
+        with self._monitor("insert", {"documents": documents}) as reply:
+            ids = [self._insert(document) for document in documents]
+            reply["n"] = len(ids)
+        return InsertManyResult(ids, True)
+
+    def _apply(self, doc: dict, update: dict | list, query, array_filters) -> bool:
+        if isinstance(update, list):
+            updated = run_pipeline([doc], update, self._database)[0]
+            changed = updated != doc
+            doc.clear()
+            doc.update(updated)
+            return changed
+        before = copy.deepcopy(doc) if self._has_unique_indexes() else None
+        changed = apply_update(doc, update, query, array_filters)
+        if before is not None and changed:
+            try:
+                self._check_unique(doc)
+            except DuplicateKeyError:
+                doc.clear()
+                doc.update(before)
+                raise
+        return changed
+
+    def _has_unique_indexes(self) -> bool:
+        return any(index.get("unique") for name, index in self._indexes.items() if name != "_id_")
+
+    def _upsert(self, query: dict | None, update: dict | list, array_filters) -> Any:
+        doc = upsert_document(query)
+        if isinstance(update, dict):
+            apply_update(doc, update, query, array_filters, inserting=True)
+        return self._insert(doc)
+
+    def _update_raw(self, query, update, many: bool, upsert: bool, array_filters) -> dict:
+        targets = self._matching(query)
+        if not many:
+            targets = targets[:1]
+        modified = sum(self._apply(doc, update, query, array_filters) for doc in targets)
+        if not targets and upsert:
+            return {"n": 1, "nModified": 0, "upserted": self._upsert(query, update, array_filters)}
+        return {"n": len(targets), "nModified": modified}
+
+    def _update(self, query, update, many: bool, upsert: bool, array_filters) -> UpdateResult:
+        command = {"updates": [{"q": query, "u": update, "multi": many, "upsert": upsert}]}
+        with self._monitor("update", command) as reply:
+            raw = self._update_raw(query, update, many, upsert, array_filters)
+            reply.update(raw)
+        return UpdateResult(raw, True)
+
+    async def update_one(
+        self,
+        filter: dict,
+        update: dict | list,
+        upsert: bool = False,
+        array_filters: list[dict] | None = None,
+        session=None,
+        **kwargs,
+    ) -> UpdateResult:
+        return self._update(filter, update, False, upsert, array_filters)
+
+    async def update_many(
+        self,
+        filter: dict,
+        update: dict | list,
+        upsert: bool = False,
+        array_filters: list[dict] | None = None,
+        session=None,
+        **kwargs,
+    ) -> UpdateResult:
+        return self._update(filter, update, True, upsert, array_filters)
+
+    async def replace_one(
+        self, filter: dict, replacement: dict, upsert: bool = False, session=None, **kwargs
+    ) -> UpdateResult:
+        command = {"updates": [{"q": filter, "u": replacement, "upsert": upsert}]}
+        with self._monitor("update", command) as reply:
+            raw = self._replace_raw(filter, replacement, upsert)
+            reply.update(raw)
+        return UpdateResult(raw, True)
+
+    def _replace_raw(self, filter: dict, replacement: dict, upsert: bool) -> dict:
+        targets = self._matching(filter)[:1]
+        if targets:
+            old = targets[0]
+            doc = copy.deepcopy(replacement)
+            doc["_id"] = old["_id"]
+            self._documents[doc["_id"]] = doc
+            try:
+                self._check_unique(doc)
+            except DuplicateKeyError:
+                self._documents[old["_id"]] = old
+                raise
+            return {"n": 1, "nModified": int(doc != old)}
+        if upsert:
+            document = {**upsert_document(filter), **replacement}
+            return {"n": 1, "nModified": 0, "upserted": self._insert(document)}
+        return {"n": 0, "nModified": 0}
+
+    async def find_one_and_update(
+        self,
+        filter: dict,
+        update: dict | list,
+        projection: dict | None = None,
+        sort=None,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE,
+        array_filters: list[dict] | None = None,
+        session=None,
+        **kwargs,
+    ) -> dict | None:
+        command = {"query": filter, "update": update, "upsert": upsert}
+        with self._monitor("findAndModify", command) as reply:
+            targets = self._matching(filter)
+            if sort:
+                targets = sort_documents(targets, _sort_spec(sort))
+            if targets:
+                doc = targets[0]
+                before = copy.deepcopy(doc)
+                self._apply(doc, update, filter, array_filters)
+                result = doc if return_document == ReturnDocument.AFTER else before
+            elif upsert:
+                inserted_id = self._upsert(filter, update, array_filters)
+                result = self._documents[inserted_id] if return_document else None
+            else:
+                result = None
+            reply["value"] = (
+                copy.deepcopy(project(result, projection, filter)) if result is not None else None
+            )
+        return reply["value"]
+
+    async def find_one_and_delete(
+        self, filter: dict, projection: dict | None = None, sort=None, session=None, **kwargs
+    ) -> dict | None:
+        with self._monitor("findAndModify", {"query": filter, "remove": True}) as reply:
+            targets = self._matching(filter)
+            if sort:
+                targets = sort_documents(targets, _sort_spec(sort))
+            reply["value"] = None
+            if targets:
+                doc = self._documents.pop(targets[0]["_id"])
+                reply["value"] = copy.deepcopy(project(doc, projection, filter))
+        return reply["value"]
+
+    def _delete_raw(self, query: dict, many: bool) -> int:
+        targets = self._matching(query)
+        if not many:
+            targets = targets[:1]
+        for doc in targets:
+            del self._documents[doc["_id"]]
+        return len(targets)
+
+    def _delete(self, query: dict, many: bool) -> DeleteResult:
+        command = {"deletes": [{"q": query, "limit": 0 if many else 1}]}
+        with self._monitor("delete", command) as reply:
+            reply["n"] = self._delete_raw(query, many)
+        return DeleteResult({"n": reply["n"]}, True)
+
+    async def delete_one(self, filter: dict, session=None, **kwargs) -> DeleteResult:
+        return self._delete(filter, many=False)
+
+    async def delete_many(self, filter: dict, session=None, **kwargs) -> DeleteResult:
+        return self._delete(filter, many=True)
+
+    async def bulk_write(
+        self, requests: list, ordered: bool = True, session=None, **kwargs
+    ) -> BulkWriteResult:
+        """Like pymongo, one insert/update/delete command per run of operations of one kind"""
+        result = {
+            "nInserted": 0,
+            "nUpserted": 0,
+            "nMatched": 0,
+            "nModified": 0,
+            "nRemoved": 0,
+            "upserted": [],
+        }
+        indexed = list(enumerate(requests))
+        for kind, run in itertools.groupby(indexed, key=lambda item: _bulk_kind(item[1])):
+            run = list(run)
+            command = {
+                "ordered": ordered,
+                _BULK_FIELDS[kind]: [_bulk_statement(op) for _, op in run],
+            }
+            with self._monitor(kind, command) as reply:
+                reply["n"] = 0
+                for index, op in run:
+                    reply["n"] += self._bulk_apply(kind, index, op, result)
+        return BulkWriteResult(result, True)
+
+    def _bulk_apply(self, kind: str, index: int, op, result: dict) -> int:
+        if kind == "insert":
+            self._insert(op._doc)
+            result["nInserted"] += 1
+            return 1
+        if kind == "delete":
+            removed = self._delete_raw(op._filter, isinstance(op, DeleteMany))
+            result["nRemoved"] += removed
+            return removed
+        if isinstance(op, ReplaceOne):
+            raw = self._replace_raw(op._filter, op._doc, bool(op._upsert))
+        else:
+            raw = self._update_raw(
+                op._filter, op._doc, isinstance(op, UpdateMany), bool(op._upsert), op._array_filters
+            )
+        if "upserted" in raw:
+            result["nUpserted"] += 1
+            result["upserted"].append({"index": index, "_id": raw["upserted"]})
+        else:
+            result["nMatched"] += raw["n"]
+            result["nModified"] += raw["nModified"]
+        return raw["n"]
+
+    async def drop(self, session=None) -> None:
+        await self._database.drop_collection(self.name)
+
+
+_BULK_FIELDS = {"insert": "documents", "update": "updates", "delete": "deletes"}
+
+
+def _bulk_statement(op) -> dict:
+    """The wire statement of a bulk operation, as in the driver's command"""
+    if isinstance(op, InsertOne):
+        return op._doc
+    if isinstance(op, DeleteOne | DeleteMany):
+        return {"q": op._filter, "limit": 0 if isinstance(op, DeleteMany) else 1}
+    statement = {"q": op._filter, "u": op._doc, "upsert": bool(op._upsert)}
+    if isinstance(op, UpdateMany):
+        statement["multi"] = True
+    return statement
+
+
+def _bulk_kind(op) -> str:
+    if isinstance(op, InsertOne):
+        return "insert"
+    if isinstance(op, DeleteOne | DeleteMany):
+        return "delete"
+    return "update"
+
+
+class MemorySession:
+    """Client session whose transactions restore a snapshot when they fail"""
+
+    def __init__(self, client: "MemoryClient"):
+        self.client = client
+        self.in_transaction = False
+        self._snapshot: dict | None = None
+
+    async def __aenter__(self) -> "MemorySession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self.in_transaction:
+            await self.abort_transaction()
+
+    def start_transaction(self, **kwargs):
+        self._snapshot = {
+            name: copy.deepcopy(database._snapshot())
+            for name, database in self.client._databases.items()
+        }
+        self.in_transaction = True
+        return self._transaction()
+
+    @asynccontextmanager
+    async def _transaction(self):
+        try:
+            yield self
+        except BaseException:
+            if self.in_transaction:
+                await self.abort_transaction()
+            raise
+        if self.in_transaction:
+            await self.commit_transaction()
+
+    async def commit_transaction(self) -> None:
+        self.in_transaction = False
+        self._snapshot = None
+
+    async def abort_transaction(self) -> None:
+        for name, snapshot in (self._snapshot or {}).items():
+            self.client._databases[name]._restore(snapshot)
+        self.in_transaction = False
+        self._snapshot = None
+
+    async def end_session(self) -> None:
+        if self.in_transaction:
+            await self.abort_transaction()
+
+
+class MemoryClient:
+    """Stand-in for AsyncIOMotorClient holding MemoryDatabases"""
+
+    def __init__(self, event_listeners: list | None = None):
+        self.event_listeners = list(event_listeners or [])
+        self._databases: dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> "MemoryDatabase":
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(name, client=self)
+        return self._databases[name]
+
+    def get_database(self, name: str) -> "MemoryDatabase":
+        return self[name]
+
+    async def start_session(self, **kwargs) -> MemorySession:
+        return MemorySession(self)
+
+    async def list_database_names(self) -> list[str]:
+        return list(self._databases)
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryDatabase:
+    """Dict of MemoryCollections, created on first access like Motor's db["name"]"""
+
+    def __init__(
+        self,
+        name: str = "bishl_memory",
+        event_listeners: list | None = None,
+        client: MemoryClient | None = None,
+    ):
+        self.name = name
+        self.client = client or MemoryClient(event_listeners)
+        self.client._databases.setdefault(name, self)
+        self._collections: dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def get_collection(self, name: str) -> MemoryCollection:
+        return self[name]
+
+    async def list_collection_names(self, **kwargs) -> list[str]:
+        return [name for name, collection in self._collections.items() if collection._documents]
+
+    async def drop_collection(self, name: str, **kwargs) -> None:
+        self._collections.pop(name, None)
+
+    async def command(self, command: str | dict, **kwargs) -> dict:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        raise NotImplementedError(f"Database command {name} is not supported")
+
+    def _snapshot(self) -> dict:
+        return {
+            name: (collection._documents, collection._indexes)
+            for name, collection in self._collections.items()
+        }
+
+    def _restore(self, snapshot: dict) -> None:
+        # In place, so collection objects held by callers see the rollback
+        for name, collection in self._collections.items():
+            documents, indexes = snapshot.get(name, ({}, MemoryCollection(self, name)._indexes))
+            collection._documents = documents
+            collection._indexes = indexes
+
+    def _monitor(self, command_name: str, command: dict):
+        return _CommandMonitor(self, command_name, command)
+
+
+class _CommandMonitor:
+    """Publishes pymongo command events around one stand-in operation"""
+
+    def __init__(self, database: MemoryDatabase, command_name: str, command: dict):
+        self.database = database
+        self.command_name = command_name
+        self.command = command
+        self.reply: dict = {"ok": 1.0}
+
+    def _event(self, **fields) -> SimpleNamespace:
+        return SimpleNamespace(
+            command_name=self.command_name,
+            database_name=self.database.name,
+            connection_id=("memory", 0),
+            request_id=self.request_id,
+            operation_id=self.request_id,
+            service_id=None,
+            **fields,
+        )
+
+    def __enter__(self) -> dict:
+        self.request_id = next(_request_ids)
+        self.listeners = self.database.client.event_listeners
+        if self.listeners:
+            self.start = time.perf_counter()
+            event = self._event(command=self.command)
+            for listener in self.listeners:
+                listener.started(event)
+        return self.reply
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self.listeners:
+            return
+        duration = int((time.perf_counter() - self.start) * 1_000_000)
+        for listener in self.listeners:
+            if exc is None:
+                listener.succeeded(self._event(reply=self.reply, duration_micros=duration))
+            else:
+                listener.failed(self._event(failure={"errmsg": str(exc)}, duration_micros=duration))
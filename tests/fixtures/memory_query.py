@@ -0,0 +1,747 @@
+"""
+Query language of the in-memory MongoDB stand-in
+
+Field paths, query documents (including $expr), aggregation expressions,
+update operators with positional ($, $[], $[<identifier>]) paths, find
+projections and the BSON sort order. Used by memory_db and memory_aggregation.
+"""
+
+import copy
+import re
+from datetime import datetime, timedelta
+from typing import Any
+
+from bson import ObjectId
+
+MISSING: Any = type("Missing", (), {"__repr__": lambda self: "MISSING"})()
+
+
+class UnsupportedOperation(NotImplementedError):
+    """The stand-in does not implement a query, update or pipeline feature"""
+
+
+# ==================== PATHS ====================
+
+
+def values_at(doc: Any, path: str) -> list:
+    """All values at a dotted path, descending into arrays like query matching does"""
+    current = [doc]
+    for part in path.split("."):
+        found = []
+        for value in current:
+            if isinstance(value, dict):
+                if part in value:
+                    found.append(value[part])
+            elif isinstance(value, list):
+                if part.isdigit():
+                    if int(part) < len(value):
+                        found.append(value[int(part)])
+                else:
+                    found += [v[part] for v in value if isinstance(v, dict) and part in v]
+        current = found
+    return current
+
+
+def get_path(doc: Any, path: str) -> Any:
+    """Value at a dotted path without array traversal; MISSING if absent"""
+    current = doc
+    for part in path.split("."):
+        if isinstance(current, dict):
+            current = current.get(part, MISSING)
+        elif isinstance(current, list) and part.isdigit() and int(part) < len(current):
+            current = current[int(part)]
+        else:
+            return MISSING
+        if current is MISSING:
+            return MISSING
+    return current
+
+
+def set_path(doc: dict, path: str, value: Any) -> None:
+    parts = path.split(".")
+    current: Any = doc
+    for part in parts[:-1]:
+        if isinstance(current, list):
+            current = current[int(part)]
+        else:
+            current = current.setdefault(part, {})
+    if isinstance(current, list):
+        current[int(parts[-1])] = value
+    else:
+        current[parts[-1]] = value
+
+
+def remove_path(doc: dict, path: str) -> bool:
+    parts = path.split(".")
+    parent = get_path(doc, ".".join(parts[:-1])) if len(parts) > 1 else doc
+    if isinstance(parent, dict) and parts[-1] in parent:
+        del parent[parts[-1]]
+        return True
+    return False
+
+
+def field_value(doc: Any, path: str) -> Any:
+    """Aggregation field path: arrays map to the values of their elements"""
+    current = doc
+    for part in path.split("."):
+        if isinstance(current, dict):
+            current = current.get(part, MISSING)
+        elif isinstance(current, list):
+            current = [
+                item
+                for item in (field_value(v, part) for v in current if isinstance(v, dict))
+                if item is not MISSING
+            ]
+        else:
+            return MISSING
+        if current is MISSING:
+            return MISSING
+    return current
+
+
+# ==================== ORDERING ====================
+
+_TYPE_ORDER = (
+    (type(None), 1),
+    (bool, 8),
+    (int, 2),
+    (float, 2),
+    (str, 3),
+    (dict, 4),
+    (list, 5),
+    (bytes, 6),
+    (ObjectId, 7),
+    (datetime, 9),
+)
+
+
+def _type_rank(value: Any) -> int:
+    if value is MISSING:
+        return 0
+    for kind, rank in _TYPE_ORDER:
+        if isinstance(value, kind):
+            return rank
+    return 10
+
+
+def sort_key(value: Any, casefold: bool = False):
+    """Key implementing the BSON comparison order across types"""
+    rank = _type_rank(value)
+    if rank in (0, 1):
+        return (1, 0)
+    if rank == 3 and casefold:
+        return (rank, value.casefold())
+    if rank in (4, 5):
+        return (rank, repr(value))
+    return (rank, value)
+
+
+def compare(a: Any, b: Any) -> int:
+    left, right = sort_key(a), sort_key(b)
+    return (left > right) - (left < right)
+
+
+# ==================== EXPRESSIONS ====================
+
+
+def truthy(value: Any) -> bool:
+    return value not in (None, False, 0) and value is not MISSING
+
+
+def _none(value: Any) -> Any:
+    return None if value is MISSING else value
+
+
+def _date_diff(a: Any, b: Any) -> Any:
+    if isinstance(a, datetime) and isinstance(b, datetime):
+        return int((a - b).total_seconds() * 1000)
+    if isinstance(a, datetime):
+        return a - timedelta(milliseconds=b)
+    return a - b
+
+
+def _numbers(values: list) -> list:
+    return [v for v in values if isinstance(v, int | float) and not isinstance(v, bool)]
+
+
+def _args(operand: Any, doc: Any, variables: dict) -> list:
+    if isinstance(operand, list):
+        return [evaluate(item, doc, variables) for item in operand]
+    return [evaluate(operand, doc, variables)]
+
+
+def _array_args(operand: Any, doc: Any, variables: dict) -> list:
+    """Operands of $sum/$max/...: one array argument or several plain arguments"""
+    values = _args(operand, doc, variables)
+    if len(values) == 1 and isinstance(values[0], list):
+        return values[0]
+    return values
+
+
+def _operator(op: str, operand: Any, doc: Any, variables: dict) -> Any:
+    if op == "$literal":
+        return operand
+    if op in ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$cmp"):
+        a, b = (_none(v) for v in _args(operand, doc, variables))
+        result = compare(a, b)
+        return {
+            "$eq": result == 0,
+            "$ne": result != 0,
+            "$gt": result > 0,
+            "$gte": result >= 0,
+            "$lt": result < 0,
+            "$lte": result <= 0,
+            "$cmp": result,
+        }[op]
+    if op == "$and":
+        return all(truthy(evaluate(item, doc, variables)) for item in operand)
+    if op == "$or":
+        return any(truthy(evaluate(item, doc, variables)) for item in operand)
+    if op == "$not":
+        return not truthy(_args(operand, doc, variables)[0])
+    if op == "$cond":
+        if isinstance(operand, dict):
+            condition, then, otherwise = operand["if"], operand["then"], operand["else"]
+        else:
+            condition, then, otherwise = operand
+        branch = then if truthy(evaluate(condition, doc, variables)) else otherwise
+        return evaluate(branch, doc, variables)
+    if op == "$ifNull":
+        values = _args(operand, doc, variables)
+        for value in values[:-1]:
+            if value is not None and value is not MISSING:
+                return value
+        return values[-1]
+    if op in ("$first", "$last"):
+        array = _args(operand, doc, variables)[0]
+        if not isinstance(array, list) or not array:
+            return MISSING
+        return array[0] if op == "$first" else array[-1]
+    if op == "$size":
+        array = _args(operand, doc, variables)[0]
+        if not isinstance(array, list):
+            raise UnsupportedOperation("$size requires an array")
+        return len(array)
+    if op == "$in":
+        value, array = _args(operand, doc, variables)
+        return any(compare(value, item) == 0 for item in array or [])
+    if op == "$filter":
+        name = operand.get("as", "this")
+        array = evaluate(operand["input"], doc, variables)
+        if array is None or array is MISSING:
+            return None
+        return [
+            item
+            for item in array
+            if truthy(evaluate(operand["cond"], doc, {**variables, name: item}))
+        ]
+    if op == "$map":
+        name = operand.get("as", "this")
+        array = evaluate(operand["input"], doc, variables)
+        if array is None or array is MISSING:
+            return None
+        return [evaluate(operand["in"], doc, {**variables, name: item}) for item in array]
+    if op == "$reduce":
+        value = evaluate(operand["initialValue"], doc, variables)
+        for item in evaluate(operand["input"], doc, variables) or []:
+            value = evaluate(operand["in"], doc, {**variables, "value": value, "this": item})
+        return value
+    if op == "$let":
+        bound = {name: evaluate(expr, doc, variables) for name, expr in operand["vars"].items()}
+        return evaluate(operand["in"], doc, {**variables, **bound})
+    if op == "$concatArrays":
+        arrays = _args(operand, doc, variables)
+        if any(a is None or a is MISSING for a in arrays):
+            return None
+        return [item for array in arrays for item in array]
+    if op == "$arrayToObject":
+        array = _array_args(operand, doc, variables)
+        pairs = [(p["k"], p["v"]) if isinstance(p, dict) else tuple(p) for p in array]
+        return dict(pairs)
+    if op == "$objectToArray":
+        value = _args(operand, doc, variables)[0]
+        return [{"k": k, "v": v} for k, v in value.items()]
+    if op == "$sum":
+        return sum(_numbers(_array_args(operand, doc, variables)))
+    if op == "$avg":
+        numbers = _numbers(_array_args(operand, doc, variables))
+        return sum(numbers) / len(numbers) if numbers else None
+    if op in ("$max", "$min"):
+        values = [v for v in _array_args(operand, doc, variables) if v not in (None, MISSING)]
+        if not values:
+            return None
+        pick = max if op == "$max" else min
+        return pick(values, key=sort_key)
+    if op == "$add":
+        values = _args(operand, doc, variables)
+        if any(v is None or v is MISSING for v in values):
+            return None
+        dates = [v for v in values if isinstance(v, datetime)]
+        total = sum(v for v in values if not isinstance(v, datetime))
+        if dates:
+            return dates[0] + timedelta(milliseconds=total)
+        return total
+    if op == "$subtract":
+        a, b = _args(operand, doc, variables)
+        return None if None in (_none(a), _none(b)) else _date_diff(a, b)
+    if op == "$multiply":
+        result = 1
+        for value in _args(operand, doc, variables):
+            if value is None or value is MISSING:
+                return None
+            result *= value
+        return result
+    if op == "$divide":
+        a, b = _args(operand, doc, variables)
+        return None if None in (_none(a), _none(b)) else a / b
+    if op == "$concat":
+        values = _args(operand, doc, variables)
+        return None if any(v in (None, MISSING) for v in values) else "".join(values)
+    if op == "$toString":
+        value = _args(operand, doc, variables)[0]
+        return None if value in (None, MISSING) else str(value)
+    if op in ("$toLower", "$toUpper"):
+        value = _none(_args(operand, doc, variables)[0]) or ""
+        return value.lower() if op == "$toLower" else value.upper()
+    if op == "$type":
+        value = _args(operand, doc, variables)[0]
+        return _type_name(value)
+    if op == "$isArray":
+        return isinstance(_args(operand, doc, variables)[0], list)
+    if op == "$setUnion":
+        result: list = []
+        for array in _args(operand, doc, variables):
+            result += [item for item in array or [] if item not in result]
+        return result
+    raise UnsupportedOperation(f"Expression operator {op} is not supported")
+
+
+def _type_name(value: Any) -> str:
+    if value is MISSING:
+        return "missing"
+    names = {
+        type(None): "null",
+        bool: "bool",
+        int: "int",
+        float: "double",
+        str: "string",
+        dict: "object",
+        list: "array",
+        ObjectId: "objectId",
+        datetime: "date",
+    }
+    return names.get(type(value), type(value).__name__)
+
+
+def evaluate(expr: Any, doc: Any, variables: dict | None = None) -> Any:
+    """Evaluate an aggregation expression against a document"""
+    variables = variables or {}
+    if isinstance(expr, str):
+        if expr.startswith("$$"):
+            name, _, rest = expr[2:].partition(".")
+            if name in ("ROOT", "CURRENT"):
+                base = variables.get(name, doc)
+            elif name == "REMOVE":
+                return MISSING
+            else:
+                base = variables[name]
+            return field_value(base, rest) if rest else base
+        if expr.startswith("$"):
+            return field_value(doc, expr[1:])
+        return expr
+    if isinstance(expr, dict):
+        if len(expr) == 1:
+            (key, operand), *_ = expr.items()
+            if key.startswith("$"):
+                return _operator(key, operand, doc, variables)
+        result = {}
+        for key, value in expr.items():
+            value = evaluate(value, doc, variables)
+            if value is not MISSING:
+                result[key] = value
+        return result
+    if isinstance(expr, list):
+        return [_none(evaluate(item, doc, variables)) for item in expr]
+    return expr
+
+
+# ==================== QUERIES ====================
+
+
+def _candidates(values: list) -> list:
+    """Values plus the elements of array values, the set a condition is tested against"""
+    expanded = list(values)
+    for value in values:
+        if isinstance(value, list):
+            expanded += value
+    return expanded
+
+
+def _regex(condition: dict) -> re.Pattern:
+    pattern = condition["$regex"]
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    flags = 0
+    for option in condition.get("$options", ""):
+        flags |= {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}[option]
+    return re.compile(pattern, flags)
+
+
+_COMPARISONS = {
+    "$gt": lambda result: result > 0,
+    "$gte": lambda result: result >= 0,
+    "$lt": lambda result: result < 0,
+    "$lte": lambda result: result <= 0,
+}
+
+
+def _equals(candidates: list, condition: Any) -> bool:
+    if isinstance(condition, re.Pattern):
+        return any(isinstance(v, str) and condition.search(v) for v in candidates)
+    rank = _type_rank(condition)
+    return any(v == condition and _type_rank(v) == rank for v in candidates)
+
+
+def _is_operator_document(condition: Any) -> bool:
+    return (
+        isinstance(condition, dict)
+        and bool(condition)
+        and all(key.startswith("$") for key in condition)
+    )
+
+
+def _matches_condition(values: list, condition: Any, variables: dict) -> bool:
+    candidates = _candidates(values)
+    if not _is_operator_document(condition):
+        if condition is None:
+            return not values or None in candidates
+        return _equals(candidates, condition)
+    for op, operand in condition.items():
+        if op == "$options":
+            continue
+        if op == "$eq":
+            ok = _matches_condition(values, operand, variables)
+        elif op == "$ne":
+            ok = not _matches_condition(values, operand, variables)
+        elif op == "$in":
+            ok = any(_matches_condition(values, item, variables) for item in operand)
+        elif op == "$nin":
+            ok = not any(_matches_condition(values, item, variables) for item in operand)
+        elif op == "$exists":
+            ok = bool(values) == bool(operand)
+        elif op == "$not":
+            ok = not _matches_condition(values, operand, variables)
+        elif op == "$regex":
+            pattern = _regex(condition)
+            ok = any(isinstance(v, str) and pattern.search(v) for v in candidates)
+        elif op == "$elemMatch":
+            ok = any(
+                (
+                    matches(item, operand, variables)
+                    if isinstance(item, dict) and not _is_operator_document(operand)
+                    else _matches_condition([item], operand, variables)
+                )
+                for value in values
+                if isinstance(value, list)
+                for item in value
+            )
+        elif op == "$size":
+            ok = any(isinstance(v, list) and len(v) == operand for v in values)
+        elif op == "$all":
+            ok = all(_matches_condition(values, item, variables) for item in operand)
+        elif op == "$type":
+            kinds = operand if isinstance(operand, list) else [operand]
+            ok = any(_type_name(v) in kinds for v in candidates)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            # Only values of the same BSON type bracket are compared
+            ok = any(
+                _type_rank(v) == _type_rank(operand) and _COMPARISONS[op](compare(v, operand))
+                for v in candidates
+            )
+        else:
+            raise UnsupportedOperation(f"Query operator {op} is not supported")
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc: dict, query: dict | None, variables: dict | None = None) -> bool:
+    """Whether a document satisfies a MongoDB query document"""
+    variables = variables or {}
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            ok = all(matches(doc, sub, variables) for sub in condition)
+        elif key == "$or":
+            ok = any(matches(doc, sub, variables) for sub in condition)
+        elif key == "$nor":
+            ok = not any(matches(doc, sub, variables) for sub in condition)
+        elif key == "$expr":
+            ok = truthy(evaluate(condition, doc, variables))
+        elif key == "$comment":
+            ok = True
+        else:
+            ok = _matches_condition(values_at(doc, key), condition, variables)
+        if not ok:
+            return False
+    return True
+
+
+# ==================== UPDATES ====================
+
+
+def _element_query(query: dict | None, prefix: str) -> dict | None:
+    """Conditions of a query on the elements of the array at prefix (for the $ operator)"""
+    element_query: dict = {}
+    for key, condition in (query or {}).items():
+        if key == prefix and isinstance(condition, dict) and "$elemMatch" in condition:
+            element_query.update(condition["$elemMatch"])
+        elif key.startswith(prefix + "."):
+            element_query[key[len(prefix) + 1 :]] = condition
+        elif key == "$and":
+            for sub in condition:
+                element_query.update(_element_query(sub, prefix) or {})
+    return element_query or None
+
+
+def _filter_matches(item: Any, identifier: str, array_filters: list[dict]) -> bool:
+    conditions = {}
+    for array_filter in array_filters:
+        for key, condition in array_filter.items():
+            if key == identifier:
+                conditions[""] = condition
+            elif key.startswith(identifier + "."):
+                conditions[key[len(identifier) + 1 :]] = condition
+    if "" in conditions:
+        return _matches_condition([item], conditions.pop(""), {})
+    return isinstance(item, dict) and matches(item, conditions)
+
+
+def resolve_update_targets(
+    doc: dict, path: str, query: dict | None, array_filters: list[dict] | None
+) -> list[tuple[Any, str]]:
+    """(container, key) pairs an update path refers to, creating missing objects"""
+    parts = path.split(".")
+    targets: list[tuple[Any, str]] = []
+
+    def walk(node: Any, index: int, walked: list[str]) -> None:
+        part = parts[index]
+        last = index == len(parts) - 1
+        if part.startswith("$"):
+            if not isinstance(node, list):
+                raise UnsupportedOperation(f"Positional {part} on a non-array in {path}")
+            if part == "$":
+                element_query = _element_query(query, ".".join(walked))
+                positions = [
+                    i
+                    for i, item in enumerate(node)
+                    if element_query is None
+                    or (
+                        matches(item, element_query)
+                        if isinstance(item, dict)
+                        else _matches_condition([item], element_query.get("", item), {})
+                    )
+                ][:1]
+            elif part == "$[]":
+                positions = list(range(len(node)))
+            else:
+                identifier = part[2:-1]
+                positions = [
+                    i
+                    for i, item in enumerate(node)
+                    if _filter_matches(item, identifier, array_filters or [])
+                ]
+            for position in positions:
+                if last:
+                    targets.append((node, str(position)))
+                else:
+                    walk(node[position], index + 1, walked + [part])
+            return
+        if last:
+            targets.append((node, part))
+            return
+        if isinstance(node, list):
+            walk(node[int(part)], index + 1, walked + [part])
+            return
+        if part not in node or node[part] is None:
+            node[part] = {}
+        walk(node[part], index + 1, walked + [part])
+
+    walk(doc, 0, [])
+    return targets
+
+
+def _read(container: Any, key: str) -> Any:
+    if isinstance(container, list):
+        return container[int(key)] if int(key) < len(container) else MISSING
+    return container.get(key, MISSING)
+
+
+def _write(container: Any, key: str, value: Any) -> None:
+    if isinstance(container, list):
+        container[int(key)] = value
+    else:
+        container[key] = value
+
+
+def _pull(current: list, value: Any) -> list:
+    if _is_operator_document(value):
+        return [item for item in current if not _matches_condition([item], value, {})]
+    if isinstance(value, dict):
+        return [item for item in current if not (isinstance(item, dict) and matches(item, value))]
+    return [item for item in current if item != value]
+
+
+def apply_update(
+    doc: dict,
+    update: dict,
+    query: dict | None = None,
+    array_filters: list[dict] | None = None,
+    inserting: bool = False,
+) -> bool:
+    """Apply an update document in place; returns whether the document changed"""
+    changed = False
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for path, value in fields.items():
+            value = copy.deepcopy(value)
+            for container, key in resolve_update_targets(doc, path, query, array_filters):
+                current = _read(container, key)
+                if op in ("$set", "$setOnInsert"):
+                    new = value
+                elif op == "$unset":
+                    if current is not MISSING and isinstance(container, dict):
+                        del container[key]
+                        changed = True
+                    continue
+                elif op == "$inc":
+                    new = (0 if current in (MISSING, None) else current) + value
+                elif op in ("$max", "$min"):
+                    better = (
+                        compare(value, current) > 0 if op == "$max" else compare(value, current) < 0
+                    )
+                    new = value if current is MISSING or better else current
+                elif op == "$push":
+                    items = (
+                        value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                    )
+                    new = ([] if current in (MISSING, None) else current) + items
+                elif op == "$addToSet":
+                    items = (
+                        value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                    )
+                    new = [] if current in (MISSING, None) else list(current)
+                    new += [item for item in items if item not in new]
+                elif op == "$pull":
+                    if not isinstance(current, list):
+                        continue
+                    new = _pull(current, value)
+                elif op == "$currentDate":
+                    new = datetime.now()
+                else:
+                    raise UnsupportedOperation(f"Update operator {op} is not supported")
+                if current is MISSING or current != new:
+                    _write(container, key, new)
+                    changed = True
+    return changed
+
+
+def upsert_document(query: dict | None) -> dict:
+    """Seed of a document inserted by an upsert: the query's equality conditions"""
+    doc: dict = {}
+    for key, condition in (query or {}).items():
+        if key.startswith("$") or _is_operator_document(condition):
+            continue
+        set_path(doc, key, condition)
+    return doc
+
+
+# ==================== PROJECTION ====================
+
+
+def _projection_tree(paths: list[str]) -> dict:
+    tree: dict = {}
+    for path in paths:
+        node = tree
+        parts = path.split(".")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+            if node is True:
+                break
+        else:
+            node[parts[-1]] = True
+    return tree
+
+
+def _include(value: Any, tree: dict) -> Any:
+    if isinstance(value, list):
+        return [_include(item, tree) for item in value if isinstance(item, dict | list)]
+    if not isinstance(value, dict):
+        return MISSING
+    result = {}
+    for key, sub in tree.items():
+        if key not in value:
+            continue
+        if sub is True:
+            result[key] = value[key]
+        else:
+            projected = _include(value[key], sub)
+            if projected is not MISSING:
+                result[key] = projected
+    return result
+
+
+def _exclude(value: Any, tree: dict) -> Any:
+    if isinstance(value, list):
+        return [_exclude(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    result = {}
+    for key, item in value.items():
+        sub = tree.get(key)
+        if sub is True:
+            continue
+        result[key] = _exclude(item, sub) if sub else item
+    return result
+
+
+def include_paths(doc: dict, paths: list[str]) -> dict:
+    """Copy of the document reduced to the given dotted paths"""
+    return _include(doc, _projection_tree(paths))
+
+
+def exclude_paths(doc: dict, paths: list[str]) -> dict:
+    """Copy of the document without the given dotted paths"""
+    return _exclude(doc, _projection_tree(paths))
+
+
+def project(doc: dict, projection: dict | list | None, query: dict | None = None) -> dict:
+    """Apply a find() projection, including the positional "array.$" form"""
+    if not projection:
+        return doc
+    if isinstance(projection, list):
+        projection = dict.fromkeys(projection, 1)
+    positional = [path for path in projection if path.endswith(".$")]
+    plain = {k: v for k, v in projection.items() if not k.endswith(".$")}
+    include_id = truthy(plain.pop("_id", 1))
+    included = [k for k, v in plain.items() if truthy(v)]
+    if not included and not positional:
+        excluded = [k for k, v in plain.items() if not truthy(v)]
+        result = _exclude(doc, _projection_tree(excluded))
+        if not include_id:
+            result.pop("_id", None)
+        return result
+    result = _include(doc, _projection_tree(included))
+    for path in positional:
+        prefix = path[:-2]
+        array = get_path(doc, prefix)
+        if not isinstance(array, list):
+            continue
+        element_query = _element_query(query, prefix)
+        for item in array:
+            if element_query is None or (isinstance(item, dict) and matches(item, element_query)):
+                set_path(result, prefix, [item])
+                break
+    if include_id and "_id" in doc:
+        result = {"_id": doc["_id"], **result}
+    return result
@@ -0,0 +1,101 @@
+"""
+Local SMTP sink
+
+A minimal SMTP server on 127.0.0.1 that accepts mail without delivering it,
+so the mail outbox can be tested against a real SMTP conversation. It
+records every connection and every accepted message, refuses the recipients
+listed in `refused` with 550 and answers the DATA of the next `fail_next`
+messages with a transient 451.
+
+    sink = SmtpSink()
+    port = await sink.start()
+    monkeypatch.setattr(settings, "MAIL_PORT", port)
+    ...
+    assert sink.messages[0]["Subject"] == "Hello"
+    await sink.stop()
+"""
+
+import asyncio
+import email
+from email.message import EmailMessage
+from email.policy import default
+
+
+class SmtpSink:
+    """In-process SMTP server collecting the messages it receives"""
+
+    def __init__(self, refused: set[str] | None = None):
+        self.refused = set(refused or ())
+        self.fail_next = 0
+        self.connections = 0
+        self.messages: list[EmailMessage] = []
+        self.envelopes: list[tuple[str, list[str]]] = []
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> int:
+        """Start listening; returns the port"""
+        self._server = await asyncio.start_server(self._session, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+
+        async def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        sender, recipients = "", []
+        await reply("220 sink ESMTP")
+        try:
+            while line := await reader.readline():
+                command, _, argument = line.decode().rstrip("\r\n").partition(" ")
+                command = command.upper()
+                if command == "EHLO":
+                    await reply("250-sink")
+                    await reply("250 8BITMIME")
+                elif command == "HELO":
+                    await reply("250 sink")
+                elif command == "MAIL":
+                    sender, recipients = _address(argument), []
+                    await reply("250 OK")
+                elif command == "RCPT":
+                    address = _address(argument)
+                    if address in self.refused:
+                        await reply("550 No such user")
+                    else:
+                        recipients.append(address)
+                        await reply("250 OK")
+                elif command == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = await reader.readuntil(b"\r\n.\r\n")
+                    if self.fail_next > 0:
+                        self.fail_next -= 1
+                        await reply("451 Try again later")
+                    else:
+                        self.messages.append(
+                            email.message_from_bytes(data[: -len(b".\r\n")], policy=default)
+                        )
+                        self.envelopes.append((sender, recipients))
+                        await reply("250 OK")
+                    sender, recipients = "", []
+                elif command in ("RSET", "NOOP"):
+                    sender, recipients = "", []
+                    await reply("250 OK")
+                elif command == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        finally:
+            writer.close()
+
+
+def _address(argument: str) -> str:
+    """Address of a MAIL FROM:<a> / RCPT TO:<a> argument"""
+    return argument.partition("<")[2].partition(">")[0]
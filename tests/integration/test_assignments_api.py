@@ -358,3 +358,57 @@ class TestAssignmentsAPI:
         response = await client.post("/assignments", json=assignment_data)
 
         assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_get_assignment_conflicts(self, client: AsyncClient, mongodb, admin_token):
+        """Test conflict check reports ASSIGNED referees missing from the match"""
+        from datetime import datetime, timedelta
+
+        start = datetime.now() + timedelta(days=3)
+        match = create_test_match(start_date=start)
+        await mongodb["matches"].insert_one(match)
+
+        await mongodb["assignments"].insert_one(
+            {
+                "_id": str(ObjectId()),
+                "matchId": match["_id"],
+                "status": "ASSIGNED",
+                "position": 1,
+                "referee": {"userId": "ref-user-1", "firstName": "John", "lastName": "Referee"},
+                "statusHistory": [],
+            }
+        )
+
+        referee = {"userId": "ref-user-2", "firstName": "Jane", "lastName": "Referee"}
+        overlapping = [
+            create_test_match(start_date=start.replace(hour=10, minute=0)),
+            create_test_match(start_date=start.replace(hour=10, minute=45)),
+        ]
+        for m in overlapping:
+            m["referee1"] = referee
+        await mongodb["matches"].insert_many(overlapping)
+
+        response = await client.get(
+            "/assignments/conflicts", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert [c["type"] for c in data["conflicts"]] == ["REFEREE_NOT_SET_IN_MATCH"]
+        assert data["analysis"]["missing_from_match"] == 1
+        assert len(data["double_bookings"]) == 1
+        assert data["double_bookings"][0]["referee"]["userId"] == "ref-user-2"
+
+    @pytest.mark.asyncio
+    async def test_get_assignment_conflicts_requires_admin(self, client: AsyncClient, mongodb):
+        """Test conflict check is restricted to ADMIN/REF_ADMIN"""
+        auth = AuthHandler()
+        token = auth.encode_token(
+            {"_id": "ref-user-1", "roles": ["REFEREE"], "firstName": "John", "lastName": "Ref"}
+        )
+
+        response = await client.get(
+            "/assignments/conflicts", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 403
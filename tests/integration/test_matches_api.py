@@ -281,6 +281,23 @@ class TestMatchesAPI:
         assert data["pagination"]["total_items"] == 5
         assert data["pagination"]["total_pages"] == 2
 
+    async def test_list_matches_query_budget(self, client: AsyncClient, mongodb, query_budget):
+        """Test that listing matches issues a constant number of queries"""
+        from tests.fixtures.data_fixtures import create_test_match
+
+        test_season = "2024-25"
+        matches = [create_test_match() for _ in range(10)]
+        for match in matches:
+            match["season"] = {"alias": test_season, "name": "2024/25"}
+        await mongodb["matches"].insert_many(matches)
+
+        with query_budget(6, max_identical=2) as requests:
+            response = await client.get(f"/matches?page_size=10&season={test_season}")
+
+        assert response.status_code == 200
+        assert len(response.json()["data"]) == 10
+        assert len(requests) == 1
+
     async def test_list_matches_filter_by_tournament(self, client: AsyncClient, mongodb):
         """Test filtering matches by tournament"""
         from tests.fixtures.data_fixtures import create_test_match
@@ -0,0 +1,187 @@
+"""Unit tests for AssignmentConflictService"""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from services.assignment_conflict_service import AssignmentConflictService
+
+
+def _cursor(result):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=result)
+    cursor.sort = MagicMock(return_value=cursor)
+    return cursor
+
+
+def _referee(user_id, first="Ref", last="Eree"):
+    return {"userId": user_id, "firstName": first, "lastName": last, "clubName": "Club"}
+
+
+def _match(match_id, start, referee1=None, referee2=None):
+    return {
+        "_id": match_id,
+        "tournament": {"name": "Regionalliga"},
+        "home": {"fullName": "Home"},
+        "away": {"fullName": "Away"},
+        "startDate": start,
+        "referee1": referee1,
+        "referee2": referee2,
+    }
+
+
+def _assignment(assignment_id, referee_id, position, match, assigned_at=None):
+    return {
+        "_id": assignment_id,
+        "matchId": match["_id"] if match else "missing-match",
+        "referee": _referee(referee_id),
+        "position": position,
+        "status": "ASSIGNED",
+        "statusHistory": (
+            [{"status": "ASSIGNED", "updateDate": assigned_at, "updatedByName": "Admin"}]
+            if assigned_at
+            else []
+        ),
+        "match": match,
+    }
+
+
+@pytest.fixture
+def mock_db():
+    """Mock MongoDB database"""
+    db = MagicMock()
+    mock_assignments = MagicMock()
+    mock_matches = MagicMock()
+    db._assignments_collection = mock_assignments
+    db._matches_collection = mock_matches
+    db.__getitem__ = MagicMock(
+        side_effect=lambda name: {"assignments": mock_assignments, "matches": mock_matches}.get(
+            name
+        )
+    )
+    return db
+
+
+@pytest.fixture
+def service(mock_db):
+    return AssignmentConflictService(mock_db)
+
+
+class TestGetAssignedWithMatches:
+    """Test the single-aggregation load"""
+
+    @pytest.mark.asyncio
+    async def test_uses_one_lookup_aggregation(self, service, mock_db):
+        mock_db._assignments_collection.aggregate = MagicMock(return_value=_cursor([]))
+
+        await service.get_assigned_with_matches()
+
+        mock_db._assignments_collection.aggregate.assert_called_once()
+        pipeline = mock_db._assignments_collection.aggregate.call_args[0][0]
+        assert pipeline[0] == {"$match": {"status": "ASSIGNED"}}
+        assert pipeline[1]["$lookup"]["from"] == "matches"
+        assert pipeline[1]["$lookup"]["localField"] == "matchId"
+
+
+class TestFindSyncConflicts:
+    """Test classification of joined assignments"""
+
+    def test_classifies_all_conflict_types(self, service):
+        start = datetime(2025, 5, 17, 14, 0)
+        ok_match = _match("m1", start, referee1=_referee("r1"))
+        unset_match = _match("m2", start)
+        mismatch_match = _match("m3", start, referee2=_referee("other"))
+        assignments = [
+            _assignment("a1", "r1", 1, ok_match),
+            _assignment("a2", "r2", 1, unset_match),
+            _assignment("a3", "r3", 2, mismatch_match),
+            _assignment("a4", "r4", 1, None),
+        ]
+
+        conflicts = service.find_sync_conflicts(assignments)
+
+        assert [(c["assignment_id"], c["type"]) for c in conflicts] == [
+            ("a2", "REFEREE_NOT_SET_IN_MATCH"),
+            ("a3", "REFEREE_MISMATCH"),
+            ("a4", "MATCH_NOT_FOUND"),
+        ]
+        assert conflicts[1]["match_referee"]["userId"] == "other"
+
+
+class TestAnalyzeWorkflow:
+    """Test REF_ADMIN workflow statistics"""
+
+    def test_counts_issues(self, service):
+        start = datetime(2025, 5, 17, 14, 0)
+        assignments = [
+            _assignment("a1", "r1", 1, _match("m1", start, referee1=_referee("r1"))),
+            _assignment("a2", "r2", 1, _match("m2", start), assigned_at=datetime(2025, 5, 1)),
+            _assignment("a3", "r3", 2, _match("m3", start), assigned_at=datetime(2025, 5, 3)),
+            _assignment("a4", "r4", 2, _match("m4", start, referee2=_referee("x"))),
+        ]
+
+        analysis = service.analyze_workflow(assignments)
+
+        assert analysis["total_assigned_status"] == 4
+        assert analysis["properly_set_in_match"] == 1
+        assert analysis["missing_from_match"] == 2
+        assert analysis["wrong_referee_in_match"] == 1
+        assert analysis["issues_by_position"] == {"1": 1, "2": 2}
+        assert analysis["issues_by_tournament"] == {"Regionalliga": 2}
+        assert [i["assignment_id"] for i in analysis["recent_issues"]] == ["a3", "a2"]
+        assert analysis["oldest_issue_date"] == datetime(2025, 5, 1)
+
+
+class TestFindDoubleBookings:
+    """Test the sorted-sweep overlap detector"""
+
+    @pytest.mark.asyncio
+    async def test_flags_overlapping_slots(self, service, mock_db):
+        matches = [
+            _match("m1", datetime(2025, 5, 17, 10, 0), referee1=_referee("r1")),
+            _match("m2", datetime(2025, 5, 17, 11, 0), referee2=_referee("r1")),
+            _match("m3", datetime(2025, 5, 17, 11, 30), referee1=_referee("r2")),
+            _match("m4", datetime(2025, 5, 17, 13, 0), referee1=_referee("r1")),
+        ]
+        mock_db._matches_collection.find = MagicMock(return_value=_cursor(matches))
+
+        conflicts = await service.find_double_bookings(match_duration_minutes=90)
+
+        assert len(conflicts) == 1
+        assert conflicts[0]["type"] == "DOUBLE_BOOKING"
+        assert conflicts[0]["referee"]["userId"] == "r1"
+        assert conflicts[0]["match_ids"] == ["m1", "m2"]
+
+    @pytest.mark.asyncio
+    async def test_back_to_back_slots_do_not_overlap(self, service, mock_db):
+        matches = [
+            _match("m1", datetime(2025, 5, 17, 10, 0), referee1=_referee("r1")),
+            _match("m2", datetime(2025, 5, 17, 11, 30), referee1=_referee("r1")),
+        ]
+        mock_db._matches_collection.find = MagicMock(return_value=_cursor(matches))
+
+        assert await service.find_double_bookings(match_duration_minutes=90) == []
+
+    @pytest.mark.asyncio
+    async def test_long_slot_overlaps_later_matches(self, service, mock_db):
+        matches = [
+            _match("m1", datetime(2025, 5, 17, 10, 0), referee1=_referee("r1")),
+            _match("m2", datetime(2025, 5, 17, 10, 30), referee1=_referee("r1")),
+            _match("m3", datetime(2025, 5, 17, 11, 0), referee2=_referee("r1")),
+        ]
+        mock_db._matches_collection.find = MagicMock(return_value=_cursor(matches))
+
+        conflicts = await service.find_double_bookings(match_duration_minutes=90)
+
+        assert [c["match_ids"] for c in conflicts] == [["m1", "m2"], ["m2", "m3"]]
+
+    @pytest.mark.asyncio
+    async def test_date_range_is_applied_to_query(self, service, mock_db):
+        mock_db._matches_collection.find = MagicMock(return_value=_cursor([]))
+
+        await service.find_double_bookings(from_date=datetime(2025, 5, 1))
+
+        query = mock_db._matches_collection.find.call_args[0][0]
+        assert query["startDate"]["$gte"] == datetime(2025, 5, 1)
+        assert "$lte" not in query["startDate"]
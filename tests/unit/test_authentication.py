@@ -167,6 +167,69 @@ class TestPasswordHashing:
         assert auth_handler.verify_password(password, hash2) is True
 
 
+class TestOffLoopPasswordHashing:
+    """Test executor-backed hashing, rehash-on-login and latency metrics"""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_async(self, auth_handler):
+        """Test async hashing runs in the hashing pool and round-trips"""
+        hashed = await auth_handler.get_password_hash_async("test-password-123")
+
+        assert hashed.startswith("$argon2")
+        assert await auth_handler.verify_password_async("test-password-123", hashed) is True
+        assert await auth_handler.verify_password_async("wrong-password", hashed) is False
+
+    @pytest.mark.asyncio
+    async def test_hashing_does_not_run_on_event_loop_thread(self, auth_handler):
+        """Test the CPU-bound call executes on a worker thread"""
+        import threading
+
+        loop_thread = threading.get_ident()
+        seen_threads = []
+
+        def fake_hash(password):
+            seen_threads.append(threading.get_ident())
+            return "$argon2id$fake"
+
+        with patch.object(auth_handler, "get_password_hash", side_effect=fake_hash):
+            await auth_handler.get_password_hash_async("pw")
+
+        assert seen_threads and seen_threads[0] != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_legacy_bcrypt_hash_is_upgraded(self, auth_handler):
+        """Test valid bcrypt hashes are transparently rehashed to argon2"""
+        import bcrypt
+
+        legacy = bcrypt.hashpw(b"legacy-pw", bcrypt.gensalt(rounds=4)).decode()
+
+        is_valid, new_hash = await auth_handler.verify_and_upgrade_password("legacy-pw", legacy)
+
+        assert is_valid is True
+        assert new_hash.startswith("$argon2")
+        assert auth_handler.verify_password("legacy-pw", new_hash) is True
+
+    @pytest.mark.asyncio
+    async def test_no_upgrade_for_current_or_invalid(self, auth_handler):
+        """Test argon2 hashes and wrong passwords are not rehashed"""
+        current = auth_handler.get_password_hash("pw")
+
+        assert await auth_handler.verify_and_upgrade_password("pw", current) == (True, None)
+        assert await auth_handler.verify_and_upgrade_password("nope", current) == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_metrics_recorded(self, auth_handler):
+        """Test hash/verify latencies are recorded"""
+        auth_handler.metrics.reset()
+        hashed = await auth_handler.get_password_hash_async("pw")
+        await auth_handler.verify_password_async("pw", hashed)
+
+        snapshot = auth_handler.metrics.snapshot()
+        assert snapshot["hash"]["count"] == 1
+        assert snapshot["verify"]["count"] == 1
+        assert snapshot["verify"]["avg_ms"] >= 0
+
+
 class TestRoleValidation:
     """Test role-based access control"""
 
@@ -196,3 +259,79 @@ class TestRoleValidation:
         required = ["ADMIN", "MODERATOR"]
 
         assert auth_handler.has_any_role(roles, required) is False
+
+
+class TestTokenPayloadRoles:
+    """Test precomputed role bitmask on TokenPayload"""
+
+    def test_role_mask_checks(self):
+        """Test has_role/has_any_role against the bitmask"""
+        from authentication import TokenPayload
+
+        payload = TokenPayload(sub="u1", roles=["REFEREE", "CLUB_ADMIN"])
+
+        assert payload.role_mask != 0
+        assert payload.has_role("REFEREE") is True
+        assert payload.has_role("ADMIN") is False
+        assert payload.has_any_role("ADMIN", "CLUB_ADMIN") is True
+        assert payload.has_any_role("ADMIN", "REF_ADMIN") is False
+
+    def test_unknown_roles_fall_back_to_list(self):
+        """Test roles outside the Role enum still work"""
+        from authentication import TokenPayload
+
+        payload = TokenPayload(sub="u1", roles=["USER"])
+
+        assert payload.has_role("USER") is True
+        assert payload.has_any_role("ADMIN", "USER") is True
+        assert payload.has_role("MODERATOR") is False
+
+
+class TestVerifiedTokenCache:
+    """Test verified-token caching in decode_token"""
+
+    def test_decode_uses_cache_on_repeat(self, auth_handler, mock_user):
+        """Test second decode of the same token skips jwt.decode"""
+        auth_handler.token_cache.clear()
+        token = auth_handler.encode_token(mock_user)
+
+        first = auth_handler.decode_token(token)
+        with patch("authentication.jwt.decode") as mock_decode:
+            second = auth_handler.decode_token(token)
+
+        mock_decode.assert_not_called()
+        assert second is first
+
+    def test_expired_entries_are_not_served(self, auth_handler, mock_user):
+        """Test cached payloads are dropped once the token exp passes"""
+        auth_handler.token_cache.clear()
+        token = auth_handler.encode_token(mock_user)
+        auth_handler.decode_token(token)
+        key = auth_handler.token_cache.key(auth_handler.secret, token)
+
+        with patch("authentication.time.time", return_value=datetime.now().timestamp() + 86400):
+            assert auth_handler.token_cache.get(key) is None
+
+        assert len(auth_handler.token_cache) == 0
+
+    def test_cache_is_bounded(self):
+        """Test LRU eviction once maxsize is exceeded"""
+        from authentication import TokenPayload, VerifiedTokenCache
+
+        cache = VerifiedTokenCache(maxsize=2)
+        expires = datetime.now().timestamp() + 60
+        for key in ["a", "b", "c"]:
+            cache.put(key, expires, TokenPayload(sub=key, roles=[]))
+
+        assert len(cache) == 2
+        assert cache.get("a") is None
+        assert cache.get("c").sub == "c"
+
+    def test_invalid_tokens_are_not_cached(self, auth_handler):
+        """Test failed verification leaves the cache untouched"""
+        auth_handler.token_cache.clear()
+
+        with pytest.raises(AuthenticationException):
+            auth_handler.decode_token("not-a-token")
+
+        assert len(auth_handler.token_cache) == 0
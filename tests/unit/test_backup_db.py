@@ -0,0 +1,134 @@
+"""Unit tests for backup_db.py and restore_db.py"""
+
+import gzip
+import json
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+
+from backup_db import backup_database, incremental_query
+from restore_db import backup_chain, collection_layers, restore_database
+
+MATCHES = [{"_id": f"m{n}", "startDate": datetime(2026, 10, n + 1)} for n in range(3)]
+POSTS = [
+    {"_id": ObjectId(), "title": "Saisonstart", "updateDate": datetime(2026, 9, 1)},
+    {"_id": ObjectId(), "title": "Spielplan", "updateDate": datetime(2026, 9, 15)},
+]
+
+
+class FakeDatabase:
+    """Sync database whose collections return fixed documents from find()"""
+
+    def __init__(self, collections: dict[str, list[dict]]):
+        self.name = "bishl_test"
+        self.collections = {}
+        for name, docs in collections.items():
+            collection = MagicMock()
+            collection.name = name
+            collection.find.return_value.sort.return_value.batch_size.return_value = docs
+            self.collections[name] = collection
+
+    def list_collection_names(self) -> list[str]:
+        return [*self.collections, "system.views"]
+
+    def __getitem__(self, name: str):
+        return self.collections[name]
+
+
+class TestBackup:
+    """Test streaming and incremental backups"""
+
+    def test_writes_gzip_ndjson_and_metadata(self, tmp_path):
+        db = FakeDatabase({"matches": MATCHES, "posts": POSTS})
+
+        metadata = backup_database(db, tmp_path / "full", batch_size=2)
+
+        with gzip.open(tmp_path / "full" / "matches.ndjson.gz", "rt") as f:
+            lines = [json.loads(line) for line in f]
+        assert [line["_id"] for line in lines] == ["m0", "m1", "m2"]
+        assert lines[0]["startDate"] == {"$date": {"$numberLong": "1790812800000"}}
+        matches = metadata["collections"]["matches"]
+        assert (matches["mode"], matches["count"], matches["max_id"]) == ("full", 3, "m2")
+        assert metadata["collections"]["posts"]["max_updated"] == {
+            "$date": {"$numberLong": "1789430400000"}
+        }
+        assert sorted(metadata["collections"]) == ["matches", "posts"]
+
+    def test_incremental_backup_queries_changes_of_timestamped_collections(self, tmp_path):
+        assignments = [{"_id": ObjectId(), "status": "ASSIGNED"}]
+        db = FakeDatabase({"matches": MATCHES, "posts": POSTS, "assignments": assignments})
+        backup_database(db, tmp_path / "full")
+
+        metadata = backup_database(db, tmp_path / "incr", since=tmp_path / "full")
+
+        assert metadata["base"] == str(tmp_path / "full")
+        assert metadata["collections"]["matches"]["mode"] == "full"
+        assert metadata["collections"]["assignments"]["mode"] == "full"
+        assert db["assignments"].find.call_args.args[0] == {}
+        assert metadata["collections"]["posts"]["mode"] == "incremental"
+        assert db["posts"].find.call_args.args[0] == {
+            "$or": [
+                {"_id": {"$gt": POSTS[1]["_id"]}},
+                {"updateDate": {"$gt": datetime(2026, 9, 15)}},
+            ]
+        }
+
+    def test_incremental_query_without_history_is_full(self):
+        assert incremental_query(None, "updateDate") == {}
+        assert incremental_query({"max_id": "m2"}, None) == {}
+
+
+class TestRestore:
+    """Test restoring a chain of backups"""
+
+    def _chain(self, tmp_path):
+        db = FakeDatabase({"matches": MATCHES, "posts": POSTS})
+        backup_database(db, tmp_path / "full")
+        backup_database(db, tmp_path / "incr", since=tmp_path / "full")
+        return tmp_path / "incr"
+
+    def test_layers_start_at_the_newest_full_dump(self, tmp_path):
+        chain = backup_chain(self._chain(tmp_path))
+
+        assert [path.name for path, _ in chain] == ["full", "incr"]
+        assert [path.parent.name for path, _ in collection_layers(chain, "posts")] == [
+            "full",
+            "incr",
+        ]
+        assert [path.parent.name for path, _ in collection_layers(chain, "matches")] == ["incr"]
+
+    def test_restore_replaces_full_dumps_and_upserts_increments(self, tmp_path):
+        target = FakeDatabase({"matches": [], "posts": []})
+
+        restored = restore_database(target, self._chain(tmp_path), batch_size=2)
+
+        assert restored == {"matches": 3, "posts": 4}
+        matches = target["matches"]
+        matches.delete_many.assert_called_once_with({})
+        assert [len(call.args[0]) for call in matches.insert_many.call_args_list] == [2, 1]
+        assert matches.insert_many.call_args_list[0].args[0][0]["startDate"] == datetime(
+            2026, 10, 1
+        )
+        upserts = target["posts"].bulk_write.call_args_list[0].args[0]
+        assert upserts[0]._filter == {"_id": POSTS[0]["_id"]}
+
+    def test_corrupt_file_aborts_before_writing(self, tmp_path):
+        backup_dir = self._chain(tmp_path)
+        with gzip.open(backup_dir / "matches.ndjson.gz", "at") as f:
+            f.write('{"_id": "extra"}\n')
+        target = FakeDatabase({"matches": [], "posts": []})
+
+        with pytest.raises(ValueError, match="matches.ndjson.gz"):
+            restore_database(target, backup_dir)
+        target["matches"].delete_many.assert_not_called()
+
+    def test_legacy_json_backup_is_refused(self, tmp_path):
+        (tmp_path / "_metadata.json").write_text(json.dumps({"collections": ["posts"]}))
+        (tmp_path / "posts.json").write_text(json.dumps([{"_id": str(POSTS[0]["_id"])}]))
+        target = FakeDatabase({"posts": []})
+
+        with pytest.raises(ValueError, match="legacy JSON backup"):
+            restore_database(target, tmp_path)
+        target["posts"].delete_many.assert_not_called()
@@ -0,0 +1,95 @@
+"""Unit tests for the chunked CSV ingest engine"""
+
+import json
+from unittest.mock import MagicMock
+
+from services.csv_ingest import BulkWriter, plan_update, read_csv_chunks
+
+CLUB = json.dumps({"clubId": "c1", "name": "Club"})
+
+
+def _write(tmp_path, lines: list[str]) -> str:
+    path = tmp_path / "data.csv"
+    path.write_text("\n".join(["firstName;Vorname;club", *lines]), encoding="utf-8")
+    return str(path)
+
+
+class TestReadCsvChunks:
+    """Test column-wise chunks and their validation"""
+
+    def test_chunks_keep_file_row_numbers(self, tmp_path):
+        csv_path = _write(tmp_path, [f"P{n};;" for n in range(5)])
+
+        chunks = list(read_csv_chunks(csv_path, chunk_size=2))
+
+        assert [chunk.numbers for chunk in chunks] == [[2, 3], [4, 5], [6]]
+        assert chunks[1].text("firstName") == ["P2", "P3"]
+
+    def test_text_falls_back_to_alias_columns(self, tmp_path):
+        csv_path = _write(tmp_path, ["Anna;;", ";Berta;", " ; ;"])
+
+        [chunk] = read_csv_chunks(csv_path, chunk_size=10)
+        names = chunk.text("firstName", "Vorname")
+        chunk.require(names, "Missing name")
+
+        assert names == ["Anna", "Berta", ""]
+        assert chunk.errors == {2: "Missing name"}
+        assert list(chunk.valid()) == [0, 1]
+
+    def test_json_column_is_parsed_once_per_value(self, tmp_path):
+        club = CLUB.replace('"', '""')
+        csv_path = _write(tmp_path, [f'A;;"{club}"', f'B;;"{club}"', "C;;{broken"])
+        cache: dict = {}
+
+        [chunk] = read_csv_chunks(csv_path, chunk_size=10)
+        clubs = chunk.json("club", cache)
+
+        assert clubs[0] is clubs[1]
+        assert clubs[2] is None
+        assert chunk.errors[2].startswith("Invalid JSON in club")
+        assert len(cache) == 1
+
+
+class TestBulkWriter:
+    """Test batching, change detection and dry runs"""
+
+    def test_sends_batches_and_flushes_the_rest(self):
+        db = MagicMock()
+        writer = BulkWriter(db, batch_size=2)
+
+        for n in range(5):
+            writer.update("users", {"_id": n}, {"active": True})
+        writer.flush()
+
+        assert [len(call.args[0]) for call in db["users"].bulk_write.call_args_list] == [2, 2, 1]
+        assert writer.batches == 3
+
+    def test_plan_update_only_writes_changed_fields(self):
+        db = MagicMock()
+        writer = BulkWriter(db, batch_size=10)
+        doc = {"_id": 1, "email": "a@x.de", "referee": {"level": "S1", "active": False}}
+
+        change = plan_update(
+            writer,
+            "users",
+            doc,
+            {"email": "a@x.de", "referee.level": "S2", "referee.active": False},
+        )
+        unchanged = plan_update(writer, "users", doc, {"referee.level": "S2"})
+        writer.flush()
+
+        assert change == "referee.level: 'S1' → 'S2'"
+        assert unchanged == ""
+        [operation] = db["users"].bulk_write.call_args.args[0]
+        assert operation._doc == {"$set": {"referee.level": "S2"}}
+        assert doc["referee"]["level"] == "S2"
+
+    def test_dry_run_counts_but_writes_nothing(self):
+        db = MagicMock()
+        writer = BulkWriter(db, batch_size=1, dry_run=True)
+
+        writer.update("users", {"_id": 1}, {"active": True})
+        writer.flush()
+
+        assert writer.queued == 1
+        db["users"].bulk_write.assert_not_called()
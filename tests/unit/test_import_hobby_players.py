@@ -12,7 +12,14 @@ PLAYER_ID = ObjectId()
 CSV_HEADER = "Saison;clubAlias;teamAlias;updateMode;firstName;lastName;birthdate"
 
 
-def _make_service():
+def _projected(docs, projection=None):
+    """find() result of docs, reduced to the projected fields like MongoDB does"""
+    if not projection:
+        return list(docs)
+    return [{k: v for k, v in doc.items() if k == "_id" or k in projection} for doc in docs]
+
+
+def _make_service(players=(), clubs=()):
     """Return a minimal ImportService with mocked db / session / token."""
     from services.import_service import ImportService
 
@@ -23,10 +30,37 @@ def _make_service():
     svc.headers = {"Authorization": "Bearer fake-token"}
     svc.base_url = "http://localhost:8000"
 
+    collections = {
+        "players": MagicMock(
+            find=MagicMock(
+                side_effect=lambda query, projection=None: _projected(players, projection)
+            )
+        ),
+        "clubs": MagicMock(find=MagicMock(return_value=list(clubs))),
+    }
     svc.db = MagicMock()
+    svc.db.__getitem__.side_effect = collections.__getitem__
     svc.session = MagicMock()
+    team_resp = MagicMock(status_code=200)
+    team_resp.json.return_value = _make_team_response()
+    svc.session.get.return_value = team_resp
+
+    return svc, collections["players"]
 
-    return svc
+
+def _write(tmp_path, rows: list[str]) -> str:
+    csv_file = tmp_path / "hobby.csv"
+    csv_file.write_text(_csv(rows), encoding="utf-8")
+    return str(csv_file)
+
+
+def _bulk_updates(players_col) -> list[tuple[dict, dict]]:
+    """(filter, $set) of every operation sent with bulk_write"""
+    return [
+        (op._filter, op._doc["$set"])
+        for call in players_col.bulk_write.call_args_list
+        for op in call.args[0]
+    ]
 
 
 def _make_club_doc():
@@ -120,109 +154,107 @@ def _assigned_clubs_with_team():
 
 class TestHobbyPlayersAdd:
     def test_add_creates_new_player_and_assigns_team(self, tmp_path):
-        svc = _make_service()
-
-        csv_content = _csv(["2026;berlin-buffalos;1-hobby;ADD;John;Doe;10.09.1988"])
-        csv_file = tmp_path / "hobby.csv"
-        csv_file.write_text(csv_content, encoding="utf-8")
-
-        players_col = MagicMock()
-        players_col.update_one.return_value = MagicMock(matched_count=1, modified_count=1)
-        svc.get_collection = MagicMock(return_value=players_col)
-
-        svc.db.clubs = MagicMock()
-        svc.db.clubs.find_one.return_value = _make_club_doc()
+        svc, players_col = _make_service(clubs=[_make_club_doc()])
+        csv_path = _write(tmp_path, ["2026;berlin-buffalos;1-hobby;ADD;John;Doe;10.09.1988"])
 
         created_id = str(ObjectId())
-        create_resp = MagicMock()
-        create_resp.status_code = 201
+        create_resp = MagicMock(status_code=201)
         create_resp.json.return_value = {"data": {"_id": created_id}}
-
-        team_resp = MagicMock()
-        team_resp.status_code = 200
-        team_resp.json.return_value = _make_team_response()
-
         svc.session.post.return_value = create_resp
-        svc.session.get.return_value = team_resp
-
-        player_doc_after_create = _make_player_doc()
-        player_doc_after_create["_id"] = ObjectId(created_id)
-
-        players_col.find_one.side_effect = [None, player_doc_after_create]
 
-        success, message = svc.import_hobby_players(str(csv_file), import_all=True)
+        success, message = svc.import_hobby_players(csv_path, import_all=True)
 
         assert success is True
-        assert "created" in message
-        players_col.update_one.assert_called_once()
+        assert "1 created" in message
+        [(query, fields)] = _bulk_updates(players_col)
+        assert query == {"_id": created_id}
+        assert fields["assignedTeams"][0]["teams"][0]["teamId"] == TEAM_ID
 
     def test_add_existing_player_gets_team_assigned(self, tmp_path):
-        svc = _make_service()
+        svc, players_col = _make_service(players=[_make_player_doc()], clubs=[_make_club_doc()])
+        csv_path = _write(tmp_path, ["2026;berlin-buffalos;1-hobby;ADD;John;Doe;10.09.1988"])
 
-        csv_content = _csv(["2026;berlin-buffalos;1-hobby;ADD;John;Doe;10.09.1988"])
-        csv_file = tmp_path / "hobby.csv"
-        csv_file.write_text(csv_content, encoding="utf-8")
+        success, message = svc.import_hobby_players(csv_path, import_all=True)
 
-        player_doc = _make_player_doc()
-        players_col = MagicMock()
-        players_col.find_one.return_value = player_doc
-        players_col.update_one.return_value = MagicMock(matched_count=1, modified_count=1)
-        svc.get_collection = MagicMock(return_value=players_col)
-
-        svc.db.clubs = MagicMock()
-        svc.db.clubs.find_one.return_value = _make_club_doc()
+        assert success is True
+        assert "1 team assignment(s) added" in message
+        [(query, fields)] = _bulk_updates(players_col)
+        assert query == {"_id": PLAYER_ID}
+        assert fields["assignedTeams"][0]["clubAlias"] == "berlin-buffalos"
+        svc.session.post.assert_not_called()
 
-        team_resp = MagicMock()
-        team_resp.status_code = 200
-        team_resp.json.return_value = _make_team_response()
-        svc.session.get.return_value = team_resp
+    def test_add_existing_player_only_changes_assigned_teams(self, tmp_path):
+        """managedByISHD is already False, so it is not part of the change"""
+        svc, players_col = _make_service(players=[_make_player_doc()], clubs=[_make_club_doc()])
+        csv_path = _write(tmp_path, ["2026;berlin-buffalos;1-hobby;ADD;John;Doe;10.09.1988"])
+        report = tmp_path / "report.csv"
 
-        success, message = svc.import_hobby_players(str(csv_file), import_all=True)
+        svc.import_hobby_players(csv_path, import_all=True, report_path=str(report))
 
-        assert success is True
-        players_col.update_one.assert_called_once()
+        [(_, fields)] = _bulk_updates(players_col)
+        assert list(fields) == ["assignedTeams"]
+        assert "managedByISHD" not in report.read_text(encoding="utf-8")
 
     def test_add_skips_silently_when_already_assigned(self, tmp_path):
         """ADD is idempotent: if the team is already in assignedTeams, skip without error."""
-        svc = _make_service()
-
-        csv_content = _csv(["2026;berlin-buffalos;1-hobby;ADD;John;Doe;10.09.1988"])
-        csv_file = tmp_path / "hobby.csv"
-        csv_file.write_text(csv_content, encoding="utf-8")
+        player = _make_player_doc(assigned_teams=_assigned_clubs_with_team())
+        svc, players_col = _make_service(players=[player], clubs=[_make_club_doc()])
+        csv_path = _write(tmp_path, ["2026;berlin-buffalos;1-hobby;ADD;John;Doe;10.09.1988"])
 
-        player_doc = _make_player_doc(assigned_teams=_assigned_clubs_with_team())
-        players_col = MagicMock()
-        players_col.find_one.return_value = player_doc
-        svc.get_collection = MagicMock(return_value=players_col)
-
-        svc.db.clubs = MagicMock()
-        svc.db.clubs.find_one.return_value = _make_club_doc()
-
-        team_resp = MagicMock()
-        team_resp.status_code = 200
-        team_resp.json.return_value = _make_team_response()
-        svc.session.get.return_value = team_resp
-
-        success, message = svc.import_hobby_players(str(csv_file), import_all=True)
+        success, message = svc.import_hobby_players(csv_path, import_all=True)
 
         assert success is True
-        assert "skipped" in message
-        players_col.update_one.assert_not_called()
+        assert "1 skipped" in message
+        players_col.bulk_write.assert_not_called()
 
     def test_add_missing_birthdate_records_error(self, tmp_path):
-        svc = _make_service()
+        svc, players_col = _make_service()
+        csv_path = _write(tmp_path, ["2026;berlin-buffalos;1-hobby;ADD;John;Doe;"])
 
-        csv_content = _csv(["2026;berlin-buffalos;1-hobby;ADD;John;Doe;"])
-        csv_file = tmp_path / "hobby.csv"
-        csv_file.write_text(csv_content, encoding="utf-8")
+        success, message = svc.import_hobby_players(csv_path, import_all=True)
 
-        players_col = MagicMock()
-        svc.get_collection = MagicMock(return_value=players_col)
+        assert success is True
+        assert message.endswith("1 errors")
+        players_col.bulk_write.assert_not_called()
+
+    def test_rows_share_lookups_and_batches(self, tmp_path):
+        """Team lookups are cached and several rows for one player accumulate"""
+        svc, players_col = _make_service(players=[_make_player_doc()], clubs=[_make_club_doc()])
+        csv_path = _write(
+            tmp_path,
+            [
+                "2026;berlin-buffalos;1-hobby;ADD;John;Doe;10.09.1988",
+                "2026;berlin-buffalos;1-hobby;ADD;John;Doe;10.09.1988",
+                "2026;berlin-buffalos;1-hobby;REMOVE;John;Doe;",
+            ],
+        )
+
+        success, message = svc.import_hobby_players(csv_path, import_all=True, batch_size=1)
 
-        success, message = svc.import_hobby_players(str(csv_file), import_all=True)
+        assert success is True
+        assert "1 team assignment(s) added, 1 removed, 1 skipped" in message
+        assert svc.session.get.call_count == 1
+        assert [fields["assignedTeams"] != [] for _, fields in _bulk_updates(players_col)] == [
+            True,
+            False,
+        ]
+        assert players_col.bulk_write.call_count == 2
+
+    def test_dry_run_reports_without_writing(self, tmp_path):
+        svc, players_col = _make_service(clubs=[_make_club_doc()])
+        csv_path = _write(tmp_path, ["2026;berlin-buffalos;1-hobby;ADD;John;Doe;10.09.1988"])
+        report = tmp_path / "report.csv"
+
+        success, message = svc.import_hobby_players(
+            csv_path, import_all=True, dry_run=True, report_path=str(report)
+        )
 
         assert success is True
-        players_col.update_one.assert_not_called()
+        assert message.startswith("Dry run, nothing written")
+        assert "1 created" in message
+        svc.session.post.assert_not_called()
+        players_col.bulk_write.assert_not_called()
+        assert "Would create John Doe" in report.read_text(encoding="utf-8")
 
 
 # ---------------------------------------------------------------------------
@@ -232,38 +264,22 @@ class TestHobbyPlayersAdd:
 
 class TestHobbyPlayersRemove:
     def test_remove_strips_team_from_player(self, tmp_path):
-        svc = _make_service()
-
-        csv_content = _csv(["2026;berlin-buffalos;1-hobby;REMOVE;John;Doe;10.09.1988"])
-        csv_file = tmp_path / "hobby.csv"
-        csv_file.write_text(csv_content, encoding="utf-8")
+        player = _make_player_doc(assigned_teams=_assigned_clubs_with_team())
+        svc, players_col = _make_service(players=[player])
+        csv_path = _write(tmp_path, ["2026;berlin-buffalos;1-hobby;REMOVE;John;Doe;10.09.1988"])
 
-        player_doc = _make_player_doc(assigned_teams=_assigned_clubs_with_team())
-        players_col = MagicMock()
-        players_col.find.return_value = [player_doc]
-        players_col.update_one.return_value = MagicMock(matched_count=1, modified_count=1)
-        svc.get_collection = MagicMock(return_value=players_col)
-
-        success, message = svc.import_hobby_players(str(csv_file), import_all=True)
+        success, message = svc.import_hobby_players(csv_path, import_all=True)
 
         assert success is True
-        assert "removed" in message
-        players_col.update_one.assert_called_once()
-        updated_assigned = players_col.update_one.call_args[0][1]["$set"]["assignedTeams"]
-        assert updated_assigned == []
+        assert "1 removed" in message
+        assert _bulk_updates(players_col) == [({"_id": PLAYER_ID}, {"assignedTeams": []})]
 
     def test_remove_player_not_found_records_error(self, tmp_path):
-        svc = _make_service()
-
-        csv_content = _csv(["2026;berlin-buffalos;1-hobby;REMOVE;Jane;Smith;"])
-        csv_file = tmp_path / "hobby.csv"
-        csv_file.write_text(csv_content, encoding="utf-8")
-
-        players_col = MagicMock()
-        players_col.find.return_value = []
-        svc.get_collection = MagicMock(return_value=players_col)
+        svc, players_col = _make_service()
+        csv_path = _write(tmp_path, ["2026;berlin-buffalos;1-hobby;REMOVE;Jane;Smith;"])
 
-        success, message = svc.import_hobby_players(str(csv_file), import_all=True)
+        success, message = svc.import_hobby_players(csv_path, import_all=True)
 
         assert success is True
-        players_col.update_one.assert_not_called()
+        assert message.endswith("1 errors")
+        players_col.bulk_write.assert_not_called()
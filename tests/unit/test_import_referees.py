@@ -0,0 +1,179 @@
+"""Unit tests for ImportService.import_referees"""
+
+import csv
+import json
+from unittest.mock import MagicMock, patch
+
+from bson import ObjectId
+
+CLUB_ID = str(ObjectId())
+CSV_HEADER = ["firstName", "lastName", "email", "club", "level", "passNo", "ishdLevel"]
+CLUB = {"clubId": CLUB_ID, "clubName": "Berlin Buffalos", "clubAlias": "berlin-buffalos"}
+
+
+def _referee(first: str, last: str, email: str, level: str = "S1", active: bool = True) -> dict:
+    return {
+        "_id": ObjectId(),
+        "firstName": first,
+        "lastName": last,
+        "email": email,
+        "roles": ["REFEREE"],
+        "referee": {
+            "club": CLUB,
+            "level": level,
+            "passNo": None,
+            "ishdLevel": None,
+            "active": active,
+        },
+    }
+
+
+def _row(first: str, last: str, email: str, level: str = "S1") -> dict:
+    return {
+        "firstName": first,
+        "lastName": last,
+        "email": email,
+        "club": json.dumps(CLUB),
+        "level": level,
+        "passNo": "",
+        "ishdLevel": "",
+    }
+
+
+def _write_csv(tmp_path, rows) -> str:
+    path = tmp_path / "referees.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_HEADER, delimiter=";")
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+def _make_service(users):
+    """ImportService whose users collection answers every find with users"""
+    from services.import_service import ImportService
+
+    with patch.object(ImportService, "__init__", lambda self, **kw: None):
+        svc = ImportService.__new__(ImportService)
+
+    svc.token = "fake-token"
+    svc.headers = {"Authorization": "Bearer fake-token"}
+    svc.base_url = "http://localhost:8000"
+    svc.session = MagicMock()
+
+    def register(url, json):
+        # /users/register inserts the user, so the merge deactivation sees it
+        users.append({"_id": ObjectId(), **json})
+        return MagicMock(status_code=201)
+
+    svc.session.post.side_effect = register
+
+    def find_users(query, projection=None):
+        if "$or" in query:
+            return users
+        # merge: the active referees
+        return [u for u in users if isinstance(u.get("referee"), dict) and u["referee"]["active"]]
+
+    collections = {
+        "users": MagicMock(find=MagicMock(side_effect=find_users)),
+        "clubs": MagicMock(find=MagicMock(return_value=[{"_id": CLUB_ID, "logoUrl": None}])),
+    }
+    svc.db = MagicMock()
+    svc.db.__getitem__.side_effect = collections.__getitem__
+    return svc, collections["users"]
+
+
+def _bulk_updates(users_col) -> list[tuple[dict, dict]]:
+    return [
+        (op._filter, op._doc["$set"])
+        for call in users_col.bulk_write.call_args_list
+        for op in call.args[0]
+    ]
+
+
+class TestImportReferees:
+    """Test the chunked referee import"""
+
+    def test_merge_updates_upgrades_registers_and_deactivates(self, tmp_path):
+        kept = _referee("Anna", "Alt", "anna@x.de")
+        promoted = _referee("Ben", "Bunt", "ben@x.de")
+        retired = _referee("Carl", "Kalt", "carl@x.de")
+        player = {"_id": ObjectId(), "firstName": "Dora", "lastName": "D", "email": "dora@x.de"}
+        users = [kept, promoted, retired, player]
+        svc, users_col = _make_service(users)
+        csv_path = _write_csv(
+            tmp_path,
+            [
+                _row("Anna", "Alt", "anna@x.de"),
+                _row("Ben", "Bunt", "ben.new@x.de", level="S2"),
+                _row("Dora", "Neu", "dora@x.de"),
+                _row("Emil", "Erst", "emil@x.de"),
+                _row("Fritz", "Fehl", ""),
+            ],
+        )
+
+        with patch("mail_service.send_email") as send_email:
+            success, message = svc.import_referees(csv_path, import_all=True)
+
+        assert success
+        assert message == (
+            "Referees [merge]: 1 created, 2 updated (1 email change(s)), 1 unchanged, "
+            "0 skipped, 1 deactivated, 1 errors"
+        )
+        updates = {query["_id"]: fields for query, fields in _bulk_updates(users_col)}
+        assert updates[promoted["_id"]] == {"referee.level": "S2", "email": "ben.new@x.de"}
+        assert updates[player["_id"]]["roles"] == ["REFEREE"]
+        assert updates[player["_id"]]["referee"]["active"] is True
+        assert updates[retired["_id"]] == {"referee.active": False}
+        assert kept["_id"] not in updates
+        svc.session.post.assert_called_once()
+        # The referee registered by this run is active and stays so
+        emil = users[-1]
+        assert (emil["email"], emil["referee"]["active"]) == ("emil@x.de", True)
+        assert emil["_id"] not in updates
+        assert users_col.bulk_write.call_count == 1
+        send_email.assert_not_called()
+
+    def test_update_strategy_skips_unknown_referees(self, tmp_path):
+        svc, users_col = _make_service([])
+        csv_path = _write_csv(tmp_path, [_row("Emil", "Erst", "emil@x.de")])
+
+        success, message = svc.import_referees(csv_path, import_all=True, strategy="update")
+
+        assert success
+        assert "1 skipped, 0 deactivated" in message
+        svc.session.post.assert_not_called()
+        users_col.bulk_write.assert_not_called()
+
+    def test_dry_run_reports_changes_without_writing(self, tmp_path):
+        referee = _referee("Ben", "Bunt", "ben@x.de")
+        svc, users_col = _make_service([referee])
+        csv_path = _write_csv(
+            tmp_path,
+            [_row("Ben", "Bunt", "ben@x.de", level="S2"), _row("Emil", "Erst", "emil@x.de")],
+        )
+        report = tmp_path / "report.csv"
+
+        success, message = svc.import_referees(
+            csv_path, import_all=True, dry_run=True, report_path=str(report)
+        )
+
+        assert success
+        assert message.startswith("Dry run, nothing written — Referees [merge]: 1 created")
+        with open(report, encoding="utf-8") as f:
+            lines = [(line["status"], line["message"]) for line in csv.DictReader(f, delimiter=";")]
+        assert lines == [
+            ("updated", "Ben Bunt: referee.level: 'S1' → 'S2'"),
+            ("created", "Would register emil@x.de"),
+        ]
+        users_col.bulk_write.assert_not_called()
+        users_col.replace_one.assert_not_called()
+        svc.session.post.assert_not_called()
+
+    def test_invalid_strategy(self):
+        svc, _ = _make_service([])
+
+        success, message = svc.import_referees("missing.csv", strategy="replace")
+
+        assert not success
+        assert message.startswith("Invalid strategy 'replace'")
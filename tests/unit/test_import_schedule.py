@@ -0,0 +1,215 @@
+"""Unit tests for ImportService.import_schedule"""
+
+import csv
+import json
+from datetime import datetime
+from functools import partial
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from bson import ObjectId
+
+HOME_CLUB_ID = str(ObjectId())
+AWAY_CLUB_ID = str(ObjectId())
+ROUND_ID = str(ObjectId())
+MATCHDAY_ID = str(ObjectId())
+
+CSV_HEADER = [
+    "tournament",
+    "season",
+    "round",
+    "matchday",
+    "venue",
+    "published",
+    "startDate",
+    "homeClubAlias",
+    "homeTeamAlias",
+    "awayClubAlias",
+    "awayTeamAlias",
+    "newMatchday",
+]
+
+
+def _team(alias: str) -> dict:
+    return {
+        "_id": str(ObjectId()),
+        "alias": alias,
+        "name": "1. Herren",
+        "fullName": f"{alias} 1. Herren",
+        "shortName": alias,
+        "tinyName": alias[:3].upper(),
+    }
+
+
+CLUBS = [
+    {"_id": HOME_CLUB_ID, "alias": "home-club", "name": "Home", "teams": [_team("1-herren")]},
+    {"_id": AWAY_CLUB_ID, "alias": "away-club", "name": "Away", "teams": [_team("1-herren")]},
+]
+
+TOURNAMENT = {
+    "_id": str(ObjectId()),
+    "alias": "regionalliga",
+    "seasons": [
+        {
+            "alias": "2026",
+            "rounds": [
+                {
+                    "_id": ROUND_ID,
+                    "alias": "hauptrunde",
+                    "matchdays": [{"_id": MATCHDAY_ID, "alias": "1"}],
+                }
+            ],
+        }
+    ],
+}
+
+
+def _row(matchday: str = "1", start: str = "2026-10-03 16:00:00+0200", away: str = "away-club"):
+    return {
+        "tournament": json.dumps({"name": "Regionalliga", "alias": "regionalliga"}),
+        "season": json.dumps({"name": "2026", "alias": "2026"}),
+        "round": json.dumps({"name": "Hauptrunde", "alias": "hauptrunde"}),
+        "matchday": json.dumps({"name": f"{matchday}. Spieltag", "alias": matchday}),
+        "venue": json.dumps({"name": "Halle", "alias": "halle"}),
+        "published": "true",
+        "startDate": start,
+        "homeClubAlias": "home-club",
+        "homeTeamAlias": "1-herren",
+        "awayClubAlias": away,
+        "awayTeamAlias": "1-herren",
+        "newMatchday": json.dumps(
+            {"name": f"{matchday}. Spieltag", "alias": matchday, "type": {"key": "REGULAR"}}
+        ),
+    }
+
+
+def _write_csv(path, rows) -> str:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_HEADER, delimiter=";")
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+def _make_service(existing_matches=()):
+    """ImportService with a mocked db holding one tournament and two clubs"""
+    from services.import_service import ImportService
+
+    with patch.object(ImportService, "__init__", lambda self, **kw: None):
+        svc = ImportService.__new__(ImportService)
+
+    svc.token = "fake-token"
+    svc.headers = {"Authorization": "Bearer fake-token"}
+    svc.base_url = "http://localhost:8000"
+    svc.session = MagicMock(verify=False)
+
+    collections = {
+        "clubs": CLUBS,
+        "tournaments": [TOURNAMENT],
+        "matches": list(existing_matches),
+    }
+    svc.db = MagicMock()
+    svc.db.__getitem__.side_effect = lambda name: MagicMock(
+        find=MagicMock(return_value=collections[name])
+    )
+    return svc
+
+
+class FakeApi:
+    """Mock transport recording API calls"""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append((request.method, request.url.path))
+        if request.method == "POST":
+            return httpx.Response(201, json={"data": {"_id": str(ObjectId())}})
+        return httpx.Response(200, json={})
+
+
+@pytest.fixture
+def api():
+    fake = FakeApi()
+    client = partial(httpx.AsyncClient, transport=httpx.MockTransport(fake))
+    with patch("httpx.AsyncClient", client):
+        yield fake
+
+
+class TestImportSchedule:
+    """Test the preloaded, concurrent schedule import"""
+
+    def test_creates_new_matches_and_reports_rows(self, tmp_path, api):
+        existing = {
+            "startDate": datetime(2026, 10, 3, 14, 0),  # stored as naive UTC
+            "home": {"clubId": HOME_CLUB_ID, "teamId": CLUBS[0]["teams"][0]["_id"]},
+            "away": {"clubId": AWAY_CLUB_ID, "teamId": CLUBS[1]["teams"][0]["_id"]},
+        }
+        svc = _make_service(existing_matches=[existing])
+        csv_path = _write_csv(
+            tmp_path / "schedule.csv",
+            [
+                _row(),  # exists
+                _row(start="2026-10-10 16:00:00+0200"),
+                _row(matchday="2", start="2026-10-17 16:00:00+0200"),
+                _row(matchday="2", start="2026-10-18 16:00:00+0200"),
+                _row(away="unknown-club"),
+            ],
+        )
+        report = tmp_path / "report.csv"
+
+        success, message = svc.import_schedule(csv_path, import_all=True, report_path=str(report))
+
+        assert success
+        assert message == "Created 3 matches, skipped 1, 1 rows with errors"
+        posts = [path for method, path in api.calls if method == "POST"]
+        assert posts.count("/matches") == 3
+        # The missing matchday is created once, before its matches
+        assert posts[0] == "/tournaments/regionalliga/seasons/2026/rounds/hauptrunde/matchdays"
+        assert posts.count(posts[0]) == 1
+        assert ("PATCH", f"/tournaments/regionalliga/seasons/2026/rounds/{ROUND_ID}") in api.calls
+        with open(report, encoding="utf-8") as f:
+            statuses = [(line["row"], line["status"]) for line in csv.DictReader(f, delimiter=";")]
+        assert statuses == [
+            ("2", "skipped"),
+            ("3", "created"),
+            ("4", "created"),
+            ("5", "created"),
+            ("6", "error"),
+        ]
+
+    def test_without_import_all_creates_first_new_match_only(self, tmp_path, api):
+        svc = _make_service()
+        csv_path = _write_csv(
+            tmp_path / "schedule.csv", [_row(), _row(start="2026-10-10 16:00:00+0200")]
+        )
+
+        success, message = svc.import_schedule(csv_path)
+
+        assert success
+        assert message == "Created 1 matches, skipped 1, 0 rows with errors"
+        assert [c for c in api.calls if c == ("POST", "/matches")] == [("POST", "/matches")]
+
+    def test_invalid_rows_are_reported_not_raised(self, tmp_path, api):
+        svc = _make_service()
+        row = _row()
+        row["tournament"] = "{not json"
+        csv_path = _write_csv(tmp_path / "schedule.csv", [row])
+        report = tmp_path / "report.csv"
+
+        success, message = svc.import_schedule(csv_path, import_all=True, report_path=str(report))
+
+        assert success
+        assert message.endswith("1 rows with errors")
+        assert "Invalid JSON in tournament" in report.read_text(encoding="utf-8")
+        assert not [c for c in api.calls if c[0] == "POST"]
+
+    def test_requires_authentication(self):
+        svc = _make_service()
+        svc.token = None
+
+        assert svc.import_schedule("missing.csv") == (
+            False,
+            "Not authenticated. Call authenticate() first.",
+        )
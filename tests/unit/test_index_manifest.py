@@ -0,0 +1,121 @@
+"""Unit tests for the index manifest and the index advisor"""
+
+from types import SimpleNamespace
+
+import pytest
+from pymongo import ASCENDING, IndexModel
+
+from services.index_advisor import IndexAdvisor, collscan_stages, explainable_command
+from services.index_manifest import INDEX_MANIFEST, apply_index_changes, diff_indexes
+from tests.fixtures.memory_db import MemoryDatabase
+
+MANIFEST = {
+    "matches": [
+        IndexModel([("season.alias", ASCENDING), ("startDate", ASCENDING)], name="season_idx"),
+        IndexModel([("alias", ASCENDING)], name="alias_idx", unique=True),
+    ]
+}
+
+
+def _started(command_name: str, command: dict) -> SimpleNamespace:
+    return SimpleNamespace(command_name=command_name, command=command)
+
+
+class TestIndexDiff:
+    """Test comparing and applying the manifest"""
+
+    @pytest.mark.asyncio
+    async def test_diff_reports_create_rebuild_and_drop(self):
+        db = MemoryDatabase("bishl_test")
+        await db["matches"].create_index([("alias", ASCENDING)], name="alias_idx")
+        await db["matches"].create_index([("status", ASCENDING)], name="status_idx")
+
+        changes = await diff_indexes(db, MANIFEST)
+
+        assert [(c.action, c.name) for c in changes] == [
+            ("create", "season_idx"),
+            ("rebuild", "alias_idx"),
+            ("drop", "status_idx"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_apply_keeps_unlisted_indexes_unless_dropping(self):
+        db = MemoryDatabase("bishl_test")
+        await db["matches"].create_index([("status", ASCENDING)], name="status_idx")
+
+        await apply_index_changes(db, await diff_indexes(db, MANIFEST), manifest=MANIFEST)
+        assert [c.action for c in await diff_indexes(db, MANIFEST)] == ["drop"]
+
+        await apply_index_changes(
+            db, await diff_indexes(db, MANIFEST), drop=True, manifest=MANIFEST
+        )
+        assert await diff_indexes(db, MANIFEST) == []
+        assert (await db["matches"].index_information())["alias_idx"]["unique"] is True
+
+    def test_manifest_names_are_unique_per_collection(self):
+        for collection, models in INDEX_MANIFEST.items():
+            names = [model.document["name"] for model in models]
+            assert len(names) == len(set(names)), collection
+
+
+class TestIndexAdvisor:
+    """Test query sampling and COLLSCAN detection"""
+
+    def test_keeps_one_sample_per_shape(self):
+        advisor = IndexAdvisor()
+        for alias in ("a", "b"):
+            advisor.started(_started("find", {"find": "players", "filter": {"alias": alias}}))
+        advisor.started(_started("getMore", {"getMore": 1, "collection": "players"}))
+
+        assert [(s["count"], s["command"]["filter"]) for s in advisor.samples.values()] == [
+            (2, {"alias": "a"})
+        ]
+
+    def test_explainable_command_strips_driver_fields(self):
+        command = {
+            "update": "matches",
+            "updates": [{"q": {"_id": 1}}, {"q": {"_id": 2}}],
+            "lsid": {"id": "x"},
+            "txnNumber": 3,
+            "$db": "bishl",
+        }
+
+        assert explainable_command("update", command) == {
+            "update": "matches",
+            "updates": [{"q": {"_id": 1}}],
+        }
+
+    def test_collscan_stages_ignore_rejected_plans(self):
+        plan = {
+            "stage": "FETCH",
+            "inputStage": {"stage": "COLLSCAN", "filter": {"alias": {"$eq": "a"}}},
+            "rejectedPlans": [{"stage": "COLLSCAN"}],
+        }
+
+        assert collscan_stages(plan) == [plan["inputStage"]]
+
+    @pytest.mark.asyncio
+    async def test_explain_samples_reports_collscans(self, tmp_path):
+        advisor = IndexAdvisor()
+        advisor.started(_started("find", {"find": "players", "filter": {"alias": "a"}}))
+        advisor.started(_started("find", {"find": "matches", "filter": {"_id": "m"}}))
+        path = tmp_path / "queries.json"
+        advisor.save(path)
+        plans = {
+            "players": {"stage": "COLLSCAN", "filter": {"alias": {"$eq": "a"}}},
+            "matches": {"stage": "IDHACK"},
+        }
+
+        async def command(command):
+            return {"queryPlanner": {"winningPlan": plans[command["explain"]["find"]]}}
+
+        findings = await IndexAdvisor.load(path).explain_samples(SimpleNamespace(command=command))
+
+        assert findings == [
+            {
+                "shape": 'players.find {"alias": "?"}',
+                "collection": "players",
+                "count": 1,
+                "filter": {"alias": {"$eq": "a"}},
+            }
+        ]
@@ -0,0 +1,215 @@
+"""Unit tests for the change-stream invalidation bus"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from services.invalidation_bus import InvalidationBus, InvalidationEvent, keys_for_change
+
+
+class _FakeStream:
+    """Async context manager / iterator standing in for a motor change stream"""
+
+    def __init__(self, changes, then=None):
+        self._changes = list(changes)
+        self._then = then
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._changes:
+            return self._changes.pop(0)
+        if self._then is not None:
+            raise self._then
+        await asyncio.sleep(3600)
+
+    async def try_next(self):
+        return None
+
+
+def _change(doc_id, operation="update", document=None):
+    return {
+        "_id": {"_data": f"token-{doc_id}"},
+        "operationType": operation,
+        "documentKey": {"_id": doc_id},
+        "fullDocument": document,
+    }
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    collections = {}
+    db.__getitem__ = MagicMock(side_effect=lambda name: collections.setdefault(name, MagicMock()))
+    db.collections = collections
+    return db
+
+
+class TestKeysForChange:
+    """Test translation of change documents into cache keys"""
+
+    def test_match_maps_to_hierarchy(self):
+        document = {
+            "tournament": {"alias": "regio"},
+            "season": {"alias": "2025"},
+            "round": {"alias": "hr"},
+            "matchday": {"alias": "1"},
+        }
+
+        keys = keys_for_change("matches", _change("m1", document=document))
+
+        assert keys == {
+            "match:m1",
+            "tournament:regio",
+            "season:regio/2025",
+            "round:regio/2025/hr",
+            "matchday:regio/2025/hr/1",
+        }
+
+    def test_deleted_match_only_has_id(self):
+        assert keys_for_change("matches", _change("m1", "delete")) == {"match:m1"}
+
+    def test_entities_by_collection(self):
+        assert keys_for_change("posts", _change("p1")) == {"posts:p1"}
+        assert keys_for_change("clubs", _change("c1", document={"alias": "club-a"})) == {
+            "club:c1",
+            "club:club-a",
+        }
+        assert "tournament:regio" in keys_for_change(
+            "tournaments", _change("t1", document={"alias": "regio"})
+        )
+
+    def test_unknown_or_changed_alias_maps_to_wildcard(self):
+        renamed = _change("c1", document={"alias": "club-b"})
+        renamed["updateDescription"] = {"updatedFields": {"alias": "club-b"}}
+
+        assert keys_for_change("clubs", renamed) == {"club:c1", "clubs:*"}
+        assert keys_for_change("clubs", _change("c1", "delete")) == {"club:c1", "clubs:*"}
+        assert keys_for_change(
+            "tournaments", _change("t1", "replace", document={"alias": "regio"})
+        ) == {"tournament-id:t1", "tournaments:*"}
+
+    def test_drop_maps_to_wildcard(self):
+        assert keys_for_change("matches", {"operationType": "drop"}) == {"matches:*"}
+
+
+class TestPublish:
+    """Test subscriber fan-out"""
+
+    def test_failing_handler_does_not_block_others(self, mock_db):
+        bus = InvalidationBus(mock_db, ("matches",), mode="off")
+        received = []
+        bus.subscribe(MagicMock(side_effect=RuntimeError("boom")))
+        bus.subscribe(received.append)
+        event = InvalidationEvent("matches", "update", frozenset({"match:m1"}))
+
+        bus.publish(event)
+
+        assert received == [event]
+
+
+class TestChangeStreamMode:
+    """Test tailing change streams"""
+
+    @pytest.mark.asyncio
+    async def test_publishes_changes_and_keeps_resume_token(self, mock_db):
+        changes = [_change("m1"), _change("m2")]
+        mock_db["matches"].watch = MagicMock(side_effect=[_FakeStream([]), _FakeStream(changes)])
+        bus = InvalidationBus(mock_db, collections=("matches",), mode="auto")
+        received = []
+        bus.subscribe(received.append)
+
+        await bus.start()
+        await asyncio.sleep(0.01)
+        await bus.stop()
+
+        assert bus.mode == "change_stream"
+        assert [sorted(e.keys) for e in received] == [["match:m1"], ["match:m2"]]
+        assert bus._resume_tokens["matches"] == {"_data": "token-m2"}
+        watch_kwargs = mock_db["matches"].watch.call_args.kwargs
+        assert watch_kwargs["full_document"] is None
+
+    @pytest.mark.asyncio
+    async def test_full_document_is_looked_up_for_alias_keyed_collections(self, mock_db):
+        change = _change("c1", document={"alias": "buffalos"})
+        mock_db["clubs"].watch = MagicMock(side_effect=[_FakeStream([]), _FakeStream([change])])
+        bus = InvalidationBus(mock_db, collections=("clubs",), mode="auto")
+        received = []
+        bus.subscribe(received.append)
+
+        await bus.start()
+        await asyncio.sleep(0.01)
+        await bus.stop()
+
+        assert received[0].keys == {"club:c1", "club:buffalos"}
+        watch_kwargs = mock_db["clubs"].watch.call_args.kwargs
+        assert watch_kwargs["full_document"] == "updateLookup"
+
+    @pytest.mark.asyncio
+    async def test_interruption_publishes_resync_and_resumes(self, mock_db, monkeypatch):
+        monkeypatch.setattr("services.invalidation_bus.RECONNECT_DELAY_SECONDS", 0)
+        mock_db["matches"].watch = MagicMock(
+            side_effect=[
+                _FakeStream([_change("m1")], then=OperationFailure("stepdown", code=189)),
+                _FakeStream([_change("m2")]),
+            ]
+        )
+        bus = InvalidationBus(mock_db, collections=("matches",), mode="change_stream")
+        received = []
+        bus.subscribe(received.append)
+
+        await bus.start()
+        await asyncio.sleep(0.01)
+        await bus.stop()
+
+        assert [e.operation for e in received] == ["update", "resync", "update"]
+        assert received[1].keys == {"matches:*"}
+        second_call = mock_db["matches"].watch.call_args_list[1]
+        assert second_call.kwargs["resume_after"] == {"_data": "token-m1"}
+
+
+class TestPollingMode:
+    """Test dbHash polling, which is opt-in"""
+
+    @pytest.mark.asyncio
+    async def test_auto_does_not_poll_without_change_streams(self, mock_db):
+        mock_db["matches"].watch = MagicMock(
+            side_effect=OperationFailure("not a replica set", code=40573)
+        )
+        mock_db.command = AsyncMock()
+        bus = InvalidationBus(mock_db, collections=("matches",), mode="auto", poll_interval=3600)
+
+        await bus.start()
+        await bus.stop()
+
+        assert bus.mode is None
+        assert bus._tasks == []
+        mock_db.command.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_poll_publishes_changed_collections(self, mock_db):
+        mock_db.command = AsyncMock(
+            side_effect=[
+                {"collections": {"matches": "a", "clubs": "x"}},
+                {"collections": {"matches": "b", "clubs": "x"}},
+            ]
+        )
+        bus = InvalidationBus(mock_db, collections=("matches", "clubs"), mode="poll")
+        received = []
+        bus.subscribe(received.append)
+
+        await bus.start()
+        changed = await bus.poll_once()
+        await bus.stop()
+
+        assert changed == ["matches"]
+        assert received == [InvalidationEvent("matches", "poll", frozenset({"matches:*"}))]
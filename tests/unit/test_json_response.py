@@ -0,0 +1,68 @@
+"""Unit tests for the single-pass JSON response"""
+
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models.matches import MatchListBase
+from models.players import PlayerDB
+from models.responses import StandardResponse
+from routers.matches import convert_seconds_to_times
+from services.json_response import FastJSONResponse, dump_json
+from services.pagination import PaginationHelper
+from tests.fixtures.data_fixtures import create_test_match, create_test_player
+
+
+def _legacy_body(content) -> bytes:
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+class TestDumpJson:
+    """Test equivalence with the jsonable_encoder path"""
+
+    def test_match_page_is_byte_identical(self):
+        match = create_test_match(start_date=datetime(2025, 3, 1, 14, 30, 0, 250000))
+        results = [MatchListBase(**convert_seconds_to_times(match)) for _ in range(3)]
+        page = PaginationHelper.create_response(items=results, page=1, page_size=100, total_count=3)
+
+        assert dump_json(page) == _legacy_body(page)
+
+    def test_dumped_players_are_byte_identical(self):
+        player = PlayerDB(**create_test_player(firstName="Jürgen")).model_dump(by_alias=True)
+        response = StandardResponse(success=True, data=[player], message="ok")
+
+        body = dump_json(response)
+
+        assert body == _legacy_body(response)
+        assert "Jürgen".encode() in body
+        assert json.loads(body)["data"][0]["ageGroup"] == player["ageGroup"]
+
+    def test_raw_documents_with_object_ids(self):
+        oid = ObjectId()
+
+        body = dump_json({"_id": oid, "refs": [oid], "at": datetime(2025, 1, 2, 3, 4, 5)})
+
+        assert json.loads(body) == {
+            "_id": str(oid),
+            "refs": [str(oid)],
+            "at": "2025-01-02T03:04:05",
+        }
+
+    def test_nan_becomes_null(self):
+        assert dump_json({"x": float("nan")}) == b'{"x":null}'
+
+
+class TestFastJSONResponse:
+    """Test the response class"""
+
+    def test_renders_models_directly(self):
+        response = FastJSONResponse(
+            status_code=201, content=StandardResponse(success=True, data={"a": 1})
+        )
+
+        assert response.status_code == 201
+        assert response.headers["content-type"] == "application/json"
+        assert json.loads(response.body) == {"success": True, "data": {"a": 1}, "message": None}
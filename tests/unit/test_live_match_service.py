@@ -0,0 +1,217 @@
+"""Unit tests for the live match event hub and SSE stream"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from models.matches import EventPlayer, ScoresBase
+from services.live_match_service import (
+    LiveMatchHub,
+    build_snapshot,
+    compact_score,
+    stream_match_events,
+)
+from services.score_service import ScoreService
+
+
+def _parse(frame: str) -> dict:
+    fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return {"id": fields["id"], "event": fields["event"], "data": json.loads(fields["data"])}
+
+
+@pytest.fixture
+def hub():
+    return LiveMatchHub(buffer_size=3, queue_size=2)
+
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    matches = MagicMock()
+    db.__getitem__ = MagicMock(side_effect=lambda name: {"matches": matches}[name])
+    db.matches = matches
+    return db
+
+
+STORED_MATCH = {
+    "_id": "m1",
+    "matchStatus": {"key": "INPROGRESS", "value": "Live"},
+    "home": {
+        "stats": {"goalsFor": 1},
+        "scores": [
+            {
+                "_id": "s1",
+                "matchSeconds": 630,
+                "goalPlayer": {"playerId": "p1", "firstName": "John", "lastName": "Doe"},
+                "assistPlayer": None,
+            }
+        ],
+    },
+    "away": {"stats": {"goalsFor": 0}},
+}
+
+
+class TestLiveMatchHub:
+    """Test fan-out and resume buffer"""
+
+    @pytest.mark.asyncio
+    async def test_publish_fans_out_to_all_viewers(self, hub):
+        first = hub.subscribe("m1")
+        second = hub.subscribe("m1")
+        other = hub.subscribe("m2")
+
+        event = hub.publish("m1", "score", {"goals": {"home": 1, "away": 0}})
+
+        assert first.queue.get_nowait() is event
+        assert second.queue.get_nowait() is event
+        assert other.queue.empty()
+        assert hub.viewer_count("m1") == 2
+
+    def test_events_since_replays_missed_events(self, hub):
+        first = hub.publish("m1", "score", {})
+        hub.publish("m1", "penalty", {})
+        third = hub.publish("m1", "match", {})
+
+        assert [e.type for e in hub.events_since("m1", first.id)] == ["penalty", "match"]
+        assert hub.events_since("m1", third.id) == []
+
+    def test_events_since_requires_snapshot_when_not_replayable(self, hub):
+        first = hub.publish("m1", "score", {})
+        for _ in range(4):
+            hub.publish("m1", "score", {})
+
+        assert hub.events_since("m1", first.id) is None  # fell out of the buffer
+        assert hub.events_since("m1", "otherepoch-1") is None
+        assert hub.events_since("m1", None) is None
+
+    def test_slow_viewer_is_marked_lagged(self, hub):
+        viewer = hub.subscribe("m1")
+        for _ in range(3):
+            hub.publish("m1", "score", {})
+
+        assert viewer.lagged is True
+        viewer.drain()
+        assert viewer.queue.empty() and viewer.lagged is False
+
+
+class TestSnapshot:
+    """Test the compact snapshot"""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_uses_one_projected_read(self, mock_db):
+        mock_db.matches.find_one = AsyncMock(return_value=STORED_MATCH)
+
+        snapshot = await build_snapshot(mock_db, "m1")
+
+        mock_db.matches.find_one.assert_awaited_once()
+        assert "roster" not in json.dumps(mock_db.matches.find_one.call_args[0][1])
+        assert snapshot["goals"] == {"home": 1, "away": 0}
+        assert snapshot["home"]["scores"][0]["matchTime"] == "10:30"
+        assert snapshot["away"] == {"scores": [], "penalties": []}
+
+    def test_compact_score_partial_keeps_only_changed_fields(self):
+        assert compact_score({"matchTime": "11:00", "isPPG": True}, partial=True) == {
+            "matchTime": "11:00",
+            "isPPG": True,
+        }
+
+
+class TestStreamMatchEvents:
+    """Test the per-viewer SSE generator"""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_then_deltas(self, hub, mock_db):
+        mock_db.matches.find_one = AsyncMock(return_value=STORED_MATCH)
+        stream = stream_match_events(mock_db, "m1", hub=hub, keepalive_seconds=5)
+
+        snapshot = _parse(await anext(stream))
+        hub.publish("m1", "score", {"goals": {"home": 2, "away": 0}})
+        delta = _parse(await anext(stream))
+        await stream.aclose()
+
+        assert snapshot["event"] == "snapshot"
+        assert snapshot["data"]["goals"]["home"] == 1
+        assert delta["event"] == "score"
+        assert delta["data"]["goals"]["home"] == 2
+        assert hub.viewer_count("m1") == 0
+
+    @pytest.mark.asyncio
+    async def test_resume_replays_without_reading_db(self, hub, mock_db):
+        mock_db.matches.find_one = AsyncMock()
+        seen = hub.publish("m1", "score", {"n": 1})
+        hub.publish("m1", "penalty", {"n": 2})
+        stream = stream_match_events(mock_db, "m1", last_event_id=seen.id, hub=hub)
+
+        replayed = _parse(await anext(stream))
+        await stream.aclose()
+
+        assert replayed["event"] == "penalty"
+        mock_db.matches.find_one.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_keepalive_when_idle(self, hub, mock_db):
+        stream = stream_match_events(
+            mock_db, "m1", last_event_id=hub.current_id("m1"), hub=hub, keepalive_seconds=0.01
+        )
+
+        frame = await asyncio.wait_for(anext(stream), timeout=1)
+        await stream.aclose()
+
+        assert frame == ": keepalive\n\n"
+
+    @pytest.mark.asyncio
+    async def test_lagged_viewer_gets_fresh_snapshot(self, hub, mock_db):
+        mock_db.matches.find_one = AsyncMock(return_value=STORED_MATCH)
+        stream = stream_match_events(mock_db, "m1", hub=hub, keepalive_seconds=5)
+        await anext(stream)
+
+        for _ in range(3):
+            hub.publish("m1", "score", {})
+        frame = _parse(await anext(stream))
+        await stream.aclose()
+
+        assert frame["event"] == "snapshot"
+
+
+class TestServicePublishing:
+    """Test that committed writes are published"""
+
+    @pytest.mark.asyncio
+    async def test_create_score_publishes_delta(self, mock_db):
+        match = {
+            "_id": "m1",
+            "matchStatus": {"key": "INPROGRESS"},
+            "home": {"roster": [{"player": {"playerId": "p1"}}], "stats": {"goalsFor": 2}},
+            "away": {"stats": {"goalsFor": 1}},
+        }
+        mock_db.matches.find_one = AsyncMock(return_value=match)
+        mock_db.matches.update_one = AsyncMock(return_value=MagicMock(modified_count=1))
+        service = ScoreService(mock_db)
+        hub = LiveMatchHub()
+        viewer = hub.subscribe("m1")
+        score = ScoresBase(
+            matchTime="10:30",
+            goalPlayer=EventPlayer(playerId="p1", firstName="John", lastName="Doe"),
+        )
+
+        with (
+            patch("services.score_service.live_match_hub", hub),
+            patch.object(service.stats_service, "calculate_roster_stats", new_callable=AsyncMock),
+            patch.object(
+                service.stats_service, "aggregate_round_standings", new_callable=AsyncMock
+            ),
+            patch.object(
+                service.stats_service, "aggregate_matchday_standings", new_callable=AsyncMock
+            ),
+            patch.object(service, "get_score_by_id", new_callable=AsyncMock),
+        ):
+            await service.create_score("m1", "home", score)
+
+        event = viewer.queue.get_nowait()
+        assert event.type == "score"
+        assert event.data["action"] == "created"
+        assert event.data["goals"] == {"home": 3, "away": 1}
+        assert event.data["score"]["goalPlayer"]["playerId"] == "p1"
+        assert event.data["score"]["matchTime"] == "10:30"
@@ -0,0 +1,131 @@
+"""Unit tests for the mail outbox and its background sender"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+import mail_service
+from config import settings
+from services import mail_outbox as mail_outbox_module
+from services.mail_outbox import MAIL_OUTBOX, MailOutbox
+from tests.fixtures.memory_db import MemoryDatabase
+from tests.fixtures.smtp_sink import SmtpSink
+
+
+@pytest.fixture
+def db():
+    return MemoryDatabase("bishl_test")
+
+
+@pytest_asyncio.fixture
+async def sink(monkeypatch):
+    sink = SmtpSink(refused={"gone@example.com"})
+    port = await sink.start()
+    monkeypatch.setattr(settings, "MAIL_ENABLED", True)
+    monkeypatch.setattr(settings, "MAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(settings, "MAIL_PORT", port)
+    monkeypatch.setattr(settings, "MAIL_SSL_TLS", False)
+    monkeypatch.setattr(settings, "MAIL_STARTTLS", False)
+    monkeypatch.setattr(settings, "USE_CREDENTIALS", False)
+    monkeypatch.setattr(settings, "MAIL_TIMEOUT", 5.0)
+    yield sink
+    await sink.stop()
+
+
+@pytest.fixture
+def outbox(db, monkeypatch):
+    outbox = MailOutbox()
+    outbox.bind(db)
+    monkeypatch.setattr(mail_outbox_module, "mail_outbox", outbox)
+    return outbox
+
+
+class TestMailOutbox:
+    """Test queueing, batched delivery, rate limiting and retries"""
+
+    @pytest.mark.asyncio
+    async def test_unbound_send_is_delivered_directly(self, sink, monkeypatch):
+        monkeypatch.setattr(mail_outbox_module, "mail_outbox", MailOutbox())
+
+        await mail_service.send_email(
+            "Passwort", ["ref@example.com"], "<p>Hallo</p>", cc=["cc@example.com"]
+        )
+
+        assert sink.connections == 1
+        message = sink.messages[0]
+        assert message["Subject"] == "Passwort"
+        assert message["Cc"] == "cc@example.com"
+        assert message.get_content_type() == "text/html"
+        assert sink.envelopes[0][1] == ["ref@example.com", "cc@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_send_email_only_queues_the_message(self, db, sink, outbox):
+        await mail_service.send_email(
+            "Pass-Check", ["admin@example.com"], "<p>Bitte prüfen</p>", reply_to=["club@x.de"]
+        )
+
+        assert sink.connections == 0
+        queued = await db[MAIL_OUTBOX].find_one({})
+        assert queued["status"] == "pending"
+        assert queued["replyTo"] == ["club@x.de"]
+
+    @pytest.mark.asyncio
+    async def test_batch_is_sent_over_one_connection(self, db, sink, outbox):
+        for i in range(5):
+            await outbox.enqueue(f"Spiel {i}", [f"ref{i}@example.com"], "<p>Einsatz</p>")
+
+        assert await outbox.process_batch() == 5
+
+        assert sink.connections == 1
+        assert [message["Subject"] for message in sink.messages] == [f"Spiel {i}" for i in range(5)]
+        sent = await db[MAIL_OUTBOX].find({"status": "sent"}).to_list(None)
+        assert len(sent) == 5
+        assert all(doc["sentAt"] and doc["attempts"] == 1 for doc in sent)
+        assert not any("body" in doc for doc in sent)
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_spans_batches(self, db, sink, outbox, monkeypatch):
+        monkeypatch.setattr(settings, "MAIL_RATE_PER_MINUTE", 3)
+        for i in range(5):
+            await outbox.enqueue(f"Spiel {i}", ["ref@example.com"], "<p>Einsatz</p>")
+
+        assert await outbox.process_batch() == 3
+        assert await outbox.process_batch() == 0
+
+        assert len(sink.messages) == 3
+        assert await db[MAIL_OUTBOX].count_documents({"status": "pending"}) == 2
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried_permanent_ones_fail(
+        self, db, sink, outbox, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "MAIL_RETRY_DELAY", 60.0)
+        sink.fail_next = 1
+        retried = await outbox.enqueue("Retry", ["ref@example.com"], "<p>1</p>")
+        refused = await outbox.enqueue("Refused", ["gone@example.com"], "<p>2</p>")
+        partial = await outbox.enqueue(
+            "Partial", ["ref@example.com"], "<p>3</p>", cc=["gone@example.com"]
+        )
+
+        assert await outbox.process_batch() == 3
+
+        doc = await db[MAIL_OUTBOX].find_one({"_id": retried})
+        assert (doc["status"], doc["attempts"]) == ("pending", 1)
+        assert doc["lastError"].startswith("451")
+        assert doc["notBefore"] > datetime.now() + timedelta(seconds=50)
+        assert "claim" not in doc
+        assert doc["body"] == "<p>1</p>"
+        doc = await db[MAIL_OUTBOX].find_one({"_id": refused})
+        assert doc["status"] == "failed"
+        assert "body" not in doc
+        doc = await db[MAIL_OUTBOX].find_one({"_id": partial})
+        assert doc["status"] == "sent"
+        assert list(doc["refused"]) == ["gone@example.com"]
+
+        # Not due yet; once it is, the retry goes through
+        assert await outbox.process_batch() == 0
+        await db[MAIL_OUTBOX].update_one({"_id": retried}, {"$set": {"notBefore": datetime.now()}})
+        assert await outbox.process_batch() == 1
+        doc = await db[MAIL_OUTBOX].find_one({"_id": retried})
+        assert (doc["status"], doc["attempts"]) == ("sent", 2)
@@ -0,0 +1,146 @@
+"""Unit tests for the today, upcoming and rest-of-week match widgets"""
+
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+
+from routers.matches import (
+    bucket_matches_by_day,
+    build_match_list_query,
+    get_rest_of_week_matches,
+    get_todays_matches,
+    get_upcoming_matches,
+)
+from tests.fixtures.data_fixtures import (
+    _CURRENT_SEASON_ALIAS,
+    create_test_match,
+    create_test_tournament,
+)
+from tests.fixtures.memory_db import MemoryDatabase
+
+
+class CommandRecorder:
+    """Command listener remembering (command, collection) of every query"""
+
+    def __init__(self):
+        self.commands: list[tuple[str, str]] = []
+
+    def started(self, event):
+        self.commands.append((event.command_name, event.command[event.command_name]))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# Match list models require ObjectId strings
+IDS = {
+    name: str(ObjectId())
+    for name in ("yesterday", "today", "tomorrow-late", "tomorrow-early", "in-two-weeks")
+}
+NAMES = {match_id: name for name, match_id in IDS.items()}
+
+
+def _at(days: int, hour: int) -> datetime:
+    return datetime.combine(
+        datetime.now().date() + timedelta(days=days), datetime.min.time()
+    ).replace(hour=hour)
+
+
+@pytest.fixture
+def recorder():
+    return CommandRecorder()
+
+
+@pytest_asyncio.fixture
+async def request_with_matches(recorder):
+    db = MemoryDatabase("bishl_test", event_listeners=[recorder])
+    await db["tournaments"].insert_one(create_test_tournament())
+    await db["matches"].insert_many(
+        [
+            create_test_match(match_id=IDS["yesterday"], start_date=_at(-1, 18)),
+            create_test_match(match_id=IDS["today"], start_date=_at(0, 18)),
+            create_test_match(match_id=IDS["tomorrow-late"], start_date=_at(1, 19)),
+            create_test_match(match_id=IDS["tomorrow-early"], start_date=_at(1, 11)),
+            create_test_match(match_id=IDS["in-two-weeks"], start_date=_at(14, 11)),
+        ]
+    )
+    recorder.commands.clear()
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(mongodb=db)))
+
+
+def _filters(**overrides) -> dict:
+    filters = dict.fromkeys(
+        ("tournament", "round", "matchday", "referee", "club", "team", "assigned")
+    )
+    return {**filters, "season": _CURRENT_SEASON_ALIAS, **overrides}
+
+
+class TestWidgetQueries:
+    """Test the query cost and content of the home page widgets"""
+
+    @pytest.mark.asyncio
+    async def test_today(self, request_with_matches, recorder):
+        response = await get_todays_matches(request_with_matches, **_filters())
+
+        assert [NAMES[m["_id"]] for m in json.loads(response.body)] == ["today"]
+        assert recorder.commands == [("find", "matches"), ("find", "tournaments")]
+
+    @pytest.mark.asyncio
+    async def test_upcoming_returns_next_match_day_in_one_query(
+        self, request_with_matches, recorder
+    ):
+        response = await get_upcoming_matches(request_with_matches, **_filters())
+
+        assert [NAMES[m["_id"]] for m in json.loads(response.body)] == [
+            "tomorrow-early",
+            "tomorrow-late",
+        ]
+        assert recorder.commands == [("find", "matches"), ("find", "tournaments")]
+
+    @pytest.mark.asyncio
+    async def test_upcoming_without_matches(self, request_with_matches, recorder):
+        response = await get_upcoming_matches(request_with_matches, **_filters(club="nobody"))
+
+        assert json.loads(response.body) == []
+        assert recorder.commands == [("find", "matches")]
+
+    @pytest.mark.asyncio
+    async def test_rest_of_week_is_one_range_query(self, request_with_matches, recorder):
+        response = await get_rest_of_week_matches(request_with_matches, **_filters())
+
+        days = json.loads(response.body)
+        tomorrow = (datetime.now().date() + timedelta(days=1)).isoformat()
+        assert days[0]["date"] == tomorrow
+        assert [NAMES[m["_id"]] for m in days[0]["matches"]] == ["tomorrow-early", "tomorrow-late"]
+        assert all(day["matches"] == [] for day in days[1:])
+        assert recorder.commands == [("find", "matches"), ("find", "tournaments")]
+
+
+class TestHelpers:
+    """Test the shared filter and day bucketing"""
+
+    def test_bucket_matches_by_day_keeps_order(self):
+        matches = [{"startDate": _at(1, 11)}, {"startDate": _at(1, 19)}, {"startDate": _at(3, 11)}]
+
+        days = bucket_matches_by_day(matches)
+
+        assert list(days) == [_at(1, 0).date(), _at(3, 0).date()]
+        assert days[_at(1, 0).date()] == matches[:2]
+
+    def test_club_and_team_filter(self):
+        query = build_match_list_query(season="2025", club="c", team="t")
+
+        assert query == {
+            "season.alias": "2025",
+            "$or": [
+                {"$and": [{"home.clubAlias": "c"}, {"home.teamAlias": "t"}]},
+                {"$and": [{"away.clubAlias": "c"}, {"away.teamAlias": "t"}]},
+            ],
+        }
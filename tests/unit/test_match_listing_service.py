@@ -0,0 +1,151 @@
+"""Unit tests for the matchListings read model"""
+
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+
+from config import settings
+from routers.matches import get_todays_matches
+from services.match_listing_service import (
+    LISTING_PROJECTION,
+    MATCH_LISTINGS,
+    MatchListingService,
+)
+from tests.fixtures.data_fixtures import (
+    _CURRENT_SEASON_ALIAS,
+    create_test_match,
+    create_test_tournament,
+)
+from tests.fixtures.memory_db import MemoryDatabase
+
+TODAY = datetime.combine(datetime.now().date(), datetime.min.time()).replace(hour=18)
+
+
+@pytest_asyncio.fixture
+async def db():
+    db = MemoryDatabase("bishl_test")
+    await db["tournaments"].insert_one(create_test_tournament())
+    return db
+
+
+@pytest.fixture
+def service(db):
+    return MatchListingService(db)
+
+
+async def _insert_match(db, start_date=TODAY, **overrides) -> str:
+    match = create_test_match(match_id=str(ObjectId()), start_date=start_date)
+    match.update(overrides)
+    await db["matches"].insert_one(match)
+    return match["_id"]
+
+
+class TestRefresh:
+    """Test keeping single listings in sync"""
+
+    @pytest.mark.asyncio
+    async def test_refresh_lists_compact_match(self, db, service):
+        match_id = await _insert_match(db)
+
+        await service.refresh(match_id)
+
+        listing = await db[MATCH_LISTINGS].find_one({"_id": match_id})
+        assert listing["startDate"] == TODAY
+        assert "roster" not in listing["home"]
+        assert "scores" not in listing["home"]
+        assert set(listing) <= {field.split(".")[0] for field in LISTING_PROJECTION}
+
+    @pytest.mark.asyncio
+    async def test_refresh_resolves_match_settings(self, db, service):
+        match_id = await _insert_match(db)
+        await db["tournaments"].update_one(
+            {"alias": "test-league"}, {"$set": {"seasons.0.matchSettings": {"numOfPeriods": 3}}}
+        )
+
+        await service.refresh(match_id)
+
+        listing = await db[MATCH_LISTINGS].find_one({"_id": match_id})
+        assert listing["matchSettings"] == {"numOfPeriods": 3}
+        assert listing["matchSettingsSource"] == "season"
+
+    @pytest.mark.asyncio
+    async def test_refresh_follows_match_updates(self, db, service):
+        match_id = await _insert_match(db)
+        await service.refresh(match_id)
+
+        await db["matches"].update_one({"_id": match_id}, {"$set": {"venue.name": "Neue Halle"}})
+        await service.refresh(match_id)
+
+        listing = await db[MATCH_LISTINGS].find_one({"_id": match_id})
+        assert listing["venue"]["name"] == "Neue Halle"
+
+    @pytest.mark.asyncio
+    async def test_refresh_removes_deleted_match(self, db, service):
+        match_id = await _insert_match(db)
+        await service.refresh(match_id)
+
+        await db["matches"].delete_one({"_id": match_id})
+        await service.refresh(match_id)
+
+        assert await db[MATCH_LISTINGS].find_one({"_id": match_id}) is None
+
+    @pytest.mark.asyncio
+    async def test_refresh_never_raises(self, service, monkeypatch):
+        async def broken(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(service, "refresh_many", broken)
+
+        await service.refresh("missing")
+
+    @pytest.mark.asyncio
+    async def test_refresh_scope_relists_season(self, db, service):
+        first, second = await _insert_match(db), await _insert_match(db)
+
+        await service.refresh_scope("test-league", _CURRENT_SEASON_ALIAS)
+
+        assert await db[MATCH_LISTINGS].count_documents({}) == 2
+        assert {doc["_id"] async for doc in db[MATCH_LISTINGS].find({})} == {first, second}
+
+
+class TestRebuild:
+    """Test rebuilding the read model from matches"""
+
+    @pytest.mark.asyncio
+    async def test_rebuild_lists_all_and_drops_orphans(self, db, service):
+        match_ids = [await _insert_match(db) for _ in range(5)]
+        await db[MATCH_LISTINGS].insert_one({"_id": "orphan"})
+
+        result = await service.rebuild(batch_size=2)
+
+        assert result == {"listed": 5, "removed": 1}
+        listed = {doc["_id"] async for doc in db[MATCH_LISTINGS].find({})}
+        assert listed == set(match_ids)
+
+
+class TestListingReads:
+    """Test public match lists served from the read model"""
+
+    @pytest.mark.asyncio
+    async def test_today_reads_listings_when_enabled(self, db, service, monkeypatch):
+        match_id = await _insert_match(db)
+        await _insert_match(db, start_date=TODAY + timedelta(days=1))
+        await service.rebuild()
+        # Listings are what is served, even before matches catch up
+        await db["matches"].delete_many({})
+        monkeypatch.setattr(settings, "MATCH_LISTINGS_ENABLED", True)
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(mongodb=db)))
+
+        response = await get_todays_matches(
+            request,
+            season=_CURRENT_SEASON_ALIAS,
+            **dict.fromkeys(
+                ("tournament", "round", "matchday", "referee", "club", "team", "assigned")
+            ),
+        )
+
+        assert [m["_id"] for m in json.loads(response.body)] == [match_id]
@@ -0,0 +1,213 @@
+"""Unit tests for the media cleanup outbox and orphan sweep"""
+
+import io
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import settings
+from services.media_cleanup import MEDIA_OUTBOX, MediaCleanupService
+from services.media_service import (
+    LocalMediaBackend,
+    MediaService,
+    public_id_from_url,
+    scoped_folder,
+)
+from tests.fixtures.memory_db import MemoryDatabase
+
+CLOUDINARY_URL = "https://res.cloudinary.com/bishl/image/upload/v1712/logos/teams/a--b.png"
+
+
+class FailingBackend(LocalMediaBackend):
+    """Local backend whose batch deletes fail"""
+
+    def destroy_many(self, public_ids, resource_type):
+        raise OSError("connection reset")
+
+
+@pytest.fixture
+def db():
+    return MemoryDatabase("bishl_test")
+
+
+@pytest.fixture
+def media(tmp_path):
+    service = MediaService(LocalMediaBackend(tmp_path, "/media"), retries=0)
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def no_delay(monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_LOCAL_URL", "/media")
+    monkeypatch.setattr(settings, "MEDIA_CLEANUP_DELAY", 0.0)
+
+
+async def _upload(media: MediaService, folder: str, public_id: str, **options) -> str:
+    result = await media.upload(io.BytesIO(b"bytes"), folder=folder, public_id=public_id, **options)
+    return result["secure_url"]
+
+
+async def _due_now(db) -> None:
+    await db[MEDIA_OUTBOX].update_many({}, {"$set": {"notBefore": datetime.now()}})
+
+
+class TestDiscard:
+    """Test scheduling deletions"""
+
+    def test_public_id_from_url(self):
+        assert public_id_from_url(CLOUDINARY_URL) == "logos/teams/a--b"
+        assert (
+            public_id_from_url(
+                "http://res.cloudinary.com/x/image/upload/c_scale,h_200/v9/posts/p.jpg"
+            )
+            == "posts/p"
+        )
+        assert public_id_from_url("/media/players/p1.jpg") == "players/p1"
+        assert public_id_from_url("https://example.com/logo.png") is None
+        assert public_id_from_url(None) is None
+
+    @pytest.mark.asyncio
+    async def test_repeated_discards_collapse_and_overwrites_are_skipped(self, db, media):
+        service = MediaCleanupService(db, media)
+
+        assert await service.discard_url(CLOUDINARY_URL)
+        assert await service.discard_url(CLOUDINARY_URL)
+        assert not await service.discard_url(
+            CLOUDINARY_URL, replaced_by=CLOUDINARY_URL.replace("v1712", "v1800")
+        )
+        assert not await service.discard_url(None)
+
+        entries = await db[MEDIA_OUTBOX].find({}).to_list(None)
+        assert [(e["publicId"], e["resourceType"], e["status"]) for e in entries] == [
+            ("logos/teams/a--b", "image", "pending")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_files_of_other_deployments_are_not_discarded(
+        self, db, media, tmp_path, monkeypatch
+    ):
+        service = MediaCleanupService(db, media)
+        monkeypatch.setattr(settings, "MEDIA_FOLDER_PREFIX", "demo/")
+        url = await _upload(media, "players", "p1")
+
+        assert (tmp_path / "demo" / "players" / "p1.jpg").exists()
+        assert not await service.discard_url(CLOUDINARY_URL)
+        assert await service.discard_url(url)
+
+        entries = await db[MEDIA_OUTBOX].find({}).to_list(None)
+        assert [e["publicId"] for e in entries] == ["demo/players/p1"]
+
+
+class TestProcessBatch:
+    """Test the outbox worker's deletions"""
+
+    @pytest.mark.asyncio
+    async def test_deletes_due_files_in_one_call_per_resource_type(self, db, media, tmp_path):
+        service = MediaCleanupService(db, media)
+        old = await _upload(media, "players", "p1")
+        await _upload(media, "docs/", "rules.pdf", resource_type="raw")
+        await service.discard_url(old)
+        await service.discard("docs/rules.pdf", "raw")
+
+        assert await service.process_batch() == 2
+
+        assert not (tmp_path / "players" / "p1.jpg").exists()
+        assert not (tmp_path / "docs" / "rules.pdf").exists()
+        assert await db[MEDIA_OUTBOX].count_documents({}) == 0
+
+    @pytest.mark.asyncio
+    async def test_waits_for_the_delay_and_keeps_referenced_files(
+        self, db, media, tmp_path, monkeypatch
+    ):
+        service = MediaCleanupService(db, media)
+        url = await _upload(media, "logos/", "buffalos")
+        await db["clubs"].insert_one({"_id": "c1", "teams": [{"_id": "t1", "logoUrl": url}]})
+        monkeypatch.setattr(settings, "MEDIA_CLEANUP_DELAY", 60.0)
+        await service.discard_url(url)
+
+        assert await service.process_batch() == 0
+
+        await _due_now(db)
+        assert await service.process_batch() == 1
+        assert (tmp_path / "logos" / "buffalos.jpg").exists()
+        assert await db[MEDIA_OUTBOX].count_documents({}) == 0
+
+    @pytest.mark.asyncio
+    async def test_failures_back_off_and_give_up(self, db, tmp_path, monkeypatch):
+        media = MediaService(FailingBackend(tmp_path, "/media"), retries=0)
+        service = MediaCleanupService(db, media)
+        monkeypatch.setattr(settings, "MEDIA_CLEANUP_MAX_ATTEMPTS", 2)
+        await service.discard("posts/p1")
+
+        await service.process_batch()
+        entry = await db[MEDIA_OUTBOX].find_one({})
+        assert (entry["status"], entry["attempts"]) == ("pending", 1)
+        assert "connection reset" in entry["lastError"]
+        assert entry["notBefore"] > datetime.now() + timedelta(seconds=30)
+
+        await _due_now(db)
+        await service.process_batch()
+        entry = await db[MEDIA_OUTBOX].find_one({})
+        assert (entry["status"], entry["attempts"]) == ("failed", 2)
+        assert await service.process_batch() == 0
+        media.shutdown()
+
+
+class TestSweep:
+    """Test the orphan sweep"""
+
+    async def _setup(self, db, media, tmp_path) -> None:
+        kept = await _upload(media, "players", "p1")
+        await _upload(media, "players", "p2")
+        await _upload(media, "docs/", "kept.pdf", resource_type="raw")
+        await _upload(media, "docs/", "orphan.pdf", resource_type="raw")
+        await _upload(media, "venues", "new")
+        await db["players"].insert_one({"_id": "p1", "imageUrl": kept})
+        root = scoped_folder("")
+        await db["documents"].insert_one({"_id": "d1", "publicId": f"{root}docs/kept.pdf"})
+        day_ago = time.time() - 2 * 86400
+        for path in ("players/p1.jpg", "players/p2.jpg", "docs/kept.pdf", "docs/orphan.pdf"):
+            os.utime(tmp_path / root / path, (day_ago, day_ago))
+
+    @pytest.mark.asyncio
+    async def test_reports_orphans_without_discarding_by_default(self, db, media, tmp_path):
+        service = MediaCleanupService(db, media)
+        await self._setup(db, media, tmp_path)
+
+        assert await service.sweep() == [("image", "players/p2"), ("raw", "docs/orphan.pdf")]
+
+        assert await db[MEDIA_OUTBOX].count_documents({}) == 0
+
+    @pytest.mark.asyncio
+    async def test_discard_needs_a_folder_prefix(self, db, media, tmp_path, monkeypatch):
+        service = MediaCleanupService(db, media)
+        monkeypatch.setattr(settings, "MEDIA_SWEEP_DISCARD", True)
+        await self._setup(db, media, tmp_path)
+
+        assert len(await service.sweep()) == 2
+
+        assert await db[MEDIA_OUTBOX].count_documents({}) == 0
+
+    @pytest.mark.asyncio
+    async def test_discards_old_unreferenced_files_of_this_deployment_only(
+        self, db, media, tmp_path, monkeypatch
+    ):
+        service = MediaCleanupService(db, media)
+        await _upload(media, "players", "prod")
+        monkeypatch.setattr(settings, "MEDIA_FOLDER_PREFIX", "demo/")
+        monkeypatch.setattr(settings, "MEDIA_SWEEP_DISCARD", True)
+        await self._setup(db, media, tmp_path)
+        day_ago = time.time() - 2 * 86400
+        os.utime(tmp_path / "players" / "prod.jpg", (day_ago, day_ago))
+
+        assert len(await service.sweep()) == 2
+
+        entries = await db[MEDIA_OUTBOX].find({}).sort("publicId", 1).to_list(None)
+        assert [(e["publicId"], e["resourceType"]) for e in entries] == [
+            ("demo/docs/orphan.pdf", "raw"),
+            ("demo/players/p2", "image"),
+        ]
+        assert await service.sweep() == []
@@ -0,0 +1,85 @@
+"""Unit tests for the media service"""
+
+import io
+from unittest.mock import patch
+
+import cloudinary.exceptions
+import pytest
+from fastapi import UploadFile
+
+from services.media_service import (
+    CloudinaryBackend,
+    LocalMediaBackend,
+    MediaService,
+)
+
+
+class FlakyBackend:
+    """Backend failing with the given errors before it succeeds"""
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.uploads: list[bytes] = []
+
+    def upload(self, file, **options):
+        self.uploads.append(file.read())
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"public_id": f"{options['folder']}/{options['public_id']}", "url": "u"}
+
+    def destroy(self, public_id, **options):
+        return {"result": "ok"}
+
+
+class TestMediaService:
+    """Test thread pool calls, retries and the local backend"""
+
+    @pytest.mark.asyncio
+    async def test_local_backend_round_trip(self, tmp_path):
+        service = MediaService(LocalMediaBackend(tmp_path, "/media"))
+        upload = UploadFile(io.BytesIO(b"jpeg bytes"), filename="logo.png")
+
+        result = await service.upload(upload, folder="logos/", public_id="buffalos")
+
+        assert result["public_id"] == "logos/buffalos"
+        assert result["secure_url"] == "/media/logos/buffalos.jpg"
+        assert (tmp_path / "logos" / "buffalos.jpg").read_bytes() == b"jpeg bytes"
+        assert (await service.destroy("logos/buffalos"))["result"] == "ok"
+        assert (await service.destroy("logos/buffalos"))["result"] == "not found"
+        service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried_from_the_start_of_the_file(self):
+        backend = FlakyBackend(
+            cloudinary.exceptions.Error("Socket error: timeout"),
+            cloudinary.exceptions.GeneralError("server error"),
+        )
+        service = MediaService(backend, retries=2, retry_delay=0)
+
+        result = await service.upload(io.BytesIO(b"abc"), folder="players", public_id="p1")
+
+        assert result["public_id"] == "players/p1"
+        assert backend.uploads == [b"abc", b"abc", b"abc"]
+
+    @pytest.mark.asyncio
+    async def test_permanent_errors_are_not_retried(self):
+        backend = FlakyBackend(cloudinary.exceptions.BadRequest("Invalid image file"))
+        service = MediaService(backend, retries=3, retry_delay=0)
+
+        with pytest.raises(cloudinary.exceptions.BadRequest):
+            await service.upload(io.BytesIO(b"abc"), folder="players", public_id="p1")
+        assert len(backend.uploads) == 1
+
+    def test_cloudinary_upload_is_chunked_and_keeps_the_file_open(self):
+        stream = io.BytesIO(b"x" * 10)
+
+        def upload_large(file, chunk_size, **options):
+            with file:
+                chunks = iter(lambda: file.read(chunk_size), b"")
+                return {"chunks": [len(chunk) for chunk in chunks], **options}
+
+        with patch("cloudinary.uploader.upload_large", upload_large):
+            result = CloudinaryBackend(chunk_size=4).upload(stream, folder="posts")
+
+        assert result == {"chunks": [4, 4, 2], "folder": "posts"}
+        assert not stream.closed
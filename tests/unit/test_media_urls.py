@@ -0,0 +1,59 @@
+"""Unit tests for size-specific image URLs"""
+
+from pydantic import HttpUrl
+
+from services.media_urls import IMAGE_SIZES, _variants, add_image_variants, derivative_url
+
+BASE = "https://res.cloudinary.com/bishl/image/upload"
+LOGO = f"{BASE}/v1712/logos/buffalos.png"
+
+
+class TestMediaUrls:
+    """Test derivative URLs and their insertion into responses"""
+
+    def test_transformation_goes_before_the_version(self):
+        assert derivative_url(LOGO, "c_fit,w_64") == f"{BASE}/c_fit,w_64/v1712/logos/buffalos.png"
+        assert (
+            derivative_url(f"{BASE}/c_scale,h_200/v3/logos/teams/a.png", "w_64")
+            == f"{BASE}/c_scale,h_200/w_64/v3/logos/teams/a.png"
+        )
+
+    def test_other_urls_are_returned_unchanged(self):
+        for url in (
+            "/media/players/p1.jpg",
+            "https://example.com/logo.png",
+            "https://res.cloudinary.com/bishl/raw/upload/v1/docs/rules.pdf",
+        ):
+            assert derivative_url(url, "w_64") == url
+
+    def test_adds_variants_next_to_nested_image_fields(self):
+        content = {
+            "data": [
+                {
+                    "logoUrl": LOGO,
+                    "teams": [{"logoUrl": HttpUrl(LOGO)}, {"logoUrl": None}],
+                    "standings": {"buffalos": {"logo": LOGO}},
+                },
+                {"player": {"imageUrl": f"{BASE}/v9/players/p1.jpg"}},
+            ]
+        }
+
+        add_image_variants(content)
+
+        club, roster_entry = content["data"]
+        assert sorted(club["logoVariants"]) == sorted(IMAGE_SIZES)
+        assert club["logoVariants"]["thumb"] == derivative_url(LOGO, IMAGE_SIZES["thumb"])
+        assert club["teams"][0]["logoVariants"] == club["logoVariants"]
+        assert "logoVariants" not in club["teams"][1]
+        assert club["standings"]["buffalos"]["logoVariants"]["list"].endswith(
+            "/v1712/logos/buffalos.png"
+        )
+        assert roster_entry["player"]["imageVariants"]["detail"].startswith(f"{BASE}/c_limit")
+
+    def test_repeated_urls_are_served_from_the_cache(self):
+        _variants.cache_clear()
+
+        add_image_variants([{"logoUrl": LOGO} for _ in range(40)])
+
+        info = _variants.cache_info()
+        assert (info.misses, info.hits) == (1, 39)
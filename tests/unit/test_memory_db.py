@@ -0,0 +1,330 @@
+"""Unit tests for the in-memory MongoDB stand-in"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from services.assignment_conflict_service import AssignmentConflictService
+from services.message_service import MessageService
+from services.request_metrics import DBCommandListener, MetricsRegistry
+from tests.fixtures.data_fixtures import create_test_match, create_test_roster_player
+from tests.fixtures.memory_db import MemoryDatabase
+
+
+@pytest.fixture
+def db():
+    return MemoryDatabase("bishl_test")
+
+
+class TestQueries:
+    """Test query operators, projections and cursors"""
+
+    @pytest.mark.asyncio
+    async def test_operators_and_dotted_paths(self, db):
+        await db["players"].insert_many(
+            [
+                {"_id": "p1", "age": 17, "teams": [{"alias": "u19"}, {"alias": "herren"}]},
+                {"_id": "p2", "age": 25, "teams": [{"alias": "herren"}], "hobby": None},
+                {"_id": "p3", "age": 12, "teams": []},
+            ]
+        )
+
+        async def ids(query):
+            return [p["_id"] for p in await db["players"].find(query).to_list(None)]
+
+        assert await ids({"teams.alias": "herren"}) == ["p1", "p2"]
+        assert await ids({"age": {"$gte": 17, "$lt": 25}}) == ["p1"]
+        assert await ids({"teams": {"$size": 0}}) == ["p3"]
+        assert await ids({"hobby": None}) == ["p1", "p2", "p3"]
+        assert await ids({"hobby": {"$exists": True}}) == ["p2"]
+        assert await ids({"$or": [{"age": 12}, {"teams.alias": {"$in": ["u19"]}}]}) == ["p1", "p3"]
+        assert await ids(
+            {"teams": {"$elemMatch": {"alias": {"$regex": "^U1", "$options": "i"}}}}
+        ) == ["p1"]
+        assert await ids({"age": {"$gt": "10"}}) == []
+
+    @pytest.mark.asyncio
+    async def test_sort_skip_limit_and_projection(self, db):
+        await db["teams"].insert_many(
+            [{"_id": i, "name": name, "club": {"alias": "c"}} for i, name in enumerate("bAc")]
+        )
+
+        cursor = db["teams"].find({}, {"name": 1, "_id": 0}).sort("name", 1)
+        assert await cursor.to_list(None) == [{"name": "A"}, {"name": "b"}, {"name": "c"}]
+        cursor = db["teams"].find({}, {"club": 0}).collation({"locale": "de", "strength": 1})
+        assert [
+            t["name"] for t in await cursor.sort("name", -1).skip(1).limit(1).to_list(None)
+        ] == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_positional_projection(self, db):
+        match = create_test_match(match_id="m1")
+        match["home"]["scores"] = [
+            {"_id": "s1", "matchSeconds": 10},
+            {"_id": "s2", "matchSeconds": 20},
+        ]
+        await db["matches"].insert_one(match)
+
+        found = await db["matches"].find_one(
+            {"_id": "m1", "home.scores._id": "s2"}, {"_id": 0, "home.scores.$": 1}
+        )
+
+        assert found == {"home": {"scores": [{"_id": "s2", "matchSeconds": 20}]}}
+
+    @pytest.mark.asyncio
+    async def test_documents_are_copied(self, db):
+        document = {"name": "original"}
+        await db["clubs"].insert_one(document)
+        assert "_id" in document
+
+        found = await db["clubs"].find_one({"_id": document["_id"]})
+        found["name"] = "changed"
+
+        assert (await db["clubs"].find_one({}))["name"] == "original"
+
+
+class TestUpdates:
+    """Test update operators, positional paths and upserts"""
+
+    @pytest.mark.asyncio
+    async def test_array_filters_like_score_service(self, db):
+        match = create_test_match(match_id="m1")
+        match["home"]["roster"]["players"] = [
+            create_test_roster_player("p1"),
+            create_test_roster_player("p2"),
+        ]
+        await db["matches"].insert_one(match)
+
+        result = await db["matches"].update_one(
+            {"_id": "m1"},
+            {
+                "$push": {"home.scores": {"_id": "s1"}},
+                "$inc": {
+                    "home.stats.goalsFor": 1,
+                    "home.roster.players.$[goalPlayer].goals": 1,
+                    "home.roster.players.$[assistPlayer].assists": 1,
+                },
+            },
+            array_filters=[
+                {"goalPlayer.player.playerId": "p1"},
+                {"assistPlayer.player.playerId": "p2"},
+            ],
+        )
+
+        stored = await db["matches"].find_one({"_id": "m1"})
+        roster = stored["home"]["roster"]["players"]
+        assert result.modified_count == 1
+        assert (roster[0]["goals"], roster[0]["assists"]) == (1, 0)
+        assert (roster[1]["goals"], roster[1]["assists"]) == (0, 1)
+        assert stored["home"]["stats"]["goalsFor"] == 1
+        assert stored["home"]["scores"] == [{"_id": "s1"}]
+
+    @pytest.mark.asyncio
+    async def test_positional_operator_and_pull(self, db):
+        await db["tournaments"].insert_one(
+            {
+                "_id": "t1",
+                "seasons": [{"alias": "2024", "rounds": []}, {"alias": "2025", "rounds": []}],
+            }
+        )
+
+        await db["tournaments"].update_one(
+            {"_id": "t1", "seasons.alias": "2025"}, {"$push": {"seasons.$.rounds": {"_id": "r1"}}}
+        )
+        stored = await db["tournaments"].find_one({"_id": "t1"})
+        assert stored["seasons"][1]["rounds"] == [{"_id": "r1"}]
+
+        await db["tournaments"].update_one(
+            {"_id": "t1", "seasons.alias": "2025"}, {"$pull": {"seasons.$.rounds": {"_id": "r1"}}}
+        )
+        stored = await db["tournaments"].find_one({"_id": "t1"})
+        assert stored["seasons"][1]["rounds"] == []
+
+    @pytest.mark.asyncio
+    async def test_upsert_and_find_one_and_update(self, db):
+        result = await db["counters"].update_one(
+            {"_id": "matchId"}, {"$inc": {"value": 1}}, upsert=True
+        )
+        assert result.upserted_id == "matchId"
+
+        after = await db["counters"].find_one_and_update(
+            {"_id": "matchId"}, {"$inc": {"value": 1}}, return_document=ReturnDocument.AFTER
+        )
+        assert after == {"_id": "matchId", "value": 2}
+
+    @pytest.mark.asyncio
+    async def test_unique_index(self, db):
+        await db["users"].create_index("email", unique=True)
+        await db["users"].insert_one({"email": "a@test.com"})
+
+        with pytest.raises(DuplicateKeyError):
+            await db["users"].insert_one({"email": "a@test.com"})
+
+
+class TestAggregation:
+    """Test pipelines the services actually run"""
+
+    @pytest.mark.asyncio
+    async def test_chat_partners_pipeline(self, db):
+        await db["users"].insert_many(
+            [
+                {"_id": "u2", "firstName": "Ref", "lastName": "Two"},
+                {"_id": "u3", "firstName": "Ref", "lastName": "Three"},
+            ]
+        )
+        await db["messages"].insert_many(
+            [
+                {
+                    "sender": {"userId": "u1"},
+                    "receiver": {"userId": "u2"},
+                    "read": False,
+                    "timestamp": datetime(2025, 1, 1),
+                },
+                {
+                    "sender": {"userId": "u2"},
+                    "receiver": {"userId": "u1"},
+                    "read": False,
+                    "timestamp": datetime(2025, 1, 2),
+                },
+                {
+                    "sender": {"userId": "u3"},
+                    "receiver": {"userId": "u1"},
+                    "read": False,
+                    "timestamp": datetime(2025, 1, 3),
+                },
+                {
+                    "sender": {"userId": "u4"},
+                    "receiver": {"userId": "u1"},
+                    "read": False,
+                    "timestamp": datetime(2025, 1, 4),
+                },
+            ]
+        )
+
+        partners = await MessageService(db).get_chat_partners("u1")
+
+        assert partners == [
+            {
+                "userId": "u3",
+                "firstName": "Ref",
+                "lastName": "Three",
+                "unreadCount": 1,
+                "lastMessageAt": datetime(2025, 1, 3),
+            },
+            {
+                "userId": "u2",
+                "firstName": "Ref",
+                "lastName": "Two",
+                "unreadCount": 1,
+                "lastMessageAt": datetime(2025, 1, 2),
+            },
+        ]
+
+    @pytest.mark.asyncio
+    async def test_lookup_with_first_and_if_null(self, db):
+        await db["matches"].insert_one(create_test_match(match_id="m1"))
+        await db["assignments"].insert_many(
+            [
+                {"_id": "a1", "status": "ASSIGNED", "matchId": "m1"},
+                {"_id": "a2", "status": "ASSIGNED", "matchId": "gone"},
+                {"_id": "a3", "status": "REQUESTED", "matchId": "m1"},
+            ]
+        )
+
+        joined = await AssignmentConflictService(db).get_assigned_with_matches()
+
+        assert [a["_id"] for a in joined] == ["a1", "a2"]
+        assert joined[0]["match"]["home"]["fullName"] == "Home Team Full Name"
+        assert "supplementarySheet" not in joined[0]["match"]
+        assert joined[1]["match"] is None
+
+    @pytest.mark.asyncio
+    async def test_unwind_and_facet(self, db):
+        await db["players"].insert_many(
+            [
+                {
+                    "_id": "p1",
+                    "assignedTeams": [
+                        {"teams": [{"status": "INVALID", "invalidReasonCodes": ["AGE", "QUOTA"]}]}
+                    ],
+                },
+                {"_id": "p2", "assignedTeams": [{"teams": [{"status": "VALID"}]}]},
+                {"_id": "p3", "assignedTeams": []},
+            ]
+        )
+
+        [result] = await (
+            db["players"]
+            .aggregate(
+                [
+                    {"$unwind": "$assignedTeams"},
+                    {"$unwind": "$assignedTeams.teams"},
+                    {
+                        "$facet": {
+                            "invalid": [
+                                {"$match": {"assignedTeams.teams.status": "INVALID"}},
+                                {"$count": "players"},
+                            ],
+                            "reasons": [
+                                {"$unwind": "$assignedTeams.teams.invalidReasonCodes"},
+                                {
+                                    "$group": {
+                                        "_id": "$assignedTeams.teams.invalidReasonCodes",
+                                        "count": {"$sum": 1},
+                                    }
+                                },
+                                {"$sort": {"_id": 1}},
+                            ],
+                        }
+                    },
+                ]
+            )
+            .to_list(1)
+        )
+
+        assert result == {
+            "invalid": [{"players": 1}],
+            "reasons": [{"_id": "AGE", "count": 1}, {"_id": "QUOTA", "count": 1}],
+        }
+
+
+class TestSessionsAndMonitoring:
+    """Test transactions and command events"""
+
+    @pytest.mark.asyncio
+    async def test_failed_transaction_is_rolled_back(self, db):
+        await db["matches"].insert_one({"_id": "m1", "referee1": None})
+
+        with pytest.raises(RuntimeError):
+            async with await db.client.start_session() as session:
+                async with session.start_transaction():
+                    await db["matches"].update_one(
+                        {"_id": "m1"}, {"$set": {"referee1": "r1"}}, session=session
+                    )
+                    await db["assignments"].insert_one({"_id": "a1"}, session=session)
+                    raise RuntimeError("conflict")
+
+        assert (await db["matches"].find_one({"_id": "m1"}))["referee1"] is None
+        assert await db["assignments"].count_documents({}) == 0
+
+    @pytest.mark.asyncio
+    async def test_listeners_receive_command_events(self):
+        registry = MetricsRegistry()
+        db = MemoryDatabase("bishl_test", event_listeners=[DBCommandListener(registry)])
+
+        await db["players"].insert_many([{"_id": "p1"}, {"_id": "p2"}])
+        await db["players"].find({}).to_list(None)
+
+        rendered = registry.render()
+        assert 'bishl_db_commands_total{collection="players",command="insert"} 1' in rendered
+        assert 'bishl_db_documents_total{collection="players",command="find"} 2' in rendered
+
+    def test_unsupported_stage_is_reported(self, db):
+        from tests.fixtures.memory_aggregation import run_pipeline
+        from tests.fixtures.memory_query import UnsupportedOperation
+
+        with pytest.raises(UnsupportedOperation, match=r"\$graphLookup"):
+            run_pipeline([{}], [{"$graphLookup": {}}], SimpleNamespace())
@@ -239,3 +239,38 @@ class TestEmailNotification:
             )
 
             mock_send_email.assert_not_called()
+
+
+class TestGetChatPartners:
+    """Test chat partner listing"""
+
+    @pytest.mark.asyncio
+    async def test_single_aggregation(self, message_service, mock_db):
+        """Test chat list is computed in one aggregation with user lookup"""
+        partners = [
+            {
+                "userId": "user-2",
+                "firstName": "Jane",
+                "lastName": "Doe",
+                "unreadCount": 2,
+                "lastMessageAt": datetime(2024, 1, 15, 18, 0),
+            }
+        ]
+        mock_cursor = MagicMock()
+        mock_cursor.to_list = AsyncMock(return_value=partners)
+        mock_db._messages_collection.aggregate = MagicMock(return_value=mock_cursor)
+
+        result = await message_service.get_chat_partners("user-1")
+
+        assert result == partners
+        mock_db._messages_collection.aggregate.assert_called_once()
+        mock_db._users_collection.find_one.assert_not_called()
+
+        pipeline = mock_db._messages_collection.aggregate.call_args[0][0]
+        stages = [next(iter(stage)) for stage in pipeline]
+        assert stages[:4] == ["$match", "$project", "$group", "$lookup"]
+        assert pipeline[0]["$match"] == {
+            "$or": [{"sender.userId": "user-1"}, {"receiver.userId": "user-1"}]
+        }
+        assert pipeline[3]["$lookup"]["from"] == "users"
+        assert "password" not in str(pipeline[3]["$lookup"]["pipeline"])
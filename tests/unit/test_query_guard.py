@@ -0,0 +1,138 @@
+"""Unit tests for N+1 detection and query budgets"""
+
+import asyncio
+import contextvars
+import functools
+import itertools
+from types import SimpleNamespace
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from config import settings
+from services.query_guard import NPlusOneQueryError, assert_query_budget, query_shape
+from services.request_metrics import DBCommandListener, MetricsRegistry, RequestMetricsMiddleware
+
+_ids = itertools.count(1)
+
+
+def _run_command(listener, command_name, command):
+    request_id = next(_ids)
+    base = {"connection_id": 1, "request_id": request_id, "operation_id": request_id}
+    listener.started(SimpleNamespace(command_name=command_name, command=command, **base))
+    listener.succeeded(
+        SimpleNamespace(
+            command_name=command_name,
+            reply={"cursor": {"firstBatch": [{}]}},
+            duration_micros=100,
+            **base,
+        )
+    )
+
+
+async def _find_one(listener, collection, filter_):
+    """Emit the command from a worker thread in the caller's context, as Motor does"""
+    context = contextvars.copy_context()
+    await asyncio.get_running_loop().run_in_executor(
+        None,
+        functools.partial(
+            context.run, _run_command, listener, "find", {"find": collection, "filter": filter_}
+        ),
+    )
+
+
+def _build_app(players: int):
+    listener = DBCommandListener(MetricsRegistry())
+    router = APIRouter()
+
+    @router.get("/{match_id}/roster")
+    async def get_roster(match_id: str):
+        await _find_one(listener, "matches", {"_id": match_id})
+        for i in range(players):
+            await _find_one(listener, "players", {"_id": f"p{i}"})
+        return {"players": players}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/matches")
+    app.add_middleware(RequestMetricsMiddleware, registry=MetricsRegistry())
+    return app
+
+
+@pytest.fixture
+def guard_settings(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_GUARD_THRESHOLD", 3)
+
+    def _mode(mode):
+        monkeypatch.setattr(settings, "QUERY_GUARD_MODE", mode)
+
+    return _mode
+
+
+class TestQueryShape:
+    """Test reduction of commands to their shape"""
+
+    def test_values_do_not_change_the_shape(self):
+        first = query_shape("players", "find", {"filter": {"_id": "p1", "age": {"$gt": 3}}})
+        second = query_shape("players", "find", {"filter": {"age": {"$gt": 9}, "_id": "p2"}})
+
+        assert first == second
+        assert first != query_shape("players", "find", {"filter": {"alias": "p1"}})
+
+    def test_in_lists_and_pipelines(self):
+        assert query_shape("m", "find", {"filter": {"_id": {"$in": [1, 2]}}}) == query_shape(
+            "m", "find", {"filter": {"_id": {"$in": [3]}}}
+        )
+        assert '"$match"' in query_shape("m", "aggregate", {"pipeline": [{"$match": {"a": 1}}]})
+
+
+class TestNPlusOneGuard:
+    """Test detection of repeated queries within one request"""
+
+    def test_raise_mode_reports_call_site(self, guard_settings):
+        guard_settings("raise")
+        client = TestClient(_build_app(players=5))
+
+        with pytest.raises(NPlusOneQueryError) as exc_info:
+            client.get("/matches/m1/roster")
+
+        message = str(exc_info.value)
+        assert "GET /matches/{match_id}/roster: 6 queries" in message
+        assert "players.find" in message
+        assert "test_query_guard.py" in message and "in get_roster" in message
+
+    def test_below_threshold_passes(self, guard_settings):
+        guard_settings("raise")
+        client = TestClient(_build_app(players=2))
+
+        assert client.get("/matches/m1/roster").status_code == 200
+
+    def test_off_mode_does_not_raise(self, guard_settings):
+        guard_settings("off")
+        client = TestClient(_build_app(players=5))
+
+        assert client.get("/matches/m1/roster").status_code == 200
+
+
+class TestQueryBudget:
+    """Test the per-request query budget"""
+
+    def test_budget_exceeded(self, guard_settings):
+        guard_settings("off")
+        client = TestClient(_build_app(players=4))
+
+        with pytest.raises(AssertionError, match="Query budget of 3 exceeded"):
+            with assert_query_budget(3):
+                client.get("/matches/m1/roster")
+
+    def test_identical_budget(self, guard_settings):
+        guard_settings("off")
+        client = TestClient(_build_app(players=2))
+
+        with assert_query_budget(5, max_identical=2) as requests:
+            client.get("/matches/m1/roster")
+        with pytest.raises(AssertionError, match="3x identical query players.find"):
+            with assert_query_budget(5, max_identical=2):
+                TestClient(_build_app(players=3)).get("/matches/m1/roster")
+
+        assert requests[0].queries == 3
@@ -0,0 +1,189 @@
+"""Unit tests for request timing and DB command metrics"""
+
+import asyncio
+import contextvars
+import functools
+import itertools
+from types import SimpleNamespace
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from config import settings
+from exceptions import AuthenticationException, AuthorizationException
+from routers import metrics as metrics_router
+from services.request_metrics import (
+    UNMATCHED_ROUTE,
+    DBCommandListener,
+    MetricsRegistry,
+    RequestMetricsMiddleware,
+    RequestStats,
+    current_request_stats,
+    route_template,
+)
+
+_ids = itertools.count(1)
+
+
+def _run_command(listener, command_name, command, reply, micros=2000):
+    """Emit started/succeeded events like pymongo does for one command"""
+    request_id = next(_ids)
+    base = {"connection_id": ("db", 27017), "request_id": request_id, "operation_id": request_id}
+    listener.started(SimpleNamespace(command_name=command_name, command=command, **base))
+    listener.succeeded(
+        SimpleNamespace(command_name=command_name, reply=reply, duration_micros=micros, **base)
+    )
+
+
+async def _motor_call(listener, *args):
+    """Run the listener on a worker thread in a copy of the caller's context, as Motor does"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    await loop.run_in_executor(None, functools.partial(context.run, _run_command, listener, *args))
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def _build_app(registry):
+    listener = DBCommandListener(registry)
+    router = APIRouter()
+
+    @router.get("/{match_id}")
+    async def get_match(match_id: str):
+        await _motor_call(listener, "find", {"find": "matches"}, {"cursor": {"firstBatch": [{}]}})
+        for _ in range(3):
+            await _motor_call(listener, "find", {"find": "players"}, {"cursor": {"firstBatch": []}})
+        return {"id": match_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/matches")
+    app.add_middleware(RequestMetricsMiddleware, registry=registry)
+    return app
+
+
+class TestDBCommandListener:
+    """Test command counting and request attribution"""
+
+    def test_counts_by_collection_and_operation(self, registry):
+        listener = DBCommandListener(registry)
+
+        _run_command(listener, "find", {"find": "matches"}, {"cursor": {"firstBatch": [{}, {}]}})
+        _run_command(
+            listener,
+            "getMore",
+            {"getMore": 1, "collection": "matches"},
+            {"cursor": {"nextBatch": [{}]}},
+        )
+        _run_command(listener, "update", {"update": "players"}, {"n": 1, "nModified": 1})
+        _run_command(listener, "hello", {"hello": 1}, {})
+
+        body = registry.render()
+
+        assert 'bishl_db_commands_total{collection="matches",command="find"} 1' in body
+        assert 'bishl_db_documents_total{collection="matches",command="getMore"} 1' in body
+        assert 'bishl_db_documents_total{collection="players",command="update"} 1' in body
+        assert "hello" not in body
+
+    def test_attributes_to_current_request(self, registry):
+        listener = DBCommandListener(registry)
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        try:
+            _run_command(listener, "find", {"find": "clubs"}, {"cursor": {"firstBatch": [{}]}})
+        finally:
+            current_request_stats.reset(token)
+        _run_command(listener, "find", {"find": "clubs"}, {"cursor": {"firstBatch": []}})
+
+        assert stats.queries == 1
+        assert stats.operations[("clubs", "find")] == [1, 1, 0.002]
+
+    def test_failed_command_is_counted(self, registry):
+        listener = DBCommandListener(registry)
+        base = {"connection_id": 1, "request_id": 7, "operation_id": 7}
+        listener.started(
+            SimpleNamespace(command_name="insert", command={"insert": "users"}, **base)
+        )
+        listener.failed(SimpleNamespace(command_name="insert", duration_micros=10, **base))
+
+        assert 'bishl_db_command_failures_total{collection="users",command="insert"} 1' in (
+            registry.render()
+        )
+
+
+class TestRequestMetricsMiddleware:
+    """Test per-route latency and queries per request"""
+
+    def test_records_route_template_and_queries(self, registry):
+        client = TestClient(_build_app(registry))
+
+        assert client.get("/matches/abc").status_code == 200
+        assert client.get("/missing").status_code == 404
+        body = registry.render()
+
+        assert (
+            'bishl_http_request_duration_seconds_count{method="GET",'
+            'route="/matches/{match_id}",status="2xx"} 1'
+        ) in body
+        assert (
+            'bishl_http_request_db_queries_bucket{method="GET",'
+            'route="/matches/{match_id}",le="2"} 0'
+        ) in body
+        assert (
+            'bishl_http_request_db_queries_bucket{method="GET",'
+            'route="/matches/{match_id}",le="5"} 1'
+        ) in body
+        assert f'route="{UNMATCHED_ROUTE}",status="4xx"' in body
+
+
+class TestRouteTemplate:
+    """Test reconstruction of the full route template"""
+
+    def test_substitutes_params_in_match_order(self):
+        scope = {
+            "endpoint": object(),
+            "path": "/clubs/berlin/teams/berlin",
+            "path_params": {"club_alias": "berlin", "team_alias": "berlin"},
+        }
+
+        assert route_template(scope) == "/clubs/{club_alias}/teams/{team_alias}"
+
+    def test_unrouted_request(self):
+        assert route_template({"path": "/nope", "path_params": {}}) == UNMATCHED_ROUTE
+
+
+class TestMetricsAccess:
+    """Test who may read GET /metrics"""
+
+    @staticmethod
+    def _request(authorization=None):
+        return SimpleNamespace(headers={"authorization": authorization} if authorization else {})
+
+    @staticmethod
+    def _token(roles):
+        user = {"_id": "u1", "roles": roles, "firstName": "Test", "lastName": "User"}
+        return f"Bearer {metrics_router.auth.encode_token(user)}"
+
+    def test_closed_by_default(self, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+
+        with pytest.raises(AuthenticationException):
+            metrics_router._authorize(self._request())
+        with pytest.raises(AuthorizationException):
+            metrics_router._authorize(self._request(self._token(["USER"])))
+        metrics_router._authorize(self._request(self._token(["ADMIN"])))
+
+    def test_metrics_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape")
+
+        metrics_router._authorize(self._request("Bearer scrape"))
+        with pytest.raises(AuthenticationException):
+            metrics_router._authorize(self._request("Bearer scrapé"))
+
+    def test_explicitly_public(self, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_PUBLIC", True)
+
+        metrics_router._authorize(self._request())
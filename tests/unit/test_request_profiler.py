@@ -0,0 +1,119 @@
+"""Unit tests for the slow-request profiler"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from config import settings
+from services.request_profiler import (
+    RequestProfilerMiddleware,
+    list_profiles,
+    profile_path,
+    sampler,
+)
+
+
+async def _wait_for_upstream():
+    await asyncio.sleep(0.08)
+
+
+def _crunch(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _build_app(sampled: list[int] | None = None):
+    router = APIRouter()
+
+    @router.get("/events")
+    async def events():
+        async def stream():
+            # The response has started, so the profile must no longer be sampled
+            sampled.append(len(sampler._active))
+            for n in range(3):
+                await _wait_for_upstream()
+                yield f"data: {n}\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @router.get("/slow")
+    async def slow_endpoint():
+        await _wait_for_upstream()
+        _crunch(0.05)
+        return {"ok": True}
+
+    @router.get("/fast")
+    async def fast_endpoint(request: Request):
+        return {"correlation_id": request.state.correlation_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/sync")
+    app.add_middleware(RequestProfilerMiddleware)
+    return app
+
+
+@pytest.fixture
+def profiler_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SLOW_REQUEST_SECONDS", 0.1)
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_INTERVAL_MS", 1.0)
+    monkeypatch.setattr(settings, "PROFILE_MAX_FILES", 2)
+    return tmp_path
+
+
+class TestRequestProfilerMiddleware:
+    """Test correlation ids and profile capture"""
+
+    def test_correlation_id_in_state_and_header(self, profiler_settings):
+        response = TestClient(_build_app()).get("/sync/fast")
+
+        assert response.headers["x-correlation-id"] == response.json()["correlation_id"]
+        assert list_profiles() == []
+
+    def test_slow_request_is_profiled(self, profiler_settings):
+        response = TestClient(_build_app()).get("/sync/slow")
+
+        profiles = list_profiles()
+        assert len(profiles) == 1
+        profile = profiles[0]
+        assert profile["id"].endswith(response.headers["x-correlation-id"])
+        assert profile["request"] == "GET /sync/slow"
+        report = profile_path(profile["id"]).read_text()
+        assert "_wait_for_upstream (tests/unit/test_request_profiler.py);<await>" in report
+        assert "_crunch (tests/unit/test_request_profiler.py)" in report
+
+    def test_oldest_profiles_are_pruned(self, profiler_settings):
+        client = TestClient(_build_app())
+        for _ in range(3):
+            client.get("/sync/slow")
+
+        assert len(list_profiles()) == 2
+
+    def test_event_streams_are_not_sampled(self, profiler_settings):
+        sampled = []
+
+        response = TestClient(_build_app(sampled)).get("/sync/events")
+
+        assert response.text.count("data:") == 3
+        assert sampled == [0]
+        assert list_profiles() == []
+
+    def test_disabled_by_default_threshold(self, profiler_settings, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILE_SLOW_REQUEST_SECONDS", 0.0)
+
+        TestClient(_build_app()).get("/sync/slow")
+
+        assert list_profiles() == []
+
+
+class TestProfilePath:
+    """Test profile id validation"""
+
+    def test_rejects_traversal(self, profiler_settings):
+        assert profile_path("../../config") is None
+        assert profile_path("20250101-120000_not-a-uuid") is None
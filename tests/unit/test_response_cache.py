@@ -0,0 +1,302 @@
+"""Unit tests for the response cache and its middleware"""
+
+from unittest.mock import AsyncMock, patch
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from models.matches import ScoresDB
+from routers import posts, scores
+from routers.rounds import router as rounds_router
+from services.response_cache import (
+    CACHE_TAGS_ATTR,
+    CACHED_COLLECTIONS,
+    CachedResponse,
+    ResponseCache,
+    ResponseCacheMiddleware,
+    cache_response,
+    etag_matches,
+    invalidates_cache,
+)
+from tests.fixtures.data_fixtures import create_test_tournament
+from tests.fixtures.memory_db import MemoryDatabase
+
+
+def _entry(body=b"{}", tags=("matches",)):
+    return CachedResponse(
+        status_code=200,
+        headers=[(b"content-type", b"application/json")],
+        body=body,
+        etag=ResponseCache.make_etag(body),
+        tags=tags,
+    )
+
+
+def _build_app(cache):
+    """Small app with one cached read, one uncached read and one write"""
+    router = APIRouter()
+    calls = {"matches": 0, "uncached": 0}
+    store = {"score": 0, "fail_after_write": False}
+
+    @router.get("")
+    @cache_response("matches")
+    async def list_matches(season: str | None = None):
+        calls["matches"] += 1
+        return {"season": season, "score": store["score"]}
+
+    @router.get("/uncached")
+    async def uncached():
+        calls["uncached"] += 1
+        return {"ok": True}
+
+    @router.patch("")
+    @invalidates_cache("matches")
+    async def update_match():
+        store["score"] += 1
+        if store["fail_after_write"]:
+            raise RuntimeError("boom")
+        return {"score": store["score"]}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/matches")
+    app.add_middleware(ResponseCacheMiddleware, cache=cache)
+    return app, calls, store
+
+
+class TestResponseCache:
+    """Test the tag-indexed LRU store"""
+
+    def test_key_ignores_query_parameter_order(self):
+        assert ResponseCache.make_key("/matches", b"b=2&a=1") == ResponseCache.make_key(
+            "/matches", b"a=1&b=2"
+        )
+        assert ResponseCache.make_key("/matches", b"") == "/matches"
+
+    def test_etag_is_strong_and_content_based(self):
+        etag = ResponseCache.make_etag(b"abc")
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag == ResponseCache.make_etag(b"abc")
+        assert etag != ResponseCache.make_etag(b"abd")
+
+    def test_invalidate_drops_only_tagged_entries(self):
+        cache = ResponseCache()
+        cache.put("/matches", _entry(tags=("matches", "tournaments")))
+        cache.put("/posts", _entry(tags=("posts",)))
+
+        assert cache.invalidate("tournaments") == 1
+
+        assert cache.get("/matches") is None
+        assert cache.get("/posts") is not None
+
+    def test_invalidate_keys_keeps_entries_of_other_documents(self):
+        cache = ResponseCache()
+        cache.put("/t/a", _entry(tags=("tournaments",))._replace(keys=("tournament:a",)))
+        cache.put("/t/b", _entry(tags=("tournaments",))._replace(keys=("tournament:b",)))
+        cache.put("/t", _entry(tags=("tournaments",))._replace(keys=("tournaments:*",)))
+
+        assert cache.invalidate_keys("tournaments", frozenset({"tournament:a"})) == 2
+
+        assert cache.get("/t/b") is not None
+        assert cache.invalidate_keys("tournaments", frozenset({"tournaments:*"})) == 1
+        assert len(cache) == 0
+
+    def test_put_rejected_after_concurrent_invalidation(self):
+        cache = ResponseCache()
+        generation = cache.generation
+        cache.invalidate("matches")
+
+        assert cache.put("/matches", _entry(), generation) is False
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(maxsize=2)
+        cache.put("a", _entry())
+        cache.put("b", _entry())
+        cache.get("a")
+        cache.put("c", _entry())
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.invalidate("matches") == 2
+
+    def test_cached_collections_cover_the_cached_routes(self):
+        tags = {
+            tag
+            for route in posts.router.routes
+            for tag in getattr(route.endpoint, CACHE_TAGS_ATTR, ())
+        }
+
+        assert "posts" in tags
+        assert tags <= CACHED_COLLECTIONS
+
+    def test_etag_matches(self):
+        etag = '"abc"'
+        assert etag_matches('"abc"', etag)
+        assert etag_matches('"x", W/"abc"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"abd"', etag)
+        assert not etag_matches(None, etag)
+
+
+class TestResponseCacheMiddleware:
+    """Test caching, conditional requests and write invalidation end to end"""
+
+    def test_second_read_served_from_cache(self):
+        app, calls, _ = _build_app(ResponseCache())
+        client = TestClient(app)
+
+        first = client.get("/matches", params={"season": "2025"})
+        second = client.get("/matches", params={"season": "2025"})
+
+        assert first.headers["x-cache"] == "MISS"
+        assert second.headers["x-cache"] == "HIT"
+        assert second.json() == first.json()
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.headers["content-length"] == str(len(second.content))
+        assert calls["matches"] == 1
+
+    def test_query_string_is_part_of_key(self):
+        app, calls, _ = _build_app(ResponseCache())
+        client = TestClient(app)
+
+        client.get("/matches", params={"season": "2024"})
+        client.get("/matches", params={"season": "2025"})
+
+        assert calls["matches"] == 2
+
+    def test_if_none_match_returns_304(self):
+        app, _, _ = _build_app(ResponseCache())
+        client = TestClient(app)
+        etag = client.get("/matches").headers["etag"]
+
+        response = client.get("/matches", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_write_invalidates_entries(self):
+        app, calls, _ = _build_app(ResponseCache())
+        client = TestClient(app)
+        etag = client.get("/matches").headers["etag"]
+
+        client.patch("/matches")
+        response = client.get("/matches", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["score"] == 1
+        assert response.headers["etag"] != etag
+        assert calls["matches"] == 2
+
+    def test_failed_write_still_invalidates(self):
+        app, calls, store = _build_app(ResponseCache())
+        client = TestClient(app, raise_server_exceptions=False)
+        client.get("/matches")
+        store["fail_after_write"] = True
+
+        assert client.patch("/matches").status_code == 500
+        assert client.get("/matches").json()["score"] == 1
+        assert calls["matches"] == 2
+
+    def test_entry_keys_come_from_path_parameters(self):
+        router = APIRouter()
+
+        @router.get("/{alias}")
+        @cache_response("clubs", "matches", keys={"clubs": "club:{alias}"})
+        async def get_club(alias: str):
+            return {"alias": alias}
+
+        cache = ResponseCache()
+        app = FastAPI()
+        app.include_router(router, prefix="/clubs")
+        app.add_middleware(ResponseCacheMiddleware, cache=cache)
+        TestClient(app).get("/clubs/buffalos")
+
+        assert cache.get("/clubs/buffalos").keys == ("club:buffalos", "matches:*")
+        assert cache.invalidate_keys("clubs", frozenset({"club:c1", "club:other"})) == 0
+        assert cache.invalidate_keys("matches", frozenset({"match:m1"})) == 1
+
+    def test_routes_without_marker_are_not_cached(self):
+        cache = ResponseCache()
+        app, calls, _ = _build_app(cache)
+        client = TestClient(app)
+
+        client.get("/matches/uncached")
+        response = client.get("/matches/uncached")
+
+        assert "x-cache" not in response.headers
+        assert calls["uncached"] == 2
+        assert len(cache) == 0
+
+
+def _standings(goals_for: int) -> dict:
+    return {
+        "fullName": "Berlin Buffalos",
+        "shortName": "Buffalos",
+        "tinyName": "BUF",
+        "gamesPlayed": 1,
+        "goalsFor": goals_for,
+        "goalsAgainst": 0,
+        "points": 3,
+        "wins": 1,
+        "losses": 0,
+        "draws": 0,
+        "otWins": 0,
+        "otLosses": 0,
+        "soWins": 0,
+        "soLosses": 0,
+    }
+
+
+class TestScoreInvalidation:
+    """Test that scoring a goal refreshes the cached standings"""
+
+    def test_cached_round_changes_after_score_post(self):
+        tournament = create_test_tournament()
+        season = tournament["seasons"][0]
+        season["rounds"][0]["standings"] = {"buffalos": _standings(0)}
+        db = MemoryDatabase("bishl_test")
+        app = FastAPI()
+        app.include_router(
+            rounds_router, prefix="/tournaments/{tournament_alias}/seasons/{season_alias}/rounds"
+        )
+        app.include_router(scores.router, prefix="/matches/{match_id}/{team_flag}/scores")
+        app.add_middleware(ResponseCacheMiddleware, cache=ResponseCache())
+        app.state.mongodb = db
+        app.dependency_overrides[scores.auth.auth_wrapper] = lambda: None
+        round_url = (
+            f"/tournaments/{tournament['alias']}/seasons/{season['alias']}/rounds/hauptrunde"
+        )
+
+        async def create_score(service, match_id, team_flag, score):
+            # ScoreService re-aggregates the standings into tournaments
+            await service.db["tournaments"].update_one(
+                {"alias": tournament["alias"]},
+                {"$set": {"seasons.0.rounds.0.standings.buffalos.goalsFor": 1}},
+            )
+            return ScoresDB(**score.model_dump(by_alias=True))
+
+        with (
+            TestClient(app) as client,
+            patch("routers.scores.MatchPermissionService") as permissions,
+            patch("routers.scores.ScoreService.create_score", create_score),
+        ):
+            permissions.return_value.get_matchday_owner = AsyncMock(return_value=None)
+            client.portal.call(db["tournaments"].insert_one, tournament)
+            client.portal.call(db["matches"].insert_one, {"_id": "m1"})
+            first = client.get(round_url)
+            assert client.get(round_url).headers["x-cache"] == "HIT"
+
+            response = client.post(
+                "/matches/m1/home/scores",
+                json={
+                    "matchTime": "12:34",
+                    "goalPlayer": {"playerId": "p1", "firstName": "Ben", "lastName": "Bunt"},
+                },
+            )
+            second = client.get(round_url)
+
+        assert response.status_code == 201
+        assert first.json()["data"]["standings"]["buffalos"]["goalsFor"] == 0
+        assert second.headers["x-cache"] == "MISS"
+        assert second.json()["data"]["standings"]["buffalos"]["goalsFor"] == 1
@@ -0,0 +1,256 @@
+"""Unit tests for UnassignedMatchService"""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.unassigned_match_service import UnassignedMatchService
+
+
+def _cursor(result):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=result)
+    return cursor
+
+
+def _match(match_id, md_alias, home_club_id, start=None):
+    return {
+        "_id": match_id,
+        "tournament": {"alias": "regio", "name": "Regionalliga"},
+        "season": {"alias": "2025"},
+        "round": {"alias": "hauptrunde"},
+        "matchday": {"alias": md_alias},
+        "home": {"clubId": home_club_id, "clubName": f"Club {home_club_id}", "fullName": "Home"},
+        "away": {"clubId": "away-club", "fullName": "Away"},
+        "startDate": start or datetime(2025, 5, 17, 14, 0),
+        "venue": {"name": "Halle"},
+    }
+
+
+TOURNAMENT_TREE = {
+    "alias": "regio",
+    "seasons": [
+        {
+            "alias": "2025",
+            "rounds": [
+                {
+                    "alias": "hauptrunde",
+                    "matchdays": [
+                        {"alias": "1", "owner": {"clubId": "owner-club", "clubName": "Owner"}},
+                        {"alias": "2", "owner": None},
+                    ],
+                }
+            ],
+        }
+    ],
+}
+
+
+@pytest.fixture
+def mock_db():
+    """Mock MongoDB database with one collection mock per name"""
+    collections = {name: MagicMock() for name in ["matches", "tournaments", "users", "clubs"]}
+    db = MagicMock()
+    db.__getitem__ = MagicMock(side_effect=lambda name: collections[name])
+    db.collections = collections
+    return db
+
+
+@pytest.fixture
+def service(mock_db):
+    return UnassignedMatchService(mock_db, max_concurrent_emails=2)
+
+
+class TestResolveMatchdayOwners:
+    """Test owner resolution from a single tournament-tree load"""
+
+    @pytest.mark.asyncio
+    async def test_resolves_owners_with_one_query(self, service, mock_db):
+        tournaments = mock_db.collections["tournaments"]
+        tournaments.find = MagicMock(return_value=_cursor([TOURNAMENT_TREE]))
+        matches = [_match("m1", "1", "home-a"), _match("m2", "2", "home-b")]
+
+        owners = await service.resolve_matchday_owners(matches)
+
+        tournaments.find.assert_called_once()
+        assert tournaments.find.call_args[0][0] == {"alias": {"$in": ["regio"]}}
+        assert owners[("regio", "2025", "hauptrunde", "1")]["clubId"] == "owner-club"
+        assert owners[("regio", "2025", "hauptrunde", "2")] is None
+
+    @pytest.mark.asyncio
+    async def test_no_query_without_complete_keys(self, service, mock_db):
+        tournaments = mock_db.collections["tournaments"]
+        tournaments.find = MagicMock()
+        match = _match("m1", "1", "home-a")
+        match["matchday"] = None
+
+        assert await service.resolve_matchday_owners([match]) == {}
+        tournaments.find.assert_not_called()
+
+
+class TestGroupAndContacts:
+    """Test grouping by responsible club and batched contact lookup"""
+
+    def test_owner_takes_priority_over_home_club(self, service):
+        owners = {
+            ("regio", "2025", "hauptrunde", "1"): {"clubId": "owner-club", "clubName": "Owner"},
+            ("regio", "2025", "hauptrunde", "2"): None,
+        }
+        matches = [
+            _match("m1", "1", "home-a"),
+            _match("m2", "1", "home-b"),
+            _match("m3", "2", "home-b"),
+        ]
+
+        grouped = service.group_matches_by_club(matches, owners)
+
+        assert [m["_id"] for m in grouped["owner-club"]["matches"]] == ["m1", "m2"]
+        assert [m["_id"] for m in grouped["home-b"]["matches"]] == ["m3"]
+        assert grouped["home-b"]["matchday_owner"] is None
+
+    @pytest.mark.asyncio
+    async def test_fetch_club_contacts_uses_in_queries(self, service, mock_db):
+        users = mock_db.collections["users"]
+        clubs = mock_db.collections["clubs"]
+        users.find = MagicMock(
+            return_value=_cursor(
+                [
+                    {"email": "a1@club.de", "club": {"clubId": "c1"}},
+                    {"email": "a2@club.de", "club": {"clubId": "c1"}},
+                    {"club": {"clubId": "c2"}},
+                ]
+            )
+        )
+        clubs.find = MagicMock(
+            return_value=_cursor(
+                [{"_id": "c1", "refereeContact": {"email": "sr@club.de"}}, {"_id": "c2"}]
+            )
+        )
+
+        admin_emails, referee_contacts = await service.fetch_club_contacts(["c1", "c2"])
+
+        users.find.assert_called_once()
+        assert users.find.call_args[0][0]["club.clubId"] == {"$in": ["c1", "c2"]}
+        clubs.find.assert_called_once()
+        assert admin_emails == {"c1": ["a1@club.de", "a2@club.de"], "c2": []}
+        assert referee_contacts == {"c1": "sr@club.de", "c2": None}
+
+
+class TestResolveRecipients:
+    """Test recipient resolution rules"""
+
+    def test_referee_contact_is_primary(self):
+        with patch("services.unassigned_match_service.settings") as mock_settings:
+            mock_settings.LIGENLEITUNG_EMAIL = "liga@bishl.de"
+            mock_settings.REF_ADMIN_EMAIL = "sr-admin@bishl.de"
+            mock_settings.ENVIRONMENT = "production"
+            recipients, cc, reply_to = UnassignedMatchService.resolve_recipients(
+                "sr@club.de", ["admin@club.de", "sr@club.de"]
+            )
+
+        assert recipients == ["sr@club.de"]
+        assert cc == ["admin@club.de", "liga@bishl.de"]
+        assert reply_to == ["sr-admin@bishl.de"]
+
+    def test_falls_back_to_ligenleitung(self):
+        with patch("services.unassigned_match_service.settings") as mock_settings:
+            mock_settings.LIGENLEITUNG_EMAIL = "liga@bishl.de"
+            mock_settings.REF_ADMIN_EMAIL = ""
+            mock_settings.ENVIRONMENT = "production"
+            recipients, cc, reply_to = UnassignedMatchService.resolve_recipients(None, [])
+
+        assert recipients == ["liga@bishl.de"]
+        assert cc == []
+        assert reply_to == []
+
+
+class TestSendNotifications:
+    """Test concurrent, bounded sending"""
+
+    @pytest.mark.asyncio
+    async def test_sends_concurrently_within_limit(self, service):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_send(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        notifications = [
+            {
+                "club_id": f"c{i}",
+                "club_name": f"Club {i}",
+                "recipients": [f"r{i}@club.de"],
+                "cc": [],
+                "reply_to": [],
+                "subject": "s",
+                "body": "b",
+            }
+            for i in range(5)
+        ]
+
+        with patch("services.unassigned_match_service.send_email", side_effect=fake_send):
+            sent = await service.send_notifications(notifications)
+
+        assert sent == 5
+        assert max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_does_not_abort_others(self, service):
+        notifications = [
+            {
+                "club_id": f"c{i}",
+                "club_name": f"Club {i}",
+                "recipients": [f"r{i}@club.de"],
+                "cc": [],
+                "reply_to": [],
+                "subject": "s",
+                "body": "b",
+            }
+            for i in range(3)
+        ]
+        send = AsyncMock(side_effect=[None, Exception("smtp down"), None])
+
+        with patch("services.unassigned_match_service.send_email", send):
+            sent = await service.send_notifications(notifications)
+
+        assert sent == 2
+        assert send.await_count == 3
+
+
+class TestRun:
+    """Test the full job"""
+
+    @pytest.mark.asyncio
+    async def test_dry_run_reports_timings_and_never_sends(self, service, mock_db):
+        mock_db.collections["matches"].find = MagicMock(
+            return_value=_cursor([_match("m1", "1", "home-a"), _match("m2", "2", "home-b")])
+        )
+        mock_db.collections["tournaments"].find = MagicMock(return_value=_cursor([TOURNAMENT_TREE]))
+        mock_db.collections["users"].find = MagicMock(
+            return_value=_cursor([{"email": "admin@owner.de", "club": {"clubId": "owner-club"}}])
+        )
+        mock_db.collections["clubs"].find = MagicMock(return_value=_cursor([]))
+
+        with patch("services.unassigned_match_service.send_email", new_callable=AsyncMock) as send:
+            result = await service.run(datetime(2025, 5, 17), send_emails=True, dry_run=True)
+
+        send.assert_not_awaited()
+        assert result["emails_sent"] == 0
+        assert {n["club_id"] for n in result["notifications"]} == {"owner-club", "home-b"}
+        assert "Spieltag Owner" in next(
+            n["subject"] for n in result["notifications"] if n["club_id"] == "owner-club"
+        )
+        assert set(result["timings"]) == {
+            "fetch_matches_ms",
+            "resolve_owners_ms",
+            "fetch_contacts_ms",
+            "render_ms",
+            "send_ms",
+            "total_ms",
+        }